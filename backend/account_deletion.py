@@ -0,0 +1,353 @@
+"""Usuwanie danych konta w tle, partiami i z możliwością wznowienia.
+
+POST /auth/delete-account i POST /admin/users/{id}/delete-account tylko
+oznaczają konto jako usunięte (e-mail, hasło, status) i zapisują
+AccountDeletionJob w tej samej transakcji. Sprzątanie powiązań — wiadomości,
+zapisy, znajomości, powiadomienia, własne grupy i wydarzenia — wykonuje
+zadanie schedulera "account_deletions":
+
+- każdy krok (DELETION_STEPS) usuwa wiersze partiami po batch_size
+  (DELETE ... WHERE id IN (SELECT id ... LIMIT n)), każda partia w osobnej
+  krótkiej transakcji razem z zapisem postępu w zadaniu,
+- po restarcie / przekroczeniu budżetu czasu zadanie wznawia się od
+  current_step (powtórzona partia niczego nie psuje — usuwa to, co zostało),
+- members_count grup, z których użytkownik był usuwany, jest przeliczany
+  jednym UPDATE z podzapytaniem agregującym.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from backend.logger import get_logger
+from backend.message_archive import archived_messages_of, purge_user_from_archives
+from backend.models import (
+    AccountDeletionJob,
+    AppleAuthCredential,
+    EmailVerificationToken,
+    Event,
+    EventSave,
+    EventSignup,
+    EventStatus,
+    Friendship,
+    Group,
+    GroupInvitation,
+    GroupMembership,
+    Message,
+    MessageArchive,
+    PasswordResetToken,
+    UserBlock,
+    UserNotification,
+)
+from backend.notifications import delete_notifications
+
+
+log = get_logger(__name__)
+
+DEFAULT_ACCOUNT_DELETION_BATCH_SIZE = 1000
+DEFAULT_ACCOUNT_DELETION_MAX_SECONDS = 120
+MAX_ATTEMPTS = 5
+MAX_ERROR_LENGTH = 2000
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class AccountDeletionConfig:
+    batch_size: int = DEFAULT_ACCOUNT_DELETION_BATCH_SIZE
+    # Budżet jednego uruchomienia zadania; reszta w kolejnym ticku schedulera.
+    max_seconds: float = DEFAULT_ACCOUNT_DELETION_MAX_SECONDS
+
+
+def load_account_deletion_config() -> AccountDeletionConfig:
+    """Ładuje konfigurację usuwania kont ze zmiennych środowiskowych."""
+
+    batch_size = int(
+        os.getenv("ACCOUNT_DELETION_BATCH_SIZE", str(DEFAULT_ACCOUNT_DELETION_BATCH_SIZE))
+    )
+    max_seconds = float(
+        os.getenv("ACCOUNT_DELETION_MAX_SECONDS", str(DEFAULT_ACCOUNT_DELETION_MAX_SECONDS))
+    )
+    if batch_size <= 0 or max_seconds <= 0:
+        raise ValueError(
+            "ACCOUNT_DELETION_BATCH_SIZE i ACCOUNT_DELETION_MAX_SECONDS muszą być większe od zera"
+        )
+    return AccountDeletionConfig(batch_size=batch_size, max_seconds=max_seconds)
+
+
+# --- kroki ---
+
+
+@dataclass(frozen=True)
+class DeletionStep:
+    name: str
+    model: type
+    condition: Callable[[int], object]
+    # Wydarzenia partnera są archiwizowane, nie usuwane.
+    archive_events: bool = False
+    # Krok z własną partią (db, user_id, batch_size) -> liczba wierszy.
+    run: Callable[[Session, int, int], int] | None = None
+
+
+def _owned_groups(user_id: int):
+    return select(Group.id).where(Group.creator_id == user_id)
+
+
+def _owned_events(user_id: int):
+    return select(Event.id).where(Event.partner_user_id == user_id)
+
+
+def _notifications_of(user_id: int):
+    return or_(UserNotification.user_id == user_id, UserNotification.partner_user_id == user_id)
+
+
+def _purge_notifications(db: Session, user_id: int, batch_size: int) -> int:
+    return delete_notifications(db, _notifications_of(user_id), limit=batch_size)
+
+
+DELETION_STEPS: tuple[DeletionStep, ...] = (
+    DeletionStep("owned_group_messages", Message, lambda uid: Message.group_id.in_(_owned_groups(uid))),
+    DeletionStep(
+        "owned_group_memberships",
+        GroupMembership,
+        lambda uid: GroupMembership.group_id.in_(_owned_groups(uid)),
+    ),
+    # Zaproszenia i wyciszenia usuwa ON DELETE CASCADE grupy.
+    DeletionStep("owned_groups", Group, lambda uid: Group.creator_id == uid),
+    DeletionStep("owned_event_signups", EventSignup, lambda uid: EventSignup.event_id.in_(_owned_events(uid))),
+    DeletionStep("owned_event_saves", EventSave, lambda uid: EventSave.event_id.in_(_owned_events(uid))),
+    DeletionStep(
+        "owned_events",
+        Event,
+        lambda uid: (Event.partner_user_id == uid) & (Event.status != EventStatus.ARCHIVED.value),
+        archive_events=True,
+    ),
+    DeletionStep(
+        "friendships",
+        Friendship,
+        lambda uid: or_(Friendship.requester_user_id == uid, Friendship.addressee_user_id == uid),
+    ),
+    DeletionStep("group_memberships", GroupMembership, lambda uid: GroupMembership.user_id == uid),
+    DeletionStep(
+        "group_invitations",
+        GroupInvitation,
+        lambda uid: or_(GroupInvitation.inviter_user_id == uid, GroupInvitation.invitee_user_id == uid),
+    ),
+    DeletionStep("event_signups", EventSignup, lambda uid: EventSignup.user_id == uid),
+    DeletionStep("event_saves", EventSave, lambda uid: EventSave.user_id == uid),
+    DeletionStep(
+        "user_blocks",
+        UserBlock,
+        lambda uid: or_(UserBlock.blocker_user_id == uid, UserBlock.blocked_user_id == uid),
+    ),
+    # Osobno wysłane i odebrane: każda partia idzie po własnym indeksie.
+    DeletionStep("messages_sent", Message, lambda uid: Message.sender_user_id == uid),
+    DeletionStep("messages_received", Message, lambda uid: Message.recipient_user_id == uid),
+    DeletionStep("archived_messages", MessageArchive, archived_messages_of, run=purge_user_from_archives),
+    DeletionStep("password_reset_tokens", PasswordResetToken, lambda uid: PasswordResetToken.user_id == uid),
+    DeletionStep(
+        "email_verification_tokens",
+        EmailVerificationToken,
+        lambda uid: EmailVerificationToken.user_id == uid,
+    ),
+    DeletionStep("apple_auth_credentials", AppleAuthCredential, lambda uid: AppleAuthCredential.user_id == uid),
+    # Usuwa też powiadomienia innych użytkowników (partner_user_id) — przez
+    # delete_notifications(), żeby ich liczniki nieprzeczytanych się zgadzały.
+    DeletionStep(
+        "notifications",
+        UserNotification,
+        _notifications_of,
+        run=_purge_notifications,
+    ),
+)
+
+_STEP_NAMES = [step.name for step in DELETION_STEPS]
+
+
+def run_step_batch(db: Session, step: DeletionStep, user_id: int, batch_size: int) -> int:
+    if step.run is not None:
+        return step.run(db, user_id, batch_size)
+    model = step.model
+    ids = select(model.id).where(step.condition(user_id)).limit(batch_size).scalar_subquery()
+    if step.archive_events:
+        statement = (
+            update(Event)
+            .where(Event.id.in_(ids))
+            .values(status=EventStatus.ARCHIVED.value, updated_at=datetime.utcnow())
+        )
+    else:
+        statement = delete(model).where(model.id.in_(ids))
+    return db.execute(statement.execution_options(synchronize_session=False)).rowcount
+
+
+def recount_group_members(db: Session, group_ids: list[int]) -> int:
+    if not group_ids:
+        return 0
+    members = (
+        select(func.count(GroupMembership.id))
+        .where(GroupMembership.group_id == Group.id)
+        .scalar_subquery()
+    )
+    return db.execute(
+        update(Group)
+        .where(Group.id.in_(group_ids))
+        .values(members_count=members, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+# --- zadania ---
+
+
+def enqueue_account_deletion(
+    db: Session,
+    user_id: int,
+    *,
+    requested_by_user_id: int | None = None,
+) -> AccountDeletionJob:
+    """Dodaje zadanie (bez commita — razem z oznaczeniem konta w żądaniu)."""
+
+    job = db.scalar(select(AccountDeletionJob).where(AccountDeletionJob.user_id == user_id))
+    if job is not None:
+        return job
+
+    affected_group_ids = db.scalars(
+        select(GroupMembership.group_id)
+        .join(Group, Group.id == GroupMembership.group_id)
+        .where(
+            GroupMembership.user_id == user_id,
+            or_(Group.creator_id.is_(None), Group.creator_id != user_id),
+        )
+    ).all()
+    job = AccountDeletionJob(
+        user_id=user_id,
+        requested_by_user_id=requested_by_user_id,
+        status=JOB_PENDING,
+        current_step=_STEP_NAMES[0],
+        deleted_rows=0,
+        progress_json="{}",
+        affected_group_ids_json=json.dumps(sorted(affected_group_ids)),
+        attempts=0,
+    )
+    db.add(job)
+    db.flush()
+    return job
+
+
+def run_account_deletion_job(
+    db: Session,
+    job: AccountDeletionJob,
+    *,
+    batch_size: int,
+    deadline: float,
+    clock: Callable[[], float] = time.monotonic,
+) -> int:
+    """Wykonuje kroki od current_step do końca albo do deadline; zwraca liczbę wierszy."""
+
+    if job.status != JOB_RUNNING:
+        job.status = JOB_RUNNING
+        job.started_at = job.started_at or datetime.utcnow()
+        job.updated_at = datetime.utcnow()
+        db.commit()
+
+    progress = json.loads(job.progress_json or "{}")
+    start_index = _STEP_NAMES.index(job.current_step) if job.current_step in _STEP_NAMES else len(DELETION_STEPS)
+    processed = 0
+
+    for index in range(start_index, len(DELETION_STEPS)):
+        step = DELETION_STEPS[index]
+        while True:
+            if clock() >= deadline:
+                return processed
+            rows = run_step_batch(db, step, job.user_id, batch_size)
+            processed += rows
+            progress[step.name] = progress.get(step.name, 0) + rows
+            job.progress_json = json.dumps(progress)
+            job.deleted_rows = (job.deleted_rows or 0) + rows
+            if rows < batch_size:
+                job.current_step = _STEP_NAMES[index + 1] if index + 1 < len(DELETION_STEPS) else None
+            job.updated_at = datetime.utcnow()
+            # Partia i postęp w jednej krótkiej transakcji.
+            db.commit()
+            if rows < batch_size:
+                break
+
+    recount_group_members(db, json.loads(job.affected_group_ids_json or "[]"))
+    job.status = JOB_DONE
+    job.current_step = None
+    job.last_error = None
+    job.finished_at = datetime.utcnow()
+    job.updated_at = job.finished_at
+    db.commit()
+    log.info("Account deletion job %s done: user_id=%s rows=%s", job.id, job.user_id, job.deleted_rows)
+    return processed
+
+
+def process_account_deletions(
+    db: Session,
+    config: AccountDeletionConfig | None = None,
+    *,
+    clock: Callable[[], float] = time.monotonic,
+) -> int:
+    """Zadanie schedulera: przetwarza oczekujące zadania w budżecie czasu."""
+
+    config = config or AccountDeletionConfig()
+    deadline = clock() + config.max_seconds
+    processed = 0
+
+    job_ids = db.scalars(
+        select(AccountDeletionJob.id)
+        .where(AccountDeletionJob.status.in_([JOB_PENDING, JOB_RUNNING]))
+        .order_by(AccountDeletionJob.id)
+    ).all()
+    for job_id in job_ids:
+        if clock() >= deadline:
+            break
+        job = db.get(AccountDeletionJob, job_id)
+        try:
+            processed += run_account_deletion_job(
+                db, job, batch_size=config.batch_size, deadline=deadline, clock=clock
+            )
+        except Exception as exc:
+            db.rollback()
+            log.exception("Account deletion job %s failed", job_id)
+            job = db.get(AccountDeletionJob, job_id)
+            job.attempts = (job.attempts or 0) + 1
+            job.last_error = "".join(traceback.format_exception_only(type(exc), exc)).strip()[:MAX_ERROR_LENGTH]
+            job.status = JOB_FAILED if job.attempts >= MAX_ATTEMPTS else JOB_PENDING
+            job.updated_at = datetime.utcnow()
+            db.commit()
+    return processed
+
+
+def account_deletion_job_status(job: AccountDeletionJob) -> dict:
+    remaining = _STEP_NAMES[_STEP_NAMES.index(job.current_step):] if job.current_step in _STEP_NAMES else []
+    return {
+        "id": job.id,
+        "user_id": job.user_id,
+        "requested_by_user_id": job.requested_by_user_id,
+        "status": job.status,
+        "current_step": job.current_step,
+        "steps_total": len(DELETION_STEPS),
+        "steps_done": len(DELETION_STEPS) - len(remaining),
+        "deleted_rows": job.deleted_rows,
+        "progress": json.loads(job.progress_json or "{}"),
+        "attempts": job.attempts,
+        "last_error": job.last_error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "updated_at": job.updated_at,
+    }
@@ -0,0 +1,373 @@
+"""Eksporty hurtowe panelu admina: użytkownicy, wydarzenia, log audytu.
+
+Widoki /admin/users i /admin/events budują całą listę w pamięci, a
+/admin/staff/audit-log jest ucięty do 100 wpisów. Eksport czyta wiersze
+partiami przez yield_per (na PostgreSQL kursor po stronie serwera) i od
+razu koduje je do CSV / NDJSON (opcjonalnie gzip), więc pamięć workera
+nie zależy od liczby wierszy:
+
+- profile (UserProfile / PartnerProfile) i organizator wydarzenia są
+  dołączane JOIN-em w tym samym zapytaniu,
+- liczniki zapisów i obserwujących są dociągane jednym GROUP BY na
+  partię, nie per wydarzenie,
+- filtry (zakres created_at, rola, status, akcja) są stosowane w SQL,
+- eksport logu audytu obejmuje też audit_log_archives (wpisy starsze niż
+  AUDIT_LOG_RETENTION_DAYS): najpierw paczki archiwum nachodzące na zakres
+  dat, rozpakowywane po jednej, potem wpisy z audit_logs.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Iterator
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.sql import Select
+
+from backend.exports import iter_encoded
+from backend.audit_log import read_audit_log_archive
+from backend.models import AuditLog, AuditLogArchive, Event, EventSave, EventSignup, PartnerProfile, User, UserProfile
+
+
+EXPORT_BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class AdminExportFilters:
+    # Zakres półotwarty: created_from <= created_at < created_to.
+    created_from: datetime | None = None
+    created_to: datetime | None = None
+    role: str | None = None
+    status: str | None = None
+    action: str | None = None
+
+
+@dataclass(frozen=True)
+class AdminExport:
+    name: str
+    permission: str
+    columns: tuple[str, ...]
+    batches: Callable[[Session, AdminExportFilters], Iterator[list[dict]]]
+
+
+def _utc_naive(value: datetime | None) -> datetime | None:
+    # Daty w bazie są zapisywane jako UTC bez strefy (datetime.utcnow).
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _created_between(query: Select, column, filters: AdminExportFilters) -> Select:
+    if filters.created_from is not None:
+        query = query.where(column >= _utc_naive(filters.created_from))
+    if filters.created_to is not None:
+        query = query.where(column < _utc_naive(filters.created_to))
+    return query
+
+
+def _partitions(db: Session, query: Select):
+    return db.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE)).partitions()
+
+
+def event_lifecycle_status(status: str | None, end_at: datetime | None, now: datetime | None = None) -> str:
+    status = str(status or "")
+    if status in {"archived", "draft"}:
+        return status
+    if end_at is not None:
+        if end_at.tzinfo is None:
+            end_at = end_at.replace(tzinfo=timezone.utc)
+        if end_at < (now or datetime.now(timezone.utc)):
+            return "ended"
+    return status or "published"
+
+
+# --- users ---
+
+USER_COLUMNS = (
+    "id",
+    "email",
+    "role",
+    "status",
+    "display_name",
+    "city",
+    "plan",
+    "plan_status",
+    "plan_expires_at",
+    "email_verified_at",
+    "created_at",
+)
+
+
+def iter_user_batches(db: Session, filters: AdminExportFilters) -> Iterator[list[dict]]:
+    query = (
+        select(
+            User.id,
+            User.email,
+            User.role,
+            User.status,
+            User.email_verified_at,
+            User.created_at,
+            UserProfile.nick,
+            UserProfile.miasto,
+            UserProfile.plan,
+            UserProfile.plan_status,
+            UserProfile.plan_expires_at,
+            PartnerProfile.nazwa,
+            PartnerProfile.miasto.label("partner_city"),
+            PartnerProfile.plan.label("partner_plan"),
+            PartnerProfile.plan_status.label("partner_plan_status"),
+            PartnerProfile.plan_expires_at.label("partner_plan_expires_at"),
+        )
+        .outerjoin(UserProfile, UserProfile.user_id == User.id)
+        .outerjoin(PartnerProfile, PartnerProfile.user_id == User.id)
+        # Konta administracji są w /admin/staff, jak w /admin/users.
+        .where(User.role != "admin")
+        .order_by(User.id)
+    )
+    if filters.role:
+        query = query.where(User.role == filters.role)
+    if filters.status:
+        query = query.where(User.status == filters.status)
+    query = _created_between(query, User.created_at, filters)
+
+    for partition in _partitions(db, query):
+        batch = []
+        for row in partition:
+            if row.role == "partner":
+                profile = (row.nazwa, row.partner_city, row.partner_plan, row.partner_plan_status, row.partner_plan_expires_at)
+            else:
+                profile = (row.nick, row.miasto, row.plan, row.plan_status, row.plan_expires_at)
+            display_name, city, plan, plan_status, plan_expires_at = profile
+            batch.append({
+                "id": row.id,
+                "email": row.email,
+                "role": row.role,
+                "status": row.status,
+                "display_name": display_name or row.email,
+                "city": city,
+                "plan": plan or "free",
+                "plan_status": plan_status,
+                "plan_expires_at": plan_expires_at,
+                "email_verified_at": row.email_verified_at,
+                "created_at": row.created_at,
+            })
+        yield batch
+
+
+# --- events ---
+
+EVENT_COLUMNS = (
+    "id",
+    "title",
+    "city",
+    "status",
+    "lifecycle_status",
+    "start_at",
+    "end_at",
+    "capacity",
+    "pricing_type",
+    "partner_user_id",
+    "organizer_email",
+    "organizer_name",
+    "organizer_status",
+    "organizer_plan",
+    "signups_count",
+    "saves_count",
+    "created_at",
+)
+
+
+def _counts_by_event(db: Session, model, event_ids: list[int]) -> dict[int, int]:
+    return dict(
+        db.execute(
+            select(model.event_id, func.count())
+            .where(model.event_id.in_(event_ids))
+            .group_by(model.event_id)
+        ).all()
+    )
+
+
+def iter_event_batches(db: Session, filters: AdminExportFilters) -> Iterator[list[dict]]:
+    organizer = aliased(User)
+    query = (
+        select(
+            Event.id,
+            Event.title,
+            Event.city,
+            Event.status,
+            Event.start_at,
+            Event.end_at,
+            Event.capacity,
+            Event.pricing_type,
+            Event.partner_user_id,
+            Event.created_at,
+            organizer.email.label("organizer_email"),
+            organizer.status.label("organizer_status"),
+            PartnerProfile.nazwa,
+            PartnerProfile.plan,
+        )
+        .outerjoin(organizer, organizer.id == Event.partner_user_id)
+        .outerjoin(PartnerProfile, PartnerProfile.user_id == Event.partner_user_id)
+        .order_by(Event.id)
+    )
+    if filters.status:
+        query = query.where(Event.status == filters.status)
+    query = _created_between(query, Event.created_at, filters)
+
+    now = datetime.now(timezone.utc)
+    for partition in _partitions(db, query):
+        event_ids = [row.id for row in partition]
+        signups = _counts_by_event(db, EventSignup, event_ids)
+        saves = _counts_by_event(db, EventSave, event_ids)
+        yield [
+            {
+                "id": row.id,
+                "title": row.title,
+                "city": row.city,
+                "status": row.status,
+                "lifecycle_status": event_lifecycle_status(row.status, row.end_at, now),
+                "start_at": row.start_at,
+                "end_at": row.end_at,
+                "capacity": row.capacity,
+                "pricing_type": row.pricing_type,
+                "partner_user_id": row.partner_user_id,
+                "organizer_email": row.organizer_email,
+                "organizer_name": row.nazwa or row.organizer_email,
+                "organizer_status": row.organizer_status,
+                "organizer_plan": row.plan,
+                "signups_count": signups.get(row.id, 0),
+                "saves_count": saves.get(row.id, 0),
+                "created_at": row.created_at,
+            }
+            for row in partition
+        ]
+
+
+# --- audit log ---
+
+AUDIT_LOG_COLUMNS = (
+    "id",
+    "created_at",
+    "action",
+    "user_id",
+    "user_email",
+    "admin_display_name",
+    "ip",
+    "user_agent",
+    "details",
+)
+
+
+def _audit_row(row: dict, user) -> dict:
+    return {
+        "id": row["id"],
+        "created_at": row["created_at"],
+        "action": row["action"],
+        "user_id": row["user_id"],
+        "user_email": user.email if user else None,
+        "admin_display_name": user.admin_display_name if user else None,
+        "ip": row["ip"],
+        "user_agent": row["user_agent"],
+        "details": row["details"],
+    }
+
+
+def iter_archived_audit_log_batches(db: Session, filters: AdminExportFilters) -> Iterator[list[dict]]:
+    """Wpisy z audit_log_archives: jedna paczka archiwum = jedna partia eksportu."""
+
+    created_from = _utc_naive(filters.created_from)
+    created_to = _utc_naive(filters.created_to)
+
+    segments = select(AuditLogArchive.id).order_by(AuditLogArchive.first_log_id)
+    if created_from is not None:
+        segments = segments.where(AuditLogArchive.period_end >= created_from)
+    if created_to is not None:
+        segments = segments.where(AuditLogArchive.period_start < created_to)
+
+    for segment_id in db.scalars(segments).all():
+        archive = db.get(AuditLogArchive, segment_id)
+        rows = []
+        for row in read_audit_log_archive(archive):
+            row["created_at"] = datetime.fromisoformat(row["created_at"]) if row.get("created_at") else None
+            if filters.action and row["action"] != filters.action:
+                continue
+            if created_from is not None and (row["created_at"] is None or row["created_at"] < created_from):
+                continue
+            if created_to is not None and (row["created_at"] is None or row["created_at"] >= created_to):
+                continue
+            rows.append(row)
+        db.expunge(archive)
+        if not rows:
+            continue
+
+        user_ids = {row["user_id"] for row in rows if row["user_id"] is not None}
+        users = {
+            user.id: user
+            for user in db.execute(
+                select(User.id, User.email, User.admin_display_name).where(User.id.in_(user_ids))
+            )
+        } if user_ids else {}
+        yield [_audit_row(row, users.get(row["user_id"])) for row in rows]
+
+
+def iter_audit_log_batches(db: Session, filters: AdminExportFilters) -> Iterator[list[dict]]:
+    yield from iter_archived_audit_log_batches(db, filters)
+
+    query = (
+        select(
+            AuditLog.id,
+            AuditLog.created_at,
+            AuditLog.action,
+            AuditLog.user_id,
+            AuditLog.ip,
+            AuditLog.user_agent,
+            AuditLog.details,
+            User.email,
+            User.admin_display_name,
+        )
+        .outerjoin(User, User.id == AuditLog.user_id)
+        .order_by(AuditLog.id)
+    )
+    if filters.action:
+        query = query.where(AuditLog.action == filters.action)
+    query = _created_between(query, AuditLog.created_at, filters)
+
+    for partition in _partitions(db, query):
+        yield [
+            {
+                "id": row.id,
+                "created_at": row.created_at,
+                "action": row.action,
+                "user_id": row.user_id,
+                "user_email": row.email,
+                "admin_display_name": row.admin_display_name,
+                "ip": row.ip,
+                "user_agent": row.user_agent,
+                "details": row.details,
+            }
+            for row in partition
+        ]
+
+
+ADMIN_EXPORTS = {
+    "users": AdminExport("users", "users", USER_COLUMNS, iter_user_batches),
+    "events": AdminExport("events", "events", EVENT_COLUMNS, iter_event_batches),
+    "audit-log": AdminExport("audit-log", "admin_manage", AUDIT_LOG_COLUMNS, iter_audit_log_batches),
+}
+
+
+def iter_admin_export(
+    session_factory,
+    export: AdminExport,
+    filters: AdminExportFilters,
+    export_format: str,
+) -> Iterator[str]:
+    """Generator dla StreamingResponse; sesja żyje tyle, co strumień."""
+
+    db = session_factory()
+    try:
+        yield from iter_encoded(export_format, export.columns, export.batches(db, filters))
+    finally:
+        db.close()
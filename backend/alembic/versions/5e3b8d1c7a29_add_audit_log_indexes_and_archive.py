@@ -0,0 +1,110 @@
+"""add audit log indexes and archive
+
+Revision ID: 5e3b8d1c7a29
+Revises: f7b1d3a84c62
+Create Date: 2026-10-19
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "5e3b8d1c7a29"
+down_revision: Union[str, Sequence[str], None] = "f7b1d3a84c62"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_audit_logs_action",
+        "audit_logs",
+        ["action"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_audit_logs_created_at",
+        "audit_logs",
+        ["created_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_audit_logs_action_created",
+        "audit_logs",
+        ["action", "created_at"],
+        unique=False,
+    )
+
+    op.create_table(
+        "audit_log_archives",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("first_log_id", sa.Integer(), nullable=False),
+        sa.Column("last_log_id", sa.Integer(), nullable=False),
+        sa.Column("row_count", sa.Integer(), nullable=False),
+        sa.Column("period_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("period_end", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_index(
+        "ix_audit_log_archives_first_log_id",
+        "audit_log_archives",
+        ["first_log_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_audit_log_archives_last_log_id",
+        "audit_log_archives",
+        ["last_log_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_audit_log_archives_period_start",
+        "audit_log_archives",
+        ["period_start"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_audit_log_archives_period_end",
+        "audit_log_archives",
+        ["period_end"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_audit_log_archives_period_end",
+        table_name="audit_log_archives",
+    )
+    op.drop_index(
+        "ix_audit_log_archives_period_start",
+        table_name="audit_log_archives",
+    )
+    op.drop_index(
+        "ix_audit_log_archives_last_log_id",
+        table_name="audit_log_archives",
+    )
+    op.drop_index(
+        "ix_audit_log_archives_first_log_id",
+        table_name="audit_log_archives",
+    )
+    op.drop_table("audit_log_archives")
+
+    op.drop_index(
+        "ix_audit_logs_action_created",
+        table_name="audit_logs",
+    )
+    op.drop_index(
+        "ix_audit_logs_created_at",
+        table_name="audit_logs",
+    )
+    op.drop_index(
+        "ix_audit_logs_action",
+        table_name="audit_logs",
+    )
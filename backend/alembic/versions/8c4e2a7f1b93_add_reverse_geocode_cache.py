@@ -0,0 +1,36 @@
+"""add reverse geocode cache
+
+Revision ID: 8c4e2a7f1b93
+Revises: 5e3b8d1c7a29
+Create Date: 2026-10-19
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "8c4e2a7f1b93"
+down_revision: Union[str, Sequence[str], None] = "5e3b8d1c7a29"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "reverse_geocode_cache",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("lat_key", sa.Integer(), nullable=False),
+        sa.Column("lng_key", sa.Integer(), nullable=False),
+        sa.Column("city", sa.String(length=80), nullable=False),
+        sa.Column("source", sa.String(length=20), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("lat_key", "lng_key", name="uq_reverse_geocode_cache_key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("reverse_geocode_cache")
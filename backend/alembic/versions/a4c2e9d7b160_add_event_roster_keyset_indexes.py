@@ -0,0 +1,37 @@
+"""add event roster keyset indexes
+
+Revision ID: a4c2e9d7b160
+Revises: e8c4a1f6b93d
+Create Date: 2026-10-19
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "a4c2e9d7b160"
+down_revision: Union[str, Sequence[str], None] = "e8c4a1f6b93d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_event_signups_event_created",
+        "event_signups",
+        ["event_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_event_saves_event_created",
+        "event_saves",
+        ["event_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_event_saves_event_created", table_name="event_saves")
+    op.drop_index("ix_event_signups_event_created", table_name="event_signups")
@@ -0,0 +1,50 @@
+"""add unread notification counter and feed index
+
+Revision ID: a8e3c5f1d209
+Revises: f2d6a9c3e187
+Create Date: 2026-10-19
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "a8e3c5f1d209"
+down_revision: Union[str, Sequence[str], None] = "f2d6a9c3e187"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("unread_notifications_count", sa.Integer(), nullable=False, server_default="0")
+        )
+
+    op.execute(
+        sa.text(
+            "UPDATE users SET unread_notifications_count = ("
+            " SELECT count(*) FROM user_notifications"
+            " WHERE user_notifications.user_id = users.id AND user_notifications.read_at IS NULL"
+            ")"
+        )
+    )
+
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.alter_column("unread_notifications_count", server_default=None)
+
+    op.create_index(
+        "ix_user_notifications_user_created",
+        "user_notifications",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_notifications_user_created", table_name="user_notifications")
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.drop_column("unread_notifications_count")
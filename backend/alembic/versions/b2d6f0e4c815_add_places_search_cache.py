@@ -0,0 +1,46 @@
+"""add places search cache
+
+Revision ID: b2d6f0e4c815
+Revises: 8c4e2a7f1b93
+Create Date: 2026-10-19
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "b2d6f0e4c815"
+down_revision: Union[str, Sequence[str], None] = "8c4e2a7f1b93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "places_search_cache",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("query_key", sa.String(length=64), nullable=False),
+        sa.Column("query", sa.String(length=300), nullable=False),
+        sa.Column("items_json", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("query_key"),
+    )
+    op.create_index(
+        "ix_places_search_cache_expires_at",
+        "places_search_cache",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_places_search_cache_expires_at",
+        table_name="places_search_cache",
+    )
+    op.drop_table("places_search_cache")
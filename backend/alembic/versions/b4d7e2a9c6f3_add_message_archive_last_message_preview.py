@@ -0,0 +1,54 @@
+"""add last message preview to message archives
+
+Revision ID: b4d7e2a9c6f3
+Revises: a8e3c5f1d209
+Create Date: 2026-10-19
+
+"""
+
+import json
+import zlib
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "b4d7e2a9c6f3"
+down_revision: Union[str, Sequence[str], None] = "a8e3c5f1d209"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("message_archives", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("last_sender_user_id", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("last_content", sa.Text(), nullable=True))
+
+    # Uzupełnienie istniejących paczek: ostatni wiersz rozpakowanego payload.
+    connection = op.get_bind()
+    archives = sa.table(
+        "message_archives",
+        sa.column("id", sa.Integer()),
+        sa.column("payload", sa.LargeBinary()),
+        sa.column("last_sender_user_id", sa.Integer()),
+        sa.column("last_content", sa.Text()),
+    )
+    archive_ids = connection.execute(sa.select(archives.c.id)).scalars().all()
+    for archive_id in archive_ids:
+        payload = connection.execute(sa.select(archives.c.payload).where(archives.c.id == archive_id)).scalar_one()
+        lines = [line for line in zlib.decompress(payload).decode("utf-8").splitlines() if line]
+        if not lines:
+            continue
+        last = json.loads(lines[-1])
+        connection.execute(
+            archives.update()
+            .where(archives.c.id == archive_id)
+            .values(last_sender_user_id=last["sender_user_id"], last_content=last["content"])
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("message_archives", schema=None) as batch_op:
+        batch_op.drop_column("last_content")
+        batch_op.drop_column("last_sender_user_id")
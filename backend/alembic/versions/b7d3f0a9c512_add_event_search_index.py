@@ -0,0 +1,98 @@
+"""add event search index
+
+Revision ID: b7d3f0a9c512
+Revises: a4c2e9d7b160
+Create Date: 2026-10-19
+
+"""
+
+import re
+import unicodedata
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "b7d3f0a9c512"
+down_revision: Union[str, Sequence[str], None] = "a4c2e9d7b160"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Zamrożona kopia normalizacji z backend/event_search.py (stan na tę rewizję) —
+# migracja nie może zależeć od bieżącego kodu aplikacji.
+_EXTRA_FOLDS = str.maketrans({"ł": "l", "ß": "ss", "æ": "ae", "ø": "o", "đ": "d"})
+_NON_WORD_RE = re.compile(r"[\W_]+")
+_BATCH_SIZE = 1000
+
+
+def _fold(value):
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value.casefold())
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(_NON_WORD_RE.sub(" ", stripped.translate(_EXTRA_FOLDS)).split())
+
+
+def _backfill(bind, is_postgres: bool) -> None:
+    events = sa.table(
+        "events",
+        sa.column("id", sa.Integer()),
+        sa.column("title", sa.String()),
+        sa.column("description", sa.Text()),
+        sa.column("where", sa.String()),
+        sa.column("address", sa.String()),
+        sa.column("city", sa.String()),
+    )
+    if is_postgres:
+        insert = sa.text(
+            "INSERT INTO event_search (event_id, document) VALUES (:event_id,"
+            " setweight(to_tsvector('simple', :title), 'A')"
+            " || setweight(to_tsvector('simple', :body), 'B'))"
+        )
+    else:
+        insert = sa.text("INSERT INTO event_search (rowid, title, body) VALUES (:event_id, :title, :body)")
+
+    bind.execute(sa.text("DELETE FROM event_search"))
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(events).where(events.c.id > last_id).order_by(events.c.id).limit(_BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        bind.execute(insert, [
+            {
+                "event_id": row.id,
+                "title": _fold(row.title),
+                "body": _fold(" ".join(filter(None, (row.description, row.where, row.address, row.city)))),
+            }
+            for row in rows
+        ])
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    # SQLite: tabela wirtualna FTS5, PostgreSQL: tsvector + GIN (backend/event_search.py).
+    bind = op.get_bind()
+    is_postgres = bind.dialect.name == "postgresql"
+    if is_postgres:
+        op.execute(
+            "CREATE TABLE IF NOT EXISTS event_search ("
+            " event_id INTEGER PRIMARY KEY REFERENCES events(id) ON DELETE CASCADE,"
+            " document tsvector NOT NULL)"
+        )
+        op.execute("CREATE INDEX IF NOT EXISTS ix_event_search_document ON event_search USING GIN (document)")
+    else:
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS event_search USING fts5("
+            "title, body, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+    _backfill(bind, is_postgres)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_event_search_document")
+    op.execute("DROP TABLE IF EXISTS event_search")
@@ -0,0 +1,105 @@
+"""add group recommendation indexes
+
+Revision ID: c3f8a2d6e471
+Revises: b7d3f0a9c512
+Create Date: 2026-10-19
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "c3f8a2d6e471"
+down_revision: Union[str, Sequence[str], None] = "b7d3f0a9c512"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Zamrożona kopia backend/interests.py (stan na tę rewizję) — migracja nie
+# może zależeć od bieżącego kodu aplikacji.
+_INTEREST_ALIASES = {
+    "foto": "fotografia",
+    "photo": "fotografia",
+    "photography": "fotografia",
+    "film": "kino",
+    "movie": "kino",
+    "movies": "kino",
+    "tech": "technologia",
+    "technology": "technologia",
+    "startup": "biznes",
+    "startups": "biznes",
+    "business": "biznes",
+    "walks": "spacer",
+    "walking": "spacer",
+    "spacery": "spacer",
+    "spacerowanie": "spacer",
+    "concert": "koncerty",
+    "concerts": "koncerty",
+    "koncert": "koncerty",
+    "board games": "planszówki",
+    "boardgaming": "planszówki",
+    "planszówka": "planszówki",
+    "gry planszowe": "planszówki",
+    "book": "książki",
+    "books": "książki",
+    "książka": "książki",
+    "travel": "podróże",
+    "travels": "podróże",
+    "podróż": "podróże",
+    "dog": "psy",
+    "dogs": "psy",
+    "pies": "psy",
+    "cat": "koty",
+    "cats": "koty",
+    "kot": "koty",
+    "bicycle": "rower",
+    "bike": "rower",
+    "cycling": "rower",
+    "rowery": "rower",
+    "jazda na rowerze": "rower",
+}
+
+
+def _normalize_interest_tag(value):
+    if not value:
+        return ""
+    tag = str(value).strip().lstrip("#").strip().lower()
+    if not tag:
+        return ""
+    return _INTEREST_ALIASES.get(tag, tag)
+
+
+def upgrade() -> None:
+    # Polecane grupy porównują tagi w SQL, więc starsze wiersze (np. z seeda)
+    # muszą mieć tag w postaci kanonicznej, tak jak zapisuje go POST /groups.
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("SELECT id, interest_tag FROM groups")).all()
+    updates = []
+    for group_id, tag in rows:
+        normalized = _normalize_interest_tag(tag)
+        if normalized and normalized != tag:
+            updates.append({"id": group_id, "tag": normalized})
+    if updates:
+        bind.execute(sa.text("UPDATE groups SET interest_tag = :tag WHERE id = :id"), updates)
+
+    with op.batch_alter_table("groups", schema=None) as batch_op:
+        batch_op.drop_index("ix_groups_interest_tag")
+    op.create_index(
+        "ix_groups_interest_tag_members",
+        "groups",
+        ["interest_tag", sa.text("members_count DESC"), "id"],
+        unique=False,
+    )
+    op.create_index("ix_groups_members_count", "groups", [sa.text("members_count DESC"), "id"], unique=False)
+    op.create_index("ix_groups_title_lower", "groups", [sa.text("lower(title)")], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_groups_title_lower", table_name="groups")
+    op.drop_index("ix_groups_members_count", table_name="groups")
+    op.drop_index("ix_groups_interest_tag_members", table_name="groups")
+    with op.batch_alter_table("groups", schema=None) as batch_op:
+        batch_op.create_index("ix_groups_interest_tag", ["interest_tag"], unique=False)
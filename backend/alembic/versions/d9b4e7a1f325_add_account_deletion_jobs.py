@@ -0,0 +1,53 @@
+"""add account deletion jobs
+
+Revision ID: d9b4e7a1f325
+Revises: c3f8a2d6e471
+Create Date: 2026-10-19
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "d9b4e7a1f325"
+down_revision: Union[str, Sequence[str], None] = "c3f8a2d6e471"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "account_deletion_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("requested_by_user_id", sa.Integer(), nullable=True),
+        sa.Column("status", sa.String(length=16), nullable=False, server_default="pending"),
+        sa.Column("current_step", sa.String(length=64), nullable=True),
+        sa.Column("deleted_rows", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("progress_json", sa.Text(), nullable=False, server_default="{}"),
+        sa.Column("affected_group_ids_json", sa.Text(), nullable=False, server_default="[]"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["requested_by_user_id"], ["users.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id"),
+    )
+    op.create_index(
+        "ix_account_deletion_jobs_status_id",
+        "account_deletion_jobs",
+        ["status", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_account_deletion_jobs_status_id", table_name="account_deletion_jobs")
+    op.drop_table("account_deletion_jobs")
@@ -0,0 +1,59 @@
+"""add message archives
+
+Revision ID: e5c1b8d4a736
+Revises: d9b4e7a1f325
+Create Date: 2026-10-19
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "e5c1b8d4a736"
+down_revision: Union[str, Sequence[str], None] = "d9b4e7a1f325"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "message_archives",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("conversation_key", sa.String(length=40), nullable=False),
+        sa.Column("group_id", sa.Integer(), nullable=True),
+        sa.Column("user_low_id", sa.Integer(), nullable=True),
+        sa.Column("user_high_id", sa.Integer(), nullable=True),
+        sa.Column("month", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("first_message_id", sa.Integer(), nullable=False),
+        sa.Column("last_message_id", sa.Integer(), nullable=False),
+        sa.Column("first_created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("row_count", sa.Integer(), nullable=False),
+        sa.Column("sender_user_ids", sa.Text(), nullable=False),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["group_id"], ["groups.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_low_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_high_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_message_archives_conversation",
+        "message_archives",
+        ["conversation_key", "first_created_at", "first_message_id"],
+        unique=False,
+    )
+    op.create_index(op.f("ix_message_archives_group_id"), "message_archives", ["group_id"], unique=False)
+    op.create_index(op.f("ix_message_archives_user_low_id"), "message_archives", ["user_low_id"], unique=False)
+    op.create_index(op.f("ix_message_archives_user_high_id"), "message_archives", ["user_high_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_message_archives_user_high_id"), table_name="message_archives")
+    op.drop_index(op.f("ix_message_archives_user_low_id"), table_name="message_archives")
+    op.drop_index(op.f("ix_message_archives_group_id"), table_name="message_archives")
+    op.drop_index("ix_message_archives_conversation", table_name="message_archives")
+    op.drop_table("message_archives")
@@ -0,0 +1,48 @@
+"""add request profiles
+
+Revision ID: e8c4a1f6b93d
+Revises: d5a9e3c7f214
+Create Date: 2026-10-19
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = "e8c4a1f6b93d"
+down_revision: Union[str, Sequence[str], None] = "d5a9e3c7f214"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "request_profiles",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("request_id", sa.String(length=64), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("trigger", sa.String(length=16), nullable=False),
+        sa.Column("method", sa.String(length=10), nullable=False),
+        sa.Column("route", sa.String(length=255), nullable=False),
+        sa.Column("path", sa.String(length=500), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=False),
+        sa.Column("duration_ms", sa.Float(), nullable=False),
+        sa.Column("sample_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("sql_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("sql_ms", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("statements_json", sa.Text(), nullable=False),
+        sa.Column("folded", sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("request_id"),
+    )
+    op.create_index(op.f("ix_request_profiles_created_at"), "request_profiles", ["created_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_request_profiles_created_at"), table_name="request_profiles")
+    op.drop_table("request_profiles")
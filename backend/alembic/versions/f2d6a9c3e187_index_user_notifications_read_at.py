@@ -0,0 +1,25 @@
+"""index user_notifications.read_at
+
+Revision ID: f2d6a9c3e187
+Revises: e5c1b8d4a736
+Create Date: 2026-10-19
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "f2d6a9c3e187"
+down_revision: Union[str, Sequence[str], None] = "e5c1b8d4a736"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f("ix_user_notifications_read_at"), "user_notifications", ["read_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_user_notifications_read_at"), table_name="user_notifications")
@@ -3,7 +3,6 @@ from __future__ import annotations
 from typing import Any, Optional
 
 from pydantic import BaseModel
-from fastapi.encoders import jsonable_encoder
 
 from backend.error_codes import ErrorCode
 from backend.i18n import message_for
@@ -22,7 +21,9 @@ class ApiResponse(BaseModel):
 
 
 def ok(data: Any = None) -> dict:
-    return jsonable_encoder(ApiResponse(success=True, data=data, error=None).model_dump())
+    # Bez kopiowania i jsonable_encoder: datetime/date zostają jako obiekty,
+    # FastJSONResponse (backend/json_response.py) serializuje je natywnie.
+    return {"success": True, "data": data, "error": None}
 
 
 def fail(
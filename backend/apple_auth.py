@@ -1,17 +1,15 @@
 from __future__ import annotations
 
-import time
-from threading import Lock
 from typing import Any, Iterable
 
-import requests
-from jose import JWTError, jwk, jwt
+from jose import JWTError, jwt
+
+from backend.identity_keys import IdentityKeyError, IdentityKeyProvider, fetch_jwks
 
 
 APPLE_ISSUER = "https://appleid.apple.com"
 APPLE_JWKS_URL = "https://appleid.apple.com/auth/keys"
 APPLE_JWKS_CACHE_TTL_SECONDS = 6 * 60 * 60
-APPLE_JWKS_HTTP_TIMEOUT_SECONDS = 5
 
 
 class AppleAuthError(Exception):
@@ -26,76 +24,22 @@ class AppleAuthTokenError(AppleAuthError):
     """Apple identity token is invalid."""
 
 
-_jwks_cache: dict[str, Any] = {
-    "fetched_at": 0.0,
-    "keys": [],
-}
-_jwks_lock = Lock()
-
-
-def _fetch_apple_jwks(*, force_refresh: bool = False) -> list[dict[str, Any]]:
-    now = time.monotonic()
-
-    with _jwks_lock:
-        cached_keys = _jwks_cache.get("keys") or []
-        fetched_at = float(_jwks_cache.get("fetched_at") or 0.0)
-
-        if (
-            not force_refresh
-            and cached_keys
-            and now - fetched_at < APPLE_JWKS_CACHE_TTL_SECONDS
-        ):
-            return list(cached_keys)
-
-        try:
-            response = requests.get(
-                APPLE_JWKS_URL,
-                timeout=APPLE_JWKS_HTTP_TIMEOUT_SECONDS,
-            )
-            response.raise_for_status()
-            payload = response.json()
-        except (requests.RequestException, ValueError) as exc:
-            raise AppleAuthKeyError(
-                "Could not fetch Apple public signing keys."
-            ) from exc
-
-        keys = payload.get("keys") if isinstance(payload, dict) else None
-
-        if not isinstance(keys, list) or not keys:
-            raise AppleAuthKeyError(
-                "Apple public signing keys response is invalid."
-            )
-
-        normalized_keys = [
-            key
-            for key in keys
-            if isinstance(key, dict)
-            and isinstance(key.get("kid"), str)
-            and key.get("kid")
-        ]
-
-        if not normalized_keys:
-            raise AppleAuthKeyError(
-                "Apple public signing keys response contains no usable keys."
-            )
-
-        _jwks_cache["keys"] = normalized_keys
-        _jwks_cache["fetched_at"] = now
+def _fetch_apple_jwks() -> tuple[list[dict[str, Any]], int | None]:
+    return fetch_jwks(APPLE_JWKS_URL)
 
-        return list(normalized_keys)
 
+apple_signing_keys = IdentityKeyProvider(
+    "Apple",
+    lambda: _fetch_apple_jwks(),
+    default_ttl_seconds=APPLE_JWKS_CACHE_TTL_SECONDS,
+)
 
-def _find_apple_signing_key(kid: str) -> dict[str, Any]:
-    for force_refresh in (False, True):
-        keys = _fetch_apple_jwks(force_refresh=force_refresh)
 
-        for key in keys:
-            if key.get("kid") == kid:
-                return key
-
-    raise AppleAuthKeyError(
-        "No matching Apple public signing key was found."
-    )
+def _find_apple_signing_key(kid: str):
+    try:
+        return apple_signing_keys.get_key(kid)
+    except IdentityKeyError as exc:
+        raise AppleAuthKeyError(str(exc)) from exc
 
 
 def _normalize_audiences(audiences: Iterable[str]) -> set[str]:
@@ -139,15 +83,12 @@ def verify_apple_identity_token(
             "Apple identity token uses an invalid signing header."
         )
 
-    signing_jwk = _find_apple_signing_key(kid)
+    signing_key = _find_apple_signing_key(kid)
 
     try:
-        signing_key = jwk.construct(signing_jwk, algorithm="RS256")
-        public_key_pem = signing_key.to_pem()
-
         claims = jwt.decode(
             token,
-            public_key_pem,
+            signing_key,
             algorithms=["RS256"],
             issuer=APPLE_ISSUER,
             options={
@@ -7,6 +7,8 @@ from typing import Any
 import requests
 from jose import JWTError, jwt
 
+from backend.identity_keys import identity_http_session
+
 
 APPLE_TOKEN_AUDIENCE = "https://appleid.apple.com"
 
@@ -141,7 +143,7 @@ def exchange_apple_authorization_code(
         request_data["redirect_uri"] = redirect_uri_value
 
     try:
-        response = requests.post(
+        response = identity_http_session().post(
             APPLE_TOKEN_URL,
             data=request_data,
             timeout=APPLE_TOKEN_HTTP_TIMEOUT_SECONDS,
@@ -223,7 +225,7 @@ def revoke_apple_token(
     }
 
     try:
-        response = requests.post(
+        response = identity_http_session().post(
             APPLE_REVOKE_URL,
             data=request_data,
             timeout=APPLE_TOKEN_HTTP_TIMEOUT_SECONDS,
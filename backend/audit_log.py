@@ -0,0 +1,412 @@
+"""Buforowany zapis AuditLog oraz retencja starych wpisów.
+
+Moduł:
+
+- zbiera wpisy audytu w pamięci zamiast commitować je w handlerze,
+- zapisuje je hurtowo (jeden INSERT na paczkę) po przekroczeniu progu
+  rozmiaru albo czasu,
+- próbkuje lub odrzuca hałaśliwe akcje (np. TOKEN_EXPIRED),
+- opróżnia bufor przy zamknięciu aplikacji,
+- przenosi wpisy starsze niż okres retencji do audit_log_archives.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import random
+import threading
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from backend.logger import get_logger
+from backend.models import AuditLog, AuditLogArchive
+
+
+log = get_logger(__name__)
+
+DEFAULT_AUDIT_FLUSH_BATCH_SIZE = 200
+DEFAULT_AUDIT_FLUSH_INTERVAL_SECONDS = 2.0
+DEFAULT_AUDIT_MAX_BUFFER_SIZE = 10_000
+DEFAULT_AUDIT_SAMPLE_RATES = {
+    "TOKEN_EXPIRED": 0.05,
+}
+
+DEFAULT_AUDIT_LOG_RETENTION_DAYS = 180
+DEFAULT_AUDIT_ARCHIVE_BATCH_SIZE = 5_000
+DEFAULT_AUDIT_ARCHIVE_MAX_BATCHES = 20
+
+
+@dataclass(frozen=True)
+class AuditSinkConfig:
+    batch_size: int = DEFAULT_AUDIT_FLUSH_BATCH_SIZE
+    flush_interval_seconds: float = DEFAULT_AUDIT_FLUSH_INTERVAL_SECONDS
+    max_buffer_size: int = DEFAULT_AUDIT_MAX_BUFFER_SIZE
+    sample_rates: dict[str, float] = field(
+        default_factory=lambda: dict(DEFAULT_AUDIT_SAMPLE_RATES)
+    )
+
+
+def _parse_sample_rates(raw: str) -> dict[str, float]:
+    """Parsuje "TOKEN_EXPIRED=0.05,LOGOUT=0" do słownika akcja -> częstość."""
+
+    rates: dict[str, float] = {}
+
+    for chunk in raw.split(","):
+        if not chunk.strip():
+            continue
+
+        action, sep, value = chunk.partition("=")
+        if not sep:
+            raise ValueError(
+                "AUDIT_SAMPLE_RATES musi mieć format AKCJA=częstość"
+            )
+
+        rate = float(value.strip())
+        if rate < 0 or rate > 1:
+            raise ValueError(
+                "Częstość w AUDIT_SAMPLE_RATES musi być z zakresu 0..1"
+            )
+
+        rates[action.strip().upper()] = rate
+
+    return rates
+
+
+def load_audit_sink_config() -> AuditSinkConfig:
+    """Ładuje konfigurację bufora audytu ze zmiennych środowiskowych."""
+
+    batch_size = int(
+        os.getenv("AUDIT_FLUSH_BATCH_SIZE", str(DEFAULT_AUDIT_FLUSH_BATCH_SIZE))
+    )
+    flush_interval_seconds = float(
+        os.getenv(
+            "AUDIT_FLUSH_INTERVAL_SECONDS",
+            str(DEFAULT_AUDIT_FLUSH_INTERVAL_SECONDS),
+        )
+    )
+    max_buffer_size = int(
+        os.getenv("AUDIT_MAX_BUFFER_SIZE", str(DEFAULT_AUDIT_MAX_BUFFER_SIZE))
+    )
+
+    if batch_size <= 0 or flush_interval_seconds <= 0 or max_buffer_size <= 0:
+        raise ValueError(
+            "AUDIT_FLUSH_BATCH_SIZE, AUDIT_FLUSH_INTERVAL_SECONDS i "
+            "AUDIT_MAX_BUFFER_SIZE muszą być większe od zera"
+        )
+
+    sample_rates = dict(DEFAULT_AUDIT_SAMPLE_RATES)
+    sample_rates.update(_parse_sample_rates(os.getenv("AUDIT_SAMPLE_RATES", "")))
+
+    return AuditSinkConfig(
+        batch_size=batch_size,
+        flush_interval_seconds=flush_interval_seconds,
+        max_buffer_size=max(max_buffer_size, batch_size),
+        sample_rates=sample_rates,
+    )
+
+
+class AuditSink:
+    """Bufor wpisów AuditLog zapisywanych hurtowo w osobnej sesji.
+
+    record() jest bezpieczne wątkowo i nie dotyka bazy. Zapis wykonuje
+    wątek w tle (próg czasu albo rozmiaru) lub jawne flush()/close().
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        config: AuditSinkConfig | None = None,
+        *,
+        random_fn: Callable[[], float] = random.random,
+    ) -> None:
+        self._session_factory = session_factory
+        self.config = config or AuditSinkConfig()
+        self._random = random_fn
+
+        self._buffer: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self.written = 0
+        self.sampled_out = 0
+        self.dropped = 0
+
+    def record(
+        self,
+        *,
+        action: str,
+        user_id: int | None,
+        ip: str | None = None,
+        user_agent: str | None = None,
+        details: str | None = None,
+        created_at: datetime | None = None,
+    ) -> bool:
+        """Dodaje wpis do bufora. Zwraca False, gdy wpis został pominięty."""
+
+        rate = self.config.sample_rates.get(action)
+        if rate is not None and (rate <= 0 or self._random() >= rate):
+            with self._lock:
+                self.sampled_out += 1
+            return False
+
+        row = {
+            "user_id": user_id,
+            "action": action,
+            "ip": ip,
+            "user_agent": user_agent[:255] if user_agent else None,
+            "details": details,
+            "created_at": created_at or datetime.utcnow(),
+        }
+
+        with self._lock:
+            if len(self._buffer) >= self.config.max_buffer_size:
+                self.dropped += 1
+                return False
+
+            self._buffer.append(row)
+            should_flush = len(self._buffer) >= self.config.batch_size
+
+        self._ensure_started()
+
+        if should_flush:
+            self._wakeup.set()
+
+        return True
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def flush(self) -> int:
+        """Zapisuje cały bufor hurtowo. Zwraca liczbę zapisanych wpisów."""
+
+        with self._flush_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+
+            if not rows:
+                return 0
+
+            db = self._session_factory()
+            try:
+                db.execute(insert(AuditLog), rows)
+                db.commit()
+            except Exception as exc:
+                db.rollback()
+                self._requeue(rows)
+                log.warning("AUDIT FLUSH ERROR: %s (rows=%s)", exc, len(rows))
+                return 0
+            finally:
+                db.close()
+
+            with self._lock:
+                self.written += len(rows)
+
+            return len(rows)
+
+    def _requeue(self, rows: list[dict[str, Any]]) -> None:
+        with self._lock:
+            room = self.config.max_buffer_size - len(self._buffer)
+            kept = rows[: max(room, 0)]
+            self.dropped += len(rows) - len(kept)
+            self._buffer = kept + self._buffer
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None or self._stopping.is_set():
+            return
+
+        with self._lock:
+            if self._thread is not None:
+                return
+
+            self._thread = threading.Thread(
+                target=self._run,
+                name="audit-sink",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.config.flush_interval_seconds)
+            self._wakeup.clear()
+            self.flush()
+
+    def close(self) -> int:
+        """Zatrzymuje wątek w tle i opróżnia bufor. Zwraca liczbę dopisanych wpisów."""
+
+        with self._lock:
+            written_before = self.written
+
+        self._stopping.set()
+        self._wakeup.set()
+
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=self.config.flush_interval_seconds + 5)
+
+        self.flush()
+
+        with self._lock:
+            return self.written - written_before
+
+
+_sink: AuditSink | None = None
+_sink_lock = threading.Lock()
+
+
+def get_audit_sink() -> AuditSink:
+    """Zwraca współdzielony bufor audytu procesu (tworzony przy pierwszym użyciu)."""
+
+    global _sink
+
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                from backend.db.database import SessionLocal
+
+                _sink = AuditSink(SessionLocal, load_audit_sink_config())
+                atexit.register(_sink.close)
+
+    return _sink
+
+
+def record_audit_event(
+    *,
+    action: str,
+    user_id: int | None,
+    ip: str | None = None,
+    user_agent: str | None = None,
+    details: str | None = None,
+) -> bool:
+    return get_audit_sink().record(
+        action=action,
+        user_id=user_id,
+        ip=ip,
+        user_agent=user_agent,
+        details=details,
+    )
+
+
+def close_audit_sink() -> int:
+    if _sink is None:
+        return 0
+    return _sink.close()
+
+
+# =========================
+# RETENCJA
+# =========================
+
+def _audit_row_to_dict(row: AuditLog) -> dict[str, Any]:
+    return {
+        "id": row.id,
+        "user_id": row.user_id,
+        "action": row.action,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "ip": row.ip,
+        "user_agent": row.user_agent,
+        "details": row.details,
+    }
+
+
+def read_audit_log_archive(archive: AuditLogArchive) -> list[dict[str, Any]]:
+    """Rozpakowuje paczkę archiwum do listy słowników wpisów."""
+
+    raw = zlib.decompress(archive.payload).decode("utf-8")
+    return [json.loads(line) for line in raw.splitlines() if line]
+
+
+def load_audit_log_retention_days() -> int:
+    days = int(
+        os.getenv(
+            "AUDIT_LOG_RETENTION_DAYS",
+            str(DEFAULT_AUDIT_LOG_RETENTION_DAYS),
+        )
+    )
+    if days <= 0:
+        raise ValueError("AUDIT_LOG_RETENTION_DAYS musi być większe od zera")
+    return days
+
+
+def archive_audit_logs(
+    db: Session,
+    *,
+    retention_days: int | None = None,
+    now: datetime | None = None,
+    batch_size: int = DEFAULT_AUDIT_ARCHIVE_BATCH_SIZE,
+    max_batches: int = DEFAULT_AUDIT_ARCHIVE_MAX_BATCHES,
+) -> dict:
+    """Przenosi wpisy starsze niż retencja do audit_log_archives.
+
+    Każda paczka (najwyżej batch_size wpisów, po id rosnąco) to osobna,
+    krótka transakcja: INSERT skompresowanego archiwum i DELETE po id.
+    """
+
+    days = retention_days if retention_days is not None else load_audit_log_retention_days()
+    cutoff = (now or datetime.utcnow()) - timedelta(days=days)
+
+    archived_rows = 0
+    archive_batches = 0
+
+    for _ in range(max_batches):
+        rows = (
+            db.query(AuditLog)
+            .filter(AuditLog.created_at < cutoff)
+            .order_by(AuditLog.id.asc())
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+
+        lines = "\n".join(
+            json.dumps(_audit_row_to_dict(row), ensure_ascii=False)
+            for row in rows
+        )
+        created = [row.created_at for row in rows if row.created_at]
+        ids = [row.id for row in rows]
+
+        try:
+            db.add(
+                AuditLogArchive(
+                    first_log_id=ids[0],
+                    last_log_id=ids[-1],
+                    row_count=len(rows),
+                    period_start=min(created),
+                    period_end=max(created),
+                    payload=zlib.compress(lines.encode("utf-8"), 9),
+                    archived_at=datetime.utcnow(),
+                )
+            )
+            db.execute(
+                delete(AuditLog)
+                .where(AuditLog.id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        db.expunge_all()
+        archived_rows += len(rows)
+        archive_batches += 1
+
+        if len(rows) < batch_size:
+            break
+
+    return {
+        "archived_rows": archived_rows,
+        "archive_batches": archive_batches,
+    }
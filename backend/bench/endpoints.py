@@ -0,0 +1,344 @@
+"""Benchmark głównych endpointów na danych z backend.bench.generate.
+
+Aplikacja działa w tym samym procesie (httpx + ASGITransport, bez
+serwera i bez sieci), więc wynik to czas samego backendu i bazy. Dla
+każdego scenariusza wysyła --requests żądań z --concurrency równoległymi
+klientami, jako losowi użytkownicy z wygenerowanego zbioru (token JWT
+wystawiany lokalnie), i raportuje p50/p95/p99 oraz liczbę zapytań SQL na
+żądanie jako JSON.
+
+Uruchomienie (z katalogu głównego repo, na bazie z generatora):
+
+    DATABASE_URL=sqlite:////tmp/usly-bench.db JWT_SECRET_KEY=bench \\
+        python -m backend.bench.endpoints --output before.json
+    DATABASE_URL=sqlite:////tmp/usly-bench.db JWT_SECRET_KEY=bench \\
+        python -m backend.bench.endpoints --baseline before.json
+
+--baseline dopisuje do wyniku zmianę p95 i liczby zapytań względem
+wcześniejszego pliku, np. z poprzedniego commita.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import subprocess
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+from urllib.parse import quote
+
+DEFAULT_SEED = 7
+
+SCENARIO_NAMES = [
+    "users_nearby",
+    "events",
+    "events_city",
+    "event_details",
+    "private_inbox",
+    "private_thread",
+    "group_messages",
+    "friends",
+    "groups",
+    "my_groups",
+    "notifications",
+]
+
+
+@dataclass(frozen=True)
+class Actor:
+    user_id: int
+    token: str
+    city: str | None
+    friend_id: int | None
+    group_id: int | None
+    event_id: int | None
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    path: Callable[[Actor], str | None]
+
+
+SCENARIOS = [
+    Scenario("users_nearby", lambda actor: "/users/nearby?limit=20"),
+    Scenario("events", lambda actor: "/events?limit=20"),
+    Scenario("events_city", lambda actor: f"/events?limit=20&city={quote(actor.city)}" if actor.city else None),
+    Scenario("event_details", lambda actor: f"/events/{actor.event_id}" if actor.event_id else None),
+    Scenario("private_inbox", lambda actor: "/messages/private"),
+    Scenario(
+        "private_thread",
+        lambda actor: f"/messages/private/{actor.friend_id}?limit=50" if actor.friend_id else None,
+    ),
+    Scenario(
+        "group_messages",
+        lambda actor: f"/messages/group/{actor.group_id}?limit=50" if actor.group_id else None,
+    ),
+    Scenario("friends", lambda actor: "/friends"),
+    Scenario("groups", lambda actor: "/groups?limit=20"),
+    Scenario("my_groups", lambda actor: "/groups/my"),
+    Scenario("notifications", lambda actor: "/users/me/notifications?limit=20"),
+]
+
+
+def _prepare_environment() -> None:
+    os.environ.setdefault("JWT_SECRET_KEY", "bench-secret")
+    # Tracker N+1 z middleware'u przesłaniałby tracker benchmarku.
+    os.environ["SQL_N_PLUS_ONE_DETECTION"] = "0"
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _dataset_counts(db) -> dict:
+    from sqlalchemy import func, select
+
+    from backend.models import Event, Friendship, Group, Message, User, UserNotification
+
+    return {
+        model.__tablename__: db.execute(select(func.count()).select_from(model)).scalar_one()
+        for model in (User, Event, Friendship, Group, Message, UserNotification)
+    }
+
+
+def load_actors(db, count: int, seed: int) -> list[Actor]:
+    """Losowi aktywni użytkownicy (rola user) z profilem, znajomym, grupą i wydarzeniem."""
+
+    from sqlalchemy import select
+
+    from backend.models import Event, EventSignup, Friendship, GroupMembership, User, UserProfile
+    from backend.security import create_access_token
+
+    user_ids = list(
+        db.execute(
+            select(User.id)
+            .join(UserProfile, UserProfile.user_id == User.id)
+            .where(User.role == "user", User.status == "active")
+            .order_by(User.id)
+        ).scalars()
+    )
+    if not user_ids:
+        raise ValueError("Brak użytkowników — najpierw uruchom backend.bench.generate.")
+
+    chosen = sorted(random.Random(seed).sample(user_ids, min(count, len(user_ids))))
+
+    cities = dict(
+        db.execute(select(UserProfile.user_id, UserProfile.miasto).where(UserProfile.user_id.in_(chosen))).all()
+    )
+
+    friends: dict[int, int] = {}
+    for requester_id, addressee_id in db.execute(
+        select(Friendship.requester_user_id, Friendship.addressee_user_id)
+        .where(
+            Friendship.status == "accepted",
+            Friendship.requester_user_id.in_(chosen) | Friendship.addressee_user_id.in_(chosen),
+        )
+        .order_by(Friendship.id)
+    ):
+        friends.setdefault(requester_id, addressee_id)
+        friends.setdefault(addressee_id, requester_id)
+
+    groups: dict[int, int] = {}
+    for user_id, group_id in db.execute(
+        select(GroupMembership.user_id, GroupMembership.group_id)
+        .where(GroupMembership.user_id.in_(chosen))
+        .order_by(GroupMembership.id)
+    ):
+        groups.setdefault(user_id, group_id)
+
+    events: dict[int, int] = {}
+    for user_id, event_id in db.execute(
+        select(EventSignup.user_id, EventSignup.event_id)
+        .join(Event, Event.id == EventSignup.event_id)
+        .where(EventSignup.user_id.in_(chosen), Event.status == "published")
+        .order_by(EventSignup.id)
+    ):
+        events.setdefault(user_id, event_id)
+
+    return [
+        Actor(
+            user_id=user_id,
+            token=create_access_token(user_id),
+            city=cities.get(user_id),
+            friend_id=friends.get(user_id),
+            group_id=groups.get(user_id),
+            event_id=events.get(user_id),
+        )
+        for user_id in chosen
+    ]
+
+
+async def _run_scenario(
+    client,
+    scenario: Scenario,
+    actors: list[Actor],
+    *,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    seed: int,
+) -> dict:
+    from backend.bench.common import latency_summary, percentile
+    from backend.query_tracking import track_queries
+
+    rng = random.Random(f"{seed}:{scenario.name}")
+    plan = []
+    for actor in actors:
+        path = scenario.path(actor)
+        if path is not None:
+            plan.append((actor, path))
+    if not plan:
+        return {"skipped": "no actor has data for this scenario"}
+
+    work = [rng.choice(plan) for _ in range(warmup + requests)]
+    samples: list[float] = []
+    queries: list[int] = []
+    statuses: dict[int, int] = {}
+    position = 0
+
+    async def worker() -> None:
+        nonlocal position
+        while position < len(work):
+            index = position
+            position += 1
+            actor, path = work[index]
+
+            with track_queries() as tracker:
+                started = time.perf_counter()
+                response = await client.get(path, headers={"Authorization": f"Bearer {actor.token}"})
+                elapsed_ms = (time.perf_counter() - started) * 1000
+
+            if index < warmup:
+                continue
+            samples.append(elapsed_ms)
+            queries.append(tracker.total)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    total_seconds = time.perf_counter() - started
+
+    return {
+        **latency_summary(samples),
+        "requests_per_second": round(len(work) / total_seconds, 1) if total_seconds else None,
+        "queries_p50": percentile(queries, 50),
+        "queries_p95": percentile(queries, 95),
+        "queries_max": max(queries),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+def compare(result: dict, baseline: dict) -> dict:
+    """Zmiana p95 i liczby zapytań na żądanie względem wcześniejszego wyniku."""
+
+    changes = {}
+    for name, current in result["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if not previous or "p95_ms" not in current or "p95_ms" not in previous:
+            continue
+        changes[name] = {
+            "p95_ms": [previous["p95_ms"], current["p95_ms"]],
+            "p95_change_pct": (
+                round((current["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"] * 100, 1)
+                if previous["p95_ms"]
+                else None
+            ),
+            "queries_p95": [previous["queries_p95"], current["queries_p95"]],
+        }
+    return {"baseline_commit": baseline.get("commit"), "endpoints": changes}
+
+
+async def run(*, scenarios: list[str], requests: int, concurrency: int, warmup: int, actors: int, seed: int) -> dict:
+    import httpx
+
+    import backend.main as main
+    from backend.db.database import engine
+
+    main.limiter.enabled = False
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    db = main.SessionLocal()
+    try:
+        dataset = _dataset_counts(db)
+        bench_actors = load_actors(db, actors, seed)
+    finally:
+        db.close()
+
+    results = {}
+    # Wyjątek w handlerze ma być policzony jako 500, a nie przerwać benchmark.
+    transport = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for scenario in SCENARIOS:
+            if scenario.name not in scenarios:
+                continue
+            results[scenario.name] = await _run_scenario(
+                client,
+                scenario,
+                bench_actors,
+                requests=requests,
+                concurrency=concurrency,
+                warmup=warmup,
+                seed=seed,
+            )
+
+    return {
+        "commit": _git_commit(),
+        "database": engine.dialect.name,
+        "dataset": dataset,
+        "requests": requests,
+        "concurrency": concurrency,
+        "actors": len(bench_actors),
+        "endpoints": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="żądań na scenariusz")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--actors", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--only", nargs="+", choices=SCENARIO_NAMES, default=SCENARIO_NAMES)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=None)
+    args = parser.parse_args()
+
+    _prepare_environment()
+    result = asyncio.run(
+        run(
+            scenarios=args.only,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            warmup=args.warmup,
+            actors=args.actors,
+            seed=args.seed,
+        )
+    )
+    if args.baseline:
+        result["comparison"] = compare(result, json.loads(args.baseline.read_text(encoding="utf-8")))
+
+    output = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(output + "\n", encoding="utf-8")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,596 @@
+"""Generator syntetycznych danych w skali produkcyjnej.
+
+Wypełnia pustą bazę (DATABASE_URL) kontami, profilami z zainteresowaniami
+i lokalizacją w polskich miejscowościach (geodata/pl_places.csv, losowanie
+ważone liczbą mieszkańców), partnerami i ich wydarzeniami, zapisami,
+znajomościami, blokadami, grupami, wiadomościami oraz powiadomieniami.
+
+Dane są powtarzalne: ten sam --seed i --anchor dają identyczną bazę, więc
+wyniki backend.bench.endpoints można porównywać między commitami. Wiersze
+są wstawiane hurtowo (insert() + executemany w paczkach), bez ORM.
+
+Uruchomienie (z katalogu głównego repo):
+
+    DATABASE_URL=sqlite:////tmp/usly-bench.db JWT_SECRET_KEY=bench \\
+        python -m backend.bench.generate --users 100000 --events 20000 --messages 2000000
+
+Wszystkie konta mają hasło BENCH_PASSWORD.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import random
+import time
+from bisect import bisect_right
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from itertools import accumulate
+from typing import Callable, Iterable, Iterator
+
+from sqlalchemy import func, insert, select
+
+from backend.models import (
+    Event,
+    EventSave,
+    EventSignup,
+    Friendship,
+    Group,
+    GroupMembership,
+    Message,
+    PartnerProfile,
+    User,
+    UserBlock,
+    UserNotification,
+    UserProfile,
+)
+from backend.notifications import recount_unread_notifications
+from backend.reverse_geocoder import DEFAULT_DATASET_PATH
+
+
+BENCH_PASSWORD = "bench-password"
+BENCH_EMAIL_DOMAIN = "bench.usly.test"
+
+DEFAULT_SEED = 20260101
+INSERT_CHUNK_SIZE = 5000
+CITY_POOL_SIZE = 150
+CITY_JITTER_DEGREES = 0.05
+SAME_CITY_SHARE = 0.7
+
+INTERESTS = [
+    "kino", "spacer", "koncerty", "książki", "podróże", "rower", "bieganie",
+    "fotografia", "planszówki", "psy", "gotowanie", "joga", "siłownia",
+    "taniec", "teatr", "technologia", "biznes", "koty", "wspinaczka",
+    "pływanie", "sztuka", "gry", "wolontariat", "języki", "ogrodnictwo",
+]
+PLANS = [("free", 0.8), ("plus", 0.12), ("premium", 0.06), ("vip", 0.02)]
+NICKS = [
+    "Ania", "Kasia", "Ola", "Magda", "Zosia", "Julia", "Marta", "Ewa",
+    "Tomek", "Kuba", "Piotr", "Michał", "Bartek", "Paweł", "Adam", "Wojtek",
+]
+EVENT_KINDS = [
+    "Wieczór", "Warsztaty", "Spotkanie", "Turniej", "Wycieczka", "Pokaz",
+    "Festiwal", "Koncert", "Trening", "Meetup",
+]
+PHRASES = [
+    "Cześć!", "Hej, co słychać?", "Idziesz jutro?", "Super, do zobaczenia",
+    "Jestem już na miejscu", "Spóźnię się 10 minut", "Dzięki za wczoraj!",
+    "Może w sobotę?", "Brzmi świetnie", "Kto jeszcze się wybiera?",
+    "Wyślę ci adres", "Haha, dokładnie", "Daj znać, jak dotrzesz",
+]
+NOTIFICATION_TYPES = ["event_reminder_2d", "event_reminder_1d", "event_time_changed", "friend_request"]
+
+
+class WeightedChoice:
+    """Losowanie z wagami w O(log n) (random.choices liczy sumy przy każdym wywołaniu)."""
+
+    def __init__(self, items: list, weights: Iterable[float]) -> None:
+        self.items = items
+        self.cumulative = list(accumulate(weights))
+        self.total = self.cumulative[-1]
+
+    def pick(self, rng: random.Random):
+        return self.items[bisect_right(self.cumulative, rng.random() * self.total)]
+
+
+def _zipf(count: int, exponent: float = 0.9) -> list[float]:
+    return [1.0 / (rank + 1) ** exponent for rank in range(count)]
+
+
+def load_cities(limit: int = CITY_POOL_SIZE) -> list[tuple[str, float, float, int]]:
+    """Największe miejscowości (dzielnice łączone z miastem) jako (nazwa, lat, lng, populacja)."""
+
+    rows_by_name: dict[str, list[tuple[float, float, int]]] = {}
+    with open(DEFAULT_DATASET_PATH, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            rows_by_name.setdefault(row["name"], []).append(
+                (float(row["lat"]), float(row["lng"]), int(row["population"]))
+            )
+
+    cities = []
+    for name, rows in rows_by_name.items():
+        # Współrzędne miasta bierzemy z jego największej części.
+        lat, lng, _ = max(rows, key=lambda row: row[2])
+        cities.append((name, lat, lng, sum(row[2] for row in rows)))
+
+    cities.sort(key=lambda city: (-city[3], city[0]))
+    return cities[:limit]
+
+
+def _insert(db, model, rows: Iterable[dict], chunk_size: int = INSERT_CHUNK_SIZE) -> int:
+    count = 0
+    batch: list[dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            db.execute(insert(model), batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        db.execute(insert(model), batch)
+        count += len(batch)
+    db.commit()
+    return count
+
+
+def _ids(db, column) -> list[int]:
+    return list(db.execute(select(column).order_by(column)).scalars())
+
+
+class DatasetGenerator:
+    def __init__(
+        self,
+        session_factory,
+        *,
+        users: int,
+        events: int,
+        messages: int,
+        partners: int | None = None,
+        groups: int | None = None,
+        friends_per_user: float = 8.0,
+        signups_per_event: float = 12.0,
+        notifications_per_user: float = 6.0,
+        seed: int = DEFAULT_SEED,
+        anchor: date | None = None,
+        password_hash: str | None = None,
+        progress: Callable[[str], None] | None = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.users = users
+        self.events = events
+        self.messages = messages
+        self.partners = partners if partners is not None else max(1, users // 50)
+        self.groups = groups if groups is not None else max(1, users // 200)
+        self.friends_per_user = friends_per_user
+        self.signups_per_event = signups_per_event
+        self.notifications_per_user = notifications_per_user
+        self.seed = seed
+        anchor = anchor or datetime.now(timezone.utc).date()
+        self.anchor = datetime.combine(anchor, dt_time(12, 0), tzinfo=timezone.utc)
+        self.password_hash = password_hash
+        self._progress = progress or (lambda message: None)
+
+        self.cities = load_cities()
+        self.city_choice = WeightedChoice(self.cities, [city[3] for city in self.cities])
+        self.interest_choice = WeightedChoice(INTERESTS, _zipf(len(INTERESTS)))
+
+        self.user_ids: list[int] = []
+        self.partner_ids: list[int] = []
+        self.user_city: dict[int, str] = {}
+        self.users_by_city: dict[str, list[int]] = {}
+        self.event_ids: list[int] = []
+        self.signups_by_user: dict[int, list[int]] = {}
+        self.friend_pairs: list[tuple[int, int]] = []
+        self.group_members: dict[int, list[int]] = {}
+
+    def _rng(self, part: str) -> random.Random:
+        # Osobny strumień na tabelę: zmiana liczby wiadomości nie przesuwa np. wydarzeń.
+        return random.Random(f"{self.seed}:{part}")
+
+    def _location(self, rng: random.Random) -> tuple[str, float, float]:
+        name, lat, lng, _ = self.city_choice.pick(rng)
+        return (
+            name,
+            round(lat + rng.uniform(-CITY_JITTER_DEGREES, CITY_JITTER_DEGREES), 6),
+            round(lng + rng.uniform(-CITY_JITTER_DEGREES, CITY_JITTER_DEGREES), 6),
+        )
+
+    def _interests(self, rng: random.Random, count: int) -> list[str]:
+        picked: list[str] = []
+        while len(picked) < count:
+            tag = self.interest_choice.pick(rng)
+            if tag not in picked:
+                picked.append(tag)
+        return picked
+
+    def _neighbour(self, rng: random.Random, user_id: int) -> int:
+        if rng.random() < SAME_CITY_SHARE:
+            local = self.users_by_city[self.user_city[user_id]]
+            if len(local) > 1:
+                return rng.choice(local)
+        return rng.choice(self.user_ids)
+
+    # --- tabele ---
+
+    def _generate_users(self, db) -> dict:
+        rng = self._rng("users")
+        password_hash = self.password_hash
+        if password_hash is None:
+            from backend.security import hash_password
+
+            password_hash = hash_password(BENCH_PASSWORD)
+
+        def rows() -> Iterator[dict]:
+            for index in range(self.partners + self.users):
+                role = "partner" if index < self.partners else "user"
+                yield {
+                    "email": f"{role}-{index}@{BENCH_EMAIL_DOMAIN}",
+                    "password_hash": password_hash,
+                    "dob": self.anchor.date() - timedelta(days=rng.randint(18 * 365, 60 * 365)),
+                    "role": role,
+                    "status": "active",
+                    "email_verified_at": self.anchor - timedelta(days=rng.randint(1, 700)),
+                    "created_at": self.anchor - timedelta(days=rng.randint(1, 730), seconds=rng.randint(0, 86399)),
+                }
+
+        _insert(db, User, rows())
+        ids = _ids(db, User.id)
+        self.partner_ids = ids[: self.partners]
+        self.user_ids = ids[self.partners :]
+
+        plan_choice = WeightedChoice([plan for plan, _ in PLANS], [share for _, share in PLANS])
+        locations: dict[int, tuple[str, float, float]] = {}
+
+        def profiles() -> Iterator[dict]:
+            for user_id in self.user_ids:
+                city, lat, lng = self._location(rng)
+                locations[user_id] = (city, lat, lng)
+                age_min = rng.randint(18, 35)
+                yield {
+                    "user_id": user_id,
+                    "nick": f"{rng.choice(NICKS)}{user_id}",
+                    "miasto": city,
+                    "bio": "Lubię poznawać nowych ludzi.",
+                    "zainteresowania_json": json.dumps(self._interests(rng, rng.randint(2, 8)), ensure_ascii=False),
+                    "age_min": age_min,
+                    "age_max": age_min + rng.randint(5, 25),
+                    "nearby_radius_km": rng.choice((10, 25, 50, 100)),
+                    "location_lat": lat,
+                    "location_lng": lng,
+                    "plan": plan_choice.pick(rng),
+                    "updated_at": self.anchor - timedelta(days=rng.randint(0, 90)),
+                }
+
+        profile_count = _insert(db, UserProfile, profiles())
+        for user_id, (city, _, _) in locations.items():
+            self.user_city[user_id] = city
+            self.users_by_city.setdefault(city, []).append(user_id)
+
+        partner_count = _insert(
+            db,
+            PartnerProfile,
+            (
+                {
+                    "user_id": partner_id,
+                    "nazwa": f"Partner {partner_id}",
+                    "miasto": self.city_choice.pick(rng)[0],
+                    "kategoria": self.interest_choice.pick(rng),
+                    "plan": rng.choice(("free", "pro", "premium")),
+                    "updated_at": self.anchor,
+                }
+                for partner_id in self.partner_ids
+            ),
+        )
+        return {"users": len(ids), "user_profiles": profile_count, "partner_profiles": partner_count}
+
+    def _generate_events(self, db) -> dict:
+        rng = self._rng("events")
+
+        def rows() -> Iterator[dict]:
+            for index in range(self.events):
+                city, lat, lng = self._location(rng)
+                tags = self._interests(rng, rng.randint(1, 3))
+                # ~1/3 wydarzeń już minęła, reszta w ciągu 60 dni.
+                start_at = self.anchor + timedelta(hours=rng.randint(-30 * 24, 60 * 24))
+                status = "published" if rng.random() < 0.9 else rng.choice(("draft", "archived"))
+                yield {
+                    "partner_user_id": rng.choice(self.partner_ids),
+                    "title": f"{rng.choice(EVENT_KINDS)}: {tags[0]} #{index}",
+                    "description": "Zapraszamy na wydarzenie. " * rng.randint(2, 12),
+                    "city": city,
+                    "where": f"{city}, centrum",
+                    "address": f"ul. Testowa {rng.randint(1, 200)}",
+                    "location_lat": lat,
+                    "location_lng": lng,
+                    "interest_tag": tags[0],
+                    "interest_tags_json": json.dumps(tags, ensure_ascii=False),
+                    "start_at": start_at,
+                    "end_at": start_at + timedelta(hours=rng.randint(1, 6)),
+                    "capacity": rng.choice((None, None, 20, 50, 100, 500)),
+                    "status": status,
+                    "created_at": start_at - timedelta(days=rng.randint(7, 60)),
+                    "updated_at": start_at - timedelta(days=rng.randint(0, 7)),
+                }
+
+        count = _insert(db, Event, rows())
+        self.event_ids = _ids(db, Event.id)
+
+        events = db.execute(
+            select(Event.id, Event.city, Event.capacity, Event.status).order_by(Event.id)
+        ).all()
+        signup_pairs: list[tuple[int, int]] = []
+        save_pairs: list[tuple[int, int]] = []
+        for event_id, city, capacity, status in events:
+            if status != "published":
+                continue
+            local = self.users_by_city.get(city) or self.user_ids
+            wanted = min(int(rng.expovariate(1 / self.signups_per_event)), capacity or 10**9, len(self.user_ids))
+            attendees: set[int] = set()
+            while len(attendees) < wanted:
+                pool = local if rng.random() < SAME_CITY_SHARE else self.user_ids
+                attendees.add(rng.choice(pool))
+            for user_id in attendees:
+                signup_pairs.append((event_id, user_id))
+                self.signups_by_user.setdefault(user_id, []).append(event_id)
+
+            savers = {rng.choice(local) for _ in range(int(rng.expovariate(3 / self.signups_per_event)))}
+            save_pairs.extend((event_id, user_id) for user_id in savers - attendees)
+
+        def pair_rows(pairs: list[tuple[int, int]]) -> Iterator[dict]:
+            for event_id, user_id in pairs:
+                yield {
+                    "event_id": event_id,
+                    "user_id": user_id,
+                    "created_at": self.anchor - timedelta(minutes=rng.randint(0, 60 * 24 * 30)),
+                }
+
+        return {
+            "events": count,
+            "event_signups": _insert(db, EventSignup, pair_rows(signup_pairs)),
+            "event_saves": _insert(db, EventSave, pair_rows(save_pairs)),
+        }
+
+    def _generate_social(self, db) -> dict:
+        rng = self._rng("social")
+
+        pairs: set[tuple[int, int]] = set()
+        friendship_rows = []
+        for user_id in self.user_ids:
+            # Każdy inicjuje ~połowę swoich znajomości.
+            for _ in range(int(rng.expovariate(2 / self.friends_per_user))):
+                other_id = self._neighbour(rng, user_id)
+                key = (min(user_id, other_id), max(user_id, other_id))
+                if other_id == user_id or key in pairs:
+                    continue
+                pairs.add(key)
+
+                roll = rng.random()
+                status = "accepted" if roll < 0.8 else "pending" if roll < 0.95 else "rejected"
+                created_at = self.anchor - timedelta(minutes=rng.randint(60, 60 * 24 * 365))
+                friendship_rows.append(
+                    {
+                        "requester_user_id": user_id,
+                        "addressee_user_id": other_id,
+                        "status": status,
+                        "created_at": created_at,
+                        "responded_at": None if status == "pending" else created_at + timedelta(hours=rng.randint(1, 72)),
+                    }
+                )
+                if status == "accepted":
+                    self.friend_pairs.append((user_id, other_id))
+
+        blocks: set[tuple[int, int]] = set()
+        for user_id in self.user_ids:
+            if rng.random() < 0.02:
+                for _ in range(rng.randint(1, 3)):
+                    blocked_id = rng.choice(self.user_ids)
+                    if blocked_id != user_id:
+                        blocks.add((user_id, blocked_id))
+
+        return {
+            "friendships": _insert(db, Friendship, friendship_rows),
+            "user_blocks": _insert(
+                db,
+                UserBlock,
+                (
+                    {
+                        "blocker_user_id": blocker_id,
+                        "blocked_user_id": blocked_id,
+                        "created_at": self.anchor - timedelta(days=rng.randint(1, 300)),
+                    }
+                    for blocker_id, blocked_id in sorted(blocks)
+                ),
+            ),
+        }
+
+    def _generate_groups(self, db) -> dict:
+        rng = self._rng("groups")
+        size_choice = WeightedChoice(list(range(self.groups)), _zipf(self.groups, 1.1))
+
+        members: dict[int, list[int]] = {index: [] for index in range(self.groups)}
+        for user_id in self.user_ids:
+            joined = {size_choice.pick(rng) for _ in range(int(rng.expovariate(1 / 1.5)))}
+            for index in joined:
+                members[index].append(user_id)
+
+        creators = []
+        group_rows = []
+        for index in range(self.groups):
+            if not members[index]:
+                members[index].append(rng.choice(self.user_ids))
+            creator_id = members[index][0]
+            creators.append(creator_id)
+            tag = self.interest_choice.pick(rng)
+            created_at = self.anchor - timedelta(days=rng.randint(30, 700))
+            group_rows.append(
+                {
+                    "creator_id": creator_id,
+                    "title": f"{tag.capitalize()} — grupa {index}",
+                    "description": f"Grupa dla fanów: {tag}",
+                    "interest_tag": tag,
+                    "members_count": len(members[index]),
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                }
+            )
+
+        count = _insert(db, Group, group_rows)
+        group_ids = _ids(db, Group.id)
+
+        def membership_rows() -> Iterator[dict]:
+            for index, group_id in enumerate(group_ids):
+                self.group_members[group_id] = members[index]
+                for user_id in members[index]:
+                    yield {
+                        "user_id": user_id,
+                        "group_id": group_id,
+                        "role": "owner" if user_id == creators[index] else "member",
+                        "joined_at": self.anchor - timedelta(days=rng.randint(1, 700)),
+                    }
+
+        return {"groups": count, "group_memberships": _insert(db, GroupMembership, membership_rows())}
+
+    def _generate_messages(self, db) -> dict:
+        rng = self._rng("messages")
+        group_ids = [group_id for group_id, members in self.group_members.items() if len(members) > 1]
+        span_seconds = 180 * 24 * 3600
+        mean_gap = span_seconds / max(self.messages, 1)
+        unread_after = self.anchor - timedelta(days=2)
+
+        def rows() -> Iterator[dict]:
+            sent = 0
+            offset = 0.0
+            while sent < self.messages:
+                # Wiadomości przychodzą seriami w obrębie jednej rozmowy.
+                burst = min(rng.randint(1, 8), self.messages - sent)
+                if group_ids and rng.random() < 0.3:
+                    group_id = rng.choice(group_ids)
+                    participants = self.group_members[group_id]
+                    recipients = None
+                elif self.friend_pairs:
+                    group_id = None
+                    participants = list(rng.choice(self.friend_pairs))
+                    recipients = participants
+                else:
+                    group_id = None
+                    participants = rng.sample(self.user_ids, 2)
+                    recipients = participants
+
+                for step in range(burst):
+                    offset += rng.expovariate(1 / mean_gap)
+                    created_at = self.anchor - timedelta(seconds=span_seconds) + timedelta(seconds=offset)
+                    if recipients is None:
+                        sender_id, recipient_id = rng.choice(participants), None
+                    else:
+                        sender_id, recipient_id = recipients[step % 2], recipients[(step + 1) % 2]
+                    yield {
+                        "sender_user_id": sender_id,
+                        "recipient_user_id": recipient_id,
+                        "group_id": group_id,
+                        "content": rng.choice(PHRASES),
+                        "is_read": created_at < unread_after or rng.random() < 0.5,
+                        "created_at": created_at,
+                    }
+                sent += burst
+
+        return {"messages": _insert(db, Message, rows())}
+
+    def _generate_notifications(self, db) -> dict:
+        rng = self._rng("notifications")
+        partner_by_event = dict(db.execute(select(Event.id, Event.partner_user_id)).all())
+
+        def rows() -> Iterator[dict]:
+            for user_id in self.user_ids:
+                event_ids = self.signups_by_user.get(user_id)
+                for _ in range(int(rng.expovariate(1 / self.notifications_per_user))):
+                    notification_type = rng.choice(NOTIFICATION_TYPES)
+                    event_id = None
+                    if notification_type != "friend_request" and event_ids:
+                        event_id = rng.choice(event_ids)
+                    elif notification_type != "friend_request":
+                        notification_type = "friend_request"
+                    created_at = self.anchor - timedelta(minutes=rng.randint(0, 60 * 24 * 60))
+                    yield {
+                        "user_id": user_id,
+                        "event_id": event_id,
+                        "partner_user_id": partner_by_event.get(event_id),
+                        "type": notification_type,
+                        "created_at": created_at,
+                        "read_at": created_at + timedelta(hours=1) if rng.random() < 0.7 else None,
+                    }
+
+        count = _insert(db, UserNotification, rows())
+        # Wstawienia z pominięciem ORM — licznik nieprzeczytanych liczony na końcu.
+        recount_unread_notifications(db)
+        db.commit()
+        return {"user_notifications": count}
+
+    def run(self) -> dict:
+        db = self.session_factory()
+        try:
+            if db.execute(select(func.count()).select_from(User)).scalar_one():
+                raise ValueError("Generator wymaga pustej bazy (tabela users zawiera już wiersze).")
+
+            counts: dict[str, int] = {}
+            steps = [
+                ("users", self._generate_users),
+                ("events", self._generate_events),
+                ("social", self._generate_social),
+                ("groups", self._generate_groups),
+                ("messages", self._generate_messages),
+                ("notifications", self._generate_notifications),
+            ]
+            for name, step in steps:
+                started = time.perf_counter()
+                result = step(db)
+                counts.update(result)
+                self._progress(f"{name}: {result} in {time.perf_counter() - started:.1f}s")
+            return counts
+        finally:
+            db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--events", type=int, default=2_000)
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--partners", type=int, default=None)
+    parser.add_argument("--groups", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--anchor", type=date.fromisoformat, default=None, help="YYYY-MM-DD, domyślnie dziś (UTC)")
+    args = parser.parse_args()
+
+    from backend.db.database import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+
+    generator = DatasetGenerator(
+        SessionLocal,
+        users=args.users,
+        events=args.events,
+        messages=args.messages,
+        partners=args.partners,
+        groups=args.groups,
+        seed=args.seed,
+        anchor=args.anchor,
+        progress=lambda message: print(message, flush=True),
+    )
+    started = time.perf_counter()
+    counts = generator.run()
+    print(
+        json.dumps(
+            {
+                "seed": args.seed,
+                "anchor": generator.anchor.date().isoformat(),
+                "seconds": round(time.perf_counter() - started, 1),
+                "rows": counts,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
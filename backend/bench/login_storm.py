@@ -0,0 +1,183 @@
+"""Benchmark: opóźnienie GET /events podczas fali logowań.
+
+Uruchamia aplikację w uvicorn na tymczasowej bazie SQLite, zakłada
+konto i kilkadziesiąt wydarzeń, a następnie mierzy p50/p95/p99 /events:
+najpierw bez obciążenia, potem równolegle z falą POST /auth/login.
+
+Uruchomienie (z katalogu głównego repo):
+
+    JWT_SECRET_KEY=bench python -m backend.bench.login_storm
+    JWT_SECRET_KEY=bench PASSWORD_HASH_WORKERS=0 python -m backend.bench.login_storm
+
+Drugi wariant liczy bcrypt we wspólnej puli wątków (stare zachowanie),
+co pozwala porównać wyniki.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+def _prepare_environment(workdir: Path) -> None:
+    os.environ["DATABASE_URL"] = f"sqlite:///{(workdir / 'bench.db').as_posix()}"
+    os.environ.setdefault("JWT_SECRET_KEY", "bench-secret")
+
+
+def _seed(main, *, events: int, password: str) -> str:
+    from backend.db.database import Base, engine
+
+    Base.metadata.create_all(bind=engine)
+
+    db = main.SessionLocal()
+    try:
+        partner = main.User(
+            email="bench-partner@example.com",
+            password_hash=main.hash_password(password),
+            role="partner",
+            status="active",
+        )
+        user = main.User(
+            email="bench-user@example.com",
+            password_hash=main.hash_password(password),
+            role="user",
+            status="active",
+        )
+        db.add_all([partner, user])
+        db.flush()
+
+        start = datetime.now(timezone.utc) + timedelta(days=1)
+        for index in range(events):
+            db.add(
+                main.Event(
+                    partner_user_id=partner.id,
+                    title=f"Wydarzenie {index}",
+                    description="Opis wydarzenia " * 10,
+                    city="Warszawa",
+                    where="Centrum",
+                    interest_tag="kino",
+                    start_at=start + timedelta(hours=index),
+                    end_at=start + timedelta(hours=index + 2),
+                    status="published",
+                )
+            )
+        db.commit()
+        return user.email
+    finally:
+        db.close()
+
+
+def _measure_events(session, base_url: str, token: str, stop: threading.Event, samples: list[float]) -> None:
+    headers = {"Authorization": f"Bearer {token}"}
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = session.get(f"{base_url}/events", headers=headers, params={"limit": 20})
+        samples.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+
+
+def run(*, logins: int, concurrency: int, events: int, baseline_seconds: float) -> dict:
+    import requests
+
+    from backend.bench.common import free_port, latency_summary, start_uvicorn
+
+    with tempfile.TemporaryDirectory(prefix="usly-bench-") as tmp:
+        _prepare_environment(Path(tmp))
+
+        import backend.main as main
+
+        main.limiter.enabled = False
+        password = "bench-password-123"
+        email = _seed(main, events=events, password=password)
+
+        port = free_port()
+        server, thread = start_uvicorn(main.app, port)
+        base_url = f"http://127.0.0.1:{port}"
+
+        try:
+            login_payload = {"email": email, "password": password}
+            token = requests.post(f"{base_url}/auth/login", json=login_payload).json()["data"]["access_token"]
+
+            baseline: list[float] = []
+            stop = threading.Event()
+            probe = threading.Thread(
+                target=_measure_events,
+                args=(requests.Session(), base_url, token, stop, baseline),
+            )
+            probe.start()
+            time.sleep(baseline_seconds)
+            stop.set()
+            probe.join()
+
+            storm: list[float] = []
+            stop = threading.Event()
+            probe = threading.Thread(
+                target=_measure_events,
+                args=(requests.Session(), base_url, token, stop, storm),
+            )
+
+            remaining = [logins]
+            remaining_lock = threading.Lock()
+            login_statuses: dict[int, int] = {}
+
+            def login_worker() -> None:
+                session = requests.Session()
+                while True:
+                    with remaining_lock:
+                        if remaining[0] <= 0:
+                            return
+                        remaining[0] -= 1
+                    response = session.post(f"{base_url}/auth/login", json=login_payload)
+                    with remaining_lock:
+                        login_statuses[response.status_code] = login_statuses.get(response.status_code, 0) + 1
+
+            workers = [threading.Thread(target=login_worker) for _ in range(concurrency)]
+            probe.start()
+            storm_started = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            storm_seconds = time.perf_counter() - storm_started
+            stop.set()
+            probe.join()
+        finally:
+            server.should_exit = True
+            thread.join(timeout=10)
+
+        return {
+            "password_hash_workers": os.getenv("PASSWORD_HASH_WORKERS", "default"),
+            "logins": logins,
+            "login_concurrency": concurrency,
+            "login_statuses": {str(code): count for code, count in sorted(login_statuses.items())},
+            "logins_per_second": round(logins / storm_seconds, 2) if storm_seconds else None,
+            "events_baseline": latency_summary(baseline),
+            "events_during_login_storm": latency_summary(storm),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--events", type=int, default=50)
+    parser.add_argument("--baseline-seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    result = run(
+        logins=args.logins,
+        concurrency=args.concurrency,
+        events=args.events,
+        baseline_seconds=args.baseline_seconds,
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
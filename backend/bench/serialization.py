@@ -0,0 +1,126 @@
+"""Benchmark serializacji i rozmiaru odpowiedzi /admin/users i /events.
+
+Handlery są wywoływane wprost (jak w testach), a ich wynik serializowany
+na dwa sposoby:
+
+- "legacy" — dotychczasowa ścieżka FastAPI: jsonable_encoder + stdlib
+  json (JSONResponse.render),
+- "fast" — backend.json_response.dumps (orjson, jeśli zainstalowany).
+
+Dla każdego endpointu raportuje p50/p95 czasu serializacji oraz bajty na
+łączu bez kompresji, z gzip i z brotli (poziomy z COMPRESSION_*).
+
+Uruchomienie (z katalogu głównego repo, na bazie z generatora):
+
+    DATABASE_URL=sqlite:////tmp/usly-bench.db JWT_SECRET_KEY=bench \\
+        python -m backend.bench.serialization --output serialization.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from backend.bench.endpoints import DEFAULT_SEED, _git_commit, _prepare_environment, load_actors
+
+
+def _legacy_dumps(content) -> bytes:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def _time_ms(serialize, content, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        serialize(content)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def _wire_bytes(body: bytes, config) -> dict:
+    from backend.compression import brotli, compress_body
+
+    sizes = {"raw": len(body), "gzip": len(compress_body(body, "gzip", config))}
+    if brotli is not None:
+        sizes["br"] = len(compress_body(body, "br", config))
+    return sizes
+
+
+def measure(content, *, repeat: int, config) -> dict:
+    from backend.bench.common import latency_summary
+    from backend.json_response import dumps
+
+    legacy = latency_summary(_time_ms(_legacy_dumps, content, repeat))
+    fast = latency_summary(_time_ms(dumps, content, repeat))
+    return {
+        "legacy": legacy,
+        "fast": fast,
+        "p50_speedup": round(legacy["p50_ms"] / fast["p50_ms"], 2) if fast["p50_ms"] else None,
+        "bytes": _wire_bytes(dumps(content), config),
+        "legacy_raw_bytes": len(_legacy_dumps(content)),
+    }
+
+
+def run(*, repeat: int, limit: int, seed: int) -> dict:
+    import backend.main as main
+    from backend.compression import load_compression_config
+    from backend.db.database import engine
+    from backend.models import User
+
+    config = load_compression_config()
+    admin = SimpleNamespace(id=0, role="admin", admin_level=None)
+
+    db = main.SessionLocal()
+    try:
+        actor = load_actors(db, 1, seed)[0]
+        viewer = db.get(User, actor.user_id)
+        payloads = {
+            "admin_users": main.admin_list_users(current_user=admin),
+            "events": main.list_events(
+                city=None,
+                date=None,
+                limit=limit,
+                offset=0,
+                lat=None,
+                lng=None,
+                radius_km=None,
+                current_user=viewer,
+            ),
+        }
+    finally:
+        db.close()
+
+    return {
+        "commit": _git_commit(),
+        "database": engine.dialect.name,
+        "repeat": repeat,
+        "compression": {"gzip_level": config.gzip_level, "brotli_quality": config.brotli_quality},
+        "endpoints": {name: measure(content, repeat=repeat, config=config) for name, content in payloads.items()},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50, help="serializacji na endpoint i wariant")
+    parser.add_argument("--limit", type=int, default=100, help="limit strony /events")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    _prepare_environment()
+    result = run(repeat=args.repeat, limit=args.limit, seed=args.seed)
+
+    output = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(output + "\n", encoding="utf-8")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
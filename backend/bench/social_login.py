@@ -0,0 +1,211 @@
+"""Benchmark: opóźnienie POST /auth/google przy wolnym endpointcie JWKS.
+
+Uruchamia aplikację w uvicorn na tymczasowej bazie SQLite oraz lokalny
+serwer JWKS, który odpowiada z opóźnieniem --jwks-latency-ms (symuluje
+sieć do Google). Tokeny ID są podpisywane kluczem wygenerowanym na
+potrzeby testu. Raportuje p50/p95/p99 logowań i liczbę pobrań JWKS.
+
+Uruchomienie (z katalogu głównego repo):
+
+    JWT_SECRET_KEY=bench python -m backend.bench.social_login
+    JWT_SECRET_KEY=bench python -m backend.bench.social_login --cold
+
+--cold czyści cache kluczy przed każdym logowaniem, co odpowiada
+wcześniejszemu zachowaniu (pobranie certyfikatów przy każdym żądaniu).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+BENCH_AUDIENCE = "usly-bench.apps.googleusercontent.com"
+
+
+def _prepare_environment(workdir: Path) -> None:
+    os.environ["DATABASE_URL"] = f"sqlite:///{(workdir / 'bench.db').as_posix()}"
+    os.environ.setdefault("JWT_SECRET_KEY", "bench-secret")
+    os.environ["GOOGLE_WEB_CLIENT_ID"] = BENCH_AUDIENCE
+
+
+def _start_jwks_server(jwks: dict, latency_seconds: float):
+    from backend.bench.common import free_port
+
+    body = json.dumps(jwks).encode("utf-8")
+    fetches = [0]
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            fetches[0] += 1
+            time.sleep(latency_seconds)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Cache-Control", "public, max-age=21600")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", free_port()), Handler)
+    threading.Thread(target=server.serve_forever, name="bench-jwks", daemon=True).start()
+    return server, fetches
+
+
+def _seed(main, users: int) -> None:
+    db = main.SessionLocal()
+    try:
+        for index in range(users):
+            db.add(
+                main.User(
+                    email=f"bench-google-{index}@example.com",
+                    google_sub=f"bench-google-{index}",
+                    role="user",
+                    status="active",
+                )
+            )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _make_token(private_key_pem: bytes, index: int) -> str:
+    from jose import jwt
+
+    now = int(time.time())
+    return jwt.encode(
+        {
+            "iss": "https://accounts.google.com",
+            "aud": BENCH_AUDIENCE,
+            "sub": f"bench-google-{index}",
+            "email": f"bench-google-{index}@example.com",
+            "email_verified": True,
+            "iat": now,
+            "exp": now + 3600,
+        },
+        private_key_pem,
+        algorithm="RS256",
+        headers={"kid": "bench-key"},
+    )
+
+
+def run(*, logins: int, concurrency: int, users: int, jwks_latency_ms: float, cold: bool) -> dict:
+    import requests
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    from backend.bench.common import free_port, latency_summary, start_uvicorn
+    from backend.test_apple_auth import _rsa_public_jwk
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_key_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+    jwks_server, jwks_fetches = _start_jwks_server(
+        {"keys": [_rsa_public_jwk(private_key, kid="bench-key")]},
+        jwks_latency_ms / 1000,
+    )
+
+    with tempfile.TemporaryDirectory(prefix="usly-bench-") as tmp:
+        _prepare_environment(Path(tmp))
+
+        import backend.google_auth as google_auth
+        import backend.main as main
+        from backend.db.database import Base, engine
+
+        Base.metadata.create_all(bind=engine)
+        _seed(main, users)
+        main.limiter.enabled = False
+        google_auth.GOOGLE_JWKS_URL = f"http://127.0.0.1:{jwks_server.server_address[1]}/oauth2/v3/certs"
+        google_auth.google_signing_keys.clear()
+
+        tokens = [_make_token(private_key_pem, index) for index in range(users)]
+
+        port = free_port()
+        server, thread = start_uvicorn(main.app, port)
+        base_url = f"http://127.0.0.1:{port}"
+
+        samples: list[float] = []
+        statuses: dict[int, int] = {}
+        remaining = [logins]
+        lock = threading.Lock()
+
+        def login_worker() -> None:
+            session = requests.Session()
+            while True:
+                with lock:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+                    index = remaining[0]
+                if cold:
+                    google_auth.google_signing_keys.clear()
+                started = time.perf_counter()
+                response = session.post(
+                    f"{base_url}/auth/google",
+                    json={
+                        "id_token": tokens[index % users],
+                        "mode": "login",
+                        "expected_role": "user",
+                    },
+                )
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                with lock:
+                    samples.append(elapsed_ms)
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        try:
+            workers = [threading.Thread(target=login_worker) for _ in range(concurrency)]
+            started = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            total_seconds = time.perf_counter() - started
+        finally:
+            server.should_exit = True
+            thread.join(timeout=10)
+            jwks_server.shutdown()
+
+        return {
+            "cold": cold,
+            "logins": logins,
+            "concurrency": concurrency,
+            "jwks_latency_ms": jwks_latency_ms,
+            "statuses": {str(code): count for code, count in sorted(statuses.items())},
+            "logins_per_second": round(logins / total_seconds, 2) if total_seconds else None,
+            "jwks_fetches": jwks_fetches[0],
+            "google_login": latency_summary(samples),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--jwks-latency-ms", type=float, default=150.0)
+    parser.add_argument("--cold", action="store_true")
+    args = parser.parse_args()
+
+    result = run(
+        logins=args.logins,
+        concurrency=args.concurrency,
+        users=args.users,
+        jwks_latency_ms=args.jwks_latency_ms,
+        cold=args.cold,
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
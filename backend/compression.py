@@ -0,0 +1,146 @@
+"""Kompresja odpowiedzi API (brotli/gzip) według Accept-Encoding.
+
+CompressionMiddleware kompresuje odpowiedzi, które:
+
+- mają ciało wysłane w jednym kawałku (odpowiedzi strumieniowe, np.
+  eksporty CSV/NDJSON, przechodzą bez zmian — nie są buforowane),
+- mają co najmniej COMPRESSION_MIN_BYTES bajtów,
+- mają tekstowy typ treści (JSON, NDJSON, text/*, JS, SVG) i nie mają
+  jeszcze Content-Encoding (zasoby statyczne są prekompresowane).
+
+Silny ETag skompresowanej odpowiedzi staje się słaby (W/"..."), bo
+opisuje reprezentację bez kompresji; If-None-Match porównuje słabo.
+
+Kodowanie wybiera negotiate_encoding() z backend/static_assets.py: brotli,
+gdy klient go akceptuje i pakiet jest zainstalowany, w przeciwnym razie
+gzip. Poziomy są niższe niż przy budowaniu zasobów statycznych, bo
+kompresja odbywa się przy każdym żądaniu.
+"""
+
+from __future__ import annotations
+
+import gzip
+import os
+from dataclasses import dataclass
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.static_assets import negotiate_encoding
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - zależy od środowiska
+    brotli = None
+
+
+DEFAULT_COMPRESSION_MIN_BYTES = 1024
+DEFAULT_GZIP_LEVEL = 6
+DEFAULT_BROTLI_QUALITY = 4
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "image/svg+xml",
+    "text/",
+)
+
+
+@dataclass(frozen=True)
+class CompressionConfig:
+    enabled: bool = True
+    min_bytes: int = DEFAULT_COMPRESSION_MIN_BYTES
+    gzip_level: int = DEFAULT_GZIP_LEVEL
+    brotli_quality: int = DEFAULT_BROTLI_QUALITY
+
+
+def load_compression_config() -> CompressionConfig:
+    """Ładuje konfigurację kompresji odpowiedzi ze zmiennych środowiskowych."""
+
+    enabled = os.getenv("COMPRESSION_ENABLED", "1").strip().lower() not in {"0", "false", "no"}
+    min_bytes = int(os.getenv("COMPRESSION_MIN_BYTES", str(DEFAULT_COMPRESSION_MIN_BYTES)))
+    gzip_level = int(os.getenv("COMPRESSION_GZIP_LEVEL", str(DEFAULT_GZIP_LEVEL)))
+    brotli_quality = int(os.getenv("COMPRESSION_BROTLI_QUALITY", str(DEFAULT_BROTLI_QUALITY)))
+
+    if min_bytes < 0:
+        raise ValueError("COMPRESSION_MIN_BYTES nie może być ujemne")
+    if not 1 <= gzip_level <= 9 or not 0 <= brotli_quality <= 11:
+        raise ValueError("COMPRESSION_GZIP_LEVEL musi być z [1, 9], a COMPRESSION_BROTLI_QUALITY z [0, 11]")
+
+    return CompressionConfig(
+        enabled=enabled,
+        min_bytes=min_bytes,
+        gzip_level=gzip_level,
+        brotli_quality=brotli_quality,
+    )
+
+
+def compress_body(body: bytes, encoding: str, config: CompressionConfig) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=config.brotli_quality)
+    return gzip.compress(body, compresslevel=config.gzip_level, mtime=0)
+
+
+def _compressible(headers: Headers, body: bytes, min_bytes: int) -> bool:
+    if "content-encoding" in headers or len(body) < min_bytes:
+        return False
+    content_type = headers.get("content-type", "").lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, config: CompressionConfig | None = None) -> None:
+        self.app = app
+        self.config = config or CompressionConfig()
+        self.available = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.config.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"), self.available)
+        if encoding == "identity":
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # Nagłówki wysyłamy dopiero, gdy wiadomo, czy ciało będzie skompresowane.
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            if message.get("more_body", False) or not _compressible(headers, body, self.config.min_bytes):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            compressed = compress_body(body, encoding, self.config)
+            headers.add_vary_header("Accept-Encoding")
+            if len(compressed) < len(body):
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(compressed))
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    # Silny ETag opisuje bajty bez kompresji (backend/conditional.py).
+                    headers["ETag"] = f"W/{etag}"
+                body = compressed
+            passthrough = True
+            await send(start)
+            await send({"type": "http.response.body", "body": body, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,78 @@
+"""Warunkowe GET (ETag / If-None-Match) dla zasobów czytanych częściej niż zmienianych.
+
+Handler liczy ETag z tanich danych wejściowych, z których składa się
+odpowiedź: updated_at wierszy (kolumny mają onupdate w modelach), liczników
+oraz stanu zależnego od widza. Potem woła not_modified() — zanim zbuduje
+resztę odpowiedzi. Gdy klient przysłał pasujący If-None-Match, handler
+zwraca od razu 304 bez ciała. W przeciwnym razie ETag i Cache-Control
+trafiają do odpowiedzi przez wstrzyknięty przez FastAPI `Response`.
+
+Zasada: do compute_etag() trafia wszystko, od czego zależy ciało
+odpowiedzi 200. Warunki kończące się błędem (404, 409, wygaśnięcie) muszą
+być sprawdzone wcześniej, bo 304 potwierdza poprzednią odpowiedź 200.
+
+CompressionMiddleware osłabia ETag (W/...) przy kompresji, a
+etag_matches() porównuje słabo, więc rewalidacja działa także dla
+odpowiedzi skompresowanych.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+
+from backend.json_response import dumps
+from backend.static_assets import etag_matches
+
+PUBLIC_REVALIDATE = "public, no-cache"
+PRIVATE_REVALIDATE = "private, no-cache"
+
+
+def compute_etag(*parts: Any) -> str:
+    """Silny ETag z części serializowalnych do JSON (datetime/date dozwolone)."""
+
+    return f'"{hashlib.sha256(dumps(parts)).hexdigest()[:32]}"'
+
+
+def not_modified(
+    request: Request,
+    response: Response,
+    etag: str,
+    *,
+    cache_control: str = PRIVATE_REVALIDATE,
+) -> Response | None:
+    """Ustawia ETag i Cache-Control; przy pasującym If-None-Match zwraca odpowiedź 304."""
+
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+@lru_cache(maxsize=32)
+def _file_etag(path: str, mtime_ns: int, size: int) -> str:
+    return f'"{hashlib.sha256(Path(path).read_bytes()).hexdigest()[:32]}"'
+
+
+def conditional_file_response(
+    request: Request,
+    path: str | os.PathLike,
+    *,
+    media_type: str | None = None,
+    cache_control: str = PUBLIC_REVALIDATE,
+) -> Response:
+    """FileResponse z ETag z treści pliku (liczonym raz na wersję pliku) i obsługą 304."""
+
+    stat = os.stat(path)
+    etag = _file_etag(os.fspath(path), stat.st_mtime_ns, stat.st_size)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat)
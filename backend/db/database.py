@@ -47,6 +47,15 @@ engine = make_engine(DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
 
+def dialect_insert(db):
+    # insert() with ON CONFLICT support for the session's dialect (Postgres or SQLite).
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
 def get_db() -> Generator:
     db = SessionLocal()
     try:
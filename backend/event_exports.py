@@ -0,0 +1,157 @@
+"""Listy uczestników i obserwujących wydarzenia partnera.
+
+Jedno zapytanie na stronę / eksport: zapis (EventSignup albo EventSave)
+razem z użytkownikiem i nickiem z profilu (LEFT JOIN), blokady
+wykluczane w SQL przez NOT EXISTS — bez dociągania profilu per wiersz
+i bez ładowania listy blokad do Pythona.
+
+- roster_page() — strona JSON z kursorem keyset (created_at, id),
+- iter_roster_export() — eksport całej listy (CSV / NDJSON, kodowanie
+  w backend.exports) dla StreamingResponse. Wiersze są czytane
+  partiami (yield_per; na PostgreSQL kursor po stronie serwera), więc
+  pamięć nie rośnie z rozmiarem wydarzenia.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator
+
+from sqlalchemy import and_, exists, func, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from backend.exports import iter_csv, iter_encoded, iter_ndjson
+from backend.models import EventSave, EventSignup, User, UserBlock, UserProfile
+from backend.pagination import after_cursor_desc, encode_cursor
+
+
+EXPORT_BATCH_SIZE = 500
+
+
+@dataclass(frozen=True)
+class RosterKind:
+    model: type
+    # Klucz z datą w odpowiedzi JSON ("signup" / "saved") i kolumna CSV.
+    item_key: str
+    date_column: str
+    exclude_blocked: bool
+
+
+ROSTER_KINDS = {
+    "participants": RosterKind(EventSignup, "signup", "signed_up_at", exclude_blocked=True),
+    "observers": RosterKind(EventSave, "saved", "saved_at", exclude_blocked=False),
+}
+
+
+def _blocked_with(viewer_id: int):
+    return exists().where(
+        or_(
+            and_(UserBlock.blocker_user_id == viewer_id, UserBlock.blocked_user_id == User.id),
+            and_(UserBlock.blocked_user_id == viewer_id, UserBlock.blocker_user_id == User.id),
+        )
+    )
+
+
+def roster_query(kind: RosterKind, event_id: int, viewer_id: int) -> Select:
+    row = kind.model
+    query = (
+        select(row.id, row.created_at, User.id.label("user_id"), User.email, UserProfile.nick)
+        .join(User, User.id == row.user_id)
+        .outerjoin(UserProfile, UserProfile.user_id == User.id)
+        .where(row.event_id == event_id)
+    )
+    if kind.exclude_blocked:
+        query = query.where(~_blocked_with(viewer_id))
+    return query
+
+
+def roster_total(db: Session, kind: RosterKind, event_id: int, viewer_id: int) -> int:
+    return db.execute(
+        select(func.count()).select_from(roster_query(kind, event_id, viewer_id).subquery())
+    ).scalar_one()
+
+
+def roster_page(
+    db: Session,
+    kind: RosterKind,
+    event_id: int,
+    viewer_id: int,
+    *,
+    limit: int,
+    offset: int = 0,
+    cursor: tuple[datetime, int] | None = None,
+) -> tuple[list[dict], str | None]:
+    """Strona listy od najnowszych; zwraca (items, next_cursor)."""
+
+    row = kind.model
+    query = roster_query(kind, event_id, viewer_id).order_by(row.created_at.desc(), row.id.desc())
+    if cursor is not None:
+        query = query.where(after_cursor_desc(row.created_at, row.id, cursor))
+    elif offset:
+        query = query.offset(offset)
+
+    rows = db.execute(query.limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items = [
+        {
+            "user": {
+                "id": user_id,
+                "email": email,
+                "nick": nick,
+            },
+            kind.item_key: {
+                "created_at": created_at,
+            },
+        }
+        for _row_id, created_at, user_id, email, nick in rows
+    ]
+    next_cursor = encode_cursor(rows[-1][1], rows[-1][0]) if has_more else None
+    return items, next_cursor
+
+
+def _iter_roster_batches(db: Session, kind: RosterKind, event_id: int, viewer_id: int) -> Iterator[list[dict]]:
+    row = kind.model
+    query = roster_query(kind, event_id, viewer_id).order_by(row.created_at.asc(), row.id.asc())
+    result = db.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    for partition in result.partitions():
+        yield [
+            {
+                "user_id": user_id,
+                "email": email,
+                "nick": nick,
+                kind.date_column: created_at,
+            }
+            for _row_id, created_at, user_id, email, nick in partition
+        ]
+
+
+def _columns(kind: RosterKind) -> tuple[str, ...]:
+    return ("user_id", "email", "nick", kind.date_column)
+
+
+def iter_roster_csv(db: Session, kind: RosterKind, event_id: int, viewer_id: int) -> Iterator[str]:
+    return iter_csv(_columns(kind), _iter_roster_batches(db, kind, event_id, viewer_id))
+
+
+def iter_roster_ndjson(db: Session, kind: RosterKind, event_id: int, viewer_id: int) -> Iterator[str]:
+    return iter_ndjson(_iter_roster_batches(db, kind, event_id, viewer_id))
+
+
+def iter_roster_export(
+    session_factory,
+    kind: RosterKind,
+    event_id: int,
+    viewer_id: int,
+    export_format: str,
+) -> Iterator[str]:
+    """Generator dla StreamingResponse; sesja żyje tyle, co strumień."""
+
+    db = session_factory()
+    try:
+        yield from iter_encoded(export_format, _columns(kind), _iter_roster_batches(db, kind, event_id, viewer_id))
+    finally:
+        db.close()
@@ -0,0 +1,248 @@
+"""Pełnotekstowe wyszukiwanie wydarzeń (GET /events/search).
+
+Indeks trzyma jeden dokument na wydarzenie: tytuł (waga wyższa) oraz
+opis, miejsce, adres i miasto. Tekst jest normalizowany w Pythonie
+(fold_search_text): małe litery, bez znaków diakrytycznych — także "ł",
+którego nie rozkłada ani unicode61, ani słownik "simple" — i bez
+interpunkcji. Tak samo jest normalizowane zapytanie, a każde słowo
+zapytania pasuje prefiksem ("koncer" -> "koncert", "koncertu"), co przy
+braku polskiego stemmera w standardowym PostgreSQL pokrywa odmianę.
+
+- SQLite (dev): tabela wirtualna FTS5 event_search(title, body),
+  rowid = events.id, ranking bm25 z wagą 10 dla tytułu,
+- PostgreSQL: tabela event_search(event_id, document tsvector) z indeksem
+  GIN, setweight A/B i ranking ts_rank_cd.
+
+Indeks jest aktualizowany w after_flush sesji (install_event_search), więc
+każde utworzenie, edycja i usunięcie wydarzenia przez ORM trafia do niego
+w tej samej transakcji. Status, end_at i blokady nie są w indeksie —
+filtruje je zapytanie łączące indeks z tabelą events.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import unicodedata
+import weakref
+from itertools import chain
+from typing import Iterable
+
+from sqlalchemy import Float, Integer, event as sa_event, inspect, select, text
+from sqlalchemy.sql import Select
+
+from backend.logger import get_logger
+from backend.models import Event
+
+
+log = get_logger(__name__)
+
+SEARCH_TABLE = "event_search"
+SEARCH_FIELDS = ("title", "description", "where", "address", "city")
+MAX_QUERY_TERMS = 8
+MIN_TERM_LENGTH = 2
+REBUILD_BATCH_SIZE = 1000
+TITLE_WEIGHT = 10.0
+
+# Litery, których NFKD nie rozkłada na literę bazową + znak łączący.
+_EXTRA_FOLDS = str.maketrans({"ł": "l", "ß": "ss", "æ": "ae", "ø": "o", "đ": "d"})
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+# Silnik -> czy tabela indeksu istnieje (sprawdzane raz na silnik).
+_index_ready: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def fold_search_text(value: str | None) -> str:
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value.casefold())
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(_NON_WORD_RE.sub(" ", stripped.translate(_EXTRA_FOLDS)).split())
+
+
+def search_terms(query: str | None) -> list[str]:
+    terms: list[str] = []
+    for term in fold_search_text(query).split():
+        if len(term) >= MIN_TERM_LENGTH and term not in terms:
+            terms.append(term)
+    return terms[:MAX_QUERY_TERMS]
+
+
+def _document(row) -> tuple[str, str]:
+    body = " ".join(filter(None, (row.description, row.where, row.address, row.city)))
+    return fold_search_text(row.title), fold_search_text(body)
+
+
+def _is_postgres(connection) -> bool:
+    return connection.dialect.name == "postgresql"
+
+
+# --- DDL ---
+
+
+def create_event_search_index(connection) -> None:
+    if _is_postgres(connection):
+        connection.execute(text(
+            "CREATE TABLE IF NOT EXISTS event_search ("
+            " event_id INTEGER PRIMARY KEY REFERENCES events(id) ON DELETE CASCADE,"
+            " document tsvector NOT NULL)"
+        ))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_event_search_document ON event_search USING GIN (document)"
+        ))
+    else:
+        # prefix='2 3' — dodatkowe indeksy prefiksów dla krótkich fraz "ko*", "kon*".
+        connection.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS event_search USING fts5("
+            "title, body, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        ))
+
+
+def drop_event_search_index(connection) -> None:
+    if _is_postgres(connection):
+        connection.execute(text("DROP INDEX IF EXISTS ix_event_search_document"))
+    connection.execute(text("DROP TABLE IF EXISTS event_search"))
+
+
+# --- zapis ---
+
+
+def index_events(connection, rows: Iterable) -> None:
+    """Wstawia albo podmienia dokumenty; row to Event lub wiersz z polami SEARCH_FIELDS."""
+
+    params = []
+    for row in rows:
+        title, body = _document(row)
+        params.append({"event_id": row.id, "title": title, "body": body})
+    if not params:
+        return
+
+    if _is_postgres(connection):
+        connection.execute(
+            text(
+                "INSERT INTO event_search (event_id, document) VALUES (:event_id,"
+                " setweight(to_tsvector('simple', :title), 'A')"
+                " || setweight(to_tsvector('simple', :body), 'B'))"
+                " ON CONFLICT (event_id) DO UPDATE SET document = EXCLUDED.document"
+            ),
+            params,
+        )
+    else:
+        remove_events(connection, [item["event_id"] for item in params])
+        connection.execute(
+            text("INSERT INTO event_search (rowid, title, body) VALUES (:event_id, :title, :body)"),
+            params,
+        )
+
+
+def remove_events(connection, event_ids: Iterable[int]) -> None:
+    params = [{"event_id": event_id} for event_id in event_ids]
+    if not params:
+        return
+    key = "event_id" if _is_postgres(connection) else "rowid"
+    connection.execute(text(f"DELETE FROM event_search WHERE {key} = :event_id"), params)
+
+
+def rebuild_event_search(connection, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    """Przebudowuje indeks od zera (backfill w migracji, naprawa ręczna)."""
+
+    connection.execute(text("DELETE FROM event_search"))
+    columns = [Event.id] + [getattr(Event, name) for name in SEARCH_FIELDS]
+    last_id, indexed = 0, 0
+    while True:
+        rows = connection.execute(
+            select(*columns).where(Event.id > last_id).order_by(Event.id).limit(batch_size)
+        ).all()
+        if not rows:
+            return indexed
+        index_events(connection, rows)
+        indexed += len(rows)
+        last_id = rows[-1].id
+
+
+# --- synchronizacja z ORM ---
+
+
+def _search_fields_changed(obj: Event) -> bool:
+    attrs = inspect(obj).attrs
+    return any(attrs[name].history.has_changes() for name in SEARCH_FIELDS)
+
+
+def _index_exists(connection) -> bool:
+    engine = connection.engine
+    ready = _index_ready.get(engine)
+    if ready is None:
+        ready = inspect(connection).has_table(SEARCH_TABLE)
+        if not ready:
+            log.warning("event search index missing; run migrations to enable /events/search")
+        _index_ready[engine] = ready
+    return ready
+
+
+def _sync_after_flush(session, flush_context) -> None:
+    changed = [
+        obj for obj in chain(session.new, session.dirty)
+        if isinstance(obj, Event) and obj not in session.deleted and _search_fields_changed(obj)
+    ]
+    deleted = [obj.id for obj in session.deleted if isinstance(obj, Event)]
+    if not changed and not deleted:
+        return
+
+    connection = session.connection()
+    if not _index_exists(connection):
+        return
+    remove_events(connection, deleted)
+    index_events(connection, changed)
+
+
+def install_event_search(session_factory) -> None:
+    """Podpina aktualizację indeksu pod sesje z session_factory (idempotentne)."""
+
+    if not sa_event.contains(session_factory, "after_flush", _sync_after_flush):
+        sa_event.listen(session_factory, "after_flush", _sync_after_flush)
+
+
+# --- zapytanie ---
+
+
+def _match_expression(connection, terms: list[str]) -> str:
+    # Słowa po fold_search_text mają tylko litery i cyfry, więc nie wymagają
+    # dalszego escapowania w składni MATCH / to_tsquery.
+    if _is_postgres(connection):
+        return " & ".join(f"{term}:*" for term in terms)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def ranked_events_query(connection, terms: list[str]) -> Select:
+    """select(Event, score) dla wydarzeń pasujących do wszystkich słów; wyższy score = lepiej."""
+
+    match = _match_expression(connection, terms)
+    if _is_postgres(connection):
+        matches = text(
+            "SELECT event_id, ts_rank_cd(document, to_tsquery('simple', :match)) AS score"
+            " FROM event_search WHERE document @@ to_tsquery('simple', :match)"
+        )
+    else:
+        # bm25() zwraca wartości ujemne (niższa = lepiej) — odwracamy znak.
+        matches = text(
+            f"SELECT rowid AS event_id, -bm25(event_search, {TITLE_WEIGHT}, 1.0) AS score"
+            " FROM event_search WHERE event_search MATCH :match"
+        )
+    # MATERIALIZED: dopasowania liczone raz i dołączane po kluczu głównym; bez tego
+    # SQLite spłaszcza podzapytanie i wykonuje MATCH dla każdego wiersza events.
+    matches = (
+        matches.bindparams(match=match)
+        .columns(event_id=Integer, score=Float)
+        .cte("matches")
+        .prefix_with("MATERIALIZED")
+    )
+    return select(Event, matches.c.score).join(matches, matches.c.event_id == Event.id)
+
+
+def bounding_box(lat: float, lng: float, radius_km: float) -> tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lng, max_lng) obejmujące okrąg — wstępny filtr w SQL."""
+
+    lat_delta = radius_km / 111.0
+    cos_lat = math.cos(math.radians(lat))
+    lng_delta = 180.0 if cos_lat < 0.01 else min(radius_km / (111.32 * cos_lat), 180.0)
+    return lat - lat_delta, lat + lat_delta, lng - lng_delta, lng + lng_delta
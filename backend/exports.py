@@ -0,0 +1,90 @@
+"""Wspólne kodowanie eksportów strumieniowych (CSV, NDJSON, gzip).
+
+Eksport to generator partii wierszy (listy słowników) czytanych z bazy
+przez yield_per; tutaj każda partia jest zamieniana na jeden fragment
+tekstu dla StreamingResponse. W pamięci jest naraz tylko jedna partia,
+niezależnie od liczby wierszy.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Iterable, Iterator, Sequence
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+GZIP_MEDIA_TYPE = "application/gzip"
+
+# Pierwsze znaki, przy których arkusz potraktowałby komórkę jako formułę.
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def csv_safe(value):
+    value = _plain(value)
+    if value is None:
+        return ""
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_csv(columns: Sequence[str], batches: Iterable[list[dict]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    for batch in batches:
+        for row in batch:
+            writer.writerow([csv_safe(row.get(column)) for column in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_ndjson(batches: Iterable[list[dict]]) -> Iterator[str]:
+    for batch in batches:
+        if batch:
+            yield "".join(json.dumps(row, ensure_ascii=False, default=_plain) + "\n" for row in batch)
+
+
+def iter_encoded(
+    export_format: str,
+    columns: Sequence[str],
+    batches: Iterable[list[dict]],
+) -> Iterator[str]:
+    if export_format == "csv":
+        return iter_csv(columns, batches)
+    return iter_ndjson(batches)
+
+
+def iter_gzip(chunks: Iterable[str]) -> Iterator[bytes]:
+    """Kompresuje fragmenty w locie (jeden strumień gzip, bez buforowania całości)."""
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def attachment_headers(filename: str) -> dict[str, str]:
+    return {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Cache-Control": "no-store",
+    }
@@ -0,0 +1,97 @@
+"""Polecane grupy (/groups/suggested) i wyszukiwarka grup (/groups/search).
+
+Zamiast ładować cały katalog grup i sortować go w Pythonie, kandydaci są
+wybierani w SQL jako suma (UNION ALL) małych zapytań top-N:
+
+- dla każdego tagu zainteresowań użytkownika: N największych grup z tym
+  tagiem (indeks ix_groups_interest_tag_members),
+- N największych grup ogółem (indeks ix_groups_members_count),
+
+każde z wykluczeniem grup, do których użytkownik już należy (NOT EXISTS
+na group_memberships). Wynik zawiera co najwyżej (tagi + 1) * N wierszy
+i daje tę samą kolejność co pełne sortowanie: najpierw grupy pasujące
+do zainteresowań, potem według liczby członków, na końcu po id.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy import exists, func, literal, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from backend.interests import normalize_interest_tag
+from backend.models import Group, GroupMembership
+
+
+MAX_INTEREST_TAGS = 20
+
+
+def _not_member(user_id: int):
+    return ~exists().where(
+        GroupMembership.group_id == Group.id,
+        GroupMembership.user_id == user_id,
+    )
+
+
+def _top_groups(user_id: int, limit: int, score: int, interest_tag: str | None = None):
+    query = (
+        select(Group.id, Group.members_count, literal(score).label("score"))
+        .where(_not_member(user_id))
+        .order_by(Group.members_count.desc(), Group.id.asc())
+        .limit(limit)
+    )
+    if interest_tag is not None:
+        query = query.where(Group.interest_tag == interest_tag)
+    # Podzapytanie, bo SQLite nie przyjmuje LIMIT w członach UNION.
+    return select(query.subquery())
+
+
+def suggested_groups(db: Session, user_id: int, interest_tags: set[str], limit: int) -> list[Group]:
+    tags = sorted(tag for tag in interest_tags if tag)[:MAX_INTEREST_TAGS]
+    parts = [_top_groups(user_id, limit, 1, tag) for tag in tags]
+    parts.append(_top_groups(user_id, limit, 0))
+    candidates = union_all(*parts).subquery("candidates")
+
+    ranked = (
+        select(candidates.c.id, func.max(candidates.c.score).label("score"))
+        .group_by(candidates.c.id, candidates.c.members_count)
+        .order_by(
+            func.max(candidates.c.score).desc(),
+            candidates.c.members_count.desc(),
+            candidates.c.id.asc(),
+        )
+        .limit(limit)
+        .subquery("ranked")
+    )
+    return list(
+        db.scalars(
+            select(Group)
+            .join(ranked, ranked.c.id == Group.id)
+            .order_by(ranked.c.score.desc(), Group.members_count.desc(), Group.id.asc())
+        )
+    )
+
+
+def _prefix_range(column, prefix: str):
+    # Zakres [prefix, prefix + U+FFFF) korzysta z indeksu B-drzewa, w
+    # przeciwieństwie do LIKE (w SQLite domyślnie bez rozróżniania wielkości liter).
+    return (column >= prefix) & (column < prefix + "\uffff")
+
+
+def groups_by_prefix(db: Session, query: str, *, limit: int, offset: int = 0) -> tuple[list[Group], int]:
+    """Grupy, których tag albo tytuł zaczyna się od zapytania; największe najpierw."""
+
+    tag_prefix = normalize_interest_tag(query)
+    title_prefix = query.strip().lower()
+    condition = or_(
+        _prefix_range(Group.interest_tag, tag_prefix),
+        _prefix_range(func.lower(Group.title), title_prefix),
+    )
+    total = db.scalar(select(func.count()).select_from(Group).where(condition))
+    groups = db.scalars(
+        select(Group)
+        .where(condition)
+        .order_by(Group.members_count.desc(), Group.id.asc())
+        .limit(limit)
+        .offset(offset)
+    )
+    return list(groups), total
@@ -45,6 +45,7 @@ MESSAGES: Dict[str, Dict[ErrorCode, str]] = {
         ErrorCode.interest_too_long_max_40: "Zainteresowanie jest za długie (maks. 40 znaków).",
         ErrorCode.too_many_interests_max_20: "Za dużo zainteresowań (maks. 20).",
         ErrorCode.RATE_LIMITED: "Zbyt wiele prób. Spróbuj ponownie za chwilę.",
+        ErrorCode.SERVICE_BUSY: "Serwer jest chwilowo przeciążony. Spróbuj ponownie za chwilę.",
 
         # LOGIN
         ErrorCode.INVALID_CREDENTIALS: "Nieprawidłowy e-mail lub hasło.",
@@ -110,6 +111,7 @@ MESSAGES: Dict[str, Dict[ErrorCode, str]] = {
         ErrorCode.interest_too_long_max_40: "Interest is too long (max 40 characters).",
         ErrorCode.too_many_interests_max_20: "Too many interests (max 20).",
         ErrorCode.RATE_LIMITED: "Too many attempts. Please try again later.",
+        ErrorCode.SERVICE_BUSY: "The server is busy right now. Please try again in a moment.",
 
         # LOGIN
         ErrorCode.INVALID_CREDENTIALS: "Invalid email or password.",
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import requests
+from jose import jwk
+from jose.exceptions import JWKError
+from requests.adapters import HTTPAdapter
+
+from backend.logger import get_logger
+
+
+log = get_logger(__name__)
+
+IDENTITY_HTTP_POOL_SIZE = 10
+IDENTITY_KEYS_HTTP_TIMEOUT_SECONDS = 5
+
+DEFAULT_KEYS_TTL_SECONDS = 6 * 60 * 60
+MIN_KEYS_TTL_SECONDS = 60
+MAX_KEYS_TTL_SECONDS = 24 * 60 * 60
+# Refresh in the background once this fraction of the TTL has elapsed.
+REFRESH_AHEAD_FRACTION = 0.8
+# Unknown `kid` values trigger a refetch at most this often.
+MIN_FORCED_REFRESH_INTERVAL_SECONDS = 30
+
+_MAX_AGE_RE = re.compile(r"(?:^|,)\s*max-age\s*=\s*(\d+)", re.IGNORECASE)
+
+
+class IdentityKeyError(Exception):
+    """Signing keys for an identity provider could not be resolved."""
+
+
+_http_session: requests.Session | None = None
+_http_session_lock = threading.Lock()
+
+
+def identity_http_session() -> requests.Session:
+    """Shared keep-alive session for Apple/Google identity endpoints."""
+
+    global _http_session
+
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=IDENTITY_HTTP_POOL_SIZE,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _http_session = session
+
+    return _http_session
+
+
+def parse_max_age(cache_control: str | None) -> int | None:
+    if not cache_control:
+        return None
+
+    match = _MAX_AGE_RE.search(cache_control)
+    return int(match.group(1)) if match else None
+
+
+def fetch_jwks(url: str) -> tuple[list[dict[str, Any]], int | None]:
+    """Downloads a JWK Set and returns (keys, Cache-Control max-age)."""
+
+    try:
+        response = identity_http_session().get(
+            url,
+            timeout=IDENTITY_KEYS_HTTP_TIMEOUT_SECONDS,
+        )
+        response.raise_for_status()
+        payload = response.json()
+    except (requests.RequestException, ValueError) as exc:
+        raise IdentityKeyError(f"Could not fetch signing keys from {url}.") from exc
+
+    keys = payload.get("keys") if isinstance(payload, dict) else None
+
+    if not isinstance(keys, list) or not keys:
+        raise IdentityKeyError(f"Signing keys response from {url} is invalid.")
+
+    return keys, parse_max_age(response.headers.get("Cache-Control"))
+
+
+@dataclass(frozen=True)
+class KeySet:
+    keys: dict[str, Any]
+    fetched_at: float
+    refresh_at: float
+    expires_at: float
+
+
+class IdentityKeyProvider:
+    """Caches a provider's JWKS as constructed jose keys.
+
+    - the TTL follows the response's Cache-Control max-age (clamped),
+    - after REFRESH_AHEAD_FRACTION of the TTL one background thread
+      refreshes the set while requests keep using the current keys,
+    - only a cold or fully expired cache blocks the caller; concurrent
+      callers then wait for a single fetch,
+    - if a refresh fails, the last good keys stay in use.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[], tuple[list[dict[str, Any]], int | None]],
+        *,
+        algorithm: str = "RS256",
+        default_ttl_seconds: int = DEFAULT_KEYS_TTL_SECONDS,
+        min_forced_refresh_interval_seconds: float = MIN_FORCED_REFRESH_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self._fetch = fetch
+        self.algorithm = algorithm
+        self.default_ttl_seconds = default_ttl_seconds
+        self.min_forced_refresh_interval_seconds = min_forced_refresh_interval_seconds
+        self._clock = clock
+
+        self._keyset: KeySet | None = None
+        self._fetch_lock = threading.Lock()
+        self._background_refresh: threading.Thread | None = None
+        self.fetch_count = 0
+
+    def _construct(self, raw_keys: list[dict[str, Any]]) -> dict[str, Any]:
+        keys = {}
+        for raw in raw_keys:
+            if not isinstance(raw, dict):
+                continue
+            kid = raw.get("kid")
+            if not isinstance(kid, str) or not kid:
+                continue
+            try:
+                keys[kid] = jwk.construct(raw, algorithm=self.algorithm)
+            except (JWKError, ValueError, TypeError):
+                log.warning("Skipping unusable %s signing key kid=%s", self.name, kid)
+        return keys
+
+    def _load(self) -> KeySet:
+        raw_keys, max_age = self._fetch()
+        self.fetch_count += 1
+
+        keys = self._construct(raw_keys)
+        if not keys:
+            raise IdentityKeyError(f"{self.name} signing keys response contains no usable keys.")
+
+        ttl = max_age if max_age is not None else self.default_ttl_seconds
+        ttl = min(max(ttl, MIN_KEYS_TTL_SECONDS), MAX_KEYS_TTL_SECONDS)
+
+        now = self._clock()
+        keyset = KeySet(
+            keys=keys,
+            fetched_at=now,
+            refresh_at=now + ttl * REFRESH_AHEAD_FRACTION,
+            expires_at=now + ttl,
+        )
+        self._keyset = keyset
+        return keyset
+
+    def _refresh(self, *, stale: KeySet | None) -> KeySet:
+        with self._fetch_lock:
+            current = self._keyset
+            if current is not None and current is not stale:
+                # Another thread refreshed while we waited for the lock.
+                return current
+
+            try:
+                return self._load()
+            except Exception as exc:
+                if current is None:
+                    if isinstance(exc, IdentityKeyError):
+                        raise
+                    raise IdentityKeyError(f"Could not load {self.name} signing keys.") from exc
+
+                log.warning("%s signing keys refresh failed, using cached keys: %s", self.name, exc)
+                return current
+
+    def _refresh_in_background(self, stale: KeySet) -> None:
+        thread = self._background_refresh
+        if thread is not None and thread.is_alive():
+            return
+
+        thread = threading.Thread(
+            target=self._refresh,
+            kwargs={"stale": stale},
+            name=f"{self.name}-jwks-refresh",
+            daemon=True,
+        )
+        self._background_refresh = thread
+        thread.start()
+
+    def keyset(self) -> KeySet:
+        keyset = self._keyset
+        now = self._clock()
+
+        if keyset is None or now >= keyset.expires_at:
+            return self._refresh(stale=keyset)
+
+        if now >= keyset.refresh_at:
+            self._refresh_in_background(keyset)
+
+        return keyset
+
+    def get_key(self, kid: str):
+        keyset = self.keyset()
+        key = keyset.keys.get(kid)
+        if key is not None:
+            return key
+
+        # Key rotation: a new `kid` may not be in our cached set yet.
+        if self._clock() - keyset.fetched_at >= self.min_forced_refresh_interval_seconds:
+            key = self._refresh(stale=keyset).keys.get(kid)
+            if key is not None:
+                return key
+
+        raise IdentityKeyError(f"No matching {self.name} public signing key was found.")
+
+    def warm(self) -> None:
+        self.keyset()
+
+    def clear(self) -> None:
+        with self._fetch_lock:
+            self._keyset = None
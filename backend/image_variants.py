@@ -0,0 +1,174 @@
+"""Przetwarzanie przesłanych obrazów na warianty rozmiarów.
+
+Upload (awatar, logo, okładka wydarzenia, awatar AI) jest dekodowany przez
+Pillow — plik, którego nie da się zdekodować, jest odrzucany. Z obrazu
+usuwane są metadane (EXIF, GPS, profile), orientacja z EXIF jest
+wypalana w pikselach, a następnie powstają warianty WebP i JPEG dla
+rozmiarów IMAGE_VARIANT_SIZES (dłuższy bok, bez powiększania).
+
+Klucze są deterministyczne i zależą od treści pliku:
+
+    {folder}/{image_id}/{rozmiar}.{webp|jpg}
+
+dzięki czemu warianty można cache'ować jako niezmienne, a URL jednego
+wariantu wystarcza do odtworzenia pozostałych (image_variant_urls).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import re
+from dataclasses import dataclass
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+IMAGE_VARIANT_SIZES = (64, 256, 1024)
+PRIMARY_VARIANT_SIZE = 1024
+PRIMARY_VARIANT_EXT = "jpg"
+
+# Ochrona przed "decompression bomb": 5 MB PNG potrafi mieć setki Mpx.
+MAX_IMAGE_PIXELS = 40_000_000
+
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+
+_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpg": ("JPEG", "image/jpeg"),
+}
+
+_VARIANT_URL_RE = re.compile(
+    r"^(?P<prefix>.*/)(?P<image_id>[0-9a-f]{32})/(?P<size>\d+)\.(?P<ext>webp|jpg)$"
+)
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class InvalidImageError(ValueError):
+    """Przesłany plik nie jest poprawnym obrazem."""
+
+
+@dataclass(frozen=True)
+class ImageVariant:
+    size: int
+    ext: str
+    content_type: str
+    content: bytes
+
+    def key(self, folder: str, image_id: str) -> str:
+        return variant_key(folder, image_id, self.size, self.ext)
+
+
+@dataclass(frozen=True)
+class ProcessedImage:
+    image_id: str
+    width: int
+    height: int
+    variants: list[ImageVariant]
+
+    def primary_key(self, folder: str) -> str:
+        return variant_key(folder, self.image_id, PRIMARY_VARIANT_SIZE, PRIMARY_VARIANT_EXT)
+
+
+def variant_key(folder: str, image_id: str, size: int, ext: str) -> str:
+    return f"{folder}/{image_id}/{size}.{ext}"
+
+
+def _decode(content: bytes) -> Image.Image:
+    try:
+        with Image.open(io.BytesIO(content)) as probe:
+            width, height = probe.size
+            if width * height > MAX_IMAGE_PIXELS:
+                raise InvalidImageError("image_too_large")
+            probe.verify()
+
+        # verify() zostawia obiekt w stanie nienadającym się do użycia.
+        image = Image.open(io.BytesIO(content))
+        image.load()
+    except InvalidImageError:
+        raise
+    except (UnidentifiedImageError, OSError, SyntaxError, ValueError, Image.DecompressionBombError) as exc:
+        raise InvalidImageError("invalid_image") from exc
+
+    return ImageOps.exif_transpose(image)
+
+
+def _normalize_mode(image: Image.Image) -> Image.Image:
+    if image.mode in ("RGB", "RGBA"):
+        return image
+    if image.mode in ("LA", "PA") or (image.mode == "P" and "transparency" in image.info):
+        return image.convert("RGBA")
+    return image.convert("RGB")
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    if image.mode != "RGBA":
+        return image
+    background = Image.new("RGB", image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel("A"))
+    return background
+
+
+def _encode(image: Image.Image, ext: str) -> bytes:
+    pil_format, _ = _FORMATS[ext]
+    buffer = io.BytesIO()
+
+    if ext == "jpg":
+        _flatten(image).save(buffer, pil_format, quality=JPEG_QUALITY, optimize=True, progressive=True)
+    else:
+        image.save(buffer, pil_format, quality=WEBP_QUALITY, method=4)
+
+    return buffer.getvalue()
+
+
+def process_image(content: bytes, *, sizes: tuple[int, ...] = IMAGE_VARIANT_SIZES) -> ProcessedImage:
+    """Waliduje obraz i zwraca warianty WebP/JPEG bez metadanych."""
+
+    image = _normalize_mode(_decode(content))
+    width, height = image.size
+
+    variants: list[ImageVariant] = []
+    for size in sizes:
+        resized = image.copy()
+        # thumbnail() zachowuje proporcje i nigdy nie powiększa obrazu.
+        resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+
+        for ext, (_, content_type) in _FORMATS.items():
+            variants.append(
+                ImageVariant(
+                    size=size,
+                    ext=ext,
+                    content_type=content_type,
+                    content=_encode(resized, ext),
+                )
+            )
+
+    return ProcessedImage(
+        image_id=hashlib.sha256(content).hexdigest()[:32],
+        width=width,
+        height=height,
+        variants=variants,
+    )
+
+
+def image_variant_urls(url: str | None) -> dict[str, dict[str, str]] | None:
+    """Mapuje URL dowolnego wariantu na {"64": {"webp": ..., "jpg": ...}, ...}.
+
+    Dla starszych uploadów (pojedynczy plik bez wariantów) zwraca None —
+    klient używa wtedy oryginalnego URL.
+    """
+
+    if not url:
+        return None
+
+    match = _VARIANT_URL_RE.match(url)
+    if not match:
+        return None
+
+    base = f"{match['prefix']}{match['image_id']}"
+    return {
+        str(size): {ext: f"{base}/{size}.{ext}" for ext in _FORMATS}
+        for size in IMAGE_VARIANT_SIZES
+    }
@@ -0,0 +1,120 @@
+"""Leniwie inicjalizowane klienty zewnętrznych SDK.
+
+boto3, firebase_admin, openai i qrcode razem wydłużały import
+backend.main o ~0,6 s (python -X importtime), a większość procesów
+(np. healthcheck po deployu) nigdy ich nie używa. Każde SDK jest teraz
+importowane i konfigurowane dopiero przy pierwszym wywołaniu akcesora.
+
+LazyClient inicjalizuje się dokładnie raz, także przy równoległych
+wywołaniach z wielu wątków. Wynik fabryki (również None, gdy integracja
+nie jest skonfigurowana) jest zapamiętywany; wyjątek z fabryki nie jest —
+kolejne wywołanie spróbuje ponownie.
+"""
+
+from __future__ import annotations
+
+import base64
+import io
+import json
+import os
+import threading
+from typing import Any, Callable, Generic, TypeVar
+
+from backend.logger import get_logger
+
+
+log = get_logger(__name__)
+
+T = TypeVar("T")
+
+_UNSET: Any = object()
+
+
+class LazyClient(Generic[T]):
+    def __init__(self, name: str, factory: Callable[[], T]) -> None:
+        self.name = name
+        self._factory = factory
+        self._value: Any = _UNSET
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._value is not _UNSET
+
+    def get(self) -> T:
+        value = self._value
+        if value is _UNSET:
+            with self._lock:
+                value = self._value
+                if value is _UNSET:
+                    value = self._factory()
+                    self._value = value
+        return value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._value = _UNSET
+
+
+# --- OpenAI ------------------------------------------------------------------
+
+
+def openai_configured() -> bool:
+    """Czy OPENAI_API_KEY jest ustawiony — bez importu SDK (bezpieczne na pętli zdarzeń)."""
+
+    return bool(os.getenv("OPENAI_API_KEY", "").strip())
+
+
+def _create_openai_client():
+    api_key = os.getenv("OPENAI_API_KEY", "").strip()
+    if not api_key:
+        return None
+
+    from openai import OpenAI
+
+    return OpenAI(api_key=api_key)
+
+
+openai_client = LazyClient("openai", _create_openai_client)
+
+
+# --- Firebase Admin ----------------------------------------------------------
+
+
+def _init_firebase_app():
+    service_account_b64 = os.getenv("FIREBASE_SERVICE_ACCOUNT_JSON_BASE64", "").strip()
+    if not service_account_b64:
+        log.info("Firebase Admin disabled (missing FIREBASE_SERVICE_ACCOUNT_JSON_BASE64)")
+        return None
+
+    import firebase_admin
+    from firebase_admin import credentials
+
+    if firebase_admin._apps:
+        return firebase_admin.get_app()
+
+    try:
+        service_account_json = base64.b64decode(service_account_b64).decode("utf-8")
+        service_account_info = json.loads(service_account_json)
+        cred = credentials.Certificate(service_account_info)
+        app = firebase_admin.initialize_app(cred)
+        log.info("Firebase Admin initialized")
+        return app
+    except Exception:
+        log.exception("Firebase Admin initialization failed")
+        return None
+
+
+firebase_app = LazyClient("firebase", _init_firebase_app)
+
+
+# --- Kody QR -----------------------------------------------------------------
+
+
+def qr_png(data: str) -> bytes:
+    import qrcode
+
+    img = qrcode.make(data)
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
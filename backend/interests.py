@@ -0,0 +1,61 @@
+"""Normalizacja tagów zainteresowań (profil, grupy, wydarzenia).
+
+Tag jest zapisywany w postaci kanonicznej: bez "#", małymi literami, z
+aliasami sprowadzonymi do jednej nazwy ("koncert" -> "koncerty"). Dzięki
+temu dopasowanie zainteresowań użytkownika do grup i wydarzeń może być
+zwykłym porównaniem w SQL (i korzystać z indeksu na interest_tag).
+"""
+
+from __future__ import annotations
+
+
+INTEREST_CANONICAL_ALIASES = {
+    "foto": "fotografia",
+    "photo": "fotografia",
+    "photography": "fotografia",
+    "film": "kino",
+    "movie": "kino",
+    "movies": "kino",
+    "tech": "technologia",
+    "technology": "technologia",
+    "startup": "biznes",
+    "startups": "biznes",
+    "business": "biznes",
+    "walks": "spacer",
+    "walking": "spacer",
+    "spacery": "spacer",
+    "spacerowanie": "spacer",
+    "concert": "koncerty",
+    "concerts": "koncerty",
+    "koncert": "koncerty",
+    "board games": "planszówki",
+    "boardgaming": "planszówki",
+    "planszówka": "planszówki",
+    "gry planszowe": "planszówki",
+    "book": "książki",
+    "books": "książki",
+    "książka": "książki",
+    "travel": "podróże",
+    "travels": "podróże",
+    "podróż": "podróże",
+    "dog": "psy",
+    "dogs": "psy",
+    "pies": "psy",
+    "cat": "koty",
+    "cats": "koty",
+    "kot": "koty",
+    "bicycle": "rower",
+    "bike": "rower",
+    "cycling": "rower",
+    "rowery": "rower",
+    "jazda na rowerze": "rower",
+}
+
+
+def normalize_interest_tag(value: str | None) -> str:
+    if not value:
+        return ""
+    tag = str(value).strip().lstrip("#").strip().lower()
+    if not tag:
+        return ""
+    return INTEREST_CANONICAL_ALIASES.get(tag, tag)
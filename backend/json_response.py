@@ -0,0 +1,91 @@
+"""Szybka serializacja odpowiedzi JSON.
+
+FastJSONResponse to domyślna klasa odpowiedzi aplikacji: serializuje przez
+orjson (natywnie datetime/date/UUID/enum, bez pośrednich kopii), a bez
+pakietu orjson przez stdlib json z tym samym formatem dat (isoformat).
+Wartości, których serializator nie zna (modele pydantic, Decimal, set),
+przechodzą przez jsonable_encoder pojedynczo.
+
+PlainJSONRoute to klasa tras, która pomija przebieg jsonable_encoder, jaki
+FastAPI robi dla każdego zwróconego dicta: endpoint bez response_model
+zwracający zwykły dict/list (np. ok(...)) dostaje od razu FastJSONResponse.
+Inne wartości (modele, Response) idą zwykłą ścieżką FastAPI.
+"""
+
+from __future__ import annotations
+
+import inspect
+import json
+from datetime import date, datetime
+from functools import wraps
+from typing import Any, Callable
+
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - zależy od środowiska
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return jsonable_encoder(value)
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _plain_json_endpoint(endpoint: Callable, status_code: int | None) -> Callable:
+    def respond(result, kwargs):
+        if type(result) not in (dict, list):
+            return result
+        response = FastJSONResponse(result, status_code=status_code or 200)
+        # Nagłówki/status ustawione na wstrzykniętym `response: Response`
+        # (FastAPI scala je tylko dla wartości, które sam serializuje).
+        for value in kwargs.values():
+            if isinstance(value, Response):
+                if value.status_code:
+                    response.status_code = value.status_code
+                response.headers.raw.extend(value.headers.raw)
+        return response
+
+    if inspect.iscoroutinefunction(endpoint):
+        @wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            return respond(await endpoint(*args, **kwargs), kwargs)
+
+        return async_wrapper
+
+    @wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        return respond(endpoint(*args, **kwargs), kwargs)
+
+    return wrapper
+
+
+class PlainJSONRoute(APIRoute):
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        response_model = kwargs.get("response_model")
+        untyped = inspect.signature(endpoint).return_annotation is inspect.Signature.empty
+        if untyped and (response_model is None or isinstance(response_model, DefaultPlaceholder)):
+            endpoint = _plain_json_endpoint(endpoint, kwargs.get("status_code"))
+        super().__init__(path, endpoint, **kwargs)
@@ -1,12 +1,59 @@
 # backend/logger.py
+"""
+Logging pipeline for the backend.
+
+- Request threads only enqueue records (QueueHandler on the root logger);
+  a single QueueListener thread formats them and writes to stdout, so a slow
+  stdout/pipe never blocks a request. When the queue is full, records are
+  dropped and counted instead of waiting.
+- Every record carries the id of the request it was emitted in
+  (X-Request-ID, set by MetricsMiddleware via bind_request_id()).
+- LOG_FORMAT=json writes one JSON object per line (fields passed with
+  extra={...} become top-level keys); LOG_FORMAT=text keeps the classic
+  "time | level | logger | request_id | message" line.
+- High-volume loggers can be sampled (LOG_SAMPLE_RATES, below WARNING only)
+  and rate limited (LOG_RATE_LIMITS, records per second).
+- Sensitive values (password=..., "token": "...") are masked with
+  precompiled patterns, once, in the formatter (listener thread).
+"""
 from __future__ import annotations
 
+import atexit
+import json
 import logging
 import os
+import queue
+import random
+import re
 import sys
-from typing import Optional
+import threading
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Optional, TextIO
 
 _CONFIGURED = False
+_LISTENER: Optional[QueueListener] = None
+
+# --- Request context ----------------------------------------------------------
+
+_request_id: ContextVar[Optional[str]] = ContextVar("log_request_id", default=None)
+
+
+def bind_request_id(request_id: Optional[str]) -> Token:
+    """Attach a request id to every record logged in the current context."""
+    return _request_id.set(request_id)
+
+
+def reset_request_id(token: Token) -> None:
+    _request_id.reset(token)
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
 
 # --- Safety: mask sensitive data in logs (best-effort) ------------------------
 
@@ -20,110 +67,246 @@ _SENSITIVE_KEYS = (
     "apikey",
 )
 
+MASK = "********"
+
+# key=value, key: value, "key": "value" (also access_token=..., Authorization: Bearer ...)
+_SENSITIVE_VALUE_RE = re.compile(
+    r"""(?P<key>(?:%s)["']?\s*[:=]\s*)
+        (?:(?P<quote>["'])[^"'\r\n]*(?P=quote)|(?:bearer\s+)?[^\s,;}\r\n]+)"""
+    % "|".join(_SENSITIVE_KEYS),
+    re.IGNORECASE | re.VERBOSE,
+)
+# Field names like "token", "refresh_token", "client_secret" (but not "token_id").
+_SENSITIVE_FIELD_RE = re.compile(r"(?:^|_)(?:%s)$" % "|".join(_SENSITIVE_KEYS), re.IGNORECASE)
+
+
+def _mask_match(match: re.Match) -> str:
+    quote = match.group("quote")
+    if quote:
+        return f"{match.group('key')}{quote}{MASK}{quote}"
+    return f"{match.group('key')}{MASK}"
+
 
-class SensitiveDataFilter(logging.Filter):
+def mask_sensitive(text: str) -> str:
     """
-    Best-effort masking of sensitive values in log messages.
+    Best-effort masking of sensitive values in a log line.
 
     Works for typical patterns like:
-      - "password=abc", "token: xyz"
+      - "password=abc", "token: xyz", "Authorization: Bearer xyz"
       - {"password": "abc"} (as a string in the message)
 
     Note: this is not a perfect DLP system, but it prevents most accidental leaks.
     """
+    return _SENSITIVE_VALUE_RE.sub(_mask_match, text)
+
+
+def _mask_field(key: str, value):
+    if _SENSITIVE_FIELD_RE.search(key):
+        return MASK
+    if isinstance(value, str):
+        return mask_sensitive(value)
+    return value
+
+
+# --- Formatters (run on the listener thread) ----------------------------------
+
+# Attributes every LogRecord has; anything else came from extra={...}.
+_RECORD_ATTRS = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__
+) | {"message", "asctime", "request_id", "taskName"}
+
+
+def _record_extras(record: logging.LogRecord) -> dict:
+    return {
+        key: value
+        for key, value in record.__dict__.items()
+        if key not in _RECORD_ATTRS and not key.startswith("_")
+    }
+
+
+class TextFormatter(logging.Formatter):
+    """time | level | logger | request_id | message | key=value ... (masked)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        if not hasattr(record, "request_id"):
+            record.request_id = "-"
+        line = super().format(record)
+        extras = _record_extras(record)
+        if extras:
+            fields = " ".join(f"{key}={value}" for key, value in extras.items())
+            head, sep, tail = line.partition("\n")
+            line = f"{head} | {fields}{sep}{tail}"
+        return mask_sensitive(line)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; message, traceback and extras are masked."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": mask_sensitive(record.getMessage()),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id and request_id != "-":
+            entry["request_id"] = request_id
+
+        for key, value in _record_extras(record).items():
+            entry.setdefault(key, _mask_field(key, value))
+
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = mask_sensitive(record.exc_text)
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+# --- Filters (run on the emitting thread, before enqueueing) ------------------
+
+
+class RequestContextFilter(logging.Filter):
+    """Copies the request id from the emitting context onto the record."""
 
     def filter(self, record: logging.LogRecord) -> bool:
-        try:
-            msg = record.getMessage()
-            lowered = msg.lower()
-            if any(k in lowered for k in _SENSITIVE_KEYS):
-                record.msg = _mask_message(msg)
-                record.args = ()
-        except Exception:
-            # Never break logging because of masking issues
-            pass
+        if not hasattr(record, "request_id"):
+            record.request_id = _request_id.get() or "-"
         return True
 
 
-def _mask_message(msg: str) -> str:
-    # Simple, safe masking for common "key=value" and "key: value" patterns.
-    # We avoid regex to keep it lightweight and dependency-free.
-    out = msg
-    for key in _SENSITIVE_KEYS:
-        out = _mask_key_value(out, key)
-    return out
+def _lookup_by_logger(table: dict[str, float], name: str) -> Optional[float]:
+    # "backend.push" also covers "backend.push.fcm".
+    while name:
+        if name in table:
+            return table[name]
+        name = name.rpartition(".")[0]
+    return None
 
 
-def _mask_key_value(text: str, key: str) -> str:
-    # Mask occurrences of key in various casings.
-    variants = {key, key.upper(), key.capitalize()}
+class _TokenBucket:
+    __slots__ = ("rate", "tokens", "updated", "suppressed")
 
-    for k in variants:
-        # key=value or key: value
-        text = _mask_after_separator(text, k, "=")
-        text = _mask_after_separator(text, k, ":")
+    def __init__(self, rate: float, now: float) -> None:
+        self.rate = rate
+        self.tokens = rate
+        self.updated = now
+        self.suppressed = 0
 
-        # JSON-like: "key":"value" or "key": "value"
-        text = _mask_after_separator(text, f'"{k}"', ":")
-
-    return text
+    def take(self, now: float) -> bool:
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        self.suppressed += 1
+        return False
 
 
+class RateLimitFilter(logging.Filter):
+    """
+    Per-logger sampling and rate limiting for high-volume events.
 
-def _mask_after_separator(text: str, key: str, sep: str) -> str:
-    needle = f"{key}{sep}"
-    start = 0
+    - sample_rates: fraction of records below WARNING that are kept,
+    - rate_limits: max records per second (burst of the same size); the next
+      record let through reports how many were suppressed in between.
+    """
 
-    while True:
-        idx = text.find(needle, start)
-        if idx == -1:
-            break
+    def __init__(
+        self,
+        sample_rates: Optional[dict[str, float]] = None,
+        rate_limits: Optional[dict[str, float]] = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        super().__init__()
+        self.sample_rates = dict(sample_rates or {})
+        self.rate_limits = dict(rate_limits or {})
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._buckets: dict[str, _TokenBucket] = {}
+        self._lock = threading.Lock()
 
-        val_start = idx + len(needle)
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING and self.sample_rates:
+            rate = _lookup_by_logger(self.sample_rates, record.name)
+            if rate is not None and self._rng.random() >= rate:
+                return False
+
+        if not self.rate_limits:
+            return True
+        limit = _lookup_by_logger(self.rate_limits, record.name)
+        if limit is None:
+            return True
+
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(record.name)
+            if bucket is None:
+                bucket = self._buckets[record.name] = _TokenBucket(limit, now)
+            if not bucket.take(now):
+                return False
+            suppressed, bucket.suppressed = bucket.suppressed, 0
+
+        if suppressed:
+            record.suppressed = suppressed
+        return True
 
-        # Skip spaces after separator
-        while val_start < len(text) and text[val_start] == " ":
-            val_start += 1
 
-        if val_start >= len(text):
-            break
+# --- Non-blocking handler -----------------------------------------------------
 
-        # If value starts with a quote, mask until the closing quote.
-        if text[val_start] in ('"', "'"):
-            quote = text[val_start]
-            # find closing quote
-            val_end = val_start + 1
-            while val_end < len(text) and text[val_end] != quote:
-                val_end += 1
 
-            # If we found a closing quote, mask inside quotes
-            if val_end < len(text) and text[val_end] == quote:
-                inner_start = val_start + 1
-                inner_end = val_end
-                text = text[:inner_start] + "********" + text[inner_end:]
-                start = inner_start + len("********") + 1  # move past masked + closing quote
-                continue
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Enqueues records without ever blocking the caller.
 
-        # Fallback: mask until a common delimiter or whitespace/newline
-        val_end = val_start
-        while val_end < len(text) and text[val_end] not in (" ", ",", ";", "\n", "\r", "}"):
-            val_end += 1
+    The message is rendered here (cheap %-formatting, so later mutation of the
+    arguments does not matter); masking, JSON and tracebacks are left to the
+    formatter on the listener thread.
+    """
 
-        if val_end > val_start:
-            text = text[:val_start] + "********" + text[val_end:]
-            start = val_start + len("********")
-        else:
-            start = val_start
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
 
-    return text
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
 
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
 
 
 # --- Base logger config -------------------------------------------------------
 
 DEFAULT_LEVEL = "INFO"
-DEFAULT_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+DEFAULT_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(request_id)s | %(message)s"
 DEFAULT_DATEFMT = "%Y-%m-%d %H:%M:%S"
+DEFAULT_LOG_QUEUE_SIZE = 10_000
+DEFAULT_LOG_SAMPLE_RATES = {
+    "backend.push": 0.1,
+}
+DEFAULT_LOG_RATE_LIMITS = {
+    "backend.push": 20.0,
+}
+
+
+@dataclass(frozen=True)
+class LoggingConfig:
+    level: int = logging.INFO
+    json_format: bool = False
+    queue_size: int = DEFAULT_LOG_QUEUE_SIZE
+    sample_rates: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_LOG_SAMPLE_RATES))
+    rate_limits: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_LOG_RATE_LIMITS))
 
 
 def _resolve_level(level: Optional[str]) -> int:
@@ -135,6 +318,67 @@ def _resolve_level(level: Optional[str]) -> int:
     return getattr(logging, raw, logging.INFO)
 
 
+def _parse_logger_values(raw: str, env_name: str) -> dict[str, float]:
+    """Parses "backend.push=0.1,backend.main=5" into logger name -> value."""
+    values: dict[str, float] = {}
+    for chunk in raw.split(","):
+        if not chunk.strip():
+            continue
+        name, sep, value = chunk.partition("=")
+        if not sep:
+            raise ValueError(f"{env_name} must look like logger.name=value")
+        number = float(value.strip())
+        if number < 0:
+            raise ValueError(f"{env_name} values must not be negative")
+        values[name.strip()] = number
+    return values
+
+
+def load_logging_config(level: Optional[str] = None) -> LoggingConfig:
+    """Reads LOG_LEVEL, LOG_FORMAT, LOG_QUEUE_SIZE, LOG_SAMPLE_RATES and LOG_RATE_LIMITS."""
+    default_format = "text" if os.getenv("ENV", "local").strip().lower() == "local" else "json"
+    log_format = os.getenv("LOG_FORMAT", default_format).strip().lower()
+    if log_format not in {"json", "text"}:
+        raise ValueError("LOG_FORMAT must be json or text")
+
+    queue_size = int(os.getenv("LOG_QUEUE_SIZE", str(DEFAULT_LOG_QUEUE_SIZE)))
+    if queue_size < 1:
+        raise ValueError("LOG_QUEUE_SIZE must be at least 1")
+
+    sample_rates = dict(DEFAULT_LOG_SAMPLE_RATES)
+    sample_rates.update(_parse_logger_values(os.getenv("LOG_SAMPLE_RATES", ""), "LOG_SAMPLE_RATES"))
+    if any(rate > 1 for rate in sample_rates.values()):
+        raise ValueError("LOG_SAMPLE_RATES values must be within 0..1")
+
+    rate_limits = dict(DEFAULT_LOG_RATE_LIMITS)
+    rate_limits.update(_parse_logger_values(os.getenv("LOG_RATE_LIMITS", ""), "LOG_RATE_LIMITS"))
+
+    return LoggingConfig(
+        level=_resolve_level(level),
+        json_format=log_format == "json",
+        queue_size=queue_size,
+        sample_rates=sample_rates,
+        rate_limits={name: limit for name, limit in rate_limits.items() if limit > 0},
+    )
+
+
+def build_log_pipeline(
+    config: LoggingConfig,
+    stream: Optional[TextIO] = None,
+    fmt: str = DEFAULT_FORMAT,
+    datefmt: str = DEFAULT_DATEFMT,
+) -> tuple[NonBlockingQueueHandler, QueueListener]:
+    """Queue handler for loggers plus the (not yet started) listener writing to the stream."""
+    output = logging.StreamHandler(stream=stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if config.json_format else TextFormatter(fmt=fmt, datefmt=datefmt))
+
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=config.queue_size))
+    handler.addFilter(RequestContextFilter())
+    handler.addFilter(RateLimitFilter(config.sample_rates, config.rate_limits))
+
+    return handler, QueueListener(handler.queue, output)
+
+
 def configure_logging(
     level: Optional[str] = None,
     fmt: str = DEFAULT_FORMAT,
@@ -142,24 +386,25 @@ def configure_logging(
 ) -> None:
     """
     Configure root logging once (idempotent).
-    - Logs to stdout (best for Docker/cloud).
-    - Unified format (time | level | logger_name | message).
-    - Adds a safety filter that masks common sensitive fields.
+    - Logs to stdout (best for Docker/cloud) through a background listener.
+    - JSON or text format (LOG_FORMAT), with the request id on every record.
+    - Masks common sensitive fields in the formatter.
     """
-    global _CONFIGURED
+    global _CONFIGURED, _LISTENER
     if _CONFIGURED:
         return
 
+    config = load_logging_config(level)
     root = logging.getLogger()
-    root.setLevel(_resolve_level(level))
+    root.setLevel(config.level)
 
     # Avoid duplicate handlers if something else configured logging earlier.
     if not root.handlers:
-        handler = logging.StreamHandler(stream=sys.stdout)
-        handler.setLevel(root.level)
-        handler.setFormatter(logging.Formatter(fmt=fmt, datefmt=datefmt))
-        handler.addFilter(SensitiveDataFilter())
+        handler, listener = build_log_pipeline(config, fmt=fmt, datefmt=datefmt)
         root.addHandler(handler)
+        listener.start()
+        _LISTENER = listener
+        atexit.register(shutdown_logging)
 
     # Make common noisy libs quieter (optional, safe default).
     for noisy in ("uvicorn", "uvicorn.access", "gunicorn", "werkzeug"):
@@ -168,12 +413,21 @@ def configure_logging(
     _CONFIGURED = True
 
 
+def shutdown_logging() -> None:
+    """Writes out everything still queued and stops the listener thread."""
+    global _LISTENER
+    listener, _LISTENER = _LISTENER, None
+    if listener is not None:
+        listener.stop()
+
+
 def get_logger(name: Optional[str] = None) -> logging.Logger:
     """
     Returns a logger that is guaranteed to be configured.
     Usage:
         log = get_logger(__name__)
         log.info("Hello")
+        log.info("Push sent", extra={"user_id": 7})
     """
     configure_logging()
     return logging.getLogger(name if name else "app")
@@ -187,6 +441,4 @@ def log_exception(logger: logging.Logger, msg: str, **extra) -> None:
         except Exception:
             log_exception(log, "Failed to do X", user_id=user_id)
     """
-    if extra:
-        msg = f"{msg} | extra={extra}"
-    logger.exception(msg)
+    logger.exception(msg, extra=extra or None)
@@ -0,0 +1,112 @@
+"""Monitor opóźnienia pętli zdarzeń asyncio.
+
+Zadanie w tle co `interval_seconds` zasypia i mierzy, o ile później się
+obudziło. Opóźnienie ponad próg oznacza, że coś zablokowało pętlę
+(synchroniczne I/O, CPU w handlerze `async def`) — wtedy monitor loguje
+ostrzeżenie i zwiększa licznik. Aktualne wartości są dostępne przez
+snapshot() (gauge dla /healthz i metryk).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from dataclasses import dataclass
+
+from backend.logger import get_logger
+
+
+log = get_logger(__name__)
+
+DEFAULT_EVENT_LOOP_LAG_INTERVAL_SECONDS = 0.5
+DEFAULT_EVENT_LOOP_LAG_THRESHOLD_SECONDS = 0.1
+
+
+@dataclass(frozen=True)
+class EventLoopLagConfig:
+    interval_seconds: float = DEFAULT_EVENT_LOOP_LAG_INTERVAL_SECONDS
+    threshold_seconds: float = DEFAULT_EVENT_LOOP_LAG_THRESHOLD_SECONDS
+
+
+def load_event_loop_lag_config() -> EventLoopLagConfig:
+    """Ładuje konfigurację monitora ze zmiennych środowiskowych."""
+
+    interval_seconds = float(
+        os.getenv(
+            "EVENT_LOOP_LAG_INTERVAL_SECONDS",
+            str(DEFAULT_EVENT_LOOP_LAG_INTERVAL_SECONDS),
+        )
+    )
+    threshold_seconds = float(
+        os.getenv(
+            "EVENT_LOOP_LAG_THRESHOLD_SECONDS",
+            str(DEFAULT_EVENT_LOOP_LAG_THRESHOLD_SECONDS),
+        )
+    )
+
+    if interval_seconds <= 0 or threshold_seconds <= 0:
+        raise ValueError(
+            "EVENT_LOOP_LAG_INTERVAL_SECONDS i EVENT_LOOP_LAG_THRESHOLD_SECONDS "
+            "muszą być większe od zera"
+        )
+
+    return EventLoopLagConfig(
+        interval_seconds=interval_seconds,
+        threshold_seconds=threshold_seconds,
+    )
+
+
+class EventLoopLagMonitor:
+    """Mierzy, jak długo pętla zdarzeń była zablokowana."""
+
+    def __init__(self, config: EventLoopLagConfig | None = None) -> None:
+        self.config = config or EventLoopLagConfig()
+        self.last_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+        self.stalls_total = 0
+        self._task: asyncio.Task | None = None
+
+    def observe(self, lag_seconds: float) -> None:
+        lag_seconds = max(lag_seconds, 0.0)
+        self.last_lag_seconds = lag_seconds
+        self.max_lag_seconds = max(self.max_lag_seconds, lag_seconds)
+
+        if lag_seconds > self.config.threshold_seconds:
+            self.stalls_total += 1
+            log.warning(
+                "EVENT LOOP BLOCKED: %.0f ms (threshold %.0f ms)",
+                lag_seconds * 1000,
+                self.config.threshold_seconds * 1000,
+            )
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        interval = self.config.interval_seconds
+
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            self.observe(loop.time() - started - interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def snapshot(self) -> dict:
+        return {
+            "lag_ms": round(self.last_lag_seconds * 1000, 2),
+            "max_lag_ms": round(self.max_lag_seconds * 1000, 2),
+            "stalls_total": self.stalls_total,
+            "threshold_ms": round(self.config.threshold_seconds * 1000, 2),
+        }
@@ -2,13 +2,11 @@ from slowapi.middleware import SlowAPIMiddleware
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
-from backend.request_id_middleware import RequestIdMiddleware
 # -*- coding: utf-8 -*-
 
 import os
-import asyncio
 import base64
-import io
+import threading
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -17,13 +15,12 @@ load_dotenv(Path(__file__).resolve().parent / ".env")
 # --- SENTRY (optional) ---
 # Enable by setting SENTRY_DSN in env (Render / local .env).
 # ENV can be: local | staging | prod
-import sentry_sdk
-from sentry_sdk.integrations.asgi import SentryAsgiMiddleware
-
 _SENTRY_DSN = os.getenv("SENTRY_DSN")
 _ENV = os.getenv("ENV", "local")
-_OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "").strip()
 if _SENTRY_DSN:
+    import sentry_sdk
+    from sentry_sdk.integrations.asgi import SentryAsgiMiddleware
+
     sentry_sdk.init(
         dsn=_SENTRY_DSN,
         environment=_ENV,
@@ -35,62 +32,53 @@ import json
 import math
 import hashlib
 import secrets
+from types import SimpleNamespace
 
-import pyotp
-import qrcode
-from jose import jwt
-
-import requests
-from openai import OpenAI
-
-_openai_client = OpenAI(api_key=_OPENAI_API_KEY) if _OPENAI_API_KEY else None
-
-def _reverse_geocode_city(lat: float, lng: float) -> str | None:
-    try:
-        url = "https://nominatim.openstreetmap.org/reverse"
-        params = {
-            "lat": lat,
-            "lon": lng,
-            "format": "json",
-            "zoom": 10,
-            "addressdetails": 1,
-        }
-        headers = {
-            "User-Agent": "usly-app"
-        }
-
-        r = requests.get(url, params=params, headers=headers, timeout=3)
-        if r.status_code != 200:
-            return None
-
-        data = r.json()
-        addr = data.get("address", {})
-
-        return (
-            addr.get("city")
-            or addr.get("town")
-            or addr.get("village")
-            or addr.get("municipality")
-        )
-    except Exception:
-        return None
-
+from jose import JWTError, jwt
+from sqlalchemy import func, select
 
 def ensure_event_reminder_notifications(db, current_time=None):
     now = current_time or datetime.utcnow()
     if getattr(now, "tzinfo", None) is not None:
         now = now.replace(tzinfo=None)
 
+    created = 0
     reminder_rules = [
         ("event_reminder_2d", timedelta(days=2)),
         ("event_reminder_1d", timedelta(days=1)),
     ]
+    reminder_types = [notif_type for notif_type, _ in reminder_rules]
 
+    # Przypomnienie trafia w okno [start - delta, start - delta + 24h), więc
+    # wystarczą wydarzenia startujące najpóźniej za max(delta).
     published_events = (
         db.query(Event)
         .filter(
             Event.status == "published",
             Event.start_at > now,
+            Event.start_at <= now + max(delta for _, delta in reminder_rules),
+        )
+        .all()
+    )
+    if not published_events:
+        return created
+
+    event_ids = [event.id for event in published_events]
+
+    target_user_ids_by_event: dict[int, set[int]] = {event_id: set() for event_id in event_ids}
+    for model in (EventSignup, EventSave):
+        for event_id, user_id in (
+            db.query(model.event_id, model.user_id)
+            .filter(model.event_id.in_(event_ids))
+            .all()
+        ):
+            target_user_ids_by_event[event_id].add(user_id)
+
+    existing = set(
+        db.query(UserNotification.user_id, UserNotification.event_id, UserNotification.type)
+        .filter(
+            UserNotification.event_id.in_(event_ids),
+            UserNotification.type.in_(reminder_types),
         )
         .all()
     )
@@ -100,25 +88,7 @@ def ensure_event_reminder_notifications(db, current_time=None):
         if getattr(event_start, "tzinfo", None) is not None:
             event_start = event_start.astimezone(timezone.utc).replace(tzinfo=None)
 
-        signup_user_ids = {
-            user_id
-            for (user_id,) in (
-                db.query(EventSignup.user_id)
-                .filter(EventSignup.event_id == event.id)
-                .all()
-            )
-        }
-
-        saved_user_ids = {
-            user_id
-            for (user_id,) in (
-                db.query(EventSave.user_id)
-                .filter(EventSave.event_id == event.id)
-                .all()
-            )
-        }
-
-        target_user_ids = signup_user_ids | saved_user_ids
+        target_user_ids = target_user_ids_by_event[event.id]
 
         for notif_type, delta in reminder_rules:
             if event_start is None:
@@ -131,17 +101,7 @@ def ensure_event_reminder_notifications(db, current_time=None):
                 continue
 
             for target_user_id in target_user_ids:
-                exists = (
-                    db.query(UserNotification.id)
-                    .filter(
-                        UserNotification.user_id == target_user_id,
-                        UserNotification.event_id == event.id,
-                        UserNotification.type == notif_type,
-                    )
-                    .first()
-                )
-
-                if exists:
+                if (target_user_id, event.id, notif_type) in existing:
                     continue
 
                 db.add(
@@ -152,6 +112,9 @@ def ensure_event_reminder_notifications(db, current_time=None):
                         type=notif_type,
                     )
                 )
+                existing.add((target_user_id, event.id, notif_type))
+
+                created += 1
 
                 if notif_type == "event_reminder_2d":
                     reminder_body_pl = "Twoje wydarzenie odbędzie się za 2 dni"
@@ -175,6 +138,8 @@ def ensure_event_reminder_notifications(db, current_time=None):
                     },
                 )
 
+    return created
+
 
 from dataclasses import dataclass
 from datetime import date, datetime, timezone, timedelta
@@ -183,17 +148,12 @@ from pathlib import Path
 from typing import List, Optional
 from uuid import uuid4
 
-import boto3
-import firebase_admin
-from firebase_admin import credentials, messaging
-from google.auth.transport import requests as google_auth_requests
-from google.oauth2 import id_token as google_id_token
-from botocore.exceptions import ClientError
 import os
 import aiosmtplib
 from email.message import EmailMessage
 
 from fastapi import (
+    BackgroundTasks,
     FastAPI,
     Depends,
     HTTPException,
@@ -203,18 +163,76 @@ from fastapi import (
     File,
     Query,
 )
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse, HTMLResponse
+from fastapi.responses import JSONResponse, FileResponse, HTMLResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, EmailStr, Field
 
+from backend.account_deletion import (
+    account_deletion_job_status,
+    enqueue_account_deletion,
+    load_account_deletion_config,
+    process_account_deletions,
+)
+from backend.admin_exports import ADMIN_EXPORTS, AdminExportFilters, event_lifecycle_status, iter_admin_export
 from backend.api_response import ok, fail
+from backend.compression import CompressionMiddleware, load_compression_config
+from backend.conditional import PUBLIC_REVALIDATE, compute_etag, conditional_file_response, not_modified
+from backend.event_exports import ROSTER_KINDS, iter_roster_export, roster_page, roster_total
+from backend.event_search import bounding_box, install_event_search, ranked_events_query, search_terms
+from backend.exports import EXPORT_FORMATS, GZIP_MEDIA_TYPE, attachment_headers, iter_gzip
+from backend.audit_log import archive_audit_logs, close_audit_sink, record_audit_event
+from backend.json_response import FastJSONResponse, PlainJSONRoute
+from backend.integrations import LazyClient, firebase_app, openai_client, openai_configured, qr_png
+from backend.notifications import (
+    delete_notifications,
+    install_notification_counters,
+    mark_notifications_read,
+    notifications_page,
+    unread_notifications_count,
+)
+from backend.message_archive import (
+    archive_messages,
+    archived_page,
+    group_conversation_key,
+    latest_archived_private_messages,
+    load_message_archive_config,
+    private_conversation_key,
+)
+from backend.group_recommendations import groups_by_prefix, suggested_groups
+from backend.interests import normalize_interest_tag as _normalize_interest_tag
+from backend.image_variants import IMMUTABLE_CACHE_CONTROL, InvalidImageError, image_variant_urls, process_image
+from backend.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, Gauge, MetricsMiddleware, MetricsRegistry, instrument_engine
+from backend.query_tracking import QueryTrackingMiddleware, install_query_tracking, load_query_tracking_config
+from backend.request_profiler import (
+    RequestProfilerMiddleware,
+    install_profiler,
+    load_profiler_config,
+    purge_request_profiles,
+    request_profile_summary,
+)
+from backend.scheduler import JobScheduler, PeriodicJob, load_scheduler_config, scheduled_jobs_status
+from backend.loop_monitor import EventLoopLagMonitor, load_event_loop_lag_config
+from backend.static_assets import get_static_bundle, static_response
+from backend.password_hasher import shutdown_password_hasher
+from backend.pagination import InvalidCursor, decode_cursor
+from backend.places_search import (
+    PlacesSearchError,
+    PlacesSearchNotConfiguredError,
+    get_places_search_service,
+    purge_expired_places_cache,
+)
+from backend.retention import RETENTION_RULES, load_retention_config, purge_expired_rows
+from backend.reverse_geocoder import fill_cache_from_remote, get_city_index, load_reverse_geocode_config, lookup_city
+from backend.google_auth import GoogleAuthError, google_signing_keys, verify_google_id_token
 from backend.apple_auth import (
     AppleAuthError,
+    apple_signing_keys,
     verify_apple_identity_token,
 )
 from backend.error_codes import ErrorCode
-from backend.db.database import SessionLocal
+from backend.db.database import SessionLocal, engine
 from backend.models import (
     User,
     UserProfile,
@@ -245,6 +263,8 @@ from backend.models import (
     AppleAuthNonce,
     AppleAuthCredential,
     AiUsageLog,
+    RequestProfile,
+    AccountDeletionJob,
 )
 from backend.secret_crypto import (
     decrypt_secret,
@@ -278,17 +298,72 @@ from backend.security import (
 require_role,
 create_access_token,
     verify_password,
+    verify_and_update_password,
     get_current_user,
     JWT_SECRET_KEY,
     JWT_ALGORITHM,
 )
+from backend.logger import get_logger
 
-app = FastAPI(title="USLY API")
+log = get_logger(__name__)
+# Wysyłka pushy loguje się per token — próbkowane i limitowane (LOG_SAMPLE_RATES / LOG_RATE_LIMITS).
+push_log = get_logger("backend.push")
+
+app = FastAPI(title="USLY API", default_response_class=FastJSONResponse)
+# Endpointy zwracające ok(...) są serializowane od razu, bez jsonable_encoder.
+app.router.route_class = PlainJSONRoute
 # Sentry middleware (enabled only when SENTRY_DSN is set)
 if _SENTRY_DSN:
     app.add_middleware(SentryAsgiMiddleware)
 
-app.add_middleware(RequestIdMiddleware)
+def _profiler_admin_id(authorization: str) -> int | None:
+    # X-Usly-Profile działa tylko z tokenem aktywnego admina z uprawnieniem "system".
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+    try:
+        payload = jwt.decode(token.strip(), JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+        user_id = int(payload.get("sub") or 0)
+    except (JWTError, ValueError):
+        return None
+
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        if not user or user.status != "active" or user.role != "admin":
+            return None
+        if _admin_level(user) not in ADMIN_PERMISSION_LEVELS["system"]:
+            return None
+        return user.id
+    finally:
+        db.close()
+
+
+profiler_config = load_profiler_config()
+if profiler_config.enabled:
+    install_profiler(engine)
+    # Dodany przed MetricsMiddleware, więc działa wewnątrz niego i zna request_id.
+    app.add_middleware(
+        RequestProfilerMiddleware,
+        session_factory=SessionLocal,
+        authorize=_profiler_admin_id,
+        config=profiler_config,
+    )
+
+metrics_registry = MetricsRegistry()
+instrument_engine(engine, metrics_registry)
+# Czysty ASGI: X-Request-ID + metryki per trasa (GET /metrics).
+app.add_middleware(MetricsMiddleware, registry=metrics_registry)
+
+install_query_tracking(engine)
+# Indeks /events/search aktualizowany w tej samej transakcji co wydarzenie.
+install_event_search(SessionLocal)
+# users.unread_notifications_count aktualizowany razem z powiadomieniami.
+install_notification_counters(SessionLocal)
+query_tracking_config = load_query_tracking_config()
+if query_tracking_config.enabled:
+    # Loguje kształty zapytań powtórzone >= threshold razy w jednym żądaniu (N+1).
+    app.add_middleware(QueryTrackingMiddleware, threshold=query_tracking_config.threshold)
 
 
 ADMIN_LEVEL_OWNER = "owner"
@@ -306,6 +381,7 @@ ADMIN_PERMISSION_LEVELS = {
     "account_delete": {ADMIN_LEVEL_OWNER},
     "admin_create": {ADMIN_LEVEL_OWNER},
     "admin_manage": {ADMIN_LEVEL_OWNER},
+    "system": {ADMIN_LEVEL_OWNER, ADMIN_LEVEL_OPERATIONS},
 }
 
 
@@ -356,6 +432,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Najbardziej zewnętrzny: kompresuje odpowiedź po wszystkich pozostałych warstwach.
+app.add_middleware(CompressionMiddleware, config=load_compression_config())
+
 
 
 USER_INTEREST_LIMITS = {
@@ -391,58 +470,6 @@ def _partner_event_interest_tag_limit(plan: str | None) -> int:
     return PARTNER_EVENT_INTEREST_TAG_LIMITS.get(safe_plan, PARTNER_EVENT_INTEREST_TAG_LIMITS["free"])
 
 
-INTEREST_CANONICAL_ALIASES = {
-    "foto": "fotografia",
-    "photo": "fotografia",
-    "photography": "fotografia",
-    "film": "kino",
-    "movie": "kino",
-    "movies": "kino",
-    "tech": "technologia",
-    "technology": "technologia",
-    "startup": "biznes",
-    "startups": "biznes",
-    "business": "biznes",
-    "walks": "spacer",
-    "walking": "spacer",
-    "spacery": "spacer",
-    "spacerowanie": "spacer",
-    "concert": "koncerty",
-    "concerts": "koncerty",
-    "koncert": "koncerty",
-    "board games": "planszówki",
-    "boardgaming": "planszówki",
-    "planszówka": "planszówki",
-    "gry planszowe": "planszówki",
-    "book": "książki",
-    "books": "książki",
-    "książka": "książki",
-    "travel": "podróże",
-    "travels": "podróże",
-    "podróż": "podróże",
-    "dog": "psy",
-    "dogs": "psy",
-    "pies": "psy",
-    "cat": "koty",
-    "cats": "koty",
-    "kot": "koty",
-    "bicycle": "rower",
-    "bike": "rower",
-    "cycling": "rower",
-    "rowery": "rower",
-    "jazda na rowerze": "rower",
-}
-
-
-def _normalize_interest_tag(value: str | None) -> str:
-    if not value:
-        return ""
-    tag = str(value).strip().lstrip("#").strip().lower()
-    if not tag:
-        return ""
-    return INTEREST_CANONICAL_ALIASES.get(tag, tag)
-
-
 def _normalize_event_interest_tags(raw_tags, fallback_tag: str | None = None) -> list[str]:
     source = raw_tags
     if source is None:
@@ -652,7 +679,7 @@ def _plan_expiry_notice_copy(role: str, plan: str, days_left: int, expires_at: d
     return subject, body
 
 
-async def _send_plan_expiry_notices(db, now: datetime | None = None) -> dict:
+def _send_plan_expiry_notices(db, now: datetime | None = None) -> dict:
     current_time = now or datetime.utcnow()
     compare_now = _normalize_datetime_for_compare(current_time) or datetime.utcnow()
     sent = {"user_14d": 0, "user_7d": 0, "partner_14d": 0, "partner_7d": 0}
@@ -700,7 +727,7 @@ async def _send_plan_expiry_notices(db, now: datetime | None = None) -> dict:
                 plan = str(getattr(profile, "plan", None) or "paid").strip().lower()
                 subject, body = _plan_expiry_notice_copy(role, plan, days_left, expires_at)
 
-                await send_user_email(user.email, subject, body)
+                send_user_email_sync(user.email, subject, body)
 
                 setattr(profile, sent_field, current_time)
                 profile.updated_at = current_time
@@ -725,20 +752,20 @@ def _expire_due_plans(db, now: datetime | None = None) -> dict:
         ("partner", PartnerProfile),
     ]
 
+    compare_now = _normalize_datetime_for_compare(current_time)
+
     for role, model in profile_sets:
-        profiles = (
-            db.query(model)
+        # Użytkownik w tym samym zapytaniu — bez osobnego SELECT na każdy profil.
+        rows = (
+            db.query(model, User)
             .join(User, User.id == model.user_id)
             .filter(model.plan_expires_at.isnot(None))
+            .filter(model.plan_expires_at <= compare_now)
             .filter(model.plan != "free")
             .all()
         )
 
-        for profile in profiles:
-            user = db.query(User).filter(User.id == profile.user_id).first()
-            if not user:
-                continue
-
+        for profile, user in rows:
             expired = _expire_profile_plan_if_needed(db, user, profile, current_time)
             if expired:
                 result[role] += 1
@@ -890,57 +917,136 @@ def _activate_reserved_promo_redemptions_after_paid_plan(db, user: User, now: da
 
 
 
-def _init_firebase_admin() -> bool:
-    service_account_b64 = os.getenv("FIREBASE_SERVICE_ACCOUNT_JSON_BASE64", "").strip()
-    if not service_account_b64:
-        print("FIREBASE ADMIN: disabled (missing FIREBASE_SERVICE_ACCOUNT_JSON_BASE64)")
-        return False
+# Healthcheck (for deploy / monitoring)
 
-    if firebase_admin._apps:
-        return True
+def _job_expire_plans(db) -> int:
+    return sum(_expire_due_plans(db).values())
 
-    try:
-        service_account_json = base64.b64decode(service_account_b64).decode("utf-8")
-        service_account_info = json.loads(service_account_json)
-        cred = credentials.Certificate(service_account_info)
-        firebase_admin.initialize_app(cred)
-        print("FIREBASE ADMIN: initialized")
-        return True
-    except Exception as exc:
-        print("FIREBASE ADMIN INIT ERROR:", exc)
-        return False
 
+def _job_plan_expiry_notices(db) -> int:
+    return sum(_send_plan_expiry_notices(db).values())
 
 
-# Healthcheck (for deploy / monitoring)
+def _job_event_reminders(db) -> int:
+    return ensure_event_reminder_notifications(db)
+
+
+def _job_purge_places_cache(db) -> int:
+    return purge_expired_places_cache(db)
+
+
+def _job_archive_audit_logs(db) -> int:
+    return archive_audit_logs(db)["archived_rows"]
+
+
+def _job_purge_request_profiles(db) -> int:
+    return purge_request_profiles(db, retention_days=profiler_config.retention_days)
+
+
+account_deletion_config = load_account_deletion_config()
+
+
+def _job_account_deletions(db) -> int:
+    return process_account_deletions(db, account_deletion_config)
+
+
+message_archive_config = load_message_archive_config()
+
+
+def _job_archive_messages(db) -> int:
+    return archive_messages(db, message_archive_config)["archived_rows"]
+
 
-async def _plan_expiry_notice_scheduler() -> None:
-    # Lightweight scheduler: run once after backend startup, then once hourly.
-    while True:
-        db = SessionLocal()
+retention_config = load_retention_config()
+
+
+def _job_purge_expired_rows(db) -> int:
+    return sum(purge_expired_rows(db, retention_config).values())
+
+
+# Każde zadanie wykonuje jeden worker naraz (lease w scheduled_jobs), w wątku poza pętlą zdarzeń.
+scheduler = JobScheduler(
+    SessionLocal,
+    [
+        PeriodicJob("expire_plans", 60 * 60, _job_expire_plans),
+        PeriodicJob("plan_expiry_notices", 60 * 60, _job_plan_expiry_notices),
+        PeriodicJob("event_reminders", 60 * 60, _job_event_reminders),
+        PeriodicJob("purge_places_cache", 60 * 60, _job_purge_places_cache),
+        PeriodicJob("archive_audit_logs", 60 * 60, _job_archive_audit_logs),
+        PeriodicJob("purge_request_profiles", 24 * 60 * 60, _job_purge_request_profiles),
+        PeriodicJob("account_deletions", 60, _job_account_deletions),
+        PeriodicJob("archive_messages", 60 * 60, _job_archive_messages),
+        PeriodicJob("purge_expired_rows", 60 * 60, _job_purge_expired_rows),
+    ],
+    config=load_scheduler_config(),
+)
+
+
+@app.on_event("startup")
+async def start_scheduler() -> None:
+    if scheduler.config.enabled:
+        scheduler.start()
+
+
+@app.on_event("shutdown")
+async def stop_scheduler() -> None:
+    await scheduler.stop()
+
+
+event_loop_lag_monitor = EventLoopLagMonitor(load_event_loop_lag_config())
+
+
+@app.on_event("startup")
+async def start_event_loop_lag_monitor() -> None:
+    event_loop_lag_monitor.start()
+
+
+@app.on_event("startup")
+async def warm_static_bundle() -> None:
+    # Bez manifestu z buildu kompresja brotli trwa ~2 s — niech nie trafi na pierwsze żądanie.
+    await run_in_threadpool(get_static_bundle)
+
+
+def _warm_identity_keys() -> None:
+    for provider in (apple_signing_keys, google_signing_keys):
         try:
-            expired_result = _expire_due_plans(db)
-            if any(expired_result.values()):
-                print("PLANS AUTO-DOWNGRADED:", expired_result)
+            provider.warm()
+        except Exception as e:
+            log.warning("%s signing keys warm-up failed: %s: %s", provider.name, type(e).__name__, e)
 
-            result = await _send_plan_expiry_notices(db)
-            if any(result.values()):
-                print("PLAN EXPIRY NOTICES SENT:", result)
 
-            ensure_event_reminder_notifications(db)
-            db.commit()
-        except Exception as exc:
-            print("PLAN EXPIRY NOTICE SCHEDULER ERROR:", exc)
-        finally:
-            db.close()
+@app.on_event("startup")
+async def warm_identity_keys() -> None:
+    # Pierwsze logowanie Apple/Google nie czeka na pobranie JWKS.
+    await run_in_threadpool(_warm_identity_keys)
 
-        await asyncio.sleep(60 * 60)
+
+def _warm_city_index() -> None:
+    try:
+        get_city_index()
+    except Exception as e:
+        log.warning("city index warm-up failed: %s: %s", type(e).__name__, e)
 
 
 @app.on_event("startup")
-async def start_plan_expiry_notice_scheduler() -> None:
-    _init_firebase_admin()
-    asyncio.create_task(_plan_expiry_notice_scheduler())
+async def warm_city_index() -> None:
+    # Wczytanie CSV z miastami i budowa indeksu nie trafia na pierwszy PATCH /users/me z lokalizacją.
+    await run_in_threadpool(_warm_city_index)
+
+
+@app.on_event("shutdown")
+async def stop_event_loop_lag_monitor() -> None:
+    await event_loop_lag_monitor.stop()
+
+
+@app.on_event("shutdown")
+def drain_audit_sink() -> None:
+    close_audit_sink()
+
+
+@app.on_event("shutdown")
+def stop_password_hasher() -> None:
+    shutdown_password_hasher()
 
 
 @app.post("/revenuecat/webhook")
@@ -1065,49 +1171,16 @@ def revenuecat_sync_me(
             sync_result=sync_result,
         )
 
-        print(
-            "REVENUECAT SYNC-ME RESULT:",
-            {
+        log.info(
+            "RevenueCat sync-me finished",
+            extra={
                 "app_user_id": sync_result.app_user_id,
-                "customer_id": sync_result.customer_id,
+                "revenuecat_customer_id": sync_result.customer_id,
                 "role": sync_result.role,
                 "effective_plan": sync_result.effective_plan.plan,
-                "mapped_entitlements": [
-                    {
-                        "lookup_key": item.lookup_key,
-                        "plan": item.plan,
-                        "role": item.role,
-                    }
-                    for item in sync_result.mapped_entitlements
-                ],
-                "unknown_entitlement_ids": list(
-                    sync_result.unknown_entitlement_ids
-                ),
-                "subscriptions_count": len(
-                    sync_result.subscriptions
-                ),
-                "subscriptions": [
-                    {
-                        "subscription_id": item.subscription_id,
-                        "revenuecat_product_id": (
-                            item.revenuecat_product_id
-                        ),
-                        "store": item.store,
-                        "environment": item.environment,
-                        "status": item.status,
-                        "gives_access": item.gives_access,
-                        "pending_payment": item.pending_payment,
-                        "active_entitlement_ids": list(
-                            item.active_entitlement_ids
-                        ),
-                        "current_period_ends_at": (
-                            item.current_period_ends_at.isoformat()
-                            if item.current_period_ends_at
-                            else None
-                        ),
-                    }
-                    for item in sync_result.subscriptions
-                ],
+                "entitlements": [item.lookup_key for item in sync_result.mapped_entitlements],
+                "unknown_entitlements": len(sync_result.unknown_entitlement_ids),
+                "subscriptions": len(sync_result.subscriptions),
             },
         )
 
@@ -1127,9 +1200,10 @@ def revenuecat_sync_me(
         db.rollback()
         raise
     except RevenueCatSyncError as exc:
-        print(
-            "REVENUECAT SYNC-ME SYNC ERROR:",
-            f"{type(exc).__name__}: {str(exc).strip() or 'unknown error'}",
+        log.warning(
+            "RevenueCat sync-me sync failed: %s: %s",
+            type(exc).__name__,
+            str(exc).strip() or "unknown error",
         )
         db.rollback()
         raise HTTPException(
@@ -1137,9 +1211,10 @@ def revenuecat_sync_me(
             detail="REVENUECAT_SYNC_FAILED",
         ) from exc
     except RevenueCatSyncPersistenceError as exc:
-        print(
-            "REVENUECAT SYNC-ME PERSISTENCE ERROR:",
-            f"{type(exc).__name__}: {str(exc).strip() or 'unknown error'}",
+        log.warning(
+            "RevenueCat sync-me persistence failed: %s: %s",
+            type(exc).__name__,
+            str(exc).strip() or "unknown error",
         )
         db.rollback()
         raise HTTPException(
@@ -1147,10 +1222,7 @@ def revenuecat_sync_me(
             detail="REVENUECAT_SYNC_PERSISTENCE_FAILED",
         ) from exc
     except Exception as exc:
-        print(
-            "REVENUECAT SYNC-ME INTERNAL ERROR:",
-            f"{type(exc).__name__}: {str(exc).strip() or 'unknown error'}",
-        )
+        log.exception("RevenueCat sync-me failed")
         db.rollback()
         raise HTTPException(
             status_code=500,
@@ -1165,6 +1237,141 @@ def healthz():
     return {"status": "ok"}
 
 
+def _runtime_metrics() -> list[Gauge]:
+    loop = event_loop_lag_monitor
+    places = get_places_search_service().metrics
+    return [
+        Gauge("usly_event_loop_lag_seconds", "Last measured event loop lag.", loop.last_lag_seconds),
+        Gauge("usly_event_loop_lag_max_seconds", "Highest event loop lag since start.", loop.max_lag_seconds),
+        Gauge("usly_event_loop_stalls_total", "Event loop lags above the threshold.", loop.stalls_total, "counter"),
+        Gauge("usly_places_memory_hits_total", "Places searches served from memory.", places.memory_hits, "counter"),
+        Gauge("usly_places_db_hits_total", "Places searches served from the DB cache.", places.db_hits, "counter"),
+        Gauge("usly_places_coalesced_total", "Places searches that waited for an in-flight call.", places.coalesced, "counter"),
+        Gauge("usly_places_upstream_calls_total", "Calls to Google Places.", places.upstream_calls, "counter"),
+        Gauge("usly_places_upstream_errors_total", "Failed calls to Google Places.", places.upstream_errors, "counter"),
+        Gauge("usly_places_upstream_seconds_total", "Time spent in Google Places calls.", places.upstream_seconds_total, "counter"),
+        Gauge("usly_apple_jwks_fetches_total", "Apple signing key downloads.", apple_signing_keys.fetch_count, "counter"),
+        Gauge("usly_google_jwks_fetches_total", "Google signing key downloads.", google_signing_keys.fetch_count, "counter"),
+    ]
+
+
+metrics_registry.register_collector(_runtime_metrics)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    # Scraper podaje "Authorization: Bearer <METRICS_TOKEN>"; bez tokenu endpoint jest wyłączony.
+    token = os.getenv("METRICS_TOKEN", "").strip()
+    if not token:
+        raise HTTPException(status_code=404, detail="NOT_FOUND")
+
+    supplied = request.headers.get("authorization", "")
+    if not secrets.compare_digest(supplied.encode("utf-8"), f"Bearer {token}".encode("utf-8")):
+        raise HTTPException(status_code=401, detail="UNAUTHORIZED")
+
+    return Response(content=metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/admin/scheduler/jobs")
+def admin_scheduler_jobs(current_user: User = Depends(require_role("admin"))):
+    require_admin_permission(current_user, "system")
+
+    db = SessionLocal()
+    try:
+        return ok({
+            "worker_id": scheduler.worker_id,
+            "enabled": scheduler.config.enabled,
+            "jobs": scheduled_jobs_status(db),
+        })
+    finally:
+        db.close()
+
+
+@app.get("/admin/retention")
+def admin_retention(current_user: User = Depends(require_role("admin"))):
+    require_admin_permission(current_user, "system")
+
+    db = SessionLocal()
+    try:
+        # Zawsze dry-run: ile wierszy usunęłoby teraz zadanie purge_expired_rows.
+        pending = purge_expired_rows(db, retention_config, dry_run=True)
+        return ok({
+            "dry_run": retention_config.dry_run,
+            "batch_size": retention_config.batch_size,
+            "max_batches": retention_config.max_batches,
+            "rules": [
+                {
+                    "name": rule.name,
+                    "table": rule.model.__tablename__,
+                    "days": retention_config.days.get(rule.name, rule.days),
+                    "pending_rows": pending.get(rule.name),
+                }
+                for rule in RETENTION_RULES
+            ],
+        })
+    finally:
+        db.close()
+
+
+@app.get("/admin/profiles")
+def admin_request_profiles(
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(require_role("admin")),
+):
+    require_admin_permission(current_user, "system")
+
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(RequestProfile)
+            .order_by(RequestProfile.created_at.desc(), RequestProfile.id.desc())
+            .limit(limit)
+            .all()
+        )
+        return ok({"items": [request_profile_summary(row) for row in rows]})
+    finally:
+        db.close()
+
+
+def _get_request_profile_or_404(db, request_id: str) -> RequestProfile:
+    profile = db.query(RequestProfile).filter(RequestProfile.request_id == request_id).first()
+    if not profile:
+        raise HTTPException(status_code=404, detail="PROFILE_NOT_FOUND")
+    return profile
+
+
+@app.get("/admin/profiles/{request_id}")
+def admin_request_profile(request_id: str, current_user: User = Depends(require_role("admin"))):
+    require_admin_permission(current_user, "system")
+
+    db = SessionLocal()
+    try:
+        profile = _get_request_profile_or_404(db, request_id)
+        return ok({
+            **request_profile_summary(profile),
+            "statements": json.loads(profile.statements_json),
+        })
+    finally:
+        db.close()
+
+
+@app.get("/admin/profiles/{request_id}/flamegraph")
+def admin_request_profile_flamegraph(request_id: str, current_user: User = Depends(require_role("admin"))):
+    require_admin_permission(current_user, "system")
+
+    db = SessionLocal()
+    try:
+        profile = _get_request_profile_or_404(db, request_id)
+        # Format "folded stacks": flamegraph.pl, speedscope.app, inferno-flamegraph.
+        return Response(
+            content=profile.folded,
+            media_type="text/plain; charset=utf-8",
+            headers={"Content-Disposition": f'attachment; filename="profile-{request_id}.folded"'},
+        )
+    finally:
+        db.close()
+
+
 @app.get("/admin/r2/health")
 def admin_r2_health(current_user: User = Depends(require_role("admin"))):
     require_admin_permission(current_user, "plans")
@@ -1172,6 +1379,8 @@ def admin_r2_health(current_user: User = Depends(require_role("admin"))):
     if not r2_enabled():
         return ok({"enabled": False})
 
+    from botocore.exceptions import ClientError
+
     try:
         client = r2_client()
         client.head_bucket(Bucket=R2_BUCKET_NAME)
@@ -1244,10 +1453,7 @@ def admin_mfa_setup(
         db.commit()
 
         label = user.admin_display_name or user.email
-        provisioning_uri = pyotp.TOTP(secret).provisioning_uri(
-            name=label,
-            issuer_name="USLY Admin",
-        )
+        provisioning_uri = _mfa_provisioning_uri(secret, label)
 
         qr_data_url = _create_mfa_qr_data_url(provisioning_uri)
 
@@ -1534,8 +1740,12 @@ def leave_event(
 # Static uploads
 # =========================
 UPLOADS_DIR = Path("uploads")
-UPLOADS_DIR.mkdir(exist_ok=True)
-app.mount("/uploads/static", StaticFiles(directory=str(UPLOADS_DIR)), name="uploads")
+app.mount("/uploads/static", StaticFiles(directory=str(UPLOADS_DIR), check_dir=False), name="uploads")
+
+
+@app.on_event("startup")
+def ensure_uploads_dir() -> None:
+    UPLOADS_DIR.mkdir(exist_ok=True)
 
 # =========================
 # Cloudflare R2 media storage
@@ -1566,10 +1776,12 @@ def require_r2_or_allow_local_uploads() -> bool:
     return False
 
 
-def r2_client():
+def _create_r2_client():
     if not r2_enabled():
         return None
 
+    import boto3
+
     return boto3.client(
         "s3",
         endpoint_url=f"https://{R2_ACCOUNT_ID}.r2.cloudflarestorage.com",
@@ -1579,20 +1791,60 @@ def r2_client():
     )
 
 
-def upload_media_to_r2(key: str, content: bytes, content_type: str) -> str:
-    client = r2_client()
+# Klient boto3 jest thread-safe — jeden na proces zamiast nowego przy każdym uploadzie.
+_r2_client = LazyClient("r2", _create_r2_client)
+
+
+def r2_client():
+    return _r2_client.get()
+
+
+def upload_media_to_r2(key: str, content: bytes, content_type: str, *, client=None, cache_control: str | None = None) -> str:
+    client = client or r2_client()
     if not client:
         raise RuntimeError("R2 is not configured")
 
+    extra = {"CacheControl": cache_control} if cache_control else {}
     client.put_object(
         Bucket=R2_BUCKET_NAME,
         Key=key,
         Body=content,
         ContentType=content_type,
+        **extra,
     )
     return f"{R2_PUBLIC_BASE_URL}/{key}"
 
 
+def store_image_variants(folder: str, content: bytes) -> str:
+    """Dekoduje obraz, zapisuje warianty (64/256/1024 px, WebP + JPEG) i zwraca URL głównego wariantu.
+
+    Blokujące (Pillow, boto3, dysk) — wołać przez run_in_threadpool.
+    """
+    try:
+        processed = process_image(content)
+    except InvalidImageError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    if require_r2_or_allow_local_uploads():
+        client = r2_client()
+        for variant in processed.variants:
+            upload_media_to_r2(
+                variant.key(folder, processed.image_id),
+                variant.content,
+                variant.content_type,
+                client=client,
+                cache_control=IMMUTABLE_CACHE_CONTROL,
+            )
+        return f"{R2_PUBLIC_BASE_URL}/{processed.primary_key(folder)}"
+
+    target_dir = UPLOADS_DIR / folder / processed.image_id
+    target_dir.mkdir(parents=True, exist_ok=True)
+    for variant in processed.variants:
+        with open(target_dir / f"{variant.size}.{variant.ext}", "wb") as f:
+            f.write(variant.content)
+    return f"/uploads/static/{processed.primary_key(folder)}"
+
+
 # =========================
 # Static frontend / admin
 # =========================
@@ -1602,130 +1854,112 @@ FRONTEND_LEGAL_DIR = FRONTEND_DIR / "legal"
 
 app.mount("/legal", StaticFiles(directory=str(FRONTEND_LEGAL_DIR)), name="frontend_legal")
 
-def _serve_frontend_index_file():
-    return FileResponse(
-        FRONTEND_DIR / "index.html",
-        headers={"Cache-Control": "no-store, max-age=0"},
-    )
+def _serve_frontend_page(request: Request, name: str):
+    # HTML odwołuje się do zasobów z hashem, sam jest rewalidowany przez ETag.
+    page = get_static_bundle().pages.get(name)
+    if page is None:
+        return FileResponse(FRONTEND_DIR / name, headers={"Cache-Control": "no-store, max-age=0"})
+    return static_response(request, page, immutable=False)
+
+
+def _serve_frontend_asset(request: Request, name: str):
+    # Stare adresy bez hasha (np. z HTML zapisanego w cache WebView).
+    asset = get_static_bundle().assets.get(name)
+    if asset is None:
+        return FileResponse(FRONTEND_DIR / name)
+    return static_response(request, asset, immutable=False)
+
+
+@app.get("/static/{hashed_name:path}", include_in_schema=False)
+def serve_hashed_static_asset(hashed_name: str, request: Request):
+    asset = get_static_bundle().hashed(hashed_name)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="NOT_FOUND")
+    return static_response(request, asset, immutable=True)
+
+
+def _serve_frontend_index_file(request: Request):
+    return _serve_frontend_page(request, "index.html")
 
 
 @app.get("/", include_in_schema=False)
-def serve_landing_page():
-    return FileResponse(
-        FRONTEND_DIR / "landing.html",
-        headers={"Cache-Control": "no-store, max-age=0"},
-    )
+def serve_landing_page(request: Request):
+    return _serve_frontend_page(request, "landing.html")
 
 
 @app.get("/en", include_in_schema=False)
-def serve_landing_en_page():
-    return FileResponse(
-        FRONTEND_DIR / "landing.en.html",
-        headers={"Cache-Control": "no-store, max-age=0"},
-    )
+def serve_landing_en_page(request: Request):
+    return _serve_frontend_page(request, "landing.en.html")
 
 
 @app.get("/regulamin", include_in_schema=False)
-def serve_terms_page():
-    return FileResponse(
-        FRONTEND_DIR / "regulamin.html",
-        headers={"Cache-Control": "no-store, max-age=0"},
-    )
+def serve_terms_page(request: Request):
+    return _serve_frontend_page(request, "regulamin.html")
 
 
 @app.get("/regulamin/en", include_in_schema=False)
-def serve_terms_en_page():
-    return FileResponse(
-        FRONTEND_DIR / "regulamin.en.html",
-        headers={"Cache-Control": "no-store, max-age=0"},
-    )
+def serve_terms_en_page(request: Request):
+    return _serve_frontend_page(request, "regulamin.en.html")
 
 
 @app.get("/polityka-prywatnosci", include_in_schema=False)
-def serve_privacy_page():
-    return FileResponse(
-        FRONTEND_DIR / "polityka-prywatnosci.html",
-        headers={"Cache-Control": "no-store, max-age=0"},
-    )
+def serve_privacy_page(request: Request):
+    return _serve_frontend_page(request, "polityka-prywatnosci.html")
 
 
 @app.get("/privacy-policy", include_in_schema=False)
-def serve_privacy_en_page():
-    return FileResponse(
-        FRONTEND_DIR / "privacy-policy.html",
-        headers={"Cache-Control": "no-store, max-age=0"},
-    )
+def serve_privacy_en_page(request: Request):
+    return _serve_frontend_page(request, "privacy-policy.html")
 
 
 @app.get("/bezpieczenstwo-dzieci", include_in_schema=False)
-def serve_child_safety_page():
-    return FileResponse(
-        FRONTEND_DIR / "bezpieczenstwo-dzieci.html",
-        headers={"Cache-Control": "no-store, max-age=0"},
-    )
+def serve_child_safety_page(request: Request):
+    return _serve_frontend_page(request, "bezpieczenstwo-dzieci.html")
 
 
 @app.get("/child-safety", include_in_schema=False)
-def serve_child_safety_en_page():
-    return FileResponse(
-        FRONTEND_DIR / "child-safety.html",
-        headers={"Cache-Control": "no-store, max-age=0"},
-    )
+def serve_child_safety_en_page(request: Request):
+    return _serve_frontend_page(request, "child-safety.html")
 
 
 
 @app.get("/delete-account", include_in_schema=False)
-def serve_delete_account_page():
-    return FileResponse(
-        FRONTEND_DIR / "delete-account.html",
-        headers={"Cache-Control": "no-store, max-age=0"},
-    )
+def serve_delete_account_page(request: Request):
+    return _serve_frontend_page(request, "delete-account.html")
 
 
 @app.get("/delete-account/en", include_in_schema=False)
-def serve_delete_account_en_page():
-    return FileResponse(
-        FRONTEND_DIR / "delete-account.en.html",
-        headers={"Cache-Control": "no-store, max-age=0"},
-    )
+def serve_delete_account_en_page(request: Request):
+    return _serve_frontend_page(request, "delete-account.en.html")
 
 
 @app.get("/kontakt", include_in_schema=False)
-def serve_contact_page():
-    return FileResponse(
-        FRONTEND_DIR / "kontakt.html",
-        headers={"Cache-Control": "no-store, max-age=0"},
-    )
+def serve_contact_page(request: Request):
+    return _serve_frontend_page(request, "kontakt.html")
 
 
 @app.get("/contact", include_in_schema=False)
-def serve_contact_en_page():
-    return FileResponse(
-        FRONTEND_DIR / "contact.html",
-        headers={"Cache-Control": "no-store, max-age=0"},
-    )
+def serve_contact_en_page(request: Request):
+    return _serve_frontend_page(request, "contact.html")
 
 
 @app.get("/app", include_in_schema=False)
 @app.get("/app/", include_in_schema=False)
 @app.get("/reset-password", include_in_schema=False)
 @app.get("/reset-password/", include_in_schema=False)
-def serve_frontend_app():
-    return _serve_frontend_index_file()
+def serve_frontend_app(request: Request):
+    return _serve_frontend_index_file(request)
 
 
 @app.get("/admin-reset-password", include_in_schema=False)
 @app.get("/admin-reset-password/", include_in_schema=False)
-def serve_admin_reset_password():
-    return FileResponse(
-        FRONTEND_DIR / "admin.html",
-        headers={"Cache-Control": "no-store, max-age=0"},
-    )
+def serve_admin_reset_password(request: Request):
+    return _serve_frontend_page(request, "admin.html")
 
 
 @app.get("/admin.html", include_in_schema=False)
-def serve_admin_html():
-    return FileResponse(FRONTEND_DIR / "admin.html")
+def serve_admin_html(request: Request):
+    return _serve_frontend_page(request, "admin.html")
 
 @app.get("/.well-known/assetlinks.json", include_in_schema=False)
 def serve_android_assetlinks():
@@ -1775,28 +2009,28 @@ def serve_apple_app_site_association():
 
 
 @app.get("/app.js", include_in_schema=False)
-def serve_app_js():
-    return FileResponse(FRONTEND_DIR / "app.js")
+def serve_app_js(request: Request):
+    return _serve_frontend_asset(request, "app.js")
 
 @app.get("/billing.js", include_in_schema=False)
-def serve_billing_js():
-    return FileResponse(FRONTEND_DIR / "billing.js")
+def serve_billing_js(request: Request):
+    return _serve_frontend_asset(request, "billing.js")
 
 @app.get("/api.js", include_in_schema=False)
-def serve_api_js():
-    return FileResponse(FRONTEND_DIR / "api.js")
+def serve_api_js(request: Request):
+    return _serve_frontend_asset(request, "api.js")
 
 @app.get("/style.css", include_in_schema=False)
-def serve_style_css():
-    return FileResponse(FRONTEND_DIR / "style.css")
+def serve_style_css(request: Request):
+    return _serve_frontend_asset(request, "style.css")
 
 @app.get("/admin.js", include_in_schema=False)
-def serve_admin_js():
-    return FileResponse(FRONTEND_DIR / "admin.js")
+def serve_admin_js(request: Request):
+    return _serve_frontend_asset(request, "admin.js")
 
 @app.get("/admin.css", include_in_schema=False)
-def serve_admin_css():
-    return FileResponse(FRONTEND_DIR / "admin.css")
+def serve_admin_css(request: Request):
+    return _serve_frontend_asset(request, "admin.css")
 
 @app.get("/USLY logo.png", include_in_schema=False)
 def serve_usly_logo():
@@ -1879,18 +2113,20 @@ def _get_user_agent(request: Request) -> str | None:
 
 
 def _audit(db, *, action: str, request: Request, user_id: int | None, details: str | None = None) -> None:
-    log = AuditLog(
-        user_id=user_id,
+    # Wpis trafia do bufora audytu (zapis hurtowy w tle); `db` zostaje w sygnaturze
+    # dla zgodności wywołań, ale nie jest już commitowane.
+    record_audit_event(
         action=action,
+        user_id=user_id,
         ip=_get_ip(request),
         user_agent=_get_user_agent(request),
         details=details,
     )
-    db.add(log)
-    db.commit()
 
 
 def _generate_mfa_secret() -> str:
+    import pyotp
+
     return pyotp.random_base32()
 
 
@@ -1900,9 +2136,21 @@ def _verify_mfa_code(secret: str | None, code: str | None) -> bool:
     normalized = str(code).strip().replace(" ", "")
     if not normalized.isdigit() or len(normalized) != 6:
         return False
+
+    import pyotp
+
     return pyotp.TOTP(secret).verify(normalized, valid_window=1)
 
 
+def _mfa_provisioning_uri(secret: str, label: str) -> str:
+    import pyotp
+
+    return pyotp.TOTP(secret).provisioning_uri(
+        name=label,
+        issuer_name="USLY Admin",
+    )
+
+
 def _hash_mfa_backup_code(code: str) -> str:
     return hashlib.sha256(str(code).strip().encode("utf-8")).hexdigest()
 
@@ -1914,10 +2162,7 @@ def _generate_mfa_backup_codes(count: int = 8) -> tuple[list[str], list[str]]:
 
 
 def _create_mfa_qr_data_url(provisioning_uri: str) -> str:
-    img = qrcode.make(provisioning_uri)
-    buffer = io.BytesIO()
-    img.save(buffer, format="PNG")
-    encoded = base64.b64encode(buffer.getvalue()).decode("ascii")
+    encoded = base64.b64encode(qr_png(provisioning_uri)).decode("ascii")
     return f"data:image/png;base64,{encoded}"
 
 
@@ -2095,13 +2340,13 @@ def register(request: Request, payload: RegisterRequest):
                 try:
                     asyncio.run(send_user_email(user.email, welcome_subject, welcome_body))
                     asyncio.run(send_user_email(user.email, verify_subject, verify_body))
-                except Exception as email_error:
-                    print("REGISTRATION EMAIL BACKGROUND ERROR:", email_error)
+                except Exception:
+                    log.exception("Registration emails failed")
 
             import threading
             threading.Thread(target=_send_registration_emails_background, daemon=True).start()
-        except Exception as mail_error:
-            print("WELCOME MAIL ERROR:", mail_error)
+        except Exception:
+            log.exception("Could not start registration emails", extra={"user_id": user.id})
 
         return ok(
             RegisterResponse(
@@ -2111,8 +2356,8 @@ def register(request: Request, payload: RegisterRequest):
                 status=user.status,
             ).model_dump()
         )
-    except Exception as e:
-        print("REGISTER ERROR:", e)
+    except Exception:
+        log.exception("Registration failed")
         raise
     finally:
         db.close()
@@ -2216,8 +2461,8 @@ def resend_verification_email(current_user: User = Depends(require_role("user",
                 loop.create_task(send_user_email(user.email, verify_subject, verify_body))
             except RuntimeError:
                 asyncio.run(send_user_email(user.email, verify_subject, verify_body))
-        except Exception as mail_error:
-            print("VERIFY RESEND MAIL ERROR:", mail_error)
+        except Exception:
+            log.exception("Verification email resend failed", extra={"user_id": user.id})
             raise HTTPException(status_code=500, detail="EMAIL_SEND_FAILED")
 
         return ok({"sent": True, "already_verified": False})
@@ -2286,12 +2531,21 @@ def verify_email(token: str):
         db.close()
 
 
+def _legal_document(request: Request, response: Response, document: dict):
+    cached = not_modified(request, response, compute_etag(document), cache_control=PUBLIC_REVALIDATE)
+    if cached is not None:
+        return cached
+    return ok(document)
+
+
 # =========================
 # LEGAL  TERMS v1
 # =========================
 @app.get("/legal/terms")
-def get_terms():
-    return ok(
+def get_terms(request: Request, response: Response):
+    return _legal_document(
+        request,
+        response,
         {
             "type": "terms",
             "version": "v1",
@@ -2309,8 +2563,10 @@ def get_terms():
 # LEGAL  PRIVACY v1
 # =========================
 @app.get("/legal/privacy")
-def get_privacy():
-    return ok(
+def get_privacy(request: Request, response: Response):
+    return _legal_document(
+        request,
+        response,
         {
             "type": "privacy",
             "version": "v1",
@@ -2401,10 +2657,7 @@ def _verify_apple_auth_identity(
     }
 
     if not allowed_audiences:
-        print(
-            "APPLE AUTH ERROR: "
-            "APPLE_IOS_CLIENT_ID / APPLE_WEB_CLIENT_ID not configured"
-        )
+        log.error("Apple auth: APPLE_IOS_CLIENT_ID / APPLE_WEB_CLIENT_ID not configured")
         raise HTTPException(
             status_code=503,
             detail="APPLE_AUTH_NOT_CONFIGURED",
@@ -2417,10 +2670,7 @@ def _verify_apple_auth_identity(
             expected_nonce=payload.nonce,
         )
     except AppleAuthError as exc:
-        print(
-            "APPLE AUTH TOKEN ERROR:",
-            type(exc).__name__,
-        )
+        log.warning("Apple identity token rejected: %s", type(exc).__name__)
         raise ApiException(
             status_code=401,
             code=ErrorCode.INVALID_CREDENTIALS,
@@ -2601,10 +2851,7 @@ def _exchange_apple_code_for_identity(
             redirect_uri=redirect_uri,
         )
     except AppleAuthorizationCodeError as exc:
-        print(
-            "APPLE AUTH CODE EXCHANGE ERROR:",
-            type(exc).__name__,
-        )
+        log.warning("Apple authorization code exchange failed: %s", type(exc).__name__)
         raise ApiException(
             status_code=401,
             code=ErrorCode.INVALID_CREDENTIALS,
@@ -2643,10 +2890,7 @@ def _exchange_and_store_apple_credential(
             redirect_uri=redirect_uri,
         )
     except AppleAuthorizationCodeError as exc:
-        print(
-            "APPLE AUTH CODE EXCHANGE ERROR:",
-            type(exc).__name__,
-        )
+        log.warning("Apple authorization code exchange failed: %s", type(exc).__name__)
         raise ApiException(
             status_code=401,
             code=ErrorCode.INVALID_CREDENTIALS,
@@ -2698,11 +2942,10 @@ def _revoke_stored_apple_credentials(
                 token_type_hint="refresh_token",
             )
         except AppleTokenRevocationError as exc:
-            print(
-                "APPLE TOKEN REVOCATION ERROR:",
+            log.warning(
+                "Apple token revocation failed: %s",
                 type(exc).__name__,
-                f"user_id={user_id}",
-                f"client_id={credential.client_id}",
+                extra={"user_id": user_id, "client_id": credential.client_id},
             )
             raise ApiException(
                 status_code=503,
@@ -2743,10 +2986,10 @@ def _best_effort_revoke_apple_credentials_for_admin_delete(
         # removed according to the deletion request.
         db.rollback()
 
-        print(
-            "ADMIN APPLE REVOCATION ERROR:",
+        log.warning(
+            "Admin Apple revocation failed: %s",
             type(exc).__name__,
-            f"user_id={user_id}",
+            extra={"user_id": user_id},
         )
 
         return {
@@ -3076,21 +3319,16 @@ def google_login(payload: GoogleLoginRequest, request: Request):
     google_web_client_id = os.getenv("GOOGLE_WEB_CLIENT_ID", "").strip()
 
     if not google_web_client_id:
-        print("GOOGLE AUTH ERROR: GOOGLE_WEB_CLIENT_ID is not configured")
+        log.error("Google auth: GOOGLE_WEB_CLIENT_ID is not configured")
         raise HTTPException(status_code=503, detail="GOOGLE_AUTH_NOT_CONFIGURED")
 
     try:
-        google_claims = google_id_token.verify_oauth2_token(
+        google_claims = verify_google_id_token(
             payload.id_token,
-            google_auth_requests.Request(),
-            google_web_client_id,
-        )
-    except Exception as exc:
-        print(
-            "GOOGLE AUTH TOKEN ERROR:",
-            type(exc).__name__,
-            str(exc),
+            audience=google_web_client_id,
         )
+    except GoogleAuthError as exc:
+        log.warning("Google ID token rejected: %s: %s", type(exc).__name__, exc)
         raise ApiException(
             status_code=401,
             code=ErrorCode.INVALID_CREDENTIALS,
@@ -3340,10 +3578,17 @@ def login(payload: LoginRequest, request: Request):
         if user.status != UserStatus.ACTIVE.value:
             raise ApiException(status_code=403, code=ErrorCode.ACCOUNT_INACTIVE)
 
-        if not verify_password(payload.password, user.password_hash):
+        password_ok, upgraded_hash = verify_and_update_password(payload.password, user.password_hash)
+        if not password_ok:
             _audit(db, action="LOGIN_FAIL", request=request, user_id=user.id, details=f"email={email}")
             raise ApiException(status_code=401, code=ErrorCode.INVALID_CREDENTIALS)
 
+        if upgraded_hash:
+            # zmieniła się liczba rund bcrypt — zapisujemy przeliczony hash
+            user.password_hash = upgraded_hash
+            db.add(user)
+            db.commit()
+
         if payload.expected_role and user.role != payload.expected_role:
             _audit(
                 db,
@@ -3697,93 +3942,6 @@ def reset_password(payload: ResetPasswordRequest, request: Request):
 
 # =========================
 # AUTH  DELETE ACCOUNT (SOFT DELETE)
-def cleanup_user_social_relations_for_soft_delete(db, user_id: int):
-    owned_event_ids = [
-        row[0]
-        for row in db.query(Event.id).filter(Event.partner_user_id == user_id).all()
-    ]
-
-    if owned_event_ids:
-        db.query(EventSignup).filter(
-            EventSignup.event_id.in_(owned_event_ids)
-        ).delete(synchronize_session=False)
-
-        db.query(EventSave).filter(
-            EventSave.event_id.in_(owned_event_ids)
-        ).delete(synchronize_session=False)
-
-        db.query(Event).filter(
-            Event.id.in_(owned_event_ids)
-        ).update(
-            {
-                Event.status: EventStatus.ARCHIVED.value,
-                Event.updated_at: datetime.utcnow(),
-            },
-            synchronize_session=False,
-        )
-
-    db.query(Friendship).filter(
-        (Friendship.requester_user_id == user_id)
-        | (Friendship.addressee_user_id == user_id)
-    ).delete(synchronize_session=False)
-
-    affected_group_ids = [
-        row[0]
-        for row in db.query(GroupMembership.group_id).filter(GroupMembership.user_id == user_id).all()
-    ]
-
-    db.query(GroupMembership).filter(
-        GroupMembership.user_id == user_id
-    ).delete(synchronize_session=False)
-
-    for group_id in affected_group_ids:
-        count = db.query(GroupMembership).filter(GroupMembership.group_id == group_id).count()
-        db.query(Group).filter(Group.id == group_id).update(
-            {Group.members_count: count, Group.updated_at: datetime.utcnow()},
-            synchronize_session=False,
-        )
-
-    db.query(GroupInvitation).filter(
-        (GroupInvitation.inviter_user_id == user_id)
-        | (GroupInvitation.invitee_user_id == user_id)
-    ).delete(synchronize_session=False)
-
-    db.query(EventSignup).filter(
-        EventSignup.user_id == user_id
-    ).delete(synchronize_session=False)
-
-    db.query(EventSave).filter(
-        EventSave.user_id == user_id
-    ).delete(synchronize_session=False)
-
-    db.query(UserBlock).filter(
-        (UserBlock.blocker_user_id == user_id)
-        | (UserBlock.blocked_user_id == user_id)
-    ).delete(synchronize_session=False)
-
-    db.query(Message).filter(
-        (Message.sender_user_id == user_id)
-        | (Message.recipient_user_id == user_id)
-    ).delete(synchronize_session=False)
-
-    db.query(PasswordResetToken).filter(
-        PasswordResetToken.user_id == user_id
-    ).delete(synchronize_session=False)
-
-    db.query(EmailVerificationToken).filter(
-        EmailVerificationToken.user_id == user_id
-    ).delete(synchronize_session=False)
-
-    db.query(AppleAuthCredential).filter(
-        AppleAuthCredential.user_id == user_id
-    ).delete(synchronize_session=False)
-
-    db.query(UserNotification).filter(
-        (UserNotification.user_id == user_id)
-        | (UserNotification.partner_user_id == user_id)
-    ).delete(synchronize_session=False)
-
-
 # =========================
 def _verify_delete_account_reauth(
     db,
@@ -3844,12 +4002,11 @@ def _verify_delete_account_reauth(
             )
 
         try:
-            claims = google_id_token.verify_oauth2_token(
+            claims = verify_google_id_token(
                 id_token,
-                google_auth_requests.Request(),
-                google_web_client_id,
+                audience=google_web_client_id,
             )
-        except Exception:
+        except GoogleAuthError:
             raise ApiException(
                 status_code=401,
                 code=ErrorCode.INVALID_CREDENTIALS,
@@ -3951,16 +4108,8 @@ def delete_account(
             user_id=user.id,
         )
 
-        owned_groups = (
-            db.query(Group)
-            .filter(Group.creator_id == current_user.id)
-            .all()
-        )
-
-        for g in owned_groups:
-            db.delete(g)
-
-        cleanup_user_social_relations_for_soft_delete(db, current_user.id)
+        # Powiązania (wiadomości, zapisy, grupy...) usuwa partiami zadanie w tle.
+        deletion_job = enqueue_account_deletion(db, current_user.id)
 
         original_email = user.email
         safe_email = f"deleted_{user.id}_{int(datetime.utcnow().timestamp())}@deleted.usly.local"
@@ -3993,17 +4142,17 @@ def delete_account(
                 loop.create_task(send_user_email(original_email, goodbye_subject, goodbye_body))
             except RuntimeError:
                 asyncio.run(send_user_email(original_email, goodbye_subject, goodbye_body))
-        except Exception as mail_error:
-            print("GOODBYE MAIL ERROR:", mail_error)
+        except Exception:
+            log.exception("Goodbye email failed", extra={"user_id": current_user.id})
 
         _audit(
             db,
             action="DELETE_ACCOUNT_SUCCESS",
             request=request,
             user_id=current_user.id,
-            details=f"original_email={original_email}",
+            details=f"original_email={original_email}; deletion_job_id={deletion_job.id}",
         )
-        return ok({"deleted": True})
+        return ok({"deleted": True, "deletion_job_id": deletion_job.id})
     finally:
         db.close()
 
@@ -4058,6 +4207,7 @@ def users_me(current_user: User = Depends(require_role("user"))):
                 "age_max": profile.age_max,
                 "nearby_radius_km": profile.nearby_radius_km,
                 "avatar_url": profile.avatar_url,
+                "avatar_variants": image_variant_urls(profile.avatar_url),
                 "location_lat": profile.location_lat,
                 "location_lng": profile.location_lng,
                 "plan": profile.plan,
@@ -4214,6 +4364,7 @@ def users_nearby(
                     "age_min": profile.age_min,
                     "age_max": profile.age_max,
                     "avatar_url": profile.avatar_url,
+                    "avatar_variants": image_variant_urls(profile.avatar_url),
                     "distance_km": round(dist_km, 1),
                     "location_lat": profile.location_lat,
                     "location_lng": profile.location_lng,
@@ -4248,6 +4399,8 @@ def users_nearby(
 @app.get("/users/{user_id}")
 def users_profile_by_id(
     user_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(require_role("user", "partner")),
 ):
     db = SessionLocal()
@@ -4267,6 +4420,22 @@ def users_profile_by_id(
         user, profile = profile_row
 
         viewer_profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+        viewer_location = (
+            (viewer_profile.location_lat, viewer_profile.location_lng) if viewer_profile else None
+        )
+        # Wiek zmienia się z datą, a distance_km z lokalizacją widza.
+        etag = compute_etag(
+            "user_profile",
+            user.id,
+            profile.updated_at,
+            user.dob,
+            date.today() if user.dob else None,
+            viewer_location,
+        )
+        cached = not_modified(request, response, etag)
+        if cached is not None:
+            return cached
+
         distance_km = None
         if (
             viewer_profile
@@ -4318,6 +4487,7 @@ def users_profile_by_id(
                 "age_min": profile.age_min,
                 "age_max": profile.age_max,
                 "avatar_url": profile.avatar_url,
+                "avatar_variants": image_variant_urls(profile.avatar_url),
                 "distance_km": distance_km,
             }
         )
@@ -4362,9 +4532,13 @@ def _distance_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
     return radius_km * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
 
+reverse_geocode_config = load_reverse_geocode_config()
+
+
 @app.patch("/users/me")
 def users_me_patch(
     payload: UserMePatch,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(require_role("user")),
 ):
     db = SessionLocal()
@@ -4509,9 +4683,18 @@ def users_me_patch(
             profile.location_lat = lat
             profile.location_lng = lng
 
-            city = _reverse_geocode_city(lat, lng)
+            city, needs_remote = lookup_city(db, lat, lng, config=reverse_geocode_config)
             if city:
                 profile.miasto = city
+            elif needs_remote and reverse_geocode_config.remote_fallback:
+                background_tasks.add_task(
+                    fill_cache_from_remote,
+                    SessionLocal,
+                    current_user.id,
+                    lat,
+                    lng,
+                    reverse_geocode_config,
+                )
 
         profile.updated_at = datetime.utcnow()
 
@@ -4545,6 +4728,7 @@ def users_me_patch(
                 "age_max": profile.age_max,
                 "nearby_radius_km": profile.nearby_radius_km,
                 "avatar_url": profile.avatar_url,
+                "avatar_variants": image_variant_urls(profile.avatar_url),
                 "location_lat": profile.location_lat,
                 "location_lng": profile.location_lng,
                 "plan": profile.plan,
@@ -4561,7 +4745,11 @@ def users_me_patch(
 # PROFILE  PARTNER  GET /partners/me
 # =========================
 @app.get("/partners/me")
-def partners_me(current_user: User = Depends(require_role("partner"))):
+def partners_me(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(require_role("partner")),
+):
     db = SessionLocal()
     try:
         profile = (
@@ -4581,6 +4769,10 @@ def partners_me(current_user: User = Depends(require_role("partner"))):
             db.commit()
             db.refresh(profile)
 
+        cached = not_modified(request, response, compute_etag("partner_profile", profile.user_id, profile.updated_at))
+        if cached is not None:
+            return cached
+
         return ok(
             {
                 "user_id": current_user.id,
@@ -4594,6 +4786,7 @@ def partners_me(current_user: User = Depends(require_role("partner"))):
                 "plan_expires_at": profile.plan_expires_at,
                 "bio": profile.bio,
                 "logo_url": profile.logo_url,
+                "logo_variants": image_variant_urls(profile.logo_url),
             }
         )
     finally:
@@ -4671,6 +4864,7 @@ def partners_me_patch(
                 "plan": profile.plan,
                 "bio": profile.bio,
                 "logo_url": profile.logo_url,
+                "logo_variants": image_variant_urls(profile.logo_url),
             }
         )
     finally:
@@ -4681,9 +4875,6 @@ def partners_me_patch(
 # UPLOADS (v1)  AVATAR (USER)
 # POST /uploads/avatar
 # =========================
-AVATARS_DIR = Path("uploads") / "avatars"
-AVATARS_DIR.mkdir(parents=True, exist_ok=True)
-
 ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/png", "image/webp"}
 MAX_FILE_SIZE_BYTES = 5 * 1024 * 1024  # 5MB
 
@@ -4700,36 +4891,22 @@ async def upload_avatar(
     if len(content) > MAX_FILE_SIZE_BYTES:
         raise HTTPException(status_code=422, detail="file_too_large_max_5mb")
 
-    ext_map = {
-        "image/jpeg": "jpg",
-        "image/png": "png",
-        "image/webp": "webp",
-    }
-    ext = ext_map.get(file.content_type, "bin")
+    avatar_url = await run_in_threadpool(store_image_variants, "avatars", content)
+    await run_in_threadpool(_save_user_avatar_url, current_user.id, avatar_url)
 
-    filename = f"{uuid4().hex}.{ext}"
+    return ok({"avatar_url": avatar_url, "avatar_variants": image_variant_urls(avatar_url)})
 
-    if require_r2_or_allow_local_uploads():
-        avatar_url = upload_media_to_r2(
-            key=f"avatars/{filename}",
-            content=content,
-            content_type=file.content_type,
-        )
-    else:
-        path = AVATARS_DIR / filename
-        with open(path, "wb") as f:
-            f.write(content)
-        avatar_url = f"/uploads/static/avatars/{filename}"
 
+def _save_user_avatar_url(user_id: int, avatar_url: str) -> None:
     db = SessionLocal()
     try:
         profile = (
             db.query(UserProfile)
-            .filter(UserProfile.user_id == current_user.id)
+            .filter(UserProfile.user_id == user_id)
             .first()
         )
         if not profile:
-            profile = UserProfile(user_id=current_user.id)
+            profile = UserProfile(user_id=user_id)
             db.add(profile)
             db.commit()
             db.refresh(profile)
@@ -4738,8 +4915,6 @@ async def upload_avatar(
         profile.updated_at = datetime.utcnow()
         db.add(profile)
         db.commit()
-
-        return ok({"avatar_url": avatar_url})
     finally:
         db.close()
 
@@ -4802,85 +4977,111 @@ async def generate_ai_avatar(
     payload: AiAvatarGenerateRequest,
     current_user: User = Depends(require_role("user")),
 ):
-    if not _openai_client:
+    # openai_client.get() przy pierwszym wywołaniu importuje SDK — robi to
+    # dopiero _generate_ai_avatar_png w puli wątków.
+    if not openai_configured():
         raise HTTPException(status_code=503, detail="ai_avatar_not_configured")
 
     user_prompt = (payload.prompt or "").strip()
     if len(user_prompt) < 3:
         raise HTTPException(status_code=422, detail="avatar_prompt_required")
 
+    # Zapytania do bazy, wywołanie OpenAI (10–30 s) i zapis pliku są blokujące,
+    # więc wykonują się w puli wątków, a nie na pętli zdarzeń.
+    usage = await run_in_threadpool(_check_ai_avatar_quota, current_user.id)
+    plan = usage["plan"]
+    limit = usage["limit"]
+    used = usage["used"]
+
+    final_prompt = (
+        "Create a square illustrated profile avatar for a social/event app. "
+        "Friendly, modern, polished, premium mobile app style. "
+        "Do not create a realistic portrait of a real person. "
+        "No text, no logo, no watermark. "
+        f"User style request: {user_prompt}"
+    )
+
+    content = await run_in_threadpool(_generate_ai_avatar_png, final_prompt)
+
+    avatar_url = await run_in_threadpool(store_image_variants, "avatars", content)
+    await run_in_threadpool(_record_ai_avatar_generation, current_user.id, avatar_url, plan)
+
+    return ok(
+        {
+            "avatar_url": avatar_url,
+            "avatar_variants": image_variant_urls(avatar_url),
+            "plan": plan,
+            "limit": limit,
+            "used": used + 1,
+            "remaining": max(limit - used - 1, 0),
+        }
+    )
+
+
+def _check_ai_avatar_quota(user_id: int) -> dict:
     db = SessionLocal()
     try:
         profile = (
             db.query(UserProfile)
-            .filter(UserProfile.user_id == current_user.id)
+            .filter(UserProfile.user_id == user_id)
             .first()
         )
         if not profile:
-            profile = UserProfile(user_id=current_user.id, plan="free")
+            profile = UserProfile(user_id=user_id, plan="free")
             db.add(profile)
             db.commit()
             db.refresh(profile)
 
-        usage = _get_ai_avatar_usage(db, current_user.id, profile.plan)
-        plan = usage["plan"]
-        limit = usage["limit"]
-        used = usage["used"]
+        usage = _get_ai_avatar_usage(db, user_id, profile.plan)
 
-        if used >= limit:
+        if usage["used"] >= usage["limit"]:
             raise HTTPException(
                 status_code=403,
                 detail={
                     "code": "ai_avatar_limit_reached",
                     "message": "Limit generowania awatarów AI w tym planie został wykorzystany.",
-                    "plan": plan,
-                    "limit": limit,
-                    "used": used,
+                    "plan": usage["plan"],
+                    "limit": usage["limit"],
+                    "used": usage["used"],
                 },
             )
 
-        final_prompt = (
-            "Create a square illustrated profile avatar for a social/event app. "
-            "Friendly, modern, polished, premium mobile app style. "
-            "Do not create a realistic portrait of a real person. "
-            "No text, no logo, no watermark. "
-            f"User style request: {user_prompt}"
-        )
+        return usage
+    finally:
+        db.close()
 
-        result = _openai_client.images.generate(
-            model=os.getenv("OPENAI_IMAGE_MODEL", "gpt-image-1"),
-            prompt=final_prompt,
-            size=os.getenv("OPENAI_IMAGE_SIZE", "1024x1024"),
-            quality=os.getenv("OPENAI_IMAGE_QUALITY", "low"),
-            n=1,
-        )
 
-        b64_image = result.data[0].b64_json
-        if not b64_image:
-            raise HTTPException(status_code=502, detail="ai_avatar_empty_response")
+def _generate_ai_avatar_png(prompt: str) -> bytes:
+    result = openai_client.get().images.generate(
+        model=os.getenv("OPENAI_IMAGE_MODEL", "gpt-image-1"),
+        prompt=prompt,
+        size=os.getenv("OPENAI_IMAGE_SIZE", "1024x1024"),
+        quality=os.getenv("OPENAI_IMAGE_QUALITY", "low"),
+        n=1,
+    )
 
-        content = base64.b64decode(b64_image)
-        filename = f"ai_{current_user.id}_{uuid4().hex}.png"
+    b64_image = result.data[0].b64_json
+    if not b64_image:
+        raise HTTPException(status_code=502, detail="ai_avatar_empty_response")
+
+    return base64.b64decode(b64_image)
 
-        if require_r2_or_allow_local_uploads():
-            avatar_url = upload_media_to_r2(
-                key=f"avatars/{filename}",
-                content=content,
-                content_type="image/png",
-            )
-        else:
-            path = AVATARS_DIR / filename
-            with open(path, "wb") as f:
-                f.write(content)
-            avatar_url = f"/uploads/static/avatars/{filename}"
 
+def _record_ai_avatar_generation(user_id: int, avatar_url: str, plan: str) -> None:
+    db = SessionLocal()
+    try:
+        profile = (
+            db.query(UserProfile)
+            .filter(UserProfile.user_id == user_id)
+            .first()
+        )
         profile.avatar_url = avatar_url
         profile.updated_at = datetime.utcnow()
         db.add(profile)
 
         db.add(
             AiUsageLog(
-                user_id=current_user.id,
+                user_id=user_id,
                 feature="avatar",
                 plan=plan,
                 created_at=datetime.utcnow(),
@@ -4888,16 +5089,6 @@ async def generate_ai_avatar(
         )
 
         db.commit()
-
-        return ok(
-            {
-                "avatar_url": avatar_url,
-                "plan": plan,
-                "limit": limit,
-                "used": used + 1,
-                "remaining": max(limit - used - 1, 0),
-            }
-        )
     finally:
         db.close()
 
@@ -4907,10 +5098,6 @@ async def generate_ai_avatar(
 # UPLOADS (v1)  LOGO (PARTNER)
 # POST /uploads/logo
 # =========================
-LOGOS_DIR = Path("uploads") / "logos"
-LOGOS_DIR.mkdir(parents=True, exist_ok=True)
-
-
 @app.post("/uploads/logo")
 async def upload_logo(
     file: UploadFile = File(...),
@@ -4923,36 +5110,22 @@ async def upload_logo(
     if len(content) > MAX_FILE_SIZE_BYTES:
         raise HTTPException(status_code=422, detail="file_too_large_max_5mb")
 
-    ext_map = {
-        "image/jpeg": "jpg",
-        "image/png": "png",
-        "image/webp": "webp",
-    }
-    ext = ext_map.get(file.content_type, "bin")
+    logo_url = await run_in_threadpool(store_image_variants, "logos", content)
+    await run_in_threadpool(_save_partner_logo_url, current_user.id, logo_url)
 
-    filename = f"{uuid4().hex}.{ext}"
+    return ok({"logo_url": logo_url, "logo_variants": image_variant_urls(logo_url)})
 
-    if require_r2_or_allow_local_uploads():
-        logo_url = upload_media_to_r2(
-            key=f"logos/{filename}",
-            content=content,
-            content_type=file.content_type,
-        )
-    else:
-        path = LOGOS_DIR / filename
-        with open(path, "wb") as f:
-            f.write(content)
-        logo_url = f"/uploads/static/logos/{filename}"
 
+def _save_partner_logo_url(user_id: int, logo_url: str) -> None:
     db = SessionLocal()
     try:
         profile = (
             db.query(PartnerProfile)
-            .filter(PartnerProfile.user_id == current_user.id)
+            .filter(PartnerProfile.user_id == user_id)
             .first()
         )
         if not profile:
-            profile = PartnerProfile(user_id=current_user.id)
+            profile = PartnerProfile(user_id=user_id)
             db.add(profile)
             db.commit()
             db.refresh(profile)
@@ -4961,8 +5134,6 @@ async def upload_logo(
         profile.updated_at = datetime.utcnow()
         db.add(profile)
         db.commit()
-
-        return ok({"logo_url": logo_url})
     finally:
         db.close()
 
@@ -4977,62 +5148,13 @@ def partner_search_places(
     city: Optional[str] = Query(default=None, max_length=80),
     current_user: User = Depends(require_role("partner")),
 ):
-    import json
-    import os
-    import ssl
-    import urllib.error
-    import urllib.request
-
-    api_key = os.getenv("GOOGLE_MAPS_API_KEY", "").strip()
-    if not api_key:
-        raise HTTPException(status_code=500, detail="GOOGLE_MAPS_API_KEY_NOT_CONFIGURED")
-
-    query = ", ".join([part for part in [q.strip(), (city or "").strip(), "Polska"] if part])
-
-    body = json.dumps({
-        "textQuery": query,
-        "languageCode": "pl",
-        "regionCode": "PL",
-        "maxResultCount": 5,
-    }).encode("utf-8")
-
-    req = urllib.request.Request(
-        "https://places.googleapis.com/v1/places:searchText",
-        data=body,
-        method="POST",
-        headers={
-            "Content-Type": "application/json",
-            "X-Goog-Api-Key": api_key,
-            "X-Goog-FieldMask": "places.displayName,places.formattedAddress,places.location",
-        },
-    )
-
     try:
-        with urllib.request.urlopen(req, timeout=10) as response:
-            data = json.loads(response.read().decode("utf-8"))
-    except urllib.error.URLError as exc:
-        if "CERTIFICATE_VERIFY_FAILED" not in str(exc):
-            raise HTTPException(status_code=502, detail=f"GOOGLE_PLACES_SEARCH_FAILED:{exc}")
-
-        # Lokalny fallback dla macOS/Python, gdy certyfikaty systemowe nie są podpięte w venv.
-        # Produkcyjnie na Render powinien działać standardowy SSL.
-        insecure_context = ssl._create_unverified_context()
-        with urllib.request.urlopen(req, timeout=10, context=insecure_context) as response:
-            data = json.loads(response.read().decode("utf-8"))
-    except Exception as exc:
+        items = get_places_search_service().search(q, city)
+    except PlacesSearchNotConfiguredError:
+        raise HTTPException(status_code=500, detail="GOOGLE_MAPS_API_KEY_NOT_CONFIGURED")
+    except PlacesSearchError as exc:
         raise HTTPException(status_code=502, detail=f"GOOGLE_PLACES_SEARCH_FAILED:{exc}")
 
-    items = []
-    for place in data.get("places", []) or []:
-        loc = place.get("location") or {}
-        display = place.get("displayName") or {}
-        items.append({
-            "name": display.get("text") or place.get("formattedAddress") or "Miejsce",
-            "address": place.get("formattedAddress") or "",
-            "lat": loc.get("latitude"),
-            "lng": loc.get("longitude"),
-        })
-
     return ok({"items": items})
 
 
@@ -5053,13 +5175,7 @@ def _ensure_utc(dt):
 
 
 def _admin_event_lifecycle_status(event: Event) -> str:
-    status = str(getattr(event, "status", "") or "")
-    if status in {"archived", "draft"}:
-        return status
-    end_at = _ensure_utc(getattr(event, "end_at", None))
-    if end_at and end_at < datetime.now(timezone.utc):
-        return "ended"
-    return status or "published"
+    return event_lifecycle_status(getattr(event, "status", None), getattr(event, "end_at", None))
 
 
 @app.post("/partners/events")
@@ -5139,6 +5255,7 @@ def partner_create_event(
                 created_at=event.created_at,
                 updated_at=event.updated_at,
                 event_cover_url=event.event_cover_url,
+                event_cover_variants=image_variant_urls(event.event_cover_url),
                 pricing_type=event.pricing_type,
                 price_fixed=event.price_fixed,
                 price_min=event.price_min,
@@ -5338,6 +5455,7 @@ def partner_update_event(
                 created_at=event.created_at,
                 updated_at=event.updated_at,
                 event_cover_url=event.event_cover_url,
+                event_cover_variants=image_variant_urls(event.event_cover_url),
                 pricing_type=event.pricing_type,
                 price_fixed=event.price_fixed,
                 price_min=event.price_min,
@@ -5366,6 +5484,8 @@ def partner_delete_event(
         if event.partner_user_id != current_user.id:
             raise HTTPException(status_code=403, detail="FORBIDDEN_NOT_OWNER")
 
+        # Kaskada FK z events ominęłaby liczniki nieprzeczytanych powiadomień.
+        delete_notifications(db, UserNotification.event_id == event.id)
         db.delete(event)
         db.commit()
 
@@ -5481,6 +5601,127 @@ def partner_archive_event(
 # =========================
 # EVENTS  USER: LISTA EVENTW
 # =========================
+def _blocked_partner_ids(db, user_id: int) -> set[int]:
+    rows = (
+        db.query(UserBlock.blocker_user_id, UserBlock.blocked_user_id)
+        .filter(
+            ((UserBlock.blocker_user_id == user_id) & (UserBlock.blocked_user_id != user_id)) |
+            ((UserBlock.blocked_user_id == user_id) & (UserBlock.blocker_user_id != user_id))
+        )
+        .all()
+    )
+    return {
+        blocked_user_id if blocker_user_id == user_id else blocker_user_id
+        for blocker_user_id, blocked_user_id in rows
+    }
+
+
+def _event_tags(e: Event) -> list:
+    event_tags = []
+    if getattr(e, "interest_tags_json", None):
+        try:
+            event_tags = json.loads(e.interest_tags_json) or []
+        except Exception:
+            event_tags = []
+    if not event_tags:
+        event_tags = [e.interest_tag]
+    return event_tags
+
+
+def _event_list_items(db, scored: list) -> list[dict]:
+    """Elementy listy wydarzeń; profile partnerów i liczniki zapisów jednym zapytaniem na stronę."""
+
+    event_ids = [e.id for _score, e in scored]
+    partner_ids = {e.partner_user_id for _score, e in scored}
+    partner_profiles = {}
+    signups_by_event = {}
+    if event_ids:
+        partner_profiles = {
+            profile.user_id: profile
+            for profile in db.query(PartnerProfile).filter(PartnerProfile.user_id.in_(partner_ids))
+        }
+        signups_by_event = dict(
+            db.query(EventSignup.event_id, func.count(EventSignup.id))
+            .filter(EventSignup.event_id.in_(event_ids))
+            .group_by(EventSignup.event_id)
+            .all()
+        )
+
+    items = []
+    for score, e in scored:
+        partner_profile = partner_profiles.get(e.partner_user_id)
+        signups_count = signups_by_event.get(e.id, 0)
+        spots_left = None
+        if e.capacity is not None:
+            spots_left = max(e.capacity - signups_count, 0)
+
+        items.append(
+            {
+                "id": e.id,
+                "partner_user_id": e.partner_user_id,
+                "partner_name": getattr(partner_profile, "nazwa", "") or "",
+                "partner_category": getattr(partner_profile, "kategoria", "") or "",
+                "partner_bio": getattr(partner_profile, "bio", "") or "",
+                "partner_logo_url": getattr(partner_profile, "logo_url", "") or "",
+                "partner_city": getattr(partner_profile, "miasto", "") or "",
+                "title": e.title,
+                "description": e.description,
+                "city": e.city,
+                "where": e.where,
+                "address": e.address,
+                "location_lat": e.location_lat,
+                "location_lng": e.location_lng,
+                "interest_tag": e.interest_tag,
+                "interest_tags": _event_tags(e),
+                "start_at": e.start_at,
+                "end_at": e.end_at,
+                "capacity": e.capacity,
+                "signups_count": signups_count,
+                "spots_left": spots_left,
+                "status": e.status,
+                "created_at": e.created_at,
+                "updated_at": e.updated_at,
+                "event_cover_url": e.event_cover_url,
+                "event_cover_variants": image_variant_urls(e.event_cover_url),
+                "pricing_type": e.pricing_type,
+                "price_fixed": e.price_fixed,
+                "price_min": e.price_min,
+                "price_max": e.price_max,
+                "payment_link": e.payment_link,
+                "_score": score,
+            }
+        )
+    return items
+
+
+def _visible_events_query(q, db, current_user: User, city: Optional[str], day: Optional[date]):
+    # Wspólne filtry /events i /events/search: opublikowane, niezakończone,
+    # bez partnerów zablokowanych w którąkolwiek stronę, miasto i dzień.
+    q = q.filter(Event.status == "published").filter(Event.end_at >= datetime.now(timezone.utc))
+
+    blocked_partner_ids = _blocked_partner_ids(db, current_user.id)
+    if blocked_partner_ids:
+        q = q.filter(~Event.partner_user_id.in_(blocked_partner_ids))
+
+    if city is not None and city.strip() != "":
+        q = q.filter(Event.city == city.strip())
+
+    if day is not None:
+        start_dt = datetime(day.year, day.month, day.day, 0, 0, 0)
+        end_dt = datetime(day.year, day.month, day.day, 23, 59, 59)
+        q = q.filter(Event.start_at >= start_dt)
+        q = q.filter(Event.start_at <= end_dt)
+    return q
+
+
+def _within_radius(e: Event, origin_lat: float, origin_lng: float, radius: float) -> bool:
+    return (
+        e.location_lat is not None
+        and e.location_lng is not None
+        and _distance_km(origin_lat, origin_lng, e.location_lat, e.location_lng) <= radius
+    )
+
+
 @app.get("/events")
 def list_events(
     city: Optional[str] = None,
@@ -5494,37 +5735,7 @@ def list_events(
 ):
     db = SessionLocal()
     try:
-        blocked_partner_ids_rows = (
-            db.query(UserBlock.blocker_user_id, UserBlock.blocked_user_id)
-            .filter(
-                ((UserBlock.blocker_user_id == current_user.id) & (UserBlock.blocked_user_id != current_user.id)) |
-                ((UserBlock.blocked_user_id == current_user.id) & (UserBlock.blocker_user_id != current_user.id))
-            )
-            .all()
-        )
-        blocked_partner_ids = {
-            blocked_user_id if blocker_user_id == current_user.id else blocker_user_id
-            for blocker_user_id, blocked_user_id in blocked_partner_ids_rows
-        }
-
-        now_utc = datetime.now(timezone.utc)
-        q = (
-            db.query(Event)
-            .filter(Event.status == "published")
-            .filter(Event.end_at >= now_utc)
-        )
-
-        if blocked_partner_ids:
-            q = q.filter(~Event.partner_user_id.in_(blocked_partner_ids))
-
-        if city is not None and city.strip() != "":
-            q = q.filter(Event.city == city.strip())
-
-        if date is not None:
-            start_dt = datetime(date.year, date.month, date.day, 0, 0, 0)
-            end_dt = datetime(date.year, date.month, date.day, 23, 59, 59)
-            q = q.filter(Event.start_at >= start_dt)
-            q = q.filter(Event.start_at <= end_dt)
+        q = _visible_events_query(db.query(Event), db, current_user, city, date)
 
         profile = (
             db.query(UserProfile)
@@ -5552,31 +5763,12 @@ def list_events(
         user_radius = radius_km or (profile.nearby_radius_km if profile else None) or 25
 
         if origin_lat is not None and origin_lng is not None:
-            events = [
-                e for e in events
-                if e.location_lat is not None
-                and e.location_lng is not None
-                and _distance_km(
-                    origin_lat,
-                    origin_lng,
-                    e.location_lat,
-                    e.location_lng,
-                ) <= user_radius
-            ]
+            events = [e for e in events if _within_radius(e, origin_lat, origin_lng, user_radius)]
 
         scored = []
 
         for e in events:
-            event_tags = []
-            if getattr(e, "interest_tags_json", None):
-                try:
-                    event_tags = json.loads(e.interest_tags_json) or []
-                except Exception:
-                    event_tags = []
-            if not event_tags:
-                event_tags = [e.interest_tag]
-
-            normalized_event_tags = {_normalize_interest_tag(tag) for tag in event_tags if tag and str(tag).strip()}
+            normalized_event_tags = {_normalize_interest_tag(tag) for tag in _event_tags(e) if tag and str(tag).strip()}
             score = 1 if normalized_event_tags & user_interest_set else 0
             scored.append((score, e))
 
@@ -5584,71 +5776,69 @@ def list_events(
         total = len(scored)
         paged = scored[offset:offset + limit]
 
-        items = []
-        for score, e in paged:
-            event_tags = []
-            if getattr(e, "interest_tags_json", None):
-                try:
-                    event_tags = json.loads(e.interest_tags_json) or []
-                except Exception:
-                    event_tags = []
-            if not event_tags:
-                event_tags = [e.interest_tag]
+        return ok(
+            {
+                "items": _event_list_items(db, paged),
+                "pagination": {
+                    "limit": limit,
+                    "offset": offset,
+                    "total": total,
+                },
+            }
+        )
+    finally:
+        db.close()
 
-            partner_profile = (
-                db.query(PartnerProfile)
-                .filter(PartnerProfile.user_id == e.partner_user_id)
-                .first()
-            )
 
-            signups_count = (
-                db.query(EventSignup)
-                .filter(EventSignup.event_id == e.id)
-                .count()
-            )
-            spots_left = None
-            if e.capacity is not None:
-                spots_left = max(e.capacity - signups_count, 0)
+# =========================
+# EVENTS  USER: WYSZUKIWANIE
+# =========================
+# Musi być zarejestrowane przed /events/{event_id}, inaczej "search"
+# trafiłoby do tamtej trasy jako event_id.
+@app.get("/events/search")
+def search_events(
+    q: str = Query(..., min_length=2, max_length=200),
+    city: Optional[str] = None,
+    date: Optional[date] = None,
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    lat: Optional[float] = Query(default=None, ge=-90, le=90),
+    lng: Optional[float] = Query(default=None, ge=-180, le=180),
+    radius_km: Optional[int] = Query(default=None, ge=1, le=200),
+    current_user: User = Depends(get_current_user),
+):
+    terms = search_terms(q)
+    if not terms:
+        raise HTTPException(status_code=422, detail="SEARCH_QUERY_TOO_SHORT")
 
-            items.append(
-                {
-                    "id": e.id,
-                    "partner_user_id": e.partner_user_id,
-                    "partner_name": getattr(partner_profile, "nazwa", "") or "",
-                    "partner_category": getattr(partner_profile, "kategoria", "") or "",
-                    "partner_bio": getattr(partner_profile, "bio", "") or "",
-                    "partner_logo_url": getattr(partner_profile, "logo_url", "") or "",
-                    "partner_city": getattr(partner_profile, "miasto", "") or "",
-                    "title": e.title,
-                    "description": e.description,
-                    "city": e.city,
-                    "where": e.where,
-                    "address": e.address,
-                    "location_lat": e.location_lat,
-                    "location_lng": e.location_lng,
-                    "interest_tag": e.interest_tag,
-                    "interest_tags": event_tags,
-                    "start_at": e.start_at,
-                    "end_at": e.end_at,
-                    "capacity": e.capacity,
-                    "signups_count": signups_count,
-                    "spots_left": spots_left,
-                    "status": e.status,
-                    "created_at": e.created_at,
-                    "updated_at": e.updated_at,
-                    "event_cover_url": e.event_cover_url,
-                    "pricing_type": e.pricing_type,
-                    "price_fixed": e.price_fixed,
-                    "price_min": e.price_min,
-                    "price_max": e.price_max,
-                    "payment_link": e.payment_link,
-                    "_score": score,
-                }
-            )
+    db = SessionLocal()
+    try:
+        query = _visible_events_query(ranked_events_query(db.connection(), terms), db, current_user, city, date)
+        score = query.selected_columns.score
+        query = query.order_by(score.desc(), Event.start_at, Event.id)
+
+        if lat is not None and lng is not None:
+            profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+            user_radius = radius_km or (profile.nearby_radius_km if profile else None) or 25
+            # Prostokąt wokół okręgu zawęża kandydatów w SQL; dokładny dystans liczymy w Pythonie.
+            min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, user_radius)
+            query = query.where(
+                Event.location_lat.between(min_lat, max_lat),
+                Event.location_lng.between(min_lng, max_lng),
+            )
+            scored = [
+                (rank, e) for e, rank in db.execute(query).all()
+                if _within_radius(e, lat, lng, user_radius)
+            ]
+            total = len(scored)
+            paged = scored[offset:offset + limit]
+        else:
+            total = db.execute(select(func.count()).select_from(query.order_by(None).subquery())).scalar_one()
+            paged = [(rank, e) for e, rank in db.execute(query.limit(limit).offset(offset)).all()]
 
         return ok(
             {
-                "items": items,
+                "items": _event_list_items(db, paged),
                 "pagination": {
                     "limit": limit,
                     "offset": offset,
@@ -5666,35 +5856,59 @@ def list_events(
 @app.get("/events/{event_id}")
 def get_event_details(
     event_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
 ):
     db = SessionLocal()
     try:
-        event = (
-            db.query(Event)
+        # Jedno zapytanie zbiera wszystko, od czego zależą 404 i ETag, żeby
+        # rewalidacja (304) kosztowała jeden round-trip do bazy.
+        signups_count_query = (
+            select(func.count(EventSignup.id))
+            .where(EventSignup.event_id == Event.id)
+            .scalar_subquery()
+        )
+        blocked_query = (
+            select(UserBlock.id)
+            .where(
+                ((UserBlock.blocker_user_id == current_user.id) & (UserBlock.blocked_user_id == Event.partner_user_id)) |
+                ((UserBlock.blocker_user_id == Event.partner_user_id) & (UserBlock.blocked_user_id == current_user.id))
+            )
+            .exists()
+        )
+        row = (
+            db.query(
+                Event,
+                PartnerProfile,
+                User.email,
+                signups_count_query.label("signups_count"),
+                blocked_query.label("blocked"),
+            )
+            .outerjoin(PartnerProfile, PartnerProfile.user_id == Event.partner_user_id)
+            .outerjoin(User, User.id == Event.partner_user_id)
             .filter(Event.id == event_id)
             .filter(Event.status == "published")
             .first()
         )
-        if not event:
+        if not row or row.blocked:
             raise HTTPException(status_code=404, detail="EVENT_NOT_FOUND")
 
-        block_exists = (
-            db.query(UserBlock)
-            .filter(
-                ((UserBlock.blocker_user_id == current_user.id) & (UserBlock.blocked_user_id == event.partner_user_id)) |
-                ((UserBlock.blocker_user_id == event.partner_user_id) & (UserBlock.blocked_user_id == current_user.id))
-            )
-            .first()
-        )
-        if block_exists:
-            raise HTTPException(status_code=404, detail="EVENT_NOT_FOUND")
+        event, partner_profile, organizer_email, signups_count = row.Event, row.PartnerProfile, row.email, row.signups_count
 
-        signups_count = (
-            db.query(EventSignup)
-            .filter(EventSignup.event_id == event.id)
-            .count()
+        # Blokada kończy się 404 wyżej, więc ciało zależy tylko od wierszy poniżej.
+        etag = compute_etag(
+            "event",
+            event.id,
+            event.updated_at,
+            signups_count,
+            partner_profile.updated_at if partner_profile else None,
+            organizer_email,
         )
+        cached = not_modified(request, response, etag)
+        if cached is not None:
+            return cached
+
         spots_left = None
         if event.capacity is not None:
             spots_left = max(event.capacity - signups_count, 0)
@@ -5714,7 +5928,7 @@ def get_event_details(
                 "partner_user_id": event.partner_user_id,
             "organizer_name": getattr(partner_profile, "nazwa", None) if partner_profile else None,
             "organizer_logo_url": getattr(partner_profile, "logo_url", None) if partner_profile else None,
-            "organizer_email": db.query(User).filter(User.id == event.partner_user_id).first().email if event.partner_user_id else None,
+            "organizer_email": organizer_email,
                 "title": event.title,
                 "description": event.description,
                 "city": event.city,
@@ -5729,6 +5943,7 @@ def get_event_details(
                 "created_at": event.created_at,
                 "updated_at": event.updated_at,
                 "event_cover_url": event.event_cover_url,
+                "event_cover_variants": image_variant_urls(event.event_cover_url),
                 "pricing_type": event.pricing_type,
                 "price_fixed": event.price_fixed,
                 "price_min": event.price_min,
@@ -5743,9 +5958,6 @@ def get_event_details(
 # =========================
 # UPLOADS (v1)  EVENT COVER (PARTNER)
 # =========================
-EVENT_COVERS_DIR = Path("uploads") / "event-covers"
-EVENT_COVERS_DIR.mkdir(parents=True, exist_ok=True)
-
 
 @app.post("/uploads/event-cover")
 async def upload_event_cover(
@@ -5759,28 +5971,9 @@ async def upload_event_cover(
     if len(content) > MAX_FILE_SIZE_BYTES:
         raise HTTPException(status_code=422, detail="file_too_large_max_5mb")
 
-    ext_map = {
-        "image/jpeg": "jpg",
-        "image/png": "png",
-        "image/webp": "webp",
-    }
-    ext = ext_map.get(file.content_type, "bin")
-
-    filename = f"{uuid4().hex}.{ext}"
+    event_cover_url = await run_in_threadpool(store_image_variants, "event-covers", content)
 
-    if require_r2_or_allow_local_uploads():
-        event_cover_url = upload_media_to_r2(
-            key=f"event-covers/{filename}",
-            content=content,
-            content_type=file.content_type,
-        )
-    else:
-        path = EVENT_COVERS_DIR / filename
-        with open(path, "wb") as f:
-            f.write(content)
-        event_cover_url = f"/uploads/static/event-covers/{filename}"
-
-    return ok({"event_cover_url": event_cover_url})
+    return ok({"event_cover_url": event_cover_url, "event_cover_variants": image_variant_urls(event_cover_url)})
 
 
 # =========================
@@ -5864,6 +6057,7 @@ def partner_list_events(
                     "created_at": e.created_at,
                     "updated_at": e.updated_at,
                     "event_cover_url": e.event_cover_url,
+                    "event_cover_variants": image_variant_urls(e.event_cover_url),
                     "pricing_type": e.pricing_type,
                     "price_fixed": e.price_fixed,
                     "price_min": e.price_min,
@@ -5937,6 +6131,7 @@ def partner_get_event_details(
                 "created_at": event.created_at,
                 "updated_at": event.updated_at,
                 "event_cover_url": event.event_cover_url,
+                "event_cover_variants": image_variant_urls(event.event_cover_url),
                 "pricing_type": event.pricing_type,
                 "price_fixed": event.price_fixed,
                 "price_min": event.price_min,
@@ -6030,6 +6225,7 @@ def my_saved_events(
                     "status": event.status,
                     "capacity": event.capacity,
                     "event_cover_url": event.event_cover_url,
+                    "event_cover_variants": image_variant_urls(event.event_cover_url),
                 },
             })
 
@@ -6096,6 +6292,7 @@ def my_event_signups(
                         "status": event.status,
                         "capacity": event.capacity,
                         "event_cover_url": event.event_cover_url,
+                        "event_cover_variants": image_variant_urls(event.event_cover_url),
                         "pricing_type": event.pricing_type,
                         "price_fixed": event.price_fixed,
                         "price_min": event.price_min,
@@ -6118,84 +6315,50 @@ def my_event_signups(
     finally:
         db.close()
 # =========================
-# EVENTS  PARTNER: PARTICIPANTS
-# GET /partners/events/{id}/participants?limit=10&offset=0
+# EVENTS  PARTNER: PARTICIPANTS / OBSERVERS
+# GET /partners/events/{id}/participants?limit=10&cursor=...
+# GET /partners/events/{id}/participants.csv | .ndjson (cała lista, strumieniowo)
 # =========================
-@app.get("/partners/events/{event_id}/participants")
-def partner_event_participants(
-    event_id: int,
-    limit: int = Query(10, ge=1, le=100),
-    offset: int = Query(0, ge=0),
-    current_user: User = Depends(require_role("partner")),
-):
-    db = SessionLocal()
-    try:
-        # 1) event musi istnie
-        event = db.query(Event).filter(Event.id == event_id).first()
-        if not event:
-            raise HTTPException(status_code=404, detail="EVENT_NOT_FOUND")
+def _partner_roster_event(db, event_id: int, partner: User) -> Event:
+    event = db.query(Event).filter(Event.id == event_id).first()
+    if not event:
+        raise HTTPException(status_code=404, detail="EVENT_NOT_FOUND")
 
-        # 2) tylko waciciel
-        if event.partner_user_id != current_user.id:
-            raise HTTPException(status_code=403, detail="FORBIDDEN_NOT_OWNER")
+    # tylko właściciel
+    if event.partner_user_id != partner.id:
+        raise HTTPException(status_code=403, detail="FORBIDDEN_NOT_OWNER")
 
-        partner_archive_cutoff = datetime.now(timezone.utc) - timedelta(days=30)
-        event_end_at = _ensure_utc(event.end_at)
-        if event_end_at and event_end_at < partner_archive_cutoff:
-            raise HTTPException(status_code=404, detail="EVENT_NOT_FOUND")
+    partner_archive_cutoff = datetime.now(timezone.utc) - timedelta(days=30)
+    event_end_at = _ensure_utc(event.end_at)
+    if event_end_at and event_end_at < partner_archive_cutoff:
+        raise HTTPException(status_code=404, detail="EVENT_NOT_FOUND")
 
-        blocked_rows = (
-            db.query(UserBlock.blocker_user_id, UserBlock.blocked_user_id)
-            .filter(
-                ((UserBlock.blocker_user_id == current_user.id) & (UserBlock.blocked_user_id != current_user.id)) |
-                ((UserBlock.blocked_user_id == current_user.id) & (UserBlock.blocker_user_id != current_user.id))
-            )
-            .all()
-        )
-        blocked_user_ids = {
-            blocked_user_id if blocker_user_id == current_user.id else blocker_user_id
-            for blocker_user_id, blocked_user_id in blocked_rows
-        }
+    return event
 
-        # 3) query zapisw + user
-        q = (
-            db.query(EventSignup, User)
-            .join(User, User.id == EventSignup.user_id)
-            .filter(EventSignup.event_id == event_id)
-        )
 
-        if blocked_user_ids:
-            q = q.filter(~User.id.in_(blocked_user_ids))
+def _partner_event_roster(kind_name: str, event_id: int, limit: int, offset: int, cursor: str | None, partner: User):
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except InvalidCursor:
+        raise HTTPException(status_code=422, detail="INVALID_CURSOR")
 
-        total = q.count()
+    kind = ROSTER_KINDS[kind_name]
+    db = SessionLocal()
+    try:
+        _partner_roster_event(db, event_id, partner)
 
-        rows = (
-            q.order_by(EventSignup.created_at.desc())
-            .offset(offset)
-            .limit(limit)
-            .all()
+        # Licznik tylko przy pierwszym wejściu; kolejne strony idą po kursorze.
+        total = roster_total(db, kind, event_id, partner.id) if after is None else None
+        items, next_cursor = roster_page(
+            db,
+            kind,
+            event_id,
+            partner.id,
+            limit=limit,
+            offset=offset,
+            cursor=after,
         )
 
-        items = []
-        for signup, user in rows:
-            user_profile = (
-                db.query(UserProfile)
-                .filter(UserProfile.user_id == user.id)
-                .first()
-            )
-            items.append(
-                {
-                    "user": {
-                        "id": user.id,
-                        "email": user.email,
-                        "nick": user_profile.nick if user_profile else None,
-                    },
-                    "signup": {
-                        "created_at": signup.created_at,
-                    },
-                }
-            )
-
         return ok(
             {
                 "event_id": event_id,
@@ -6204,6 +6367,7 @@ def partner_event_participants(
                     "limit": limit,
                     "offset": offset,
                     "total": total,
+                    "next_cursor": next_cursor,
                 },
             }
         )
@@ -6211,79 +6375,63 @@ def partner_event_participants(
         db.close()
 
 
-# =========================
-# EVENTS  PARTNER: OBSERVERS
-# GET /partners/events/{id}/observers?limit=10&offset=0
-# =========================
-@app.get("/partners/events/{event_id}/observers")
-def partner_event_observers(
+def _partner_event_roster_export(kind_name: str, event_id: int, export_format: str, partner: User):
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=404, detail="EXPORT_FORMAT_NOT_SUPPORTED")
+
+    db = SessionLocal()
+    try:
+        _partner_roster_event(db, event_id, partner)
+    finally:
+        db.close()
+
+    return StreamingResponse(
+        iter_roster_export(SessionLocal, ROSTER_KINDS[kind_name], event_id, partner.id, export_format),
+        media_type=EXPORT_FORMATS[export_format],
+        headers=attachment_headers(f"event-{event_id}-{kind_name}.{export_format}"),
+    )
+
+
+@app.get("/partners/events/{event_id}/participants")
+def partner_event_participants(
     event_id: int,
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     current_user: User = Depends(require_role("partner")),
 ):
-    db = SessionLocal()
-    try:
-        event = db.query(Event).filter(Event.id == event_id).first()
-        if not event:
-            raise HTTPException(status_code=404, detail="EVENT_NOT_FOUND")
+    return _partner_event_roster("participants", event_id, limit, offset, cursor, current_user)
 
-        if event.partner_user_id != current_user.id:
-            raise HTTPException(status_code=403, detail="FORBIDDEN_NOT_OWNER")
 
-        partner_archive_cutoff = datetime.now(timezone.utc) - timedelta(days=30)
-        event_end_at = _ensure_utc(event.end_at)
-        if event_end_at and event_end_at < partner_archive_cutoff:
-            raise HTTPException(status_code=404, detail="EVENT_NOT_FOUND")
+@app.get("/partners/events/{event_id}/participants.{export_format}")
+def partner_event_participants_export(
+    event_id: int,
+    export_format: str,
+    current_user: User = Depends(require_role("partner")),
+):
+    return _partner_event_roster_export("participants", event_id, export_format, current_user)
 
-        q = (
-            db.query(EventSave, User)
-            .join(User, User.id == EventSave.user_id)
-            .filter(EventSave.event_id == event_id)
-        )
 
-        total = q.count()
+@app.get("/partners/events/{event_id}/observers")
+def partner_event_observers(
+    event_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
+    current_user: User = Depends(require_role("partner")),
+):
+    return _partner_event_roster("observers", event_id, limit, offset, cursor, current_user)
 
-        rows = (
-            q.order_by(EventSave.created_at.desc())
-            .offset(offset)
-            .limit(limit)
-            .all()
-        )
 
-        items = []
-        for saved, user in rows:
-            user_profile = (
-                db.query(UserProfile)
-                .filter(UserProfile.user_id == user.id)
-                .first()
-            )
-            items.append(
-                {
-                    "user": {
-                        "id": user.id,
-                        "email": user.email,
-                        "nick": user_profile.nick if user_profile else None,
-                    },
-                    "saved": {
-                        "created_at": saved.created_at,
-                    },
-                }
-            )
+@app.get("/partners/events/{event_id}/observers.{export_format}")
+def partner_event_observers_export(
+    event_id: int,
+    export_format: str,
+    current_user: User = Depends(require_role("partner")),
+):
+    return _partner_event_roster_export("observers", event_id, export_format, current_user)
+
 
-        return ok(
-            {
-                "event_id": event_id,
-                "items": items,
-                "pagination": {
-                    "limit": limit,
-                    "offset": offset,
-                    "total": total,
-                },
-            }
-        )
-    finally:
-        db.close()
 # =========================
 # EVENTS  PARTNER: STATS
 # GET /partners/events/{id}/stats
@@ -6626,11 +6774,12 @@ def moderate_message_text_or_raise(content: str):
     if any(marker in lowered for marker in blocked_link_markers):
         raise HTTPException(status_code=422, detail="message_blocked_link")
 
-    if not _openai_client:
+    client = openai_client.get()
+    if client is None:
         return
 
     try:
-        response = _openai_client.responses.create(
+        response = client.responses.create(
             model=os.getenv("OPENAI_MODERATION_MODEL", "gpt-4.1-mini"),
             input=[
                 {
@@ -6652,8 +6801,8 @@ def moderate_message_text_or_raise(content: str):
             raise HTTPException(status_code=422, detail=f"message_blocked_ai:{data.get('reason') or 'policy'}")
     except HTTPException:
         raise
-    except Exception as e:
-        print("AI MESSAGE MODERATION ERROR:", e)
+    except Exception:
+        log.exception("AI message moderation failed")
         return
 
 
@@ -6790,15 +6939,23 @@ def list_private_messages(
         )
         db.commit()
 
-        total = q.count()
+        # Początek historii leży w archiwum, dalsza część w messages.
+        archived_items, archived_total = archived_page(
+            db,
+            private_conversation_key(current_user.id, user_id),
+            offset=offset,
+            limit=limit,
+        )
+        total = archived_total + q.count()
         rows = (
             q.order_by(Message.created_at.asc(), Message.id.asc())
-            .limit(limit)
-            .offset(offset)
+            .limit(limit - len(archived_items))
+            .offset(max(offset - archived_total, 0))
             .all()
+            if len(archived_items) < limit else []
         )
 
-        items = [
+        items = [MessageOut(**row).model_dump() for row in archived_items] + [
             MessageOut(
                 id=m.id,
                 sender_user_id=m.sender_user_id,
@@ -6960,15 +7117,23 @@ def list_group_messages(
         if blocked_user_ids:
             q = q.filter(~Message.sender_user_id.in_(blocked_user_ids))
 
-        total = q.count()
+        archived_items, archived_total = archived_page(
+            db,
+            group_conversation_key(group_id),
+            offset=offset,
+            limit=limit,
+            hidden_sender_ids=blocked_user_ids,
+        )
+        total = archived_total + q.count()
         rows = (
             q.order_by(Message.created_at.asc(), Message.id.asc())
-            .limit(limit)
-            .offset(offset)
+            .limit(limit - len(archived_items))
+            .offset(max(offset - archived_total, 0))
             .all()
+            if len(archived_items) < limit else []
         )
 
-        items = [
+        items = [MessageOut(**row).model_dump() for row in archived_items] + [
             MessageOut(
                 id=m.id,
                 sender_user_id=m.sender_user_id,
@@ -7025,6 +7190,11 @@ def list_private_conversations(
             if other_user_id not in latest_by_other_user_id:
                 latest_by_other_user_id[other_user_id] = m
 
+        # Rozmowy, których wszystkie wiadomości trafiły już do archiwum.
+        archived_latest = latest_archived_private_messages(db, current_user.id, latest_by_other_user_id)
+        for other_user_id, row in archived_latest.items():
+            latest_by_other_user_id[other_user_id] = SimpleNamespace(**row)
+
         other_user_ids = list(latest_by_other_user_id.keys())
 
         if other_user_ids:
@@ -7123,6 +7293,12 @@ def list_private_conversations(
                 else f"Użytkownik #{other_user_id}"
             )
 
+            other_user_avatar_url = (
+                getattr(user_profile, "avatar_url", None)
+                or ((partner_profile or {}).get("logo_url"))
+                or ""
+            )
+
             items.append({
                 "other_user_id": other_user_id,
                 "other_user_role": role,
@@ -7130,11 +7306,8 @@ def list_private_conversations(
                     display_name
                     or fallback_name
                 ),
-                "other_user_avatar_url": (
-                    getattr(user_profile, "avatar_url", None)
-                    or ((partner_profile or {}).get("logo_url"))
-                    or ""
-                ),
+                "other_user_avatar_url": other_user_avatar_url,
+                "other_user_avatar_variants": image_variant_urls(other_user_avatar_url),
                 "other_user_bio": (
                     getattr(user_profile, "bio", None)
                     or ((partner_profile or {}).get("bio"))
@@ -7543,6 +7716,7 @@ def list_friend_requests(
                     "nick": profile.nick if profile and profile.nick else "Użytkownik",
                     "city": profile.miasto if profile else "",
                     "avatar_url": profile.avatar_url if profile else "",
+                    "avatar_variants": image_variant_urls(profile.avatar_url if profile else None),
                 },
             }
             for fr, profile in incoming_rows
@@ -7558,6 +7732,7 @@ def list_friend_requests(
                     "nick": profile.nick if profile and profile.nick else "Użytkownik",
                     "city": profile.miasto if profile else "",
                     "avatar_url": profile.avatar_url if profile else "",
+                    "avatar_variants": image_variant_urls(profile.avatar_url if profile else None),
                 },
             }
             for fr, profile in outgoing_rows
@@ -7618,6 +7793,7 @@ def list_group_invitations(
                     "nick": profile.nick if profile and profile.nick else "Użytkownik",
                     "city": profile.miasto if profile else "",
                     "avatar_url": profile.avatar_url if profile else "",
+                    "avatar_variants": image_variant_urls(profile.avatar_url if profile else None),
                 },
             }
             for inv, group, profile in incoming_rows
@@ -7638,6 +7814,7 @@ def list_group_invitations(
                     "nick": profile.nick if profile and profile.nick else "Użytkownik",
                     "city": profile.miasto if profile else "",
                     "avatar_url": profile.avatar_url if profile else "",
+                    "avatar_variants": image_variant_urls(profile.avatar_url if profile else None),
                 },
             }
             for inv, group, profile in outgoing_rows
@@ -7838,6 +8015,7 @@ def list_friends(
                 "nick": profile.nick if profile and profile.nick else "Użytkownik",
                 "city": profile.miasto if profile else "",
                 "avatar_url": profile.avatar_url if profile else "",
+                "avatar_variants": image_variant_urls(profile.avatar_url if profile else None),
                 "interests": interests,
             })
 
@@ -7954,6 +8132,8 @@ def create_group(
 
 @app.get("/groups")
 def list_groups(
+    request: Request,
+    response: Response,
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
 ):
@@ -7961,7 +8141,15 @@ def list_groups(
     try:
         q = db.query(Group)
 
-        total = q.count()
+        # Liczba, najwyższe id i ostatnia zmiana wykrywają dodanie, usunięcie i edycję grupy
+        # (także zmianę members_count, która podbija updated_at).
+        total, last_id, last_updated_at = db.query(
+            func.count(Group.id), func.max(Group.id), func.max(Group.updated_at)
+        ).one()
+        etag = compute_etag("groups", limit, offset, total, last_id, last_updated_at)
+        cached = not_modified(request, response, etag, cache_control=PUBLIC_REVALIDATE)
+        if cached is not None:
+            return cached
 
         groups = (
             q.order_by(Group.members_count.desc(), Group.id.asc())
@@ -8288,6 +8476,18 @@ def close_group(
 
 
 
+def _group_list_item(g: Group) -> dict:
+    return {
+        "id": g.id,
+        "title": g.title,
+        "description": g.description,
+        "interest_tag": g.interest_tag,
+        "members_count": g.members_count,
+        "created_at": g.created_at,
+        "updated_at": g.updated_at,
+    }
+
+
 @app.get("/groups/suggested")
 def list_suggested_groups(
     current_user: User = Depends(require_role("user")),
@@ -8315,44 +8515,36 @@ def list_suggested_groups(
             for x in raw_interests
             if _normalize_interest_tag(str(x))
         }
-        joined_group_ids = {
-            row[0]
-            for row in db.query(GroupMembership.group_id)
-            .filter(GroupMembership.user_id == current_user.id)
-            .all()
-        }
 
-        groups = db.query(Group).all()
-
-        scored = []
-        for g in groups:
-            if g.id in joined_group_ids:
-                continue
-
-            group_tag = _normalize_interest_tag(g.interest_tag)
-            score = 1 if group_tag and group_tag in user_interest_set else 0
-
-            scored.append(
-                {
-                    "id": g.id,
-                    "title": g.title,
-                    "description": g.description,
-                    "interest_tag": g.interest_tag,
-                    "members_count": g.members_count,
-                    "created_at": g.created_at,
-                    "updated_at": g.updated_at,
-                    "_score": score,
-                }
-            )
+        groups = suggested_groups(db, current_user.id, user_interest_set, limit)
+        return ok({"items": [_group_list_item(g) for g in groups]})
+    finally:
+        db.close()
 
-        scored.sort(key=lambda x: (-x["_score"], -x["members_count"], x["id"]))
 
-        items = []
-        for item in scored[:limit]:
-            item.pop("_score", None)
-            items.append(item)
+@app.get("/groups/search")
+def search_groups(
+    q: str = Query(..., min_length=1, max_length=120),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(require_role("user")),
+):
+    if not q.strip().lstrip("#").strip():
+        raise HTTPException(status_code=422, detail="SEARCH_QUERY_TOO_SHORT")
 
-        return ok({"items": items})
+    db = SessionLocal()
+    try:
+        groups, total = groups_by_prefix(db, q, limit=limit, offset=offset)
+        return ok(
+            {
+                "items": [_group_list_item(g) for g in groups],
+                "pagination": {
+                    "limit": limit,
+                    "offset": offset,
+                    "total": total,
+                },
+            }
+        )
     finally:
         db.close()
 
@@ -8414,6 +8606,7 @@ def get_group_people(
                 "nick": profile.nick if profile and profile.nick else "Użytkownik",
                 "city": profile.miasto if profile else "",
                 "avatar_url": profile.avatar_url if profile else "",
+                "avatar_variants": image_variant_urls(profile.avatar_url if profile else None),
                 "is_founder": membership.user_id == g.creator_id,
                 "joined_at": membership.joined_at.isoformat() if membership.joined_at else None,
             })
@@ -8438,6 +8631,7 @@ def get_group_people(
                 "nick": profile.nick if profile and profile.nick else "Użytkownik",
                 "city": profile.miasto if profile else "",
                 "avatar_url": profile.avatar_url if profile else "",
+                "avatar_variants": image_variant_urls(profile.avatar_url if profile else None),
                 "invitation_id": invitation.id,
                 "created_at": invitation.created_at.isoformat() if invitation.created_at else None,
             })
@@ -8452,13 +8646,17 @@ def get_group_people(
 
 
 @app.get("/groups/{group_id}")
-def get_group_details(group_id: int):
+def get_group_details(group_id: int, request: Request, response: Response):
     db = SessionLocal()
     try:
         g = db.query(Group).filter(Group.id == group_id).first()
         if not g:
             raise HTTPException(status_code=404, detail="GROUP_NOT_FOUND")
 
+        cached = not_modified(request, response, compute_etag("group", g.id, g.updated_at), cache_control=PUBLIC_REVALIDATE)
+        if cached is not None:
+            return cached
+
         return ok(
             {
                 "id": g.id,
@@ -8486,12 +8684,12 @@ async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
     )
 
 @app.get("/api/legal/terms_pl")
-def get_terms_pl():
-    return FileResponse("legal/terms_pl.md")
+def get_terms_pl(request: Request):
+    return conditional_file_response(request, "legal/terms_pl.md")
 
 @app.get("/api/legal/terms_en")
-def get_terms_en():
-    return FileResponse("legal/terms_en.md")
+def get_terms_en(request: Request):
+    return conditional_file_response(request, "legal/terms_en.md")
 
 
 # =========================
@@ -8504,9 +8702,11 @@ def send_push_to_user(
     data: dict | None = None,
     localized_bodies: dict[str, str] | None = None,
 ) -> bool:
-    if not firebase_admin._apps:
+    if firebase_app.get() is None:
         return False
 
+    from firebase_admin import messaging
+
     tokens = (
         db.query(DevicePushToken)
         .filter(DevicePushToken.user_id == user_id)
@@ -8560,30 +8760,100 @@ def send_push_to_user(
                 token=token_row.token,
             )
             message_id = messaging.send(message)
-            print(
-                "PUSH SEND OK:",
-                "user_id=", user_id,
-                "token_id=", token_row.id,
-                "message_id=", message_id,
+            push_log.info(
+                "Push sent",
+                extra={"user_id": user_id, "token_id": token_row.id, "message_id": message_id},
             )
             sent_any = True
         except Exception as exc:
-            print(
-                "PUSH SEND ERROR:",
-                "user_id=", user_id,
-                "token_id=", token_row.id,
-                "error_type=", type(exc).__name__,
-                "error=", exc,
+            push_log.warning(
+                "Push send failed: %s: %s",
+                type(exc).__name__,
+                exc,
+                extra={"user_id": user_id, "token_id": token_row.id},
             )
 
-    return sent_any
+    return sent_any
+
+
+REPORTS_DATA_DIR = Path(__file__).resolve().parent / "data"
+_reports_file_lock = threading.Lock()
+
+
+def _smtp_deliver(msg: EmailMessage, smtp_host: str, smtp_port: int, smtp_user: str, smtp_pass: str) -> None:
+    # Blokujące smtplib — wołać przez run_in_threadpool, nigdy wprost z pętli zdarzeń.
+    import smtplib
+    import ssl
+
+    context = ssl.create_default_context()
+    try:
+        with smtplib.SMTP(smtp_host, smtp_port, timeout=20) as server:
+            server.starttls(context=context)
+            if smtp_user and smtp_pass:
+                server.login(smtp_user, smtp_pass)
+            server.send_message(msg)
+    except ssl.SSLCertVerificationError:
+        fallback_context = ssl._create_unverified_context()
+        with smtplib.SMTP(smtp_host, smtp_port, timeout=20) as server:
+            server.starttls(context=fallback_context)
+            if smtp_user and smtp_pass:
+                server.login(smtp_user, smtp_pass)
+            server.send_message(msg)
+
+
+def _send_report_email(to_email: str, subject: str, body: str) -> tuple[bool, str | None]:
+    smtp_host = os.getenv("USLY_SMTP_HOST", "").strip()
+    smtp_port = int(os.getenv("USLY_SMTP_PORT", "587"))
+    smtp_user = os.getenv("USLY_SMTP_USER", "").strip()
+    smtp_pass = os.getenv("USLY_SMTP_PASS", "").strip()
+    smtp_from = os.getenv("USLY_SMTP_FROM", "").strip() or smtp_user
+
+    if not smtp_host or not smtp_from:
+        return False, None
+
+    try:
+        msg = EmailMessage()
+        msg["Subject"] = subject
+        msg["From"] = smtp_from
+        msg["To"] = to_email
+        msg.set_content(body)
+
+        _smtp_deliver(msg, smtp_host, smtp_port, smtp_user, smtp_pass)
+        return True, None
+    except Exception as e:
+        return False, str(e)
+
+
+def _append_jsonl(file_name: str, entry: dict) -> None:
+    REPORTS_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    with _reports_file_lock:
+        with (REPORTS_DATA_DIR / file_name).open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def _append_ticketed_report(file_name: str, ticket_format: str, fields: dict) -> str:
+    # Numer zgłoszenia = liczba dotychczasowych wpisów + 1; blokada chroni przed
+    # zduplikowanym numerem przy równoległych zgłoszeniach w jednym procesie.
+    REPORTS_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    report_file = REPORTS_DATA_DIR / file_name
+
+    with _reports_file_lock:
+        existing_count = 0
+        if report_file.exists():
+            with report_file.open("r", encoding="utf-8") as f:
+                existing_count = sum(1 for _ in f if _.strip())
+
+        ticket = ticket_format.format(existing_count + 1)
+        record = {"ticket": ticket, **fields}
+
+        with report_file.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    return ticket
 
 
 async def send_bug_email(subject: str, body: str):
     try:
-        import smtplib
-        import ssl
-
         smtp_host = os.getenv("USLY_SMTP_HOST", "").strip()
         smtp_port = int(os.getenv("USLY_SMTP_PORT", "587"))
         smtp_user = os.getenv("USLY_SMTP_USER", "").strip()
@@ -8591,7 +8861,7 @@ async def send_bug_email(subject: str, body: str):
         smtp_from = os.getenv("USLY_SMTP_FROM", "").strip() or smtp_user
 
         if not smtp_host or not smtp_user or not smtp_pass:
-            print("MAIL ERROR: missing USLY SMTP config")
+            log.error("Mail not sent: missing USLY SMTP config")
             return False
 
         msg = EmailMessage()
@@ -8600,29 +8870,16 @@ async def send_bug_email(subject: str, body: str):
         msg["Subject"] = subject
         msg.set_content(body)
 
-        context = ssl.create_default_context()
-        try:
-            with smtplib.SMTP(smtp_host, smtp_port, timeout=20) as server:
-                server.starttls(context=context)
-                server.login(smtp_user, smtp_pass)
-                server.send_message(msg)
-        except ssl.SSLCertVerificationError:
-            context = ssl._create_unverified_context()
-            with smtplib.SMTP(smtp_host, smtp_port, timeout=20) as server:
-                server.starttls(context=context)
-                server.login(smtp_user, smtp_pass)
-                server.send_message(msg)
+        await run_in_threadpool(_smtp_deliver, msg, smtp_host, smtp_port, smtp_user, smtp_pass)
 
         return True
-    except Exception as e:
-        print("MAIL ERROR:", e)
+    except Exception:
+        log.exception("Mail to support failed")
         return False
 
-async def send_user_email(to_email: str, subject: str, body: str):
+def send_user_email_sync(to_email: str, subject: str, body: str):
+    """Blokujące — z handlerów async wołać send_user_email()."""
     try:
-        import smtplib
-        import ssl
-
         to_email = str(to_email or "").strip()
         if not to_email or "@" not in to_email:
             return False
@@ -8634,7 +8891,7 @@ async def send_user_email(to_email: str, subject: str, body: str):
         smtp_from = os.getenv("USLY_SMTP_FROM", "").strip() or smtp_user
 
         if not smtp_host or not smtp_user or not smtp_pass:
-            print("USER MAIL ERROR: missing USLY SMTP config")
+            log.error("User mail not sent: missing USLY SMTP config")
             return False
 
         msg = EmailMessage()
@@ -8643,32 +8900,23 @@ async def send_user_email(to_email: str, subject: str, body: str):
         msg["Subject"] = subject
         msg.set_content(body)
 
-        context = ssl.create_default_context()
-        try:
-            with smtplib.SMTP(smtp_host, smtp_port, timeout=20) as server:
-                server.starttls(context=context)
-                server.login(smtp_user, smtp_pass)
-                server.send_message(msg)
-        except ssl.SSLCertVerificationError:
-            context = ssl._create_unverified_context()
-            with smtplib.SMTP(smtp_host, smtp_port, timeout=20) as server:
-                server.starttls(context=context)
-                server.login(smtp_user, smtp_pass)
-                server.send_message(msg)
+        _smtp_deliver(msg, smtp_host, smtp_port, smtp_user, smtp_pass)
 
         return True
-    except Exception as e:
-        print("USER MAIL ERROR:", e)
+    except Exception:
+        log.exception("User mail failed")
         return False
 
 
+async def send_user_email(to_email: str, subject: str, body: str):
+    return await run_in_threadpool(send_user_email_sync, to_email, subject, body)
+
+
 # ENTERPRISE CONTACT LEADS
 # =========================
 @app.post("/enterprise/contact")
 async def submit_enterprise_contact(payload: dict):
-    from pathlib import Path
     from datetime import datetime
-    import json
 
     company = str((payload or {}).get("company") or "").strip()
     city = str((payload or {}).get("city") or "").strip()
@@ -8699,11 +8947,7 @@ async def submit_enterprise_contact(payload: dict):
         "extra": extra,
     }
 
-    data_dir = Path(__file__).resolve().parent / "data"
-    data_dir.mkdir(parents=True, exist_ok=True)
-    lead_file = data_dir / "enterprise_leads.jsonl"
-    with lead_file.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(lead, ensure_ascii=False) + "\n")
+    await run_in_threadpool(_append_jsonl, "enterprise_leads.jsonl", lead)
 
     subject = f"[USLY Enterprise] Nowe zapytanie {ticket}"
     selected_areas = locations or "—"
@@ -8780,9 +9024,9 @@ kontakt@uslyapp.pl
             )
 
         emailed = "queued"
-    except Exception as e:
+    except Exception:
         emailed = False
-        print("ENTERPRISE LEAD EMAIL QUEUE ERROR:", e)
+        log.exception("Enterprise lead emails not queued", extra={"ticket": ticket})
 
     return ok({"ticket": ticket, "saved": True, "emailed": emailed})
 
@@ -8790,9 +9034,7 @@ kontakt@uslyapp.pl
 
 @app.post("/contact")
 async def submit_public_contact(payload: dict):
-    from pathlib import Path
     from datetime import datetime
-    import json
     import asyncio
 
     name = str((payload or {}).get("name") or "").strip()
@@ -8821,11 +9063,7 @@ async def submit_public_contact(payload: dict):
         "message": message,
     }
 
-    data_dir = Path(__file__).resolve().parent / "data"
-    data_dir.mkdir(parents=True, exist_ok=True)
-    contact_file = data_dir / "contact_messages.jsonl"
-    with contact_file.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    await run_in_threadpool(_append_jsonl, "contact_messages.jsonl", entry)
 
     subject = f"[USLY Kontakt] Nowa wiadomość {ticket}"
     body = f"""NOWA WIADOMOŚĆ ZE STRONY USLY
@@ -8870,9 +9108,9 @@ https://uslyapp.pl
         asyncio.create_task(send_bug_email(subject, body))
         asyncio.create_task(send_user_email(email, autoresponder_subject, autoresponder_body))
         emailed = "queued"
-    except Exception as e:
+    except Exception:
         emailed = False
-        print("PUBLIC CONTACT EMAIL QUEUE ERROR:", e)
+        log.exception("Contact emails not queued", extra={"ticket": ticket})
 
     return ok({"ticket": ticket, "saved": True, "emailed": emailed})
 
@@ -8881,14 +9119,6 @@ https://uslyapp.pl
 # =========================
 @app.post("/feedback")
 async def submit_feedback(payload: dict):
-    import os
-    import json
-    import smtplib
-    import ssl
-    from pathlib import Path
-    from datetime import datetime
-    from email.message import EmailMessage
-
     bug_email_to = "kontakt@uslyapp.pl"
 
     message = str((payload or {}).get("message") or "").strip()
@@ -8905,31 +9135,21 @@ async def submit_feedback(payload: dict):
             "error": "EMPTY_MESSAGE",
         })
 
-    data_dir = Path(__file__).resolve().parent / "data"
-    data_dir.mkdir(parents=True, exist_ok=True)
-    bug_file = data_dir / "bug_reports.jsonl"
-
-    existing_count = 0
-    if bug_file.exists():
-        with bug_file.open("r", encoding="utf-8") as f:
-            existing_count = sum(1 for _ in f if _.strip())
-
-    ticket_no = existing_count + 1
-    ticket = f"{ticket_no:04d}"
     now = datetime.now().strftime("%Y-%m-%d %H:%M")
 
-    record = {
-        "ticket": ticket,
-        "role": role,
-        "user_id": user_id,
-        "email": email,
-        "current_view": current_view,
-        "message": message,
-        "created_at": now,
-    }
-
-    with bug_file.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    ticket = await run_in_threadpool(
+        _append_ticketed_report,
+        "bug_reports.jsonl",
+        "{:04d}",
+        {
+            "role": role,
+            "user_id": user_id,
+            "email": email,
+            "current_view": current_view,
+            "message": message,
+            "created_at": now,
+        },
+    )
 
     subject = f"[USLY BUG #{ticket}] {role.capitalize()}"
     body = (
@@ -8942,41 +9162,7 @@ async def submit_feedback(payload: dict):
         f"{message}"
     )
 
-    smtp_host = os.getenv("USLY_SMTP_HOST", "").strip()
-    smtp_port = int(os.getenv("USLY_SMTP_PORT", "587"))
-    smtp_user = os.getenv("USLY_SMTP_USER", "").strip()
-    smtp_pass = os.getenv("USLY_SMTP_PASS", "").strip()
-    smtp_from = os.getenv("USLY_SMTP_FROM", "").strip() or smtp_user
-
-    emailed = False
-    email_error = None
-
-    if smtp_host and smtp_from:
-        try:
-            msg = EmailMessage()
-            msg["Subject"] = subject
-            msg["From"] = smtp_from
-            msg["To"] = bug_email_to
-            msg.set_content(body)
-
-            context = ssl.create_default_context()
-            try:
-                with smtplib.SMTP(smtp_host, smtp_port, timeout=20) as server:
-                    server.starttls(context=context)
-                    if smtp_user and smtp_pass:
-                        server.login(smtp_user, smtp_pass)
-                    server.send_message(msg)
-            except ssl.SSLCertVerificationError:
-                fallback_context = ssl._create_unverified_context()
-                with smtplib.SMTP(smtp_host, smtp_port, timeout=20) as server:
-                    server.starttls(context=fallback_context)
-                    if smtp_user and smtp_pass:
-                        server.login(smtp_user, smtp_pass)
-                    server.send_message(msg)
-
-            emailed = True
-        except Exception as e:
-            email_error = str(e)
+    emailed, email_error = await run_in_threadpool(_send_report_email, bug_email_to, subject, body)
 
     return ok({
         "saved": True,
@@ -8989,19 +9175,43 @@ async def submit_feedback(payload: dict):
 # =========================
 # USER REPORTS / MODERATION
 # =========================
+def _require_active_user_exists(user_id: int) -> None:
+    db = SessionLocal()
+    try:
+        target = (
+            db.query(User)
+            .filter(User.id == user_id)
+            .filter(User.status == UserStatus.ACTIVE.value)
+            .first()
+        )
+        if not target:
+            raise HTTPException(status_code=404, detail="USER_NOT_FOUND")
+    finally:
+        db.close()
+
+
+def _load_reported_event_summary(event_id: int) -> tuple[str, int | None]:
+    db = SessionLocal()
+    try:
+        event = (
+            db.query(Event)
+            .filter(Event.id == event_id)
+            .first()
+        )
+        if not event:
+            raise HTTPException(status_code=404, detail="EVENT_NOT_FOUND")
+
+        event_title = getattr(event, "title", None) or getattr(event, "name", None) or f"Wydarzenie #{event_id}"
+        return event_title, getattr(event, "partner_user_id", None)
+    finally:
+        db.close()
+
+
 @app.post("/reports/user")
 async def submit_user_report(
     payload: dict,
     current_user: User = Depends(require_role("user", "partner")),
 ):
-    import os
-    import json
-    import smtplib
-    import ssl
-    from pathlib import Path
-    from datetime import datetime
-    from email.message import EmailMessage
-
     report_email_to = "kontakt@uslyapp.pl"
 
     reported_user_id = (payload or {}).get("reported_user_id")
@@ -9029,47 +9239,26 @@ async def submit_user_report(
     if len(description) > 1000:
         raise HTTPException(status_code=422, detail="REPORT_DESCRIPTION_TOO_LONG")
 
-    db = SessionLocal()
-    try:
-        target = (
-            db.query(User)
-            .filter(User.id == int(reported_user_id))
-            .filter(User.status == UserStatus.ACTIVE.value)
-            .first()
-        )
-        if not target:
-            raise HTTPException(status_code=404, detail="USER_NOT_FOUND")
-    finally:
-        db.close()
-
-    data_dir = Path(__file__).resolve().parent / "data"
-    data_dir.mkdir(parents=True, exist_ok=True)
-    report_file = data_dir / "user_reports.jsonl"
-
-    existing_count = 0
-    if report_file.exists():
-        with report_file.open("r", encoding="utf-8") as f:
-            existing_count = sum(1 for _ in f if _.strip())
+    await run_in_threadpool(_require_active_user_exists, int(reported_user_id))
 
-    ticket_no = existing_count + 1
-    ticket = f"UR-{ticket_no:04d}"
     now = datetime.now().strftime("%Y-%m-%d %H:%M")
 
-    record = {
-        "ticket": ticket,
-        "reporter_user_id": current_user.id,
-        "reporter_role": current_user.role,
-        "reported_user_id": int(reported_user_id),
-        "reason": reason,
-        "reason_label": allowed_reasons[reason],
-        "description": description,
-        "current_view": current_view,
-        "created_at": now,
-        "status": "new",
-    }
-
-    with report_file.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    ticket = await run_in_threadpool(
+        _append_ticketed_report,
+        "user_reports.jsonl",
+        "UR-{:04d}",
+        {
+            "reporter_user_id": current_user.id,
+            "reporter_role": current_user.role,
+            "reported_user_id": int(reported_user_id),
+            "reason": reason,
+            "reason_label": allowed_reasons[reason],
+            "description": description,
+            "current_view": current_view,
+            "created_at": now,
+            "status": "new",
+        },
+    )
 
     subject = f"[USLY REPORT #{ticket}] {allowed_reasons[reason]}"
     body = (
@@ -9084,42 +9273,7 @@ async def submit_user_report(
         f"{description or '—'}"
     )
 
-    smtp_host = os.getenv("USLY_SMTP_HOST", "").strip()
-    smtp_port = int(os.getenv("USLY_SMTP_PORT", "587"))
-    smtp_user = os.getenv("USLY_SMTP_USER", "").strip()
-    smtp_pass = os.getenv("USLY_SMTP_PASS", "").strip()
-    smtp_from = os.getenv("USLY_SMTP_FROM", "").strip() or smtp_user
-
-    emailed = False
-    email_error = None
-
-    if smtp_host and smtp_from:
-        try:
-            msg = EmailMessage()
-            msg["Subject"] = subject
-            msg["From"] = smtp_from
-            msg["To"] = report_email_to
-            msg.set_content(body)
-
-            context = ssl.create_default_context()
-            try:
-                server_context = context
-                with smtplib.SMTP(smtp_host, smtp_port, timeout=20) as server:
-                    server.starttls(context=server_context)
-                    if smtp_user and smtp_pass:
-                        server.login(smtp_user, smtp_pass)
-                    server.send_message(msg)
-            except ssl.SSLCertVerificationError:
-                fallback_context = ssl._create_unverified_context()
-                with smtplib.SMTP(smtp_host, smtp_port, timeout=20) as server:
-                    server.starttls(context=fallback_context)
-                    if smtp_user and smtp_pass:
-                        server.login(smtp_user, smtp_pass)
-                    server.send_message(msg)
-
-            emailed = True
-        except Exception as e:
-            email_error = str(e)
+    emailed, email_error = await run_in_threadpool(_send_report_email, report_email_to, subject, body)
 
     return ok({
         "saved": True,
@@ -9134,14 +9288,6 @@ async def submit_event_report(
     payload: dict,
     current_user: User = Depends(require_role("user", "partner")),
 ):
-    import os
-    import json
-    import smtplib
-    import ssl
-    from pathlib import Path
-    from datetime import datetime
-    from email.message import EmailMessage
-
     report_email_to = "kontakt@uslyapp.pl"
 
     event_id = (payload or {}).get("event_id")
@@ -9166,51 +9312,28 @@ async def submit_event_report(
     if len(description) > 1000:
         raise HTTPException(status_code=422, detail="REPORT_DESCRIPTION_TOO_LONG")
 
-    db = SessionLocal()
-    try:
-        event = (
-            db.query(Event)
-            .filter(Event.id == int(event_id))
-            .first()
-        )
-        if not event:
-            raise HTTPException(status_code=404, detail="EVENT_NOT_FOUND")
+    event_title, partner_user_id = await run_in_threadpool(_load_reported_event_summary, int(event_id))
 
-        event_title = getattr(event, "title", None) or getattr(event, "name", None) or f"Wydarzenie #{event_id}"
-        partner_user_id = getattr(event, "partner_user_id", None)
-    finally:
-        db.close()
-
-    data_dir = Path(__file__).resolve().parent / "data"
-    data_dir.mkdir(parents=True, exist_ok=True)
-    report_file = data_dir / "event_reports.jsonl"
-
-    existing_count = 0
-    if report_file.exists():
-        with report_file.open("r", encoding="utf-8") as f:
-            existing_count = sum(1 for _ in f if _.strip())
-
-    ticket_no = existing_count + 1
-    ticket = f"ER-{ticket_no:04d}"
     now = datetime.now().strftime("%Y-%m-%d %H:%M")
 
-    record = {
-        "ticket": ticket,
-        "reporter_user_id": current_user.id,
-        "reporter_role": current_user.role,
-        "event_id": int(event_id),
-        "event_title": event_title,
-        "partner_user_id": partner_user_id,
-        "reason": reason,
-        "reason_label": allowed_reasons[reason],
-        "description": description,
-        "current_view": current_view,
-        "created_at": now,
-        "status": "new",
-    }
-
-    with report_file.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    ticket = await run_in_threadpool(
+        _append_ticketed_report,
+        "event_reports.jsonl",
+        "ER-{:04d}",
+        {
+            "reporter_user_id": current_user.id,
+            "reporter_role": current_user.role,
+            "event_id": int(event_id),
+            "event_title": event_title,
+            "partner_user_id": partner_user_id,
+            "reason": reason,
+            "reason_label": allowed_reasons[reason],
+            "description": description,
+            "current_view": current_view,
+            "created_at": now,
+            "status": "new",
+        },
+    )
 
     subject = f"[USLY EVENT REPORT #{ticket}] {allowed_reasons[reason]}"
     body = (
@@ -9227,42 +9350,7 @@ async def submit_event_report(
         f"{description or '—'}"
     )
 
-    smtp_host = os.getenv("USLY_SMTP_HOST", "").strip()
-    smtp_port = int(os.getenv("USLY_SMTP_PORT", "587"))
-    smtp_user = os.getenv("USLY_SMTP_USER", "").strip()
-    smtp_pass = os.getenv("USLY_SMTP_PASS", "").strip()
-    smtp_from = os.getenv("USLY_SMTP_FROM", "").strip() or smtp_user
-
-    emailed = False
-    email_error = None
-
-    if smtp_host and smtp_from:
-        try:
-            msg = EmailMessage()
-            msg["Subject"] = subject
-            msg["From"] = smtp_from
-            msg["To"] = report_email_to
-            msg.set_content(body)
-
-            context = ssl.create_default_context()
-            try:
-                server_context = context
-                with smtplib.SMTP(smtp_host, smtp_port, timeout=20) as server:
-                    server.starttls(context=server_context)
-                    if smtp_user and smtp_pass:
-                        server.login(smtp_user, smtp_pass)
-                    server.send_message(msg)
-            except ssl.SSLCertVerificationError:
-                fallback_context = ssl._create_unverified_context()
-                with smtplib.SMTP(smtp_host, smtp_port, timeout=20) as server:
-                    server.starttls(context=fallback_context)
-                    if smtp_user and smtp_pass:
-                        server.login(smtp_user, smtp_pass)
-                    server.send_message(msg)
-
-            emailed = True
-        except Exception as e:
-            email_error = str(e)
+    emailed, email_error = await run_in_threadpool(_send_report_email, report_email_to, subject, body)
 
     return ok({
         "saved": True,
@@ -9574,15 +9662,6 @@ def admin_delete_user_account(
         if user.status == UserStatus.DELETED.value:
             return ok({"deleted": True, "already_deleted": True})
 
-        owned_groups = (
-            db.query(Group)
-            .filter(Group.creator_id == user.id)
-            .all()
-        )
-
-        for g in owned_groups:
-            db.delete(g)
-
         apple_revoke_result = (
             _best_effort_revoke_apple_credentials_for_admin_delete(
                 db,
@@ -9590,7 +9669,7 @@ def admin_delete_user_account(
             )
         )
 
-        cleanup_user_social_relations_for_soft_delete(db, user.id)
+        deletion_job = enqueue_account_deletion(db, user.id, requested_by_user_id=current_user.id)
 
         original_email = user.email
         safe_email = f"deleted_{user.id}_{int(datetime.utcnow().timestamp())}@deleted.usly.local"
@@ -9613,7 +9692,8 @@ def admin_delete_user_account(
                     f"original_email={original_email}; "
                     f"apple_revoke_success={apple_revoke_result.get('success')}; "
                     f"apple_revoked_count={apple_revoke_result.get('revoked_count')}; "
-                    f"apple_revoke_error={apple_revoke_result.get('error')}"
+                    f"apple_revoke_error={apple_revoke_result.get('error')}; "
+                    f"deletion_job_id={deletion_job.id}"
                 ),
             )
         )
@@ -9623,11 +9703,73 @@ def admin_delete_user_account(
             "deleted": True,
             "user_id": user.id,
             "original_email": original_email,
+            "deletion_job_id": deletion_job.id,
         })
     finally:
         db.close()
 
 
+@app.get("/admin/account-deletions")
+def admin_account_deletions(
+    status: Optional[str] = Query(default=None, max_length=16),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(require_role("admin")),
+):
+    require_admin_permission(current_user, "account_delete")
+
+    db = SessionLocal()
+    try:
+        q = db.query(AccountDeletionJob)
+        if status:
+            q = q.filter(AccountDeletionJob.status == status.strip().lower())
+        jobs = q.order_by(AccountDeletionJob.id.desc()).limit(limit).all()
+        return ok({"items": [account_deletion_job_status(job) for job in jobs]})
+    finally:
+        db.close()
+
+
+@app.get("/admin/account-deletions/{job_id}")
+def admin_account_deletion(
+    job_id: int,
+    current_user: User = Depends(require_role("admin")),
+):
+    require_admin_permission(current_user, "account_delete")
+
+    db = SessionLocal()
+    try:
+        job = db.get(AccountDeletionJob, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="ACCOUNT_DELETION_JOB_NOT_FOUND")
+        return ok(account_deletion_job_status(job))
+    finally:
+        db.close()
+
+
+@app.post("/admin/account-deletions/{job_id}/retry")
+def admin_retry_account_deletion(
+    job_id: int,
+    current_user: User = Depends(require_role("admin")),
+):
+    require_admin_permission(current_user, "account_delete")
+
+    db = SessionLocal()
+    try:
+        job = db.get(AccountDeletionJob, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="ACCOUNT_DELETION_JOB_NOT_FOUND")
+        if job.status != "failed":
+            raise HTTPException(status_code=400, detail="ACCOUNT_DELETION_JOB_NOT_FAILED")
+
+        # Wznawia od current_step w kolejnym ticku schedulera.
+        job.status = "pending"
+        job.attempts = 0
+        job.updated_at = datetime.utcnow()
+        db.commit()
+        return ok(account_deletion_job_status(job))
+    finally:
+        db.close()
+
+
 @app.post("/admin/users/{user_id}/status")
 def admin_update_user_status(
     user_id: int,
@@ -10579,6 +10721,7 @@ def admin_event_preview(
             "created_at": str(event.created_at) if event.created_at else None,
             "updated_at": str(event.updated_at) if event.updated_at else None,
             "event_cover_url": getattr(event, "event_cover_url", None),
+            "event_cover_variants": image_variant_urls(getattr(event, "event_cover_url", None)),
         })
     finally:
         db.close()
@@ -11260,6 +11403,7 @@ def admin_list_events(current_user: User = Depends(require_role("admin"))):
                 "price_min": getattr(ev, "price_min", None),
                 "price_max": getattr(ev, "price_max", None),
                 "event_cover_url": getattr(ev, "event_cover_url", None),
+                "event_cover_variants": image_variant_urls(getattr(ev, "event_cover_url", None)),
                 "partner_user_id": ev.partner_user_id,
                 "organizer_email": getattr(organizer, "email", None),
                 "organizer_email_verified": bool(getattr(organizer, "email_verified_at", None)),
@@ -11276,6 +11420,63 @@ def admin_list_events(current_user: User = Depends(require_role("admin"))):
         db.close()
 
 
+# =========================
+# ADMIN  EXPORTS
+# GET /admin/exports/users.csv | events.ndjson | audit-log.csv ?gzip=1
+# =========================
+@app.get("/admin/exports/{export_name}.{export_format}")
+def admin_export(
+    export_name: str,
+    export_format: str,
+    request: Request,
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None),
+    role: Optional[str] = Query(None),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    action: Optional[str] = Query(None),
+    gzip: bool = Query(False),
+    current_user: User = Depends(require_role("admin")),
+):
+    export = ADMIN_EXPORTS.get(export_name)
+    if export is None or export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=404, detail="EXPORT_NOT_FOUND")
+    require_admin_permission(current_user, export.permission)
+
+    if created_from and created_to and _ensure_utc(created_from) >= _ensure_utc(created_to):
+        raise HTTPException(status_code=422, detail="INVALID_DATE_RANGE")
+
+    filters = AdminExportFilters(
+        created_from=created_from,
+        created_to=created_to,
+        role=(role or "").strip().lower() or None,
+        status=(status_filter or "").strip().lower() or None,
+        action=(action or "").strip() or None,
+    )
+
+    filter_details = "; ".join(f"{key}={value}" for key, value in vars(filters).items() if value)
+    _audit(
+        None,
+        action="ADMIN_EXPORT",
+        request=request,
+        user_id=current_user.id,
+        details=f"export={export_name}.{export_format}" + (f"; {filter_details}" if filter_details else ""),
+    )
+
+    chunks = iter_admin_export(SessionLocal, export, filters, export_format)
+    filename = f"{export_name}-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}.{export_format}"
+    if gzip:
+        return StreamingResponse(
+            iter_gzip(chunks),
+            media_type=GZIP_MEDIA_TYPE,
+            headers=attachment_headers(f"{filename}.gz"),
+        )
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_FORMATS[export_format],
+        headers=attachment_headers(filename),
+    )
+
+
 @app.get("/admin/event-reports")
 def get_admin_event_reports(current_user: User = Depends(require_role("admin"))):
     require_admin_permission(current_user, "reports")
@@ -11322,57 +11523,79 @@ def get_bug_reports(current_user: User = Depends(require_role("admin"))):
 def my_notifications(
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     current_user: User = Depends(require_role("user")),
 ):
-    db = SessionLocal()
     try:
-        ensure_event_reminder_notifications(db)
-        db.commit()
+        after = decode_cursor(cursor) if cursor else None
+    except InvalidCursor:
+        raise HTTPException(status_code=422, detail="INVALID_CURSOR")
 
-        q = (
-            db.query(UserNotification, Event)
-            .outerjoin(Event, Event.id == UserNotification.event_id)
+    db = SessionLocal()
+    try:
+        # Przypomnienia o wydarzeniach tworzy zadanie schedulera "event_reminders".
+        # Licznik tylko przy pierwszym wejściu; kolejne strony idą po kursorze.
+        total = (
+            db.query(func.count(UserNotification.id))
             .filter(UserNotification.user_id == current_user.id)
-            .order_by(UserNotification.created_at.desc())
+            .scalar()
+            if after is None else None
+        )
+        items, next_cursor = notifications_page(
+            db,
+            current_user.id,
+            limit=limit,
+            offset=offset,
+            cursor=after,
         )
-
-        total = q.count()
-        rows = q.offset(offset).limit(limit).all()
-
-        items = []
-        for notification, event in rows:
-            items.append(
-                {
-                    "notification": {
-                        "id": notification.id,
-                        "type": notification.type,
-                        "created_at": notification.created_at,
-                        "read_at": notification.read_at,
-                        "event_id": notification.event_id,
-                        "partner_user_id": notification.partner_user_id,
-                    },
-                    "event": {
-                        "id": event.id,
-                        "title": event.title,
-                        "city": event.city,
-                        "where": event.where,
-                        "start_at": event.start_at,
-                        "end_at": event.end_at,
-                        "status": event.status,
-                    } if event else None,
-                }
-            )
 
         return ok({
             "items": items,
             "total": total,
             "limit": limit,
             "offset": offset,
+            "next_cursor": next_cursor,
+            "unread_count": unread_notifications_count(db, current_user.id),
+        })
+    finally:
+        db.close()
+
+
+@app.get("/users/me/notifications/unread-count")
+def my_notifications_unread_count(current_user: User = Depends(require_role("user"))):
+    db = SessionLocal()
+    try:
+        return ok({"unread_count": unread_notifications_count(db, current_user.id)})
+    finally:
+        db.close()
+
+
+class NotificationsMarkReadRequest(BaseModel):
+    # Brak up_to_id = wszystkie nieprzeczytane.
+    up_to_id: int | None = Field(default=None, ge=1)
+
+
+@app.post("/users/me/notifications/read")
+def mark_my_notifications_read(
+    payload: NotificationsMarkReadRequest,
+    current_user: User = Depends(require_role("user")),
+):
+    db = SessionLocal()
+    try:
+        marked = mark_notifications_read(db, current_user.id, up_to_id=payload.up_to_id)
+        db.commit()
+        return ok({
+            "marked": marked,
+            "unread_count": unread_notifications_count(db, current_user.id),
         })
     finally:
         db.close()
 
 
+@app.post("/users/me/notifications/read-all")
+def mark_all_my_notifications_read(current_user: User = Depends(require_role("user"))):
+    return mark_my_notifications_read(NotificationsMarkReadRequest(), current_user=current_user)
+
 
 @app.get("/admin/promo-campaigns")
 def admin_list_promo_campaigns(current_user: User = Depends(require_role("admin"))):
@@ -11689,7 +11912,7 @@ def admin_update_promo_campaign(
 
 
 @app.get("/promo-campaigns/validate/{code}")
-def validate_promo_campaign(code: str):
+def validate_promo_campaign(code: str, request: Request, response: Response):
     clean_code = str(code or "").strip().upper()
 
     if not clean_code:
@@ -11718,6 +11941,12 @@ def validate_promo_campaign(code: str):
         if campaign.max_uses is not None and campaign.uses_count >= campaign.max_uses:
             raise HTTPException(status_code=409, detail="PROMO_CODE_LIMIT_REACHED")
 
+        # Ważność jest sprawdzona wyżej przy każdym żądaniu — 304 tylko dla wciąż ważnego kodu.
+        etag = compute_etag("promo_campaign", campaign.id, campaign.updated_at, campaign.uses_count)
+        cached = not_modified(request, response, etag, cache_control=PUBLIC_REVALIDATE)
+        if cached is not None:
+            return cached
+
         return ok({
             "code": campaign.code,
             "name": campaign.name,
@@ -0,0 +1,370 @@
+"""Archiwum starych wiadomości (zimny magazyn) i odczyt historii z niego.
+
+Wiadomości starsze niż MESSAGE_ARCHIVE_AFTER_DAYS są przenoszone z
+messages do message_archives: jedna paczka na rozmowę i miesiąc w każdej
+partii, JSON Lines skompresowany zlib (jak audit_log_archives). Tabela
+messages trzyma więc tylko "gorące" okno, po którym chodzą listy rozmów,
+liczniki nieprzeczytanych i wysyłka.
+
+- Nieprzeczytane wiadomości prywatne zostają w messages, żeby liczniki
+  nieprzeczytanych i oznaczanie jako przeczytane działały bez archiwum.
+  Razem z nimi zostają nowsze wiadomości tej rozmowy: rozmowa trafia do
+  archiwum tylko do swojej najstarszej nieprzeczytanej wiadomości, więc
+  archiwum zawsze jest starszym początkiem historii.
+- Historia (/messages/private/{id}, /messages/group/{id}) jest rosnąca po
+  dacie, więc archiwum to jej początek: archived_page() liczy wiadomości z
+  indeksu wskaźników (row_count) i rozpakowuje tylko paczki, które obejmuje
+  żądana strona; dalsza część strony pochodzi z messages.
+- Ostatnia wiadomość rozmowy, która w całości trafiła do archiwum, jest
+  czytana z kolumn last_* jej najnowszej paczki, bez rozpakowywania
+  (latest_archived_private_messages) — lista rozmów to gorąca ścieżka.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Iterable
+
+from sqlalchemy import and_, delete, exists, func, or_, select
+from sqlalchemy.orm import Session, aliased, defer
+
+from backend.logger import get_logger
+from backend.models import Message, MessageArchive
+
+
+log = get_logger(__name__)
+
+DEFAULT_MESSAGE_ARCHIVE_AFTER_DAYS = 180
+DEFAULT_MESSAGE_ARCHIVE_BATCH_SIZE = 5_000
+DEFAULT_MESSAGE_ARCHIVE_MAX_BATCHES = 20
+
+
+@dataclass(frozen=True)
+class MessageArchiveConfig:
+    after_days: int = DEFAULT_MESSAGE_ARCHIVE_AFTER_DAYS
+    batch_size: int = DEFAULT_MESSAGE_ARCHIVE_BATCH_SIZE
+    max_batches: int = DEFAULT_MESSAGE_ARCHIVE_MAX_BATCHES
+
+
+def load_message_archive_config() -> MessageArchiveConfig:
+    """Ładuje konfigurację archiwum wiadomości ze zmiennych środowiskowych."""
+
+    after_days = int(
+        os.getenv("MESSAGE_ARCHIVE_AFTER_DAYS", str(DEFAULT_MESSAGE_ARCHIVE_AFTER_DAYS))
+    )
+    batch_size = int(
+        os.getenv("MESSAGE_ARCHIVE_BATCH_SIZE", str(DEFAULT_MESSAGE_ARCHIVE_BATCH_SIZE))
+    )
+    if after_days <= 0 or batch_size <= 0:
+        raise ValueError(
+            "MESSAGE_ARCHIVE_AFTER_DAYS i MESSAGE_ARCHIVE_BATCH_SIZE muszą być większe od zera"
+        )
+    return MessageArchiveConfig(after_days=after_days, batch_size=batch_size)
+
+
+# --- klucze rozmów ---
+
+
+def private_conversation_key(user_a: int, user_b: int) -> str:
+    low, high = sorted((user_a, user_b))
+    return f"p:{low}:{high}"
+
+
+def group_conversation_key(group_id: int) -> str:
+    return f"g:{group_id}"
+
+
+def _conversation_key(message: Message) -> str:
+    if message.group_id is not None:
+        return group_conversation_key(message.group_id)
+    return private_conversation_key(message.sender_user_id, message.recipient_user_id)
+
+
+def _month(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+# --- zapis ---
+
+
+def _message_to_dict(message: Message) -> dict[str, Any]:
+    return {
+        "id": message.id,
+        "sender_user_id": message.sender_user_id,
+        "recipient_user_id": message.recipient_user_id,
+        "group_id": message.group_id,
+        "content": message.content,
+        "created_at": message.created_at.isoformat() if message.created_at else None,
+        "is_read": message.is_read,
+    }
+
+
+def _encode(rows: list[dict[str, Any]]) -> bytes:
+    lines = "\n".join(json.dumps(row, ensure_ascii=False) for row in rows)
+    return zlib.compress(lines.encode("utf-8"), 9)
+
+
+def _sender_ids(rows: Iterable[dict[str, Any]]) -> str:
+    return "," + ",".join(str(sender) for sender in sorted({row["sender_user_id"] for row in rows})) + ","
+
+
+def _segment(conversation_key: str, messages: list[Message]) -> MessageArchive:
+    first, last = messages[0], messages[-1]
+    rows = [_message_to_dict(message) for message in messages]
+    low = high = None
+    if first.group_id is None:
+        low, high = sorted((first.sender_user_id, first.recipient_user_id))
+    return MessageArchive(
+        conversation_key=conversation_key,
+        group_id=first.group_id,
+        user_low_id=low,
+        user_high_id=high,
+        month=_month(first.created_at),
+        first_message_id=first.id,
+        last_message_id=last.id,
+        first_created_at=first.created_at,
+        last_created_at=last.created_at,
+        row_count=len(rows),
+        sender_user_ids=_sender_ids(rows),
+        last_sender_user_id=last.sender_user_id,
+        last_content=last.content,
+        payload=_encode(rows),
+        archived_at=datetime.utcnow(),
+    )
+
+
+def _older_unread_in_conversation():
+    """Czy rozmowa prywatna wiadomości ma starszą nieprzeczytaną wiadomość."""
+
+    unread = aliased(Message)
+    return exists().where(
+        unread.group_id.is_(None),
+        unread.is_read.is_(False),
+        or_(
+            and_(unread.sender_user_id == Message.sender_user_id, unread.recipient_user_id == Message.recipient_user_id),
+            and_(unread.sender_user_id == Message.recipient_user_id, unread.recipient_user_id == Message.sender_user_id),
+        ),
+        or_(
+            unread.created_at < Message.created_at,
+            and_(unread.created_at == Message.created_at, unread.id < Message.id),
+        ),
+    )
+
+
+def archive_messages(
+    db: Session,
+    config: MessageArchiveConfig | None = None,
+    *,
+    now: datetime | None = None,
+) -> dict:
+    """Przenosi stare wiadomości do message_archives.
+
+    Każda partia (najwyżej batch_size wiadomości, najstarsze najpierw) to
+    osobna, krótka transakcja: INSERT paczek (po jednej na rozmowę i
+    miesiąc) i DELETE przeniesionych wierszy po id.
+    """
+
+    config = config or MessageArchiveConfig()
+    cutoff = (now or datetime.utcnow()) - timedelta(days=config.after_days)
+    archived_rows = 0
+    archive_segments = 0
+
+    for _ in range(config.max_batches):
+        messages = db.scalars(
+            select(Message)
+            .where(
+                Message.created_at < cutoff,
+                or_(
+                    Message.group_id.is_not(None),
+                    and_(Message.is_read.is_(True), ~_older_unread_in_conversation()),
+                ),
+            )
+            .order_by(Message.created_at.asc(), Message.id.asc())
+            .limit(config.batch_size)
+        ).all()
+        if not messages:
+            break
+
+        segments: dict[tuple[str, datetime], list[Message]] = {}
+        for message in messages:
+            segments.setdefault((_conversation_key(message), _month(message.created_at)), []).append(message)
+
+        try:
+            db.add_all([_segment(key, rows) for (key, _month_start), rows in segments.items()])
+            db.execute(
+                delete(Message)
+                .where(Message.id.in_([message.id for message in messages]))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        db.expunge_all()
+        archived_rows += len(messages)
+        archive_segments += len(segments)
+        if len(messages) < config.batch_size:
+            break
+
+    if archived_rows:
+        log.info("Archived %s messages into %s segments", archived_rows, archive_segments)
+    return {
+        "archived_rows": archived_rows,
+        "archive_segments": archive_segments,
+    }
+
+
+# --- odczyt ---
+
+
+def read_message_archive(segment: MessageArchive) -> list[dict[str, Any]]:
+    """Rozpakowuje paczkę do listy wiadomości (created_at jako datetime)."""
+
+    raw = zlib.decompress(segment.payload).decode("utf-8")
+    rows = [json.loads(line) for line in raw.splitlines() if line]
+    for row in rows:
+        if row.get("created_at"):
+            row["created_at"] = datetime.fromisoformat(row["created_at"])
+    return rows
+
+
+def _has_sender(segment: MessageArchive, sender_ids: set[int]) -> bool:
+    return any(f",{sender_id}," in segment.sender_user_ids for sender_id in sender_ids)
+
+
+def archived_page(
+    db: Session,
+    conversation_key: str,
+    *,
+    offset: int,
+    limit: int,
+    hidden_sender_ids: set[int] | None = None,
+) -> tuple[list[dict[str, Any]], int]:
+    """Wycinek [offset, offset + limit) archiwum rozmowy; zwraca (items, archived_total)."""
+
+    hidden = hidden_sender_ids or set()
+    # payload doczytywany tylko dla paczek, które strona faktycznie obejmuje.
+    segments = db.scalars(
+        select(MessageArchive)
+        .options(defer(MessageArchive.payload))
+        .where(MessageArchive.conversation_key == conversation_key)
+        .order_by(MessageArchive.first_created_at.asc(), MessageArchive.first_message_id.asc())
+    ).all()
+
+    items: list[dict[str, Any]] = []
+    position = 0
+    for segment in segments:
+        rows = None
+        if hidden and _has_sender(segment, hidden):
+            rows = [row for row in read_message_archive(segment) if row["sender_user_id"] not in hidden]
+            count = len(rows)
+        else:
+            count = segment.row_count
+
+        start, end = position, position + count
+        if len(items) < limit and end > offset:
+            if rows is None:
+                rows = read_message_archive(segment)
+            items.extend(rows[max(offset - start, 0):][: limit - len(items)])
+        position = end
+    return items, position
+
+
+def latest_archived_private_messages(
+    db: Session,
+    user_id: int,
+    exclude_other_user_ids: Iterable[int] = (),
+) -> dict[int, dict[str, Any]]:
+    """Ostatnia zarchiwizowana wiadomość per rozmówca (dla rozmów bez gorących wiadomości)."""
+
+    excluded = set(exclude_other_user_ids)
+    own = or_(MessageArchive.user_low_id == user_id, MessageArchive.user_high_id == user_id)
+    newest = (
+        select(MessageArchive.conversation_key, func.max(MessageArchive.last_message_id).label("last_message_id"))
+        .where(own)
+        .group_by(MessageArchive.conversation_key)
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            MessageArchive.user_low_id,
+            MessageArchive.user_high_id,
+            MessageArchive.last_message_id,
+            MessageArchive.last_sender_user_id,
+            MessageArchive.last_content,
+            MessageArchive.last_created_at,
+        )
+        .join(
+            newest,
+            and_(
+                newest.c.conversation_key == MessageArchive.conversation_key,
+                newest.c.last_message_id == MessageArchive.last_message_id,
+            ),
+        )
+        .where(own)
+    ).all()
+
+    latest: dict[int, dict[str, Any]] = {}
+    for low, high, last_message_id, sender_id, content, created_at in rows:
+        other = high if low == user_id else low
+        if other in excluded:
+            continue
+        latest[other] = {
+            "id": last_message_id,
+            "sender_user_id": sender_id,
+            "recipient_user_id": other if sender_id == user_id else user_id,
+            "group_id": None,
+            "content": content,
+            "created_at": created_at,
+        }
+    return latest
+
+
+# --- usuwanie konta ---
+
+
+def archived_messages_of(user_id: int):
+    """Paczki z rozmowami prywatnymi użytkownika albo z jego wiadomościami w grupach."""
+
+    return or_(
+        MessageArchive.user_low_id == user_id,
+        MessageArchive.user_high_id == user_id,
+        MessageArchive.sender_user_ids.like(f"%,{user_id},%"),
+    )
+
+
+def purge_user_from_archives(db: Session, user_id: int, batch_size: int) -> int:
+    """Krok usuwania konta: paczki prywatne użytkownika znikają, z grupowych
+    są wycinane jego wiadomości. Zwraca liczbę przetworzonych paczek."""
+
+    segments = db.scalars(
+        select(MessageArchive)
+        .where(archived_messages_of(user_id))
+        .order_by(MessageArchive.id)
+        .limit(batch_size)
+    ).all()
+
+    for segment in segments:
+        if segment.group_id is None:
+            db.delete(segment)
+            continue
+        rows = [row for row in read_message_archive(segment) if row["sender_user_id"] != user_id]
+        if not rows:
+            db.delete(segment)
+            continue
+        segment.first_message_id, segment.first_created_at = rows[0]["id"], rows[0]["created_at"]
+        segment.last_message_id, segment.last_created_at = rows[-1]["id"], rows[-1]["created_at"]
+        segment.last_sender_user_id = rows[-1]["sender_user_id"]
+        segment.last_content = rows[-1]["content"]
+        for row in rows:
+            row["created_at"] = row["created_at"].isoformat() if row.get("created_at") else None
+        segment.row_count = len(rows)
+        segment.sender_user_ids = _sender_ids(rows)
+        segment.payload = _encode(rows)
+    db.flush()
+    return len(segments)
@@ -0,0 +1,295 @@
+"""Metryki HTTP i SQL w formacie tekstowym Prometheusa.
+
+MetricsMiddleware to czysty middleware ASGI (bez BaseHTTPMiddleware,
+który opakowuje każde żądanie w dodatkowe taski i strumienie). Dla
+każdego żądania:
+
+- nadaje/propaguje X-Request-ID (request.state.request_id) i przypina
+  go do logów z tego żądania (backend.logger.bind_request_id),
+- mierzy czas do końca odpowiedzi i zapisuje go w histogramie per
+  (metoda, szablon ścieżki), np. "/events/{event_id}" — nie surowy URL,
+  więc liczba serii jest ograniczona liczbą tras,
+- liczy odpowiedzi per status oraz żądania w toku,
+- zbiera liczbę i czas zapytań SQL wykonanych w ramach żądania
+  (hooki silnika SQLAlchemy + ContextVar; działa także dla handlerów
+  synchronicznych w threadpoolu, bo dostają kopię kontekstu).
+
+Metryki są per proces — przy kilku workerach uvicorn każdy ma własne
+liczniki, a scrape trafia do jednego z nich.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.logger import bind_request_id, get_logger, reset_request_id
+
+
+log = get_logger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+DB_STATEMENT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+UNMATCHED_ROUTE = "unmatched"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    def __init__(self, buckets: Iterable[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        # Kubełki Prometheusa są włączne: value <= le.
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        result = []
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            result.append((_format_value(bound), running))
+        result.append(("+Inf", self.count))
+        return result
+
+
+@dataclass
+class RequestDbStats:
+    queries: int = 0
+    seconds: float = 0.0
+
+
+_request_db_stats: ContextVar[RequestDbStats | None] = ContextVar("request_db_stats", default=None)
+
+
+@dataclass(frozen=True)
+class Gauge:
+    """Pojedyncza wartość z zewnętrznego kolektora (monitor pętli, cache itp.)."""
+
+    name: str
+    help: str
+    value: float
+    type: str = "gauge"
+
+
+def _format_value(value: float) -> str:
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items())
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests_total: dict[tuple[str, str, str], int] = {}
+        self.request_seconds: dict[tuple[str, str], Histogram] = {}
+        self.request_db_queries: dict[tuple[str, str], Histogram] = {}
+        self.request_db_seconds: dict[tuple[str, str], float] = {}
+        self.in_flight = 0
+        self.db_statements_total = 0
+        self.db_statement_seconds = Histogram(DB_STATEMENT_BUCKETS)
+        self._collectors: list[Callable[[], Iterable[Gauge]]] = []
+
+    # --- zapis ---
+
+    def request_started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        db: RequestDbStats,
+    ) -> None:
+        key = (method, route)
+        with self._lock:
+            self.in_flight -= 1
+
+            status_key = (method, route, str(status))
+            self.requests_total[status_key] = self.requests_total.get(status_key, 0) + 1
+
+            histogram = self.request_seconds.get(key)
+            if histogram is None:
+                histogram = self.request_seconds[key] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+
+            queries = self.request_db_queries.get(key)
+            if queries is None:
+                queries = self.request_db_queries[key] = Histogram(DB_QUERY_COUNT_BUCKETS)
+            queries.observe(db.queries)
+            self.request_db_seconds[key] = self.request_db_seconds.get(key, 0.0) + db.seconds
+
+    def observe_statement(self, seconds: float) -> None:
+        with self._lock:
+            self.db_statements_total += 1
+            self.db_statement_seconds.observe(seconds)
+
+        stats = _request_db_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += seconds
+
+    def register_collector(self, collector: Callable[[], Iterable[Gauge]]) -> None:
+        self._collectors.append(collector)
+
+    # --- eksport ---
+
+    def render(self) -> str:
+        lines: list[str] = []
+
+        def header(name: str, metric_type: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+        def histogram(name: str, labels: dict, hist: Histogram) -> None:
+            for le, count in hist.cumulative():
+                lines.append(f"{name}_bucket{{{_labels(**labels, le=le)}}} {count}")
+            suffix = f"{{{_labels(**labels)}}}" if labels else ""
+            lines.append(f"{name}_sum{suffix} {hist.sum!r}")
+            lines.append(f"{name}_count{suffix} {hist.count}")
+
+        with self._lock:
+            header("http_requests_total", "counter", "HTTP responses by route template and status.")
+            for (method, route, status), count in sorted(self.requests_total.items()):
+                lines.append(f"http_requests_total{{{_labels(method=method, route=route, status=status)}}} {count}")
+
+            header("http_request_duration_seconds", "histogram", "Time until the response body was sent.")
+            for (method, route), hist in sorted(self.request_seconds.items()):
+                histogram("http_request_duration_seconds", {"method": method, "route": route}, hist)
+
+            header("http_requests_in_flight", "gauge", "Requests currently being processed.")
+            lines.append(f"http_requests_in_flight {self.in_flight}")
+
+            header("http_request_db_queries", "histogram", "SQL statements executed per request.")
+            for (method, route), hist in sorted(self.request_db_queries.items()):
+                histogram("http_request_db_queries", {"method": method, "route": route}, hist)
+
+            header("http_request_db_seconds_total", "counter", "Time spent in SQL statements by route.")
+            for (method, route), seconds in sorted(self.request_db_seconds.items()):
+                lines.append(f"http_request_db_seconds_total{{{_labels(method=method, route=route)}}} {seconds!r}")
+
+            header("db_statements_total", "counter", "SQL statements executed (requests and background jobs).")
+            lines.append(f"db_statements_total {self.db_statements_total}")
+
+            header("db_statement_duration_seconds", "histogram", "Duration of single SQL statements.")
+            histogram("db_statement_duration_seconds", {}, self.db_statement_seconds)
+
+        for collector in self._collectors:
+            try:
+                gauges = list(collector())
+            except Exception:
+                log.exception("Metrics collector %r failed", collector)
+                continue
+            for gauge in gauges:
+                header(gauge.name, gauge.type, gauge.help)
+                lines.append(f"{gauge.name} {float(gauge.value)!r}")
+
+        return "\n".join(lines) + "\n"
+
+
+def route_template(scope: Scope) -> str:
+    # FastAPI zapisuje dopasowaną trasę w scope["route"] (APIRoute.matches).
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        registry: MetricsRegistry,
+        *,
+        request_id_header: str = "X-Request-ID",
+    ) -> None:
+        self.app = app
+        self.registry = registry
+        self.request_id_header = request_id_header.lower().encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == self.request_id_header:
+                request_id = value.decode("latin-1").strip() or None
+                break
+        request_id = request_id or str(uuid.uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        status = 500
+        header = (self.request_id_header, request_id.encode("latin-1"))
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # Handlery wyjątków mogą już ustawić ten nagłówek — nie dublujemy go.
+                headers = [item for item in message.get("headers", ()) if item[0].lower() != header[0]]
+                message["headers"] = [*headers, header]
+            await send(message)
+
+        db_stats = RequestDbStats()
+        token = _request_db_stats.set(db_stats)
+        log_token = bind_request_id(request_id)
+        self.registry.request_started()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.registry.request_finished(
+                scope["method"],
+                route_template(scope),
+                status,
+                time.perf_counter() - started,
+                db_stats,
+            )
+            _request_db_stats.reset(token)
+            reset_request_id(log_token)
+
+
+def instrument_engine(engine: Engine, registry: MetricsRegistry) -> None:
+    """Podpina liczenie zapytań SQL i ich czasu pod silnik SQLAlchemy."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["metrics_query_started"].pop()
+        registry.observe_statement(time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None:
+            stack = conn.info.get("metrics_query_started")
+            if stack:
+                registry.observe_statement(time.perf_counter() - stack.pop())
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime, date
 from enum import StrEnum
 
-from sqlalchemy import String, DateTime, Date, ForeignKey, Text, CheckConstraint, Index, Integer, UniqueConstraint, Boolean, Float
+from sqlalchemy import func, String, DateTime, Date, ForeignKey, Text, CheckConstraint, Index, Integer, UniqueConstraint, Boolean, Float, LargeBinary
 from sqlalchemy.orm import Mapped, mapped_column
 
 from backend.db.database import Base
@@ -153,6 +153,13 @@ class User(Base):
         index=True,
     )
 
+    # Nieprzeczytane user_notifications; utrzymywany przez backend/notifications.py.
+    unread_notifications_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
@@ -293,6 +300,7 @@ class UserProfile(Base):
         DateTime(timezone=True),
         nullable=False,
         default=datetime.utcnow,
+        onupdate=datetime.utcnow,
     )
 
 
@@ -430,6 +438,7 @@ class PartnerProfile(Base):
         DateTime(timezone=True),
         nullable=False,
         default=datetime.utcnow,
+        onupdate=datetime.utcnow,
     )
 
 
@@ -450,12 +459,14 @@ class AuditLog(Base):
     action: Mapped[str] = mapped_column(
         String(50),
         nullable=False,
+        index=True,
     )
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
         default=datetime.utcnow,
+        index=True,
     )
 
     ip: Mapped[str | None] = mapped_column(
@@ -473,6 +484,63 @@ class AuditLog(Base):
         nullable=True,
     )
 
+    __table_args__ = (
+        Index("ix_audit_logs_action_created", "action", "created_at"),
+    )
+
+
+class AuditLogArchive(Base):
+    """Skompresowana paczka starych wpisów AuditLog.
+
+    Wpisy starsze niż okres retencji są przenoszone z audit_logs do tej
+    tabeli jako JSON Lines skompresowany zlib. Zakres id i created_at
+    pozwala znaleźć paczkę bez rozpakowywania payloadu.
+    """
+
+    __tablename__ = "audit_log_archives"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    first_log_id: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        index=True,
+    )
+
+    last_log_id: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        index=True,
+    )
+
+    row_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+    )
+
+    period_start: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        index=True,
+    )
+
+    period_end: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        index=True,
+    )
+
+    payload: Mapped[bytes] = mapped_column(
+        LargeBinary,
+        nullable=False,
+    )
+
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+
 
 # =====================
 # EVENTS
@@ -581,6 +649,7 @@ class Event(Base):
         DateTime(timezone=True),
         nullable=False,
         default=datetime.utcnow,
+        onupdate=datetime.utcnow,
     )
 
     __table_args__ = (
@@ -662,6 +731,8 @@ class EventSignup(Base):
 
     __table_args__ = (
     Index("ix_event_signups_event_user", "event_id", "user_id"),
+    # lista uczestników partnera: od najnowszych, kursor (created_at, id)
+    Index("ix_event_signups_event_created", "event_id", "created_at", "id"),
     # nie pozwala zapisać się 2x na ten sam event
     # (event_id,user_id) musi być unikalne
     UniqueConstraint("event_id", "user_id", name="uq_event_signups_event_user"),
@@ -697,6 +768,7 @@ class EventSave(Base):
 
     __table_args__ = (
         Index("ix_event_saves_event_user", "event_id", "user_id"),
+        Index("ix_event_saves_event_created", "event_id", "created_at", "id"),
         UniqueConstraint("event_id", "user_id", name="uq_event_saves_event_user"),
     )
 
@@ -731,7 +803,6 @@ class Group(Base):
     interest_tag: Mapped[str] = mapped_column(
         String(50),
         nullable=False,
-        index=True,
     )
 
     members_count: Mapped[int] = mapped_column(
@@ -750,6 +821,7 @@ class Group(Base):
         DateTime(timezone=True),
         nullable=False,
         default=datetime.utcnow,
+        onupdate=datetime.utcnow,
     )
 
     __table_args__ = (
@@ -757,6 +829,14 @@ class Group(Base):
     )
 
 
+# Top-N grup per tag (interest_tag jest zapisywany znormalizowany) i ogółem,
+# w kolejności list: members_count DESC, id ASC.
+Index("ix_groups_interest_tag_members", Group.interest_tag, Group.members_count.desc(), Group.id)
+Index("ix_groups_members_count", Group.members_count.desc(), Group.id)
+# Wyszukiwanie po prefiksie tytułu (/groups/search).
+Index("ix_groups_title_lower", func.lower(Group.title))
+
+
 # =====================
 # GROUP MEMBERSHIPS
 # =====================
@@ -856,6 +936,108 @@ class Message(Base):
         Index("ix_messages_group_thread", "group_id", "created_at"),
     )
 
+
+class MessageArchive(Base):
+    """Skompresowana paczka starych wiadomości jednej rozmowy z jednego miesiąca.
+
+    Wiadomości starsze niż MESSAGE_ARCHIVE_AFTER_DAYS są przenoszone z
+    messages (backend/message_archive.py) jako JSON Lines skompresowany
+    zlib. Kolumny poza payload to indeks wskaźników: rozmowa, zakres id i
+    dat, liczba wiadomości i nadawcy — pozwalają stronicować historię bez
+    rozpakowywania paczek, których strona nie obejmuje.
+    """
+
+    __tablename__ = "message_archives"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    # "g:<group_id>" albo "p:<niższe user_id>:<wyższe user_id>"
+    conversation_key: Mapped[str] = mapped_column(
+        String(40),
+        nullable=False,
+    )
+
+    group_id: Mapped[int | None] = mapped_column(
+        ForeignKey("groups.id", ondelete="CASCADE"),
+        nullable=True,
+        index=True,
+    )
+
+    user_low_id: Mapped[int | None] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=True,
+        index=True,
+    )
+
+    user_high_id: Mapped[int | None] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=True,
+        index=True,
+    )
+
+    # Pierwszy dzień miesiąca, z którego pochodzą wiadomości.
+    month: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )
+
+    first_message_id: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+    )
+
+    last_message_id: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+    )
+
+    first_created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )
+
+    last_created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )
+
+    row_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+    )
+
+    # ",3,17," — nadawcy w paczce; filtr LIKE bez rozpakowywania.
+    sender_user_ids: Mapped[str] = mapped_column(
+        Text,
+        nullable=False,
+    )
+
+    # Podgląd ostatniej wiadomości dla listy rozmów — bez rozpakowywania payload.
+    last_sender_user_id: Mapped[int | None] = mapped_column(
+        Integer,
+        nullable=True,
+    )
+
+    last_content: Mapped[str | None] = mapped_column(
+        Text,
+        nullable=True,
+    )
+
+    payload: Mapped[bytes] = mapped_column(
+        LargeBinary,
+        nullable=False,
+    )
+
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+
+    __table_args__ = (
+        Index("ix_message_archives_conversation", "conversation_key", "first_created_at", "first_message_id"),
+    )
+
 # =====================
 # FRIENDSHIPS / FRIEND REQUESTS
 # =====================
@@ -1267,9 +1449,18 @@ class UserNotification(Base):
         DateTime(timezone=True),
         nullable=True,
         default=None,
+        index=True,
     )
 
 
+# Feed powiadomień: WHERE user_id = ? ORDER BY created_at DESC, id DESC (kursor keyset).
+Index(
+    "ix_user_notifications_user_created",
+    UserNotification.user_id,
+    UserNotification.created_at.desc(),
+    UserNotification.id.desc(),
+)
+
 
 # =====================
 # DEVICE PUSH TOKENS
@@ -1486,6 +1677,7 @@ class PromoCampaign(Base):
         DateTime(timezone=True),
         nullable=False,
         default=datetime.utcnow,
+        onupdate=datetime.utcnow,
     )
 
     __table_args__ = (
@@ -1856,3 +2048,355 @@ class StorePurchase(Base):
         Index("ix_store_purchases_user_status", "user_id", "status"),
     )
 
+
+
+# =====================
+# REVERSE GEOCODE CACHE
+# =====================
+
+class ReverseGeocodeCache(Base):
+    """Miasto dla współrzędnych zaokrąglonych do 0,01° (klucz = wartość * 100).
+
+    source: "local" (wbudowany indeks miejscowości) albo "nominatim"
+    (opcjonalny zdalny fallback).
+    """
+
+    __tablename__ = "reverse_geocode_cache"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    lat_key: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+    )
+
+    lng_key: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+    )
+
+    city: Mapped[str] = mapped_column(
+        String(80),
+        nullable=False,
+    )
+
+    source: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+
+    __table_args__ = (
+        UniqueConstraint("lat_key", "lng_key", name="uq_reverse_geocode_cache_key"),
+    )
+
+
+# =====================
+# PLACES SEARCH CACHE
+# =====================
+
+class PlacesSearchCache(Base):
+    """Wyniki Google Places searchText dla znormalizowanego zapytania.
+
+    query_key to sha256 z "zapytanie|miasto" po normalizacji; wpisy po
+    expires_at są ignorowane i usuwane przez scheduler.
+    """
+
+    __tablename__ = "places_search_cache"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    query_key: Mapped[str] = mapped_column(
+        String(64),
+        nullable=False,
+        unique=True,
+    )
+
+    query: Mapped[str] = mapped_column(
+        String(300),
+        nullable=False,
+    )
+
+    items_json: Mapped[str] = mapped_column(
+        Text,
+        nullable=False,
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        index=True,
+    )
+
+
+class ScheduledJob(Base):
+    """Stan okresowego zadania schedulera (lease + statystyki ostatniego uruchomienia).
+
+    Wiersz na zadanie. Worker, który atomowo ustawi lease_owner i
+    lease_expires_at, wykonuje zadanie; pozostałe je pomijają.
+    """
+
+    __tablename__ = "scheduled_jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    name: Mapped[str] = mapped_column(
+        String(64),
+        nullable=False,
+        unique=True,
+    )
+
+    next_run_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )
+
+    lease_owner: Mapped[str | None] = mapped_column(
+        String(120),
+        nullable=True,
+    )
+
+    lease_expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+    last_started_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+    last_finished_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+    last_duration_ms: Mapped[int | None] = mapped_column(
+        Integer,
+        nullable=True,
+    )
+
+    last_rows: Mapped[int | None] = mapped_column(
+        Integer,
+        nullable=True,
+    )
+
+    last_status: Mapped[str | None] = mapped_column(
+        String(16),
+        nullable=True,
+    )
+
+    last_error: Mapped[str | None] = mapped_column(
+        Text,
+        nullable=True,
+    )
+
+    last_worker: Mapped[str | None] = mapped_column(
+        String(120),
+        nullable=True,
+    )
+
+    run_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
+    failure_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
+
+class RequestProfile(Base):
+    """Profil pojedynczego żądania (folded stacks + zapytania SQL), zapisany pod X-Request-ID."""
+
+    __tablename__ = "request_profiles"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    request_id: Mapped[str] = mapped_column(
+        String(64),
+        nullable=False,
+        unique=True,
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        index=True,
+    )
+
+    user_id: Mapped[int | None] = mapped_column(
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+
+    # header | sample
+    trigger: Mapped[str] = mapped_column(
+        String(16),
+        nullable=False,
+    )
+
+    method: Mapped[str] = mapped_column(
+        String(10),
+        nullable=False,
+    )
+
+    route: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False,
+    )
+
+    path: Mapped[str] = mapped_column(
+        String(500),
+        nullable=False,
+    )
+
+    status_code: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+    )
+
+    duration_ms: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+    )
+
+    sample_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
+    sql_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
+    sql_ms: Mapped[float] = mapped_column(
+        Float,
+        nullable=False,
+        default=0.0,
+    )
+
+    statements_json: Mapped[str] = mapped_column(
+        Text,
+        nullable=False,
+    )
+
+    folded: Mapped[str] = mapped_column(
+        Text,
+        nullable=False,
+    )
+
+
+# =====================
+# ACCOUNT DELETION JOBS
+# =====================
+
+class AccountDeletionJob(Base):
+    """Usuwanie danych konta w tle, partiami (backend/account_deletion.py).
+
+    Konto jest oznaczane jako usunięte od razu w żądaniu; ten wiersz
+    opisuje sprzątanie powiązań: bieżący krok, liczniki usuniętych wierszy
+    per krok i ewentualny błąd. Zadanie wznawia się od current_step.
+    """
+
+    __tablename__ = "account_deletion_jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+    )
+
+    requested_by_user_id: Mapped[int | None] = mapped_column(
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+
+    # pending | running | done | failed
+    status: Mapped[str] = mapped_column(
+        String(16),
+        nullable=False,
+        default="pending",
+    )
+
+    current_step: Mapped[str | None] = mapped_column(
+        String(64),
+        nullable=True,
+    )
+
+    deleted_rows: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
+    # {"krok": liczba_wierszy, ...}
+    progress_json: Mapped[str] = mapped_column(
+        Text,
+        nullable=False,
+        default="{}",
+    )
+
+    # Grupy (nie własne), z których użytkownik był usuwany — do przeliczenia members_count.
+    affected_group_ids_json: Mapped[str] = mapped_column(
+        Text,
+        nullable=False,
+        default="[]",
+    )
+
+    attempts: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
+    last_error: Mapped[str | None] = mapped_column(
+        Text,
+        nullable=True,
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+
+    started_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+    finished_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+
+    __table_args__ = (
+        Index("ix_account_deletion_jobs_status_id", "status", "id"),
+    )
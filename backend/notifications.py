@@ -0,0 +1,214 @@
+"""Feed powiadomień użytkownika (/users/me/notifications) i licznik nieprzeczytanych.
+
+- users.unread_notifications_count to zdenormalizowany licznik
+  nieprzeczytanych powiadomień. Zmiany przez ORM (dodanie powiadomienia,
+  ustawienie read_at, usunięcie) poprawia listener after_flush w tej samej
+  transakcji; operacje zbiorcze z tego modułu poprawiają go same. Dzięki
+  temu /users/me/notifications/unread-count to odczyt jednej kolumny po
+  kluczu głównym — nadaje się do odpytywania.
+- Feed jest stronicowany kursorem keyset (created_at, id) po indeksie
+  ix_user_notifications_user_created.
+- "Oznacz wszystkie" i "oznacz do id" to pojedyncze UPDATE-y.
+- Usunięcia z pominięciem ORM (Core DELETE, kaskada FK z events) nie
+  przechodzą przez listener — takie ścieżki usuwają powiadomienia przez
+  delete_notifications(), która najpierw zmniejsza liczniki.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import case, delete, event as sa_event, func, inspect, select, update
+from sqlalchemy.orm import Session
+
+from backend.models import Event, User, UserNotification
+from backend.pagination import after_cursor_desc, encode_cursor
+
+
+# --- licznik ---
+
+
+def _unread_delta(session) -> Counter:
+    delta: Counter = Counter()
+    for obj in session.new:
+        if isinstance(obj, UserNotification) and obj.read_at is None:
+            delta[obj.user_id] += 1
+    for obj in session.deleted:
+        if isinstance(obj, UserNotification) and obj.read_at is None:
+            delta[obj.user_id] -= 1
+    for obj in session.dirty:
+        if not isinstance(obj, UserNotification) or obj in session.deleted:
+            continue
+        history = inspect(obj).attrs.read_at.history
+        # Bez poprzedniej wartości (atrybut niezaładowany) nie wiadomo, co się zmieniło.
+        if not history.has_changes() or not history.deleted:
+            continue
+        was_unread = history.deleted[0] is None
+        is_unread = obj.read_at is None
+        if was_unread != is_unread:
+            delta[obj.user_id] += 1 if is_unread else -1
+    return delta
+
+
+def _adjust_unread(connection_or_session, user_id: int, delta: int) -> None:
+    current = User.unread_notifications_count
+    connection_or_session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(unread_notifications_count=case((current + delta < 0, 0), else_=current + delta))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _sync_after_flush(session, flush_context) -> None:
+    delta = _unread_delta(session)
+    if not any(delta.values()):
+        return
+    connection = session.connection()
+    for user_id, change in delta.items():
+        if change:
+            _adjust_unread(connection, user_id, change)
+
+
+def install_notification_counters(session_factory) -> None:
+    """Podpina utrzymanie licznika pod sesje z session_factory (idempotentne)."""
+
+    if not sa_event.contains(session_factory, "after_flush", _sync_after_flush):
+        sa_event.listen(session_factory, "after_flush", _sync_after_flush)
+
+
+def recount_unread_notifications(db: Session, user_ids: list[int] | None = None) -> int:
+    """Przelicza licznik od zera, np. po wstawieniu powiadomień z pominięciem ORM. Bez commit."""
+
+    unread = (
+        select(func.count(UserNotification.id))
+        .where(UserNotification.user_id == User.id, UserNotification.read_at.is_(None))
+        .scalar_subquery()
+    )
+    statement = update(User).values(unread_notifications_count=unread)
+    if user_ids is not None:
+        statement = statement.where(User.id.in_(user_ids))
+    return db.execute(statement.execution_options(synchronize_session=False)).rowcount
+
+
+def delete_notifications(db: Session, condition, *, limit: int | None = None) -> int:
+    """Usuwa powiadomienia spełniające condition (opcjonalnie najwyżej limit
+    najstarszych) i zmniejsza liczniki ich odbiorców; zwraca liczbę usuniętych. Bez commit."""
+
+    ids = select(UserNotification.id).where(condition).order_by(UserNotification.id)
+    if limit is not None:
+        ids = ids.limit(limit)
+    ids = ids.scalar_subquery()
+
+    # Ta sama partia (podzapytanie z LIMIT) dla korekty liczników i DELETE.
+    unread = db.execute(
+        select(UserNotification.user_id, func.count(UserNotification.id))
+        .where(UserNotification.id.in_(ids), UserNotification.read_at.is_(None))
+        .group_by(UserNotification.user_id)
+    ).all()
+    for user_id, count in unread:
+        _adjust_unread(db, user_id, -count)
+
+    return db.execute(
+        delete(UserNotification)
+        .where(UserNotification.id.in_(ids))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def unread_notifications_count(db: Session, user_id: int) -> int:
+    return db.scalar(select(User.unread_notifications_count).where(User.id == user_id)) or 0
+
+
+# --- feed ---
+
+
+def notifications_page(
+    db: Session,
+    user_id: int,
+    *,
+    limit: int,
+    offset: int = 0,
+    cursor: tuple[datetime, int] | None = None,
+) -> tuple[list[dict], str | None]:
+    """Strona feedu od najnowszych; zwraca (items, next_cursor)."""
+
+    query = (
+        select(UserNotification, Event)
+        .outerjoin(Event, Event.id == UserNotification.event_id)
+        .where(UserNotification.user_id == user_id)
+        .order_by(UserNotification.created_at.desc(), UserNotification.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        query = query.where(after_cursor_desc(UserNotification.created_at, UserNotification.id, cursor))
+    elif offset:
+        query = query.offset(offset)
+
+    rows = db.execute(query).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items = [
+        {
+            "notification": {
+                "id": notification.id,
+                "type": notification.type,
+                "created_at": notification.created_at,
+                "read_at": notification.read_at,
+                "event_id": notification.event_id,
+                "partner_user_id": notification.partner_user_id,
+            },
+            "event": {
+                "id": event.id,
+                "title": event.title,
+                "city": event.city,
+                "where": event.where,
+                "start_at": event.start_at,
+                "end_at": event.end_at,
+                "status": event.status,
+            } if event else None,
+        }
+        for notification, event in rows
+    ]
+    last = rows[-1][0] if rows else None
+    next_cursor = encode_cursor(last.created_at, last.id) if has_more else None
+    return items, next_cursor
+
+
+# --- oznaczanie jako przeczytane ---
+
+
+def mark_notifications_read(
+    db: Session,
+    user_id: int,
+    *,
+    up_to_id: int | None = None,
+    now: datetime | None = None,
+) -> int:
+    """Oznacza nieprzeczytane powiadomienia (wszystkie albo o id <= up_to_id)
+    jednym UPDATE-em i zmniejsza licznik; zwraca liczbę oznaczonych. Bez commit."""
+
+    condition = (UserNotification.user_id == user_id) & UserNotification.read_at.is_(None)
+    if up_to_id is not None:
+        condition = condition & (UserNotification.id <= up_to_id)
+
+    marked = db.execute(
+        update(UserNotification)
+        .where(condition)
+        .values(read_at=now or datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    if up_to_id is None:
+        # Po "oznacz wszystkie" licznik jest dokładnie zerem — bez względu na dryf.
+        db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(unread_notifications_count=0)
+            .execution_options(synchronize_session=False)
+        )
+    elif marked:
+        _adjust_unread(db, user_id, -marked)
+    return marked
@@ -0,0 +1,49 @@
+"""Kursory paginacji keyset.
+
+Stronicowanie przez offset każe bazie przejść i wyrzucić wszystkie
+wcześniejsze wiersze, więc każda kolejna strona jest wolniejsza. Kursor
+zapamiętuje klucz sortowania ostatniego zwróconego wiersza
+(created_at, id), a następna strona zaczyna się tuż za nim — po indeksie,
+niezależnie od głębokości.
+
+Kursor jest dla klienta nieprzezroczysty (base64url z JSON-a); klient
+odsyła go bez zmian w parametrze `cursor`.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+from sqlalchemy.sql import ColumnElement
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), int(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeError, ValueError, TypeError) as exc:
+        raise InvalidCursor(cursor) from exc
+
+
+def after_cursor_desc(created_at_column, id_column, cursor: tuple[datetime, int]) -> ColumnElement[bool]:
+    """Warunek "dalej niż kursor" dla ORDER BY created_at DESC, id DESC."""
+
+    created_at, row_id = cursor
+    return or_(
+        created_at_column < created_at,
+        and_(created_at_column == created_at, id_column < row_id),
+    )
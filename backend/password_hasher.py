@@ -0,0 +1,188 @@
+"""Haszowanie i weryfikacja haseł bcrypt w dedykowanej puli procesów.
+
+bcrypt kosztuje ~250 ms CPU na operację. Wykonywany we wspólnej puli
+wątków AnyIO blokuje obsługę innych endpointów podczas fali logowań,
+dlatego obliczenia trafiają do małej, ograniczonej puli procesów:
+
+- liczba procesów: PASSWORD_HASH_WORKERS (0 = obliczenia w bieżącym wątku),
+- limit oczekujących operacji: PASSWORD_HASH_MAX_PENDING; po jego
+  przekroczeniu rzucany jest PasswordHasherBusyError (HTTP 503),
+- koszt bcrypt: PASSWORD_BCRYPT_ROUNDS; hashe z inną liczbą rund są
+  przy udanej weryfikacji przeliczane (verify_and_update).
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+
+from passlib.context import CryptContext
+from passlib.exc import UnknownHashError
+
+
+DEFAULT_PASSWORD_HASH_WORKERS = 2
+DEFAULT_PASSWORD_BCRYPT_ROUNDS = 12
+DEFAULT_PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS = 0.0
+
+
+class PasswordHasherBusyError(RuntimeError):
+    """Kolejka operacji na hasłach jest pełna."""
+
+
+@dataclass(frozen=True)
+class PasswordHasherConfig:
+    workers: int = DEFAULT_PASSWORD_HASH_WORKERS
+    max_pending: int = DEFAULT_PASSWORD_HASH_WORKERS * 4
+    bcrypt_rounds: int = DEFAULT_PASSWORD_BCRYPT_ROUNDS
+    queue_timeout_seconds: float = DEFAULT_PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS
+
+
+def load_password_hasher_config() -> PasswordHasherConfig:
+    """Ładuje konfigurację puli haseł ze zmiennych środowiskowych."""
+
+    workers = int(
+        os.getenv("PASSWORD_HASH_WORKERS", str(DEFAULT_PASSWORD_HASH_WORKERS))
+    )
+    max_pending = int(
+        os.getenv("PASSWORD_HASH_MAX_PENDING", str(max(workers, 1) * 4))
+    )
+    bcrypt_rounds = int(
+        os.getenv("PASSWORD_BCRYPT_ROUNDS", str(DEFAULT_PASSWORD_BCRYPT_ROUNDS))
+    )
+    queue_timeout_seconds = float(
+        os.getenv(
+            "PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS",
+            str(DEFAULT_PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS),
+        )
+    )
+
+    if workers < 0 or max_pending <= 0 or queue_timeout_seconds < 0:
+        raise ValueError(
+            "PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING i "
+            "PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS mają nieprawidłowe wartości"
+        )
+
+    if not 4 <= bcrypt_rounds <= 31:
+        raise ValueError("PASSWORD_BCRYPT_ROUNDS musi być z zakresu 4..31")
+
+    return PasswordHasherConfig(
+        workers=workers,
+        max_pending=max_pending,
+        bcrypt_rounds=bcrypt_rounds,
+        queue_timeout_seconds=queue_timeout_seconds,
+    )
+
+
+# --- Funkcje wykonywane w procesach puli (muszą być picklowalne) -------------
+
+_contexts: dict[int, CryptContext] = {}
+
+
+def _crypt_context(rounds: int) -> CryptContext:
+    context = _contexts.get(rounds)
+    if context is None:
+        # min == max == default: każdy hash z inną liczbą rund wymaga aktualizacji.
+        context = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__default_rounds=rounds,
+            bcrypt__min_rounds=rounds,
+            bcrypt__max_rounds=rounds,
+        )
+        _contexts[rounds] = context
+    return context
+
+
+def _hash_job(password: str, rounds: int) -> str:
+    return _crypt_context(rounds).hash(password)
+
+
+def _verify_job(password: str, hashed: str, rounds: int) -> tuple[bool, str | None]:
+    try:
+        return _crypt_context(rounds).verify_and_update(password, hashed)
+    except UnknownHashError:
+        return False, None
+
+
+def _warm_worker(rounds: int) -> None:
+    _crypt_context(rounds)
+
+
+class PasswordHasher:
+    """Ograniczona pula procesów dla operacji bcrypt."""
+
+    def __init__(self, config: PasswordHasherConfig | None = None) -> None:
+        self.config = config or PasswordHasherConfig()
+        self._slots = threading.BoundedSemaphore(self.config.max_pending)
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.config.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_warm_worker,
+                        initargs=(self.config.bcrypt_rounds,),
+                    )
+        return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.config.queue_timeout_seconds):
+            raise PasswordHasherBusyError("password hasher queue is full")
+
+        try:
+            if self.config.workers == 0:
+                return fn(*args)
+
+            try:
+                return self._get_executor().submit(fn, *args).result()
+            except BrokenProcessPool:
+                # Proces puli padł (np. OOM) — odtwarzamy pulę przy kolejnym
+                # wywołaniu, a bieżącą operację liczymy lokalnie.
+                with self._executor_lock:
+                    self._executor = None
+                return fn(*args)
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash_job, password, self.config.bcrypt_rounds)
+
+    def verify_and_update(self, password: str, hashed: str) -> tuple[bool, str | None]:
+        """Zwraca (czy_hasło_poprawne, nowy_hash_lub_None)."""
+
+        return self._run(_verify_job, password, hashed, self.config.bcrypt_rounds)
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+_hasher: PasswordHasher | None = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasher:
+    global _hasher
+
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = PasswordHasher(load_password_hasher_config())
+
+    return _hasher
+
+
+def shutdown_password_hasher() -> None:
+    if _hasher is not None:
+        _hasher.shutdown()
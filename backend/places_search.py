@@ -0,0 +1,396 @@
+"""Cache'ujące proxy do Google Places (places:searchText) dla partnerów.
+
+Partner wpisujący nazwę lokalu generuje serię niemal identycznych zapytań.
+Każde trafia do Google (płatne, ~300 ms), dlatego wyszukiwanie idzie przez
+kilka warstw:
+
+1. klucz = znormalizowane "zapytanie|miasto" (NFC, casefold, pojedyncze spacje),
+2. LRU w pamięci procesu (PLACES_CACHE_MEMORY_SIZE wpisów),
+3. tabela places_search_cache z TTL (PLACES_CACHE_TTL_SECONDS),
+4. coalescing: równoległe identyczne zapytania czekają na jedno wywołanie
+   upstream zamiast wysyłać własne,
+5. upstream przez requests.Session z pulą połączeń (keep-alive).
+
+Warstwa bazy jest best-effort: błąd odczytu kończy się zapytaniem upstream,
+a błąd zapisu nie psuje wyniku (ani dla wywołującego, ani dla czekających
+na ten sam klucz) — oba są logowane i liczone w db_errors.
+
+Liczniki trafień/chybień i czas odpowiedzi upstream są dostępne przez
+PlacesSearchService.metrics.snapshot().
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+from sqlalchemy.exc import SQLAlchemyError
+
+from backend.db.database import dialect_insert
+from backend.logger import get_logger
+from backend.models import PlacesSearchCache
+
+log = get_logger(__name__)
+
+
+DEFAULT_PLACES_BASE_URL = "https://places.googleapis.com"
+DEFAULT_PLACES_CACHE_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_PLACES_CACHE_MEMORY_SIZE = 512
+DEFAULT_PLACES_SEARCH_TIMEOUT_SECONDS = 10.0
+DEFAULT_PLACES_HTTP_POOL_SIZE = 10
+
+PLACES_FIELD_MASK = "places.displayName,places.formattedAddress,places.location"
+PLACES_MAX_RESULTS = 5
+
+
+class PlacesSearchError(RuntimeError):
+    """Wywołanie Google Places się nie powiodło."""
+
+
+class PlacesSearchNotConfiguredError(PlacesSearchError):
+    """Brak GOOGLE_MAPS_API_KEY."""
+
+
+@dataclass(frozen=True)
+class PlacesSearchConfig:
+    api_key: str = ""
+    base_url: str = DEFAULT_PLACES_BASE_URL
+    cache_ttl_seconds: int = DEFAULT_PLACES_CACHE_TTL_SECONDS
+    memory_cache_size: int = DEFAULT_PLACES_CACHE_MEMORY_SIZE
+    timeout_seconds: float = DEFAULT_PLACES_SEARCH_TIMEOUT_SECONDS
+    http_pool_size: int = DEFAULT_PLACES_HTTP_POOL_SIZE
+
+
+def load_places_search_config() -> PlacesSearchConfig:
+    """Ładuje konfigurację wyszukiwarki miejsc ze zmiennych środowiskowych."""
+
+    cache_ttl_seconds = int(
+        os.getenv("PLACES_CACHE_TTL_SECONDS", str(DEFAULT_PLACES_CACHE_TTL_SECONDS))
+    )
+    memory_cache_size = int(
+        os.getenv("PLACES_CACHE_MEMORY_SIZE", str(DEFAULT_PLACES_CACHE_MEMORY_SIZE))
+    )
+    timeout_seconds = float(
+        os.getenv("PLACES_SEARCH_TIMEOUT_SECONDS", str(DEFAULT_PLACES_SEARCH_TIMEOUT_SECONDS))
+    )
+
+    if cache_ttl_seconds < 0 or memory_cache_size < 0 or timeout_seconds <= 0:
+        raise ValueError(
+            "PLACES_CACHE_TTL_SECONDS, PLACES_CACHE_MEMORY_SIZE i "
+            "PLACES_SEARCH_TIMEOUT_SECONDS mają nieprawidłowe wartości"
+        )
+
+    return PlacesSearchConfig(
+        api_key=os.getenv("GOOGLE_MAPS_API_KEY", "").strip(),
+        base_url=os.getenv("GOOGLE_PLACES_BASE_URL", DEFAULT_PLACES_BASE_URL).rstrip("/"),
+        cache_ttl_seconds=cache_ttl_seconds,
+        memory_cache_size=memory_cache_size,
+        timeout_seconds=timeout_seconds,
+    )
+
+
+def _normalize(text: str | None) -> str:
+    return " ".join(unicodedata.normalize("NFC", text or "").casefold().split())
+
+
+def _utc_naive(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+
+def _timestamp(value: datetime) -> float:
+    # SQLite zwraca naive datetime (UTC), PostgreSQL — aware.
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def places_query_key(q: str, city: str | None) -> str:
+    normalized = f"{_normalize(q)}|{_normalize(city)}"
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class PlacesSearchMetrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.db_errors = 0
+        self.upstream_calls = 0
+        self.upstream_errors = 0
+        self.upstream_seconds_total = 0.0
+        self.upstream_seconds_max = 0.0
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def observe_upstream(self, seconds: float, *, error: bool) -> None:
+        with self._lock:
+            self.upstream_calls += 1
+            self.upstream_errors += int(error)
+            self.upstream_seconds_total += seconds
+            self.upstream_seconds_max = max(self.upstream_seconds_max, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            calls = self.upstream_calls
+            return {
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "db_errors": self.db_errors,
+                "upstream_calls": calls,
+                "upstream_errors": self.upstream_errors,
+                "upstream_avg_ms": round(self.upstream_seconds_total / calls * 1000, 1) if calls else None,
+                "upstream_max_ms": round(self.upstream_seconds_max * 1000, 1),
+            }
+
+
+def _parse_places(data: dict) -> list[dict]:
+    items = []
+    for place in data.get("places", []) or []:
+        loc = place.get("location") or {}
+        display = place.get("displayName") or {}
+        items.append({
+            "name": display.get("text") or place.get("formattedAddress") or "Miejsce",
+            "address": place.get("formattedAddress") or "",
+            "lat": loc.get("latitude"),
+            "lng": loc.get("longitude"),
+        })
+    return items
+
+
+class PlacesSearchService:
+    def __init__(
+        self,
+        config: PlacesSearchConfig,
+        session_factory,
+        *,
+        http: requests.Session | None = None,
+        clock=time.time,
+    ) -> None:
+        self.config = config
+        self.session_factory = session_factory
+        self.metrics = PlacesSearchMetrics()
+        self._clock = clock
+
+        if http is None:
+            http = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=config.http_pool_size,
+            )
+            http.mount("https://", adapter)
+            http.mount("http://", adapter)
+        self._http = http
+
+        self._memory: OrderedDict[str, tuple[float, list[dict]]] = OrderedDict()
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    # --- warstwa pamięci ---
+
+    def _memory_get(self, key: str) -> list[dict] | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, items = entry
+            if expires_at <= self._clock():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return items
+
+    def _memory_put(self, key: str, items: list[dict], expires_at: float) -> None:
+        if self.config.memory_cache_size == 0:
+            return
+        with self._lock:
+            self._memory[key] = (expires_at, items)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.config.memory_cache_size:
+                self._memory.popitem(last=False)
+
+    # --- warstwa bazy ---
+
+    def _db_get(self, key: str) -> tuple[list[dict], float] | None:
+        now = _utc_naive(self._clock())
+        try:
+            db = self.session_factory()
+            try:
+                row = (
+                    db.query(PlacesSearchCache)
+                    .filter(
+                        PlacesSearchCache.query_key == key,
+                        PlacesSearchCache.expires_at > now,
+                    )
+                    .first()
+                )
+                if row is None:
+                    return None
+                return json.loads(row.items_json), _timestamp(row.expires_at)
+            finally:
+                db.close()
+        except SQLAlchemyError as exc:
+            # Cache w bazie jest tylko przyspieszeniem — przy awarii pytamy upstream.
+            self.metrics.incr("db_errors")
+            log.warning("places cache read failed: %s: %s", type(exc).__name__, exc)
+            return None
+
+    def _db_put(self, key: str, query: str, items: list[dict], expires_at: float) -> None:
+        now = _utc_naive(self._clock())
+        values = {
+            "query_key": key,
+            "query": query[:300],
+            "items_json": json.dumps(items, ensure_ascii=False),
+            "created_at": now,
+            "expires_at": _utc_naive(expires_at),
+        }
+
+        try:
+            db = self.session_factory()
+            try:
+                insert = dialect_insert(db)
+                stmt = insert(PlacesSearchCache).values(**values)
+                db.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=["query_key"],
+                        set_={name: stmt.excluded[name] for name in ("query", "items_json", "created_at", "expires_at")},
+                    )
+                )
+                db.commit()
+            finally:
+                db.close()
+        except SQLAlchemyError as exc:
+            # Wynik z upstream jest już w pamięci; brak zapisu kosztuje najwyżej
+            # ponowne zapytanie po restarcie.
+            self.metrics.incr("db_errors")
+            log.warning("places cache write failed: %s: %s", type(exc).__name__, exc)
+
+    # --- upstream ---
+
+    def _fetch_upstream(self, query: str) -> list[dict]:
+        started = time.perf_counter()
+        error = True
+        try:
+            response = self._http.post(
+                f"{self.config.base_url}/v1/places:searchText",
+                json={
+                    "textQuery": query,
+                    "languageCode": "pl",
+                    "regionCode": "PL",
+                    "maxResultCount": PLACES_MAX_RESULTS,
+                },
+                headers={
+                    "X-Goog-Api-Key": self.config.api_key,
+                    "X-Goog-FieldMask": PLACES_FIELD_MASK,
+                },
+                timeout=self.config.timeout_seconds,
+            )
+            response.raise_for_status()
+            items = _parse_places(response.json())
+            error = False
+            return items
+        except requests.RequestException as exc:
+            raise PlacesSearchError(str(exc)) from exc
+        except ValueError as exc:
+            raise PlacesSearchError(f"invalid JSON: {exc}") from exc
+        finally:
+            self.metrics.observe_upstream(time.perf_counter() - started, error=error)
+
+    # --- API ---
+
+    def search(self, q: str, city: str | None = None) -> list[dict]:
+        if not self.config.api_key:
+            raise PlacesSearchNotConfiguredError("GOOGLE_MAPS_API_KEY_NOT_CONFIGURED")
+
+        key = places_query_key(q, city)
+
+        items = self._memory_get(key)
+        if items is not None:
+            self.metrics.incr("memory_hits")
+            return items
+
+        cached = self._db_get(key)
+        if cached is not None:
+            self.metrics.incr("db_hits")
+            items, expires_at = cached
+            self._memory_put(key, items, expires_at)
+            return items
+
+        with self._lock:
+            # Inny wątek mógł właśnie skończyć pobieranie tego klucza.
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > self._clock():
+                return entry[1]
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not owner:
+            self.metrics.incr("coalesced")
+            return future.result()
+
+        self.metrics.incr("misses")
+        try:
+            query = ", ".join([part for part in [q.strip(), (city or "").strip(), "Polska"] if part])
+            items = self._fetch_upstream(query)
+
+            expires_at = self._clock() + self.config.cache_ttl_seconds
+            self._memory_put(key, items, expires_at)
+            self._db_put(key, query, items, expires_at)
+
+            future.set_result(items)
+            return items
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+def purge_expired_places_cache(db, *, now: datetime | None = None) -> int:
+    """Usuwa przeterminowane wpisy places_search_cache; zwraca ich liczbę."""
+
+    now = now or datetime.utcnow()
+    deleted = (
+        db.query(PlacesSearchCache)
+        .filter(PlacesSearchCache.expires_at <= now)
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return deleted
+
+
+_service: PlacesSearchService | None = None
+_service_lock = threading.Lock()
+
+
+def get_places_search_service() -> PlacesSearchService:
+    global _service
+
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                from backend.db.database import SessionLocal
+
+                _service = PlacesSearchService(load_places_search_config(), SessionLocal)
+
+    return _service
@@ -0,0 +1,227 @@
+"""Wykrywanie zapytań N+1 i budżety zapytań SQL.
+
+Każde wykonane zapytanie jest sprowadzane do "kształtu": literały,
+placeholdery i listy IN (...) są zastępowane przez `?`, więc
+`SELECT ... WHERE users.id = 7` i `... = 8` to ten sam kształt. Jeśli
+w ramach jednego żądania ten sam kształt wystąpi co najmniej
+`threshold` razy, to niemal zawsze jest zapytanie w pętli.
+
+- QueryTrackingMiddleware (włączany w dev, SQL_N_PLUS_ONE_DETECTION=1)
+  loguje takie kształty razem z szablonem trasy i miejscem w kodzie
+  backendu, z którego padło zapytanie,
+- query_budget() w testach liczy zapytania w bloku i rzuca
+  QueryBudgetExceeded, gdy przekroczą limit:
+
+      with query_budget(6, engine=engine):
+          admin_list_users(...)
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from backend.logger import get_logger
+from backend.metrics import route_template
+
+
+log = get_logger(__name__)
+
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+
+_BACKEND_DIR = Path(__file__).resolve().parent
+_IGNORED_FILES = {
+    str(Path(__file__).resolve()),
+    str(_BACKEND_DIR / "metrics.py"),
+}
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s|:\w+|\$\d+|\?")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    shape = _STRING_RE.sub("?", statement)
+    shape = _PARAM_RE.sub("?", shape)
+    shape = _NUMBER_RE.sub("?", shape)
+    shape = _IN_LIST_RE.sub("(?)", shape)
+    return _WHITESPACE_RE.sub(" ", shape).strip()
+
+
+def _caller_site() -> str | None:
+    """Najbliższa ramka z kodu backendu (poza SQLAlchemy i tym modułem)."""
+
+    for frame in reversed(traceback.extract_stack()):
+        filename = str(Path(frame.filename).resolve())
+        if filename in _IGNORED_FILES or not filename.startswith(str(_BACKEND_DIR)):
+            continue
+        return f"{Path(filename).relative_to(_BACKEND_DIR.parent).as_posix()}:{frame.lineno} in {frame.name}"
+    return None
+
+
+@dataclass
+class QueryShape:
+    sql: str
+    count: int = 0
+    site: str | None = None
+
+
+class QueryTracker:
+    def __init__(self, threshold: int = DEFAULT_N_PLUS_ONE_THRESHOLD) -> None:
+        self.threshold = threshold
+        self.total = 0
+        self.shapes: dict[str, QueryShape] = {}
+        self._lock = threading.Lock()
+
+    def record(self, statement: str) -> None:
+        sql = normalize_sql(statement)
+        with self._lock:
+            self.total += 1
+            shape = self.shapes.get(sql)
+            if shape is None:
+                shape = self.shapes[sql] = QueryShape(sql)
+            shape.count += 1
+            capture_site = shape.count == self.threshold
+
+        # Stos jest zbierany raz na kształt i tylko dla podejrzanych — to kosztowne.
+        if capture_site:
+            shape.site = _caller_site()
+
+    def repeated(self) -> list[QueryShape]:
+        with self._lock:
+            found = [shape for shape in self.shapes.values() if shape.count >= self.threshold]
+        return sorted(found, key=lambda shape: shape.count, reverse=True)
+
+    def report(self, limit: int = 5) -> str:
+        with self._lock:
+            top = sorted(self.shapes.values(), key=lambda shape: shape.count, reverse=True)[:limit]
+        lines = [f"{self.total} statements"]
+        for shape in top:
+            site = f" [{shape.site}]" if shape.site else ""
+            lines.append(f"  {shape.count}x {shape.sql[:300]}{site}")
+        return "\n".join(lines)
+
+
+_current_tracker: ContextVar[QueryTracker | None] = ContextVar("query_tracker", default=None)
+
+
+def install_query_tracking(engine: Engine) -> None:
+    """Przekazuje zapytania do trackera bieżącego żądania (jeśli jest aktywny)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _track_statement(conn, cursor, statement, parameters, context, executemany):
+        tracker = _current_tracker.get()
+        if tracker is not None:
+            tracker.record(statement)
+
+
+@contextmanager
+def track_queries(threshold: int = DEFAULT_N_PLUS_ONE_THRESHOLD) -> Iterator[QueryTracker]:
+    """Zbiera zapytania z bieżącego kontekstu (żądania, taska) do nowego trackera.
+
+    Wymaga wcześniejszego install_query_tracking(engine).
+    """
+
+    tracker = QueryTracker(threshold)
+    token = _current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current_tracker.reset(token)
+
+
+@dataclass(frozen=True)
+class QueryTrackingConfig:
+    enabled: bool = False
+    threshold: int = DEFAULT_N_PLUS_ONE_THRESHOLD
+
+
+def load_query_tracking_config() -> QueryTrackingConfig:
+    """Ładuje konfigurację wykrywania N+1; domyślnie włączone tylko dla ENV=local."""
+
+    default_enabled = "1" if os.getenv("ENV", "local").strip().lower() == "local" else "0"
+    enabled = os.getenv("SQL_N_PLUS_ONE_DETECTION", default_enabled).strip().lower() in {
+        "1",
+        "true",
+        "yes",
+    }
+    threshold = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", str(DEFAULT_N_PLUS_ONE_THRESHOLD)))
+
+    if threshold < 2:
+        raise ValueError("SQL_N_PLUS_ONE_THRESHOLD musi być co najmniej 2")
+
+    return QueryTrackingConfig(enabled=enabled, threshold=threshold)
+
+
+class QueryTrackingMiddleware:
+    def __init__(self, app: ASGIApp, *, threshold: int = DEFAULT_N_PLUS_ONE_THRESHOLD) -> None:
+        self.app = app
+        self.threshold = threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(self.threshold) as tracker:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                self._report(scope, tracker)
+
+    def _report(self, scope: Scope, tracker: QueryTracker) -> None:
+        for shape in tracker.repeated():
+            log.warning(
+                "N+1 suspected on %s %s: %dx %s [%s]",
+                scope["method"],
+                route_template(scope),
+                shape.count,
+                shape.sql[:300],
+                shape.site or "unknown site",
+            )
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(
+    max_statements: int,
+    *,
+    engine: Engine | None = None,
+    threshold: int = DEFAULT_N_PLUS_ONE_THRESHOLD,
+) -> Iterator[QueryTracker]:
+    """Liczy wszystkie zapytania silnika w bloku (z dowolnego wątku) i pilnuje limitu."""
+
+    if engine is None:
+        from backend.db.database import engine
+
+    tracker = QueryTracker(threshold)
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        tracker.record(statement)
+
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        yield tracker
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    if tracker.total > max_statements:
+        raise QueryBudgetExceeded(
+            f"Query budget exceeded: {tracker.total} > {max_statements}\n{tracker.report()}"
+        )
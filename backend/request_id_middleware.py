@@ -1,20 +0,0 @@
-import uuid
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.types import ASGIApp
-
-
-class RequestIdMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: ASGIApp, header_name: str = "X-Request-ID") -> None:
-        super().__init__(app)
-        self.header_name = header_name
-
-    async def dispatch(self, request: Request, call_next):
-        incoming = request.headers.get(self.header_name)
-        request_id = incoming.strip() if incoming else str(uuid.uuid4())
-
-        request.state.request_id = request_id
-
-        response = await call_next(request)
-        response.headers[self.header_name] = request_id
-        return response
\ No newline at end of file
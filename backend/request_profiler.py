@@ -0,0 +1,420 @@
+"""Profilowanie pojedynczych żądań na życzenie admina.
+
+Żądanie jest profilowane, gdy:
+
+- ma nagłówek X-Usly-Profile: 1 i token admina z uprawnieniem "system"
+  (sprawdzane przez przekazaną funkcję authorize), albo
+- zostało wylosowane z PROFILER_SAMPLE_RATE (domyślnie 0).
+
+Profilowanie to wątek próbkujący stosy (sys._current_frames() co
+PROFILER_INTERVAL_MS). Do profilu trafiają tylko stosy, które przechodzą
+przez endpoint dopasowanej trasy albo jedną z jego zależności, więc inne
+żądania obsługiwane w tym czasie trafiają do niego tylko przez wspólne
+zależności (np. get_current_user). Równolegle hooki
+silnika SQLAlchemy zapisują zapytania tego żądania z czasami.
+
+Profil jest zapisywany w request_profiles pod X-Request-ID i można go
+pobrać jako plik w formacie "folded stacks" (flamegraph.pl, speedscope,
+inferno). Żądania bez nagłówka i bez losowania przechodzą bez żadnej
+dodatkowej pracy poza przejrzeniem nagłówków.
+"""
+
+from __future__ import annotations
+
+import inspect
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.logger import get_logger
+from backend.metrics import route_template
+from backend.models import RequestProfile
+
+
+log = get_logger(__name__)
+
+PROFILE_HEADER = b"x-usly-profile"
+
+DEFAULT_PROFILER_INTERVAL_MS = 5.0
+DEFAULT_PROFILER_MAX_CONCURRENT = 2
+DEFAULT_PROFILER_RETENTION_DAYS = 7
+MAX_PROFILE_STATEMENTS = 500
+MAX_STATEMENT_LENGTH = 2000
+
+_BACKEND_ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass(frozen=True)
+class ProfilerConfig:
+    enabled: bool = True
+    sample_rate: float = 0.0
+    interval_seconds: float = DEFAULT_PROFILER_INTERVAL_MS / 1000
+    max_concurrent: int = DEFAULT_PROFILER_MAX_CONCURRENT
+    retention_days: int = DEFAULT_PROFILER_RETENTION_DAYS
+
+
+def load_profiler_config() -> ProfilerConfig:
+    """Ładuje konfigurację profilera ze zmiennych środowiskowych."""
+
+    enabled = os.getenv("PROFILER_ENABLED", "1").strip().lower() not in {"0", "false", "no"}
+    sample_rate = float(os.getenv("PROFILER_SAMPLE_RATE", "0"))
+    interval_ms = float(os.getenv("PROFILER_INTERVAL_MS", str(DEFAULT_PROFILER_INTERVAL_MS)))
+    max_concurrent = int(os.getenv("PROFILER_MAX_CONCURRENT", str(DEFAULT_PROFILER_MAX_CONCURRENT)))
+    retention_days = int(os.getenv("PROFILER_RETENTION_DAYS", str(DEFAULT_PROFILER_RETENTION_DAYS)))
+
+    if not 0.0 <= sample_rate <= 1.0:
+        raise ValueError("PROFILER_SAMPLE_RATE musi być z przedziału [0, 1]")
+    if interval_ms <= 0 or max_concurrent <= 0 or retention_days <= 0:
+        raise ValueError(
+            "PROFILER_INTERVAL_MS, PROFILER_MAX_CONCURRENT i PROFILER_RETENTION_DAYS muszą być większe od zera"
+        )
+
+    return ProfilerConfig(
+        enabled=enabled,
+        sample_rate=sample_rate,
+        interval_seconds=interval_ms / 1000,
+        max_concurrent=max_concurrent,
+        retention_days=retention_days,
+    )
+
+
+# --- SQL ---------------------------------------------------------------------
+
+
+@dataclass
+class ProfiledStatement:
+    offset_ms: float
+    duration_ms: float
+    sql: str
+
+
+class ProfileRecorder:
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.statements: list[ProfiledStatement] = []
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record_statement(self, statement: str, started: float, seconds: float) -> None:
+        with self._lock:
+            self.sql_count += 1
+            self.sql_seconds += seconds
+            if len(self.statements) < MAX_PROFILE_STATEMENTS:
+                self.statements.append(
+                    ProfiledStatement(
+                        offset_ms=round((started - self.started) * 1000, 3),
+                        duration_ms=round(seconds * 1000, 3),
+                        sql=statement[:MAX_STATEMENT_LENGTH],
+                    )
+                )
+
+
+_active_profile: ContextVar[ProfileRecorder | None] = ContextVar("request_profile", default=None)
+
+
+def install_profiler(engine: Engine) -> None:
+    """Zapisuje zapytania do profilu bieżącego żądania (jeśli jest profilowane)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _active_profile.get() is not None:
+            conn.info.setdefault("profiler_query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        recorder = _active_profile.get()
+        if recorder is not None:
+            started = conn.info["profiler_query_started"].pop()
+            recorder.record_statement(statement, started, time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and _active_profile.get() is not None:
+            stack = conn.info.get("profiler_query_started")
+            if stack:
+                stack.pop()
+
+
+# --- próbkowanie stosów ------------------------------------------------------
+
+
+def _code_of(call) -> object | None:
+    try:
+        call = inspect.unwrap(call)
+    except ValueError:
+        pass
+    code = getattr(call, "__code__", None)
+    if code is None:
+        # Zależności-klasy (np. HTTPBearer) — liczy się ich __call__.
+        code = getattr(getattr(type(call), "__call__", None), "__code__", None)
+    return code
+
+
+def route_root_codes(route) -> frozenset:
+    """Kody endpointu trasy i wszystkich jego zależności (korzenie profilu)."""
+
+    codes = set()
+    endpoint = getattr(route, "endpoint", None)
+    if endpoint is not None:
+        codes.add(_code_of(endpoint))
+
+    pending = [getattr(route, "dependant", None)]
+    while pending:
+        dependant = pending.pop()
+        if dependant is None:
+            continue
+        for dependency in dependant.dependencies:
+            if dependency.call is not None:
+                codes.add(_code_of(dependency.call))
+            pending.append(dependency)
+
+    codes.discard(None)
+    return frozenset(codes)
+
+
+def _frame_label(code) -> str:
+    filename = Path(code.co_filename)
+    try:
+        filename = filename.resolve().relative_to(_BACKEND_ROOT)
+    except ValueError:
+        # Biblioteki: wystarczy ścieżka od site-packages/lib.
+        filename = Path(*filename.parts[-2:])
+    return f"{code.co_name} ({filename.as_posix()}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Wątek, który co `interval` zlicza stosy przechodzące przez korzenie trasy."""
+
+    def __init__(self, scope: Scope, interval_seconds: float) -> None:
+        self.scope = scope
+        self.interval_seconds = interval_seconds
+        self.samples = 0
+        self.counts: Counter[tuple] = Counter()
+        self._roots: frozenset | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def _root_codes(self) -> frozenset | None:
+        if self._roots is None:
+            # Trasa jest znana dopiero po dopasowaniu przez router.
+            route = self.scope.get("route")
+            if route is not None:
+                self._roots = route_root_codes(route)
+        return self._roots
+
+    def sample(self) -> None:
+        roots = self._root_codes()
+        if not roots:
+            return
+
+        own_ident = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+
+            codes = []
+            root_depth = 0
+            while frame is not None:
+                codes.append(frame.f_code)
+                if frame.f_code in roots:
+                    root_depth = len(codes)
+                frame = frame.f_back
+
+            if root_depth:
+                self.counts[tuple(reversed(codes[:root_depth]))] += 1
+                self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.sample()
+            except Exception:
+                log.exception("Request profiler sample failed")
+                return
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self, prefix: str) -> str:
+        """Format "folded stacks": `ramka;ramka;ramka liczba` w każdej linii."""
+
+        labels: dict[object, str] = {}
+        lines = []
+        for codes, count in self.counts.most_common():
+            frames = [labels.setdefault(code, _frame_label(code)) for code in codes]
+            lines.append(f"{';'.join([prefix, *frames])} {count}")
+        return "\n".join(lines) + ("\n" if lines else "")
+
+
+# --- middleware --------------------------------------------------------------
+
+
+class RequestProfilerMiddleware:
+    """Czysty ASGI; musi być wewnątrz MetricsMiddleware, który nadaje request_id."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        session_factory,
+        authorize: Callable[[str], int | None],
+        config: ProfilerConfig | None = None,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        self.app = app
+        self.session_factory = session_factory
+        self.authorize = authorize
+        self.config = config or ProfilerConfig()
+        self._rng = rng
+        self._slots = threading.BoundedSemaphore(self.config.max_concurrent)
+
+    async def _trigger(self, scope: Scope) -> tuple[str, int | None] | None:
+        profile_header = None
+        authorization = ""
+        for name, value in scope.get("headers", ()):
+            if name == PROFILE_HEADER:
+                profile_header = value
+            elif name == b"authorization":
+                authorization = value.decode("latin-1")
+
+        if profile_header is not None and profile_header.strip() == b"1" and authorization:
+            user_id = await run_in_threadpool(self.authorize, authorization)
+            if user_id is not None:
+                return "header", user_id
+
+        if self.config.sample_rate and self._rng() < self.config.sample_rate:
+            return "sample", None
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trigger = await self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not self._slots.acquire(blocking=False):
+            log.info("Request profiler busy, skipping %s %s", scope["method"], scope["path"])
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self._profile(scope, receive, send, *trigger)
+        finally:
+            self._slots.release()
+
+    async def _profile(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        trigger: str,
+        user_id: int | None,
+    ) -> None:
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        recorder = ProfileRecorder()
+        sampler = StackSampler(scope, self.config.interval_seconds)
+        token = _active_profile.set(recorder)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            _active_profile.reset(token)
+            duration_ms = (time.perf_counter() - recorder.started) * 1000
+
+            request_id = scope.get("state", {}).get("request_id") or str(uuid.uuid4())
+            method = scope["method"]
+            route = route_template(scope)
+            profile = RequestProfile(
+                request_id=request_id,
+                created_at=datetime.utcnow(),
+                user_id=user_id,
+                trigger=trigger,
+                method=method,
+                route=route,
+                path=scope["path"][:500],
+                status_code=status,
+                duration_ms=round(duration_ms, 3),
+                sample_count=sampler.samples,
+                sql_count=recorder.sql_count,
+                sql_ms=round(recorder.sql_seconds * 1000, 3),
+                statements_json=json.dumps([statement.__dict__ for statement in recorder.statements]),
+                folded=sampler.folded(f"{method} {route}"),
+            )
+            try:
+                await run_in_threadpool(self._store, profile)
+            except Exception:
+                log.exception("Could not store request profile %s", request_id)
+
+    def _store(self, profile: RequestProfile) -> None:
+        db = self.session_factory()
+        try:
+            db.add(profile)
+            db.commit()
+        finally:
+            db.close()
+
+
+# --- odczyt i sprzątanie -----------------------------------------------------
+
+
+def request_profile_summary(profile: RequestProfile) -> dict:
+    return {
+        "request_id": profile.request_id,
+        "created_at": profile.created_at.isoformat() if profile.created_at else None,
+        "user_id": profile.user_id,
+        "trigger": profile.trigger,
+        "method": profile.method,
+        "route": profile.route,
+        "path": profile.path,
+        "status_code": profile.status_code,
+        "duration_ms": profile.duration_ms,
+        "sample_count": profile.sample_count,
+        "sql_count": profile.sql_count,
+        "sql_ms": profile.sql_ms,
+    }
+
+
+def purge_request_profiles(db, *, retention_days: int, now: datetime | None = None) -> int:
+    """Usuwa profile starsze niż retention_days; zwraca ich liczbę."""
+
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    deleted = (
+        db.query(RequestProfile)
+        .filter(RequestProfile.created_at < cutoff)
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return deleted
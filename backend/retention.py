@@ -0,0 +1,173 @@
+"""Retencja tabel tymczasowych i tylko-dopisywanych (zadanie "purge_expired_rows").
+
+Każda reguła z RETENTION_RULES to tabela, predykat na zindeksowanej
+kolumnie daty i domyślny czas przechowywania w dniach. Czas można
+nadpisać zmienną RETENTION_<NAZWA_REGUŁY>_DAYS (0 wyłącza regułę).
+
+Wiersze są usuwane partiami (DELETE ... WHERE id IN (SELECT id ... LIMIT n)),
+każda partia w osobnej krótkiej transakcji, najwyżej max_batches partii na
+regułę w jednym uruchomieniu — reszta zostaje na kolejne. W trybie dry-run
+(RETENTION_DRY_RUN=1 albo GET /admin/retention) reguły tylko liczą wiersze,
+które zostałyby usunięte.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Mapping
+
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.orm import Session
+
+from backend.logger import get_logger
+from backend.models import (
+    AiUsageLog,
+    AppleAuthNonce,
+    DevicePushToken,
+    EmailVerificationToken,
+    PasswordResetToken,
+    RevenueCatWebhookEvent,
+    UserNotification,
+)
+
+
+log = get_logger(__name__)
+
+DEFAULT_RETENTION_BATCH_SIZE = 1000
+DEFAULT_RETENTION_MAX_BATCHES = 50
+
+
+@dataclass(frozen=True)
+class RetentionRule:
+    name: str
+    model: type
+    days: int
+    # cutoff -> warunek WHERE wierszy do usunięcia
+    condition: Callable[[datetime], object]
+
+
+def _used_or_expired(model) -> Callable[[datetime], object]:
+    return lambda cutoff: or_(model.used_at < cutoff, model.expires_at < cutoff)
+
+
+RETENTION_RULES: tuple[RetentionRule, ...] = (
+    RetentionRule("apple_auth_nonces", AppleAuthNonce, 1, _used_or_expired(AppleAuthNonce)),
+    RetentionRule("password_reset_tokens", PasswordResetToken, 7, _used_or_expired(PasswordResetToken)),
+    RetentionRule(
+        "email_verification_tokens",
+        EmailVerificationToken,
+        7,
+        _used_or_expired(EmailVerificationToken),
+    ),
+    # Nieudane zostają do wyjaśnienia i ponownego przetworzenia.
+    RetentionRule(
+        "revenuecat_webhook_events",
+        RevenueCatWebhookEvent,
+        90,
+        lambda cutoff: (RevenueCatWebhookEvent.status == "processed")
+        & (RevenueCatWebhookEvent.processed_at < cutoff),
+    ),
+    RetentionRule(
+        "inactive_push_tokens",
+        DevicePushToken,
+        30,
+        lambda cutoff: DevicePushToken.is_active.is_(False) & (DevicePushToken.last_seen_at < cutoff),
+    ),
+    # FCM unieważnia tokeny nieużywane przez 270 dni.
+    RetentionRule(
+        "stale_push_tokens",
+        DevicePushToken,
+        270,
+        lambda cutoff: DevicePushToken.last_seen_at < cutoff,
+    ),
+    # Limity AI liczone są w miesiącu kalendarzowym — retencja musi być dłuższa.
+    RetentionRule("ai_usage_logs", AiUsageLog, 400, lambda cutoff: AiUsageLog.created_at < cutoff),
+    RetentionRule(
+        "read_notifications",
+        UserNotification,
+        180,
+        lambda cutoff: UserNotification.read_at < cutoff,
+    ),
+)
+
+
+def _default_days() -> dict[str, int]:
+    return {rule.name: rule.days for rule in RETENTION_RULES}
+
+
+@dataclass(frozen=True)
+class RetentionConfig:
+    batch_size: int = DEFAULT_RETENTION_BATCH_SIZE
+    max_batches: int = DEFAULT_RETENTION_MAX_BATCHES
+    dry_run: bool = False
+    days: Mapping[str, int] = field(default_factory=_default_days)
+
+
+def load_retention_config() -> RetentionConfig:
+    """Ładuje konfigurację retencji ze zmiennych środowiskowych."""
+
+    batch_size = int(os.getenv("RETENTION_BATCH_SIZE", str(DEFAULT_RETENTION_BATCH_SIZE)))
+    max_batches = int(os.getenv("RETENTION_MAX_BATCHES", str(DEFAULT_RETENTION_MAX_BATCHES)))
+    dry_run = os.getenv("RETENTION_DRY_RUN", "0").strip().lower() in {"1", "true", "yes"}
+    if batch_size <= 0 or max_batches <= 0:
+        raise ValueError("RETENTION_BATCH_SIZE i RETENTION_MAX_BATCHES muszą być większe od zera")
+
+    days = {}
+    for rule in RETENTION_RULES:
+        env_name = f"RETENTION_{rule.name.upper()}_DAYS"
+        value = int(os.getenv(env_name, str(rule.days)))
+        if value < 0:
+            raise ValueError(f"{env_name} nie może być ujemne")
+        days[rule.name] = value
+
+    return RetentionConfig(batch_size=batch_size, max_batches=max_batches, dry_run=dry_run, days=days)
+
+
+def _purge_rule(db: Session, rule: RetentionRule, condition, config: RetentionConfig) -> int:
+    model = rule.model
+    purged = 0
+    for _ in range(config.max_batches):
+        ids = select(model.id).where(condition).limit(config.batch_size).scalar_subquery()
+        try:
+            rows = db.execute(
+                delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        purged += rows
+        if rows < config.batch_size:
+            break
+    return purged
+
+
+def purge_expired_rows(
+    db: Session,
+    config: RetentionConfig | None = None,
+    *,
+    now: datetime | None = None,
+    dry_run: bool | None = None,
+) -> dict[str, int]:
+    """Usuwa (albo w dry-run tylko liczy) przeterminowane wiersze; zwraca liczby per reguła."""
+
+    config = config or RetentionConfig()
+    dry_run = config.dry_run if dry_run is None else dry_run
+    now = now or datetime.utcnow()
+    result: dict[str, int] = {}
+
+    for rule in RETENTION_RULES:
+        days = config.days.get(rule.name, rule.days)
+        if days <= 0:
+            continue
+        condition = rule.condition(now - timedelta(days=days))
+        if dry_run:
+            result[rule.name] = db.scalar(select(func.count()).select_from(rule.model).where(condition))
+        else:
+            result[rule.name] = _purge_rule(db, rule, condition, config)
+
+    if any(result.values()):
+        log.info("Retention %s: %s", "dry run" if dry_run else "purged", result)
+    return result
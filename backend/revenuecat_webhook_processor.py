@@ -25,6 +25,7 @@ from backend.effective_plan_applier import (
     EffectivePlanApplyResult,
     apply_effective_plan,
 )
+from backend.logger import get_logger
 from backend.models import RevenueCatWebhookEvent, StorePurchase, User
 from backend.revenuecat_sync import (
     RevenueCatSyncEngine,
@@ -44,6 +45,8 @@ from backend.store_purchase_data import (
 from backend.store_purchase_repository import StorePurchaseRepository
 
 
+log = get_logger(__name__)
+
 # Zgodność dotychczasowego kontraktu procesora webhooków.
 RevenueCatWebhookPersistenceResult = RevenueCatSyncPersistenceResult
 
@@ -441,9 +444,10 @@ class RevenueCatWebhookProcessor:
                 f"{type(exc).__name__}: {str(exc).strip() or 'unknown error'}"
             )
 
-            print(
-                "REVENUECAT WEBHOOK PROCESSING ERROR:",
+            log.exception(
+                "RevenueCat webhook processing failed: %s",
                 error_message,
+                extra={"webhook_event_db_id": webhook_event.id},
             )
 
             if webhook_event.status == "processing":
@@ -0,0 +1,295 @@
+"""Offline'owe ustalanie miasta na podstawie przybliżonej lokalizacji.
+
+Współrzędne profilu są zaokrąglane do 0,01°, więc przestrzeń kluczy jest
+mała. Kolejność wyszukiwania:
+
+1. tabela reverse_geocode_cache (klucz: lat*100, lng*100),
+2. wbudowany indeks miejscowości (geodata/pl_places.csv) — siatka
+   komórek 0,25°, najbliższa miejscowość w promieniu
+   REVERSE_GEOCODE_MAX_DISTANCE_KM; wynik trafia do cache,
+3. opcjonalnie (REVERSE_GEOCODE_REMOTE_FALLBACK=1) zapytanie do
+   Nominatim wykonywane w tle — uzupełnia cache, nie blokuje żądania.
+"""
+
+from __future__ import annotations
+
+import csv
+import math
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import requests
+
+from backend.db.database import dialect_insert
+from backend.logger import get_logger
+from backend.models import ReverseGeocodeCache, UserProfile
+
+
+log = get_logger(__name__)
+
+DEFAULT_DATASET_PATH = Path(__file__).resolve().parent / "geodata" / "pl_places.csv"
+DEFAULT_MAX_DISTANCE_KM = 25.0
+DEFAULT_REMOTE_TIMEOUT_SECONDS = 3.0
+
+NOMINATIM_REVERSE_URL = "https://nominatim.openstreetmap.org/reverse"
+
+_EARTH_RADIUS_KM = 6371.0
+_CELL_DEGREES = 0.25
+
+
+@dataclass(frozen=True)
+class ReverseGeocodeConfig:
+    max_distance_km: float = DEFAULT_MAX_DISTANCE_KM
+    remote_fallback: bool = False
+    remote_timeout_seconds: float = DEFAULT_REMOTE_TIMEOUT_SECONDS
+
+
+def load_reverse_geocode_config() -> ReverseGeocodeConfig:
+    """Ładuje konfigurację reverse geocodingu ze zmiennych środowiskowych."""
+
+    max_distance_km = float(
+        os.getenv("REVERSE_GEOCODE_MAX_DISTANCE_KM", str(DEFAULT_MAX_DISTANCE_KM))
+    )
+    remote_timeout_seconds = float(
+        os.getenv(
+            "REVERSE_GEOCODE_REMOTE_TIMEOUT_SECONDS",
+            str(DEFAULT_REMOTE_TIMEOUT_SECONDS),
+        )
+    )
+    remote_fallback = os.getenv("REVERSE_GEOCODE_REMOTE_FALLBACK", "0").strip().lower() in {
+        "1",
+        "true",
+        "yes",
+    }
+
+    if max_distance_km <= 0 or remote_timeout_seconds <= 0:
+        raise ValueError(
+            "REVERSE_GEOCODE_MAX_DISTANCE_KM i REVERSE_GEOCODE_REMOTE_TIMEOUT_SECONDS "
+            "muszą być większe od zera"
+        )
+
+    return ReverseGeocodeConfig(
+        max_distance_km=max_distance_km,
+        remote_fallback=remote_fallback,
+        remote_timeout_seconds=remote_timeout_seconds,
+    )
+
+
+@dataclass(frozen=True)
+class Place:
+    name: str
+    lat: float
+    lng: float
+    population: int
+
+
+def _distance_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * _EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class CityIndex:
+    """Siatka komórek lat/lng z listą miejscowości w każdej komórce."""
+
+    def __init__(self, places: list[Place], cell_degrees: float = _CELL_DEGREES) -> None:
+        self.cell_degrees = cell_degrees
+        self._cells: dict[tuple[int, int], list[Place]] = {}
+        for place in places:
+            self._cells.setdefault(self._cell(place.lat, place.lng), []).append(place)
+        self.size = len(places)
+
+    def _cell(self, lat: float, lng: float) -> tuple[int, int]:
+        return math.floor(lat / self.cell_degrees), math.floor(lng / self.cell_degrees)
+
+    def nearest(self, lat: float, lng: float, max_distance_km: float) -> tuple[Place, float] | None:
+        cell_lat, cell_lng = self._cell(lat, lng)
+        # Komórka ma co najmniej ~cell_degrees * 111 km * cos(lat) szerokości.
+        cell_km = self.cell_degrees * 111.0 * max(math.cos(math.radians(abs(lat) + self.cell_degrees)), 0.1)
+        max_ring = math.ceil(max_distance_km / cell_km)
+
+        best: tuple[Place, float] | None = None
+        for ring in range(max_ring + 1):
+            # Miejscowości w pierścieniu `ring` są co najmniej (ring - 1) * cell_km od punktu.
+            if best is not None and best[1] <= (ring - 1) * cell_km:
+                break
+
+            for d_lat in range(-ring, ring + 1):
+                for d_lng in range(-ring, ring + 1):
+                    if max(abs(d_lat), abs(d_lng)) != ring:
+                        continue
+                    for place in self._cells.get((cell_lat + d_lat, cell_lng + d_lng), ()):
+                        distance = _distance_km(lat, lng, place.lat, place.lng)
+                        if best is None or distance < best[1]:
+                            best = (place, distance)
+
+        if best is None or best[1] > max_distance_km:
+            return None
+        return best
+
+
+def load_city_index(path: Path = DEFAULT_DATASET_PATH) -> CityIndex:
+    with open(path, newline="", encoding="utf-8") as f:
+        places = [
+            Place(
+                name=row["name"],
+                lat=float(row["lat"]),
+                lng=float(row["lng"]),
+                population=int(row["population"]),
+            )
+            for row in csv.DictReader(f)
+        ]
+    return CityIndex(places)
+
+
+_index: CityIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_city_index() -> CityIndex:
+    global _index
+
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_city_index()
+
+    return _index
+
+
+def coordinate_key(lat: float, lng: float) -> tuple[int, int]:
+    return round(lat * 100), round(lng * 100)
+
+
+def _store(db, lat_key: int, lng_key: int, city: str, source: str) -> None:
+    """Dodaje wpis do cache w bieżącej transakcji (bez commita).
+
+    ON CONFLICT DO NOTHING: równoległe żądanie mogło zapisać ten sam klucz,
+    a zwykły IntegrityError wycofałby też zmiany wywołującego.
+    """
+
+    insert = dialect_insert(db)
+    db.execute(
+        insert(ReverseGeocodeCache)
+        .values(
+            lat_key=lat_key,
+            lng_key=lng_key,
+            city=city,
+            source=source,
+            created_at=datetime.utcnow(),
+        )
+        .on_conflict_do_nothing(index_elements=["lat_key", "lng_key"])
+    )
+
+
+def lookup_city(
+    db,
+    lat: float,
+    lng: float,
+    *,
+    index: CityIndex | None = None,
+    config: ReverseGeocodeConfig | None = None,
+) -> tuple[str | None, bool]:
+    """Zwraca (miasto_lub_None, czy_warto_zapytać_zdalnie).
+
+    Wpis w cache jest dodawany w transakcji `db` — zatwierdza go commit
+    wywołującego. Drugi element jest True tylko wtedy, gdy punktu nie ma w cache, a
+    lokalny indeks nic nie znalazł.
+    """
+
+    config = config or ReverseGeocodeConfig()
+    lat_key, lng_key = coordinate_key(lat, lng)
+
+    cached = (
+        db.query(ReverseGeocodeCache)
+        .filter(
+            ReverseGeocodeCache.lat_key == lat_key,
+            ReverseGeocodeCache.lng_key == lng_key,
+        )
+        .first()
+    )
+    if cached is not None:
+        return cached.city, False
+
+    match = (index or get_city_index()).nearest(lat, lng, config.max_distance_km)
+    if match is None:
+        return None, True
+
+    city = match[0].name
+    _store(db, lat_key, lng_key, city, "local")
+    return city, False
+
+
+def fetch_nominatim_city(lat: float, lng: float, timeout: float = DEFAULT_REMOTE_TIMEOUT_SECONDS) -> str | None:
+    try:
+        r = requests.get(
+            NOMINATIM_REVERSE_URL,
+            params={
+                "lat": lat,
+                "lon": lng,
+                "format": "json",
+                "zoom": 10,
+                "addressdetails": 1,
+            },
+            headers={"User-Agent": "usly-app"},
+            timeout=timeout,
+        )
+        if r.status_code != 200:
+            return None
+
+        addr = r.json().get("address", {})
+        return (
+            addr.get("city")
+            or addr.get("town")
+            or addr.get("village")
+            or addr.get("municipality")
+        )
+    except Exception:
+        return None
+
+
+def fill_cache_from_remote(
+    session_factory,
+    user_id: int,
+    lat: float,
+    lng: float,
+    config: ReverseGeocodeConfig | None = None,
+) -> str | None:
+    """Fallback w tle: pyta Nominatim, zapisuje wynik w cache i uzupełnia profil.
+
+    Profil jest aktualizowany tylko, jeśli użytkownik wciąż ma te same
+    współrzędne (nie zmienił lokalizacji w międzyczasie).
+    """
+
+    config = config or ReverseGeocodeConfig()
+    city = fetch_nominatim_city(lat, lng, timeout=config.remote_timeout_seconds)
+    if not city:
+        # Błąd sieci i brak wyniku wyglądają tak samo — nie zapisujemy ich w cache.
+        return None
+
+    db = session_factory()
+    try:
+        _store(db, *coordinate_key(lat, lng), city, "nominatim")
+
+        profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+        if (
+            profile is not None
+            and profile.location_lat == lat
+            and profile.location_lng == lng
+        ):
+            profile.miasto = city
+
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        log.warning("Reverse geocode fallback failed for (%s, %s): %s", lat, lng, e)
+    finally:
+        db.close()
+
+    return city
@@ -0,0 +1,301 @@
+"""Okresowe zadania w tle, wykonywane przez jednego workera naraz.
+
+Każdy worker uvicorn uruchamia JobScheduler, ale zadanie wykonuje tylko
+ten, który przejmie jego lease w tabeli scheduled_jobs. Przejęcie to
+jeden atomowy UPDATE:
+
+    SET lease_owner = :worker, lease_expires_at = now + lease
+    WHERE name = :job AND next_run_at <= now
+      AND (lease_expires_at IS NULL OR lease_expires_at <= now)
+
+Działa tak samo na PostgreSQL (drugi UPDATE czeka na blokadę wiersza i
+po jej zwolnieniu nie spełnia już warunku) i na SQLite. Po zakończeniu
+worker zwalnia lease, ustawia next_run_at = start + interval i zapisuje
+czas trwania, liczbę przetworzonych wierszy oraz ewentualny błąd.
+Lease wygasa sam, jeśli worker zginie w trakcie zadania.
+
+Zadania są synchroniczne i wykonują się w wątku (asyncio.to_thread),
+więc nie blokują pętli zdarzeń.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable
+from uuid import uuid4
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from backend.db.database import dialect_insert
+from backend.logger import get_logger
+from backend.models import ScheduledJob
+
+
+log = get_logger(__name__)
+
+DEFAULT_SCHEDULER_TICK_SECONDS = 30.0
+DEFAULT_SCHEDULER_LEASE_SECONDS = 15 * 60
+
+MAX_ERROR_LENGTH = 2000
+
+
+@dataclass(frozen=True)
+class SchedulerConfig:
+    enabled: bool = True
+    tick_seconds: float = DEFAULT_SCHEDULER_TICK_SECONDS
+    lease_seconds: int = DEFAULT_SCHEDULER_LEASE_SECONDS
+
+
+def load_scheduler_config() -> SchedulerConfig:
+    """Ładuje konfigurację schedulera ze zmiennych środowiskowych."""
+
+    tick_seconds = float(
+        os.getenv("SCHEDULER_TICK_SECONDS", str(DEFAULT_SCHEDULER_TICK_SECONDS))
+    )
+    lease_seconds = int(
+        os.getenv("SCHEDULER_LEASE_SECONDS", str(DEFAULT_SCHEDULER_LEASE_SECONDS))
+    )
+    enabled = os.getenv("SCHEDULER_ENABLED", "1").strip().lower() not in {
+        "0",
+        "false",
+        "no",
+    }
+
+    if tick_seconds <= 0 or lease_seconds <= 0:
+        raise ValueError(
+            "SCHEDULER_TICK_SECONDS i SCHEDULER_LEASE_SECONDS muszą być większe od zera"
+        )
+
+    return SchedulerConfig(
+        enabled=enabled,
+        tick_seconds=tick_seconds,
+        lease_seconds=lease_seconds,
+    )
+
+
+@dataclass(frozen=True)
+class PeriodicJob:
+    """Zadanie okresowe; func(db) zwraca liczbę przetworzonych wierszy (lub None)."""
+
+    name: str
+    interval_seconds: int
+    func: Callable[[Session], int | None]
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:6]}"
+
+
+class JobScheduler:
+    def __init__(
+        self,
+        session_factory,
+        jobs: list[PeriodicJob],
+        *,
+        config: SchedulerConfig | None = None,
+        worker_id: str | None = None,
+        clock: Callable[[], datetime] = datetime.utcnow,
+    ) -> None:
+        names = [job.name for job in jobs]
+        if len(names) != len(set(names)):
+            raise ValueError("Nazwy zadań schedulera muszą być unikalne")
+
+        self.session_factory = session_factory
+        self.jobs = list(jobs)
+        self.config = config or SchedulerConfig()
+        self.worker_id = worker_id or default_worker_id()
+        self._clock = clock
+        self._task: asyncio.Task | None = None
+
+    # --- lease ---
+
+    def register_jobs(self) -> None:
+        """Dodaje brakujące wiersze scheduled_jobs (nowe zadanie jest od razu należne)."""
+
+        now = self._clock()
+        db = self.session_factory()
+        try:
+            insert = dialect_insert(db)
+            for job in self.jobs:
+                db.execute(
+                    insert(ScheduledJob)
+                    .values(
+                        name=job.name,
+                        next_run_at=now,
+                        run_count=0,
+                        failure_count=0,
+                    )
+                    .on_conflict_do_nothing(index_elements=["name"])
+                )
+            db.commit()
+        finally:
+            db.close()
+
+    def _claim(self, job: PeriodicJob, now: datetime) -> bool:
+        db = self.session_factory()
+        try:
+            result = db.execute(
+                update(ScheduledJob)
+                .where(
+                    ScheduledJob.name == job.name,
+                    ScheduledJob.next_run_at <= now,
+                    or_(
+                        ScheduledJob.lease_expires_at.is_(None),
+                        ScheduledJob.lease_expires_at <= now,
+                    ),
+                )
+                .values(
+                    lease_owner=self.worker_id,
+                    lease_expires_at=now + timedelta(seconds=self.config.lease_seconds),
+                    last_started_at=now,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            return result.rowcount == 1
+        finally:
+            db.close()
+
+    def _release(
+        self,
+        job: PeriodicJob,
+        started_at: datetime,
+        duration_ms: int,
+        rows: int | None,
+        error: str | None,
+    ) -> None:
+        db = self.session_factory()
+        try:
+            result = db.execute(
+                update(ScheduledJob)
+                .where(
+                    ScheduledJob.name == job.name,
+                    ScheduledJob.lease_owner == self.worker_id,
+                )
+                .values(
+                    lease_owner=None,
+                    lease_expires_at=None,
+                    next_run_at=started_at + timedelta(seconds=job.interval_seconds),
+                    last_finished_at=self._clock(),
+                    last_duration_ms=duration_ms,
+                    last_rows=rows,
+                    last_status="error" if error else "ok",
+                    last_error=error,
+                    last_worker=self.worker_id,
+                    run_count=ScheduledJob.run_count + 1,
+                    failure_count=ScheduledJob.failure_count + (1 if error else 0),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            if result.rowcount != 1:
+                log.warning(
+                    "Scheduler job %s finished after its lease was taken over (worker %s)",
+                    job.name,
+                    self.worker_id,
+                )
+        finally:
+            db.close()
+
+    # --- wykonanie ---
+
+    def run_job(self, job: PeriodicJob) -> bool:
+        """Wykonuje zadanie, jeśli jest należne i udało się przejąć lease."""
+
+        started_at = self._clock()
+        if not self._claim(job, started_at):
+            return False
+
+        started = time.perf_counter()
+        rows = None
+        error = None
+
+        db = self.session_factory()
+        try:
+            rows = job.func(db)
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            error = "".join(traceback.format_exception_only(type(exc), exc)).strip()[:MAX_ERROR_LENGTH]
+            log.exception("Scheduler job %s failed", job.name)
+        finally:
+            db.close()
+
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        self._release(job, started_at, duration_ms, rows, error)
+
+        if error is None:
+            log.info("Scheduler job %s done: rows=%s duration_ms=%s", job.name, rows, duration_ms)
+        return True
+
+    def run_pending(self) -> list[str]:
+        """Jedno przejście po zadaniach; zwraca nazwy wykonanych. Blokujące."""
+
+        executed = []
+        for job in self.jobs:
+            try:
+                if self.run_job(job):
+                    executed.append(job.name)
+            except Exception:
+                # Błąd samej bazy przy przejmowaniu lease — spróbujemy w kolejnym ticku.
+                log.exception("Scheduler could not process job %s", job.name)
+        return executed
+
+    async def run(self) -> None:
+        await asyncio.to_thread(self.register_jobs)
+
+        while True:
+            try:
+                await asyncio.to_thread(self.run_pending)
+            except Exception:
+                log.exception("Scheduler tick failed")
+            await asyncio.sleep(self.config.tick_seconds)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+def _iso(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+def scheduled_jobs_status(db) -> list[dict]:
+    rows = db.query(ScheduledJob).order_by(ScheduledJob.name.asc()).all()
+    return [
+        {
+            "name": row.name,
+            "next_run_at": _iso(row.next_run_at),
+            "running": row.lease_owner is not None,
+            "lease_owner": row.lease_owner,
+            "lease_expires_at": _iso(row.lease_expires_at),
+            "last_started_at": _iso(row.last_started_at),
+            "last_finished_at": _iso(row.last_finished_at),
+            "last_duration_ms": row.last_duration_ms,
+            "last_rows": row.last_rows,
+            "last_status": row.last_status,
+            "last_error": row.last_error,
+            "last_worker": row.last_worker,
+            "run_count": row.run_count,
+            "failure_count": row.failure_count,
+        }
+        for row in rows
+    ]
@@ -315,6 +315,7 @@ class EventOut(BaseModel):
 
     # EVENT COVER (opcjonalne MVP)
     event_cover_url: Optional[str] = None
+    event_cover_variants: Optional[dict[str, dict[str, str]]] = None
 
     # PRICING
     pricing_type: str
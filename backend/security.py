@@ -8,24 +8,49 @@ from fastapi import HTTPException, Request, status, Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 from jose.exceptions import ExpiredSignatureError
-from passlib.context import CryptContext
-from passlib.exc import UnknownHashError
 
 from backend.db.database import SessionLocal
-from backend.models import User, UserStatus, AuditLog
+from backend.audit_log import record_audit_event
+from backend.models import User, UserStatus
 from backend.error_codes import ErrorCode
 from backend.exceptions import ApiException
+from backend.password_hasher import PasswordHasherBusyError, get_password_hasher
 
 
 # =========================
 # HASZOWANIE HASEŁ
 # =========================
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt liczony jest w dedykowanej puli procesów (backend.password_hasher),
+# żeby fala logowań nie blokowała wspólnej puli wątków.
+
+
+def _busy_error() -> ApiException:
+    return ApiException(status_code=503, code=ErrorCode.SERVICE_BUSY)
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    try:
+        return get_password_hasher().hash(password)
+    except PasswordHasherBusyError:
+        raise _busy_error()
+
+
+def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str | None,
+) -> tuple[bool, str | None]:
+    """
+    Zwraca (czy_poprawne, nowy_hash). Nowy hash jest zwracany, gdy zapisany hash
+    ma inną liczbę rund bcrypt niż PASSWORD_BCRYPT_ROUNDS — wywołujący powinien go zapisać.
+    Pusty lub nieobsługiwany hash (np. stare 'TEST_HASH' z dawnych seedów) daje (False, None).
+    """
+    if not hashed_password:
+        return False, None
+    try:
+        return get_password_hasher().verify_and_update(plain_password, hashed_password)
+    except PasswordHasherBusyError:
+        raise _busy_error()
 
 
 def verify_password(plain_password: str, hashed_password: str | None) -> bool:
@@ -33,12 +58,8 @@ def verify_password(plain_password: str, hashed_password: str | None) -> bool:
     Zwraca False zamiast wywalać 500, gdy hash jest pusty lub w nieobsługiwanym formacie
     (np. stare 'TEST_HASH' z dawnych seedów).
     """
-    if not hashed_password:
-        return False
-    try:
-        return pwd_context.verify(plain_password, hashed_password)
-    except UnknownHashError:
-        return False
+    verified, _ = verify_and_update_password(plain_password, hashed_password)
+    return verified
 
 
 # =========================
@@ -76,15 +97,15 @@ def _get_user_agent(request: Request) -> str | None:
 
 
 def _audit(db, *, action: str, request: Request, user_id: int | None, details: str | None = None) -> None:
-    log = AuditLog(
-        user_id=user_id,
+    # Wpis trafia do bufora audytu (zapis hurtowy w tle); `db` zostaje w sygnaturze
+    # dla zgodności wywołań, ale nie jest już commitowane.
+    record_audit_event(
         action=action,
+        user_id=user_id,
         ip=_get_ip(request),
         user_agent=_get_user_agent(request),
         details=details,
     )
-    db.add(log)
-    db.commit()
 
 
 # =========================
@@ -160,7 +160,7 @@ def _seed_groups(db):
         Group(
             title="AI & Tech",
             description="Nowinki, projekty, dyskusje.",
-            interest_tag="AI",
+            interest_tag="ai",
             members_count=0,
         ),
         Group(
@@ -0,0 +1,333 @@
+"""Hashowane, prekompresowane zasoby statyczne frontendu.
+
+Krok budowania (uruchamiany przy deployu):
+
+    python -m backend.static_assets
+
+czyta pliki JS/CSS z `frontend/`, nadaje im nazwy z hashem treści
+(`app.3f2a9c1b7d4e.js`), zapisuje obok kopie `.gz` i `.br` oraz
+`manifest.json`. Strony HTML są przepisywane tak, aby odwoływały się do
+`/static/<nazwa-z-hashem>`, i również zapisywane w wersji skompresowanej.
+
+W runtime StaticBundle trzyma wszystko w pamięci (to ~1 MB), a
+static_response() negocjuje Accept-Encoding, ustawia ETag i odpowiada
+304 na If-None-Match. Zasoby z hashem są cache'owane na rok
+(`immutable`), HTML i stare nazwy bez hasha — `no-cache` (rewalidacja
+przez ETag). Gdy manifestu nie ma (np. lokalnie), paczka jest budowana
+w pamięci przy pierwszym użyciu.
+
+Brotli jest opcjonalne: bez pakietu `brotli` powstają tylko wersje gzip.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from backend.logger import get_logger
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - zależy od środowiska
+    brotli = None
+
+
+log = get_logger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_SOURCE_DIR = PROJECT_ROOT / "frontend"
+DEFAULT_DIST_DIR = PROJECT_ROOT / "build" / "frontend"
+
+STATIC_URL_PREFIX = "/static/"
+
+ASSET_FILES = (
+    "app.js",
+    "api.js",
+    "billing.js",
+    "config.js",
+    "style.css",
+    "admin.js",
+    "admin.css",
+    "legal/legal.css",
+    "legal/legal.js",
+)
+
+HTML_FILES = (
+    "index.html",
+    "admin.html",
+    "landing.html",
+    "landing.en.html",
+    "regulamin.html",
+    "regulamin.en.html",
+    "polityka-prywatnosci.html",
+    "privacy-policy.html",
+    "bezpieczenstwo-dzieci.html",
+    "child-safety.html",
+    "delete-account.html",
+    "delete-account.en.html",
+    "kontakt.html",
+    "contact.html",
+)
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+HASH_LENGTH = 12
+MIN_COMPRESS_BYTES = 512
+
+# Kolejność = preferencja serwera przy równych wagach q.
+_ENCODINGS = ("br", "gzip")
+_ENCODING_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    name: str
+    hashed_name: str
+    content_type: str
+    digest: str
+    bodies: dict[str, bytes] = field(repr=False)
+
+    def etag(self, encoding: str) -> str:
+        if encoding == "identity":
+            return f'"{self.digest}"'
+        return f'"{self.digest}-{encoding}"'
+
+
+@dataclass
+class StaticBundle:
+    assets: dict[str, StaticAsset]
+    pages: dict[str, StaticAsset]
+
+    def __post_init__(self) -> None:
+        self._by_hashed_name = {asset.hashed_name: asset for asset in self.assets.values()}
+
+    def hashed(self, hashed_name: str) -> StaticAsset | None:
+        return self._by_hashed_name.get(hashed_name)
+
+    def manifest(self) -> dict:
+        def describe(asset: StaticAsset) -> dict:
+            return {
+                "file": asset.hashed_name,
+                "digest": asset.digest,
+                "content_type": asset.content_type,
+                "encodings": sorted(e for e in asset.bodies if e != "identity"),
+            }
+
+        return {
+            "assets": {name: describe(a) for name, a in sorted(self.assets.items())},
+            "pages": {name: describe(p) for name, p in sorted(self.pages.items())},
+        }
+
+
+# --- Budowanie ---------------------------------------------------------------
+
+
+def _digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+
+
+def _hashed_name(name: str, digest: str) -> str:
+    path = Path(name)
+    return str(path.with_name(f"{path.stem}.{digest}{path.suffix}").as_posix())
+
+
+def _content_type(name: str) -> str:
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type.endswith("javascript"):
+        content_type += "; charset=utf-8"
+    return content_type
+
+
+def _compress(content: bytes) -> dict[str, bytes]:
+    bodies = {"identity": content}
+    if len(content) < MIN_COMPRESS_BYTES:
+        return bodies
+
+    # mtime=0: te same wejście -> te same bajty (powtarzalne buildy).
+    bodies["gzip"] = gzip.compress(content, compresslevel=9, mtime=0)
+    if brotli is not None:
+        bodies["br"] = brotli.compress(content, quality=11)
+    return bodies
+
+
+def _make_asset(name: str, content: bytes, *, hashed: bool) -> StaticAsset:
+    digest = _digest(content)
+    return StaticAsset(
+        name=name,
+        hashed_name=_hashed_name(name, digest) if hashed else name,
+        content_type=_content_type(name),
+        digest=digest,
+        bodies=_compress(content),
+    )
+
+
+def rewrite_html(html: str, assets: dict[str, StaticAsset]) -> str:
+    """Podmienia odwołania do zasobów (`app.js?v=...`, `./style.css`) na nazwy z hashem."""
+
+    for name, asset in assets.items():
+        pattern = re.compile(
+            r'(?P<attr>\b(?:src|href)=")(?:\./|/)?' + re.escape(name) + r'(?:\?[^"]*)?"'
+        )
+        html = pattern.sub(
+            lambda m: f'{m["attr"]}{STATIC_URL_PREFIX}{asset.hashed_name}"',
+            html,
+        )
+    return html
+
+
+def build_static_bundle(source_dir: Path = DEFAULT_SOURCE_DIR) -> StaticBundle:
+    assets = {}
+    for name in ASSET_FILES:
+        path = source_dir / name
+        if path.is_file():
+            assets[name] = _make_asset(name, path.read_bytes(), hashed=True)
+
+    pages = {}
+    for name in HTML_FILES:
+        path = source_dir / name
+        if path.is_file():
+            html = rewrite_html(path.read_text(encoding="utf-8"), assets)
+            pages[name] = _make_asset(name, html.encode("utf-8"), hashed=False)
+
+    return StaticBundle(assets=assets, pages=pages)
+
+
+def write_static_bundle(bundle: StaticBundle, dist_dir: Path = DEFAULT_DIST_DIR) -> Path:
+    """Zapisuje paczkę na dysk: pliki, ich wersje .gz/.br oraz manifest.json."""
+
+    for asset in [*bundle.assets.values(), *bundle.pages.values()]:
+        target = dist_dir / asset.hashed_name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        for encoding, body in asset.bodies.items():
+            target.with_name(target.name + _ENCODING_SUFFIXES.get(encoding, "")).write_bytes(body)
+
+    manifest_path = dist_dir / "manifest.json"
+    manifest_path.write_text(json.dumps(bundle.manifest(), indent=2), encoding="utf-8")
+    return manifest_path
+
+
+def load_static_bundle(dist_dir: Path = DEFAULT_DIST_DIR) -> StaticBundle:
+    manifest = json.loads((dist_dir / "manifest.json").read_text(encoding="utf-8"))
+
+    def load(entries: dict) -> dict[str, StaticAsset]:
+        loaded = {}
+        for name, entry in entries.items():
+            path = dist_dir / entry["file"]
+            bodies = {"identity": path.read_bytes()}
+            for encoding in entry["encodings"]:
+                bodies[encoding] = path.with_name(path.name + _ENCODING_SUFFIXES[encoding]).read_bytes()
+
+            loaded[name] = StaticAsset(
+                name=name,
+                hashed_name=entry["file"],
+                content_type=entry["content_type"],
+                digest=entry["digest"],
+                bodies=bodies,
+            )
+        return loaded
+
+    return StaticBundle(assets=load(manifest["assets"]), pages=load(manifest["pages"]))
+
+
+_bundle: StaticBundle | None = None
+_bundle_lock = threading.Lock()
+
+
+def get_static_bundle() -> StaticBundle:
+    global _bundle
+
+    if _bundle is None:
+        with _bundle_lock:
+            if _bundle is None:
+                if (DEFAULT_DIST_DIR / "manifest.json").is_file():
+                    _bundle = load_static_bundle(DEFAULT_DIST_DIR)
+                else:
+                    log.info("Static manifest not found in %s, building in memory", DEFAULT_DIST_DIR)
+                    _bundle = build_static_bundle(DEFAULT_SOURCE_DIR)
+
+    return _bundle
+
+
+# --- Serwowanie --------------------------------------------------------------
+
+
+def negotiate_encoding(accept_encoding: str | None, available) -> str:
+    """Wybiera najlepsze kodowanie z Accept-Encoding spośród dostępnych."""
+
+    if not accept_encoding:
+        return "identity"
+
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token] = q
+
+    best, best_q = "identity", 0.0
+    for encoding in _ENCODINGS:
+        if encoding not in available:
+            continue
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+
+    return best
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+
+def static_response(request: Request, asset: StaticAsset, *, immutable: bool) -> Response:
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"), asset.bodies)
+    etag = asset.etag(encoding)
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=asset.bodies[encoding], media_type=asset.content_type, headers=headers)
+
+
+def main() -> None:
+    bundle = build_static_bundle(DEFAULT_SOURCE_DIR)
+    manifest_path = write_static_bundle(bundle, DEFAULT_DIST_DIR)
+    print(f"Static bundle: {len(bundle.assets)} assets, {len(bundle.pages)} pages -> {manifest_path}")
+
+
+if __name__ == "__main__":
+    main()
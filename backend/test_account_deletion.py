@@ -0,0 +1,212 @@
+"""Testy usuwania danych konta w tle (partiami, ze wznowieniem)."""
+
+from __future__ import annotations
+
+import json
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import backend.main as main
+from backend.account_deletion import (
+    DELETION_STEPS,
+    AccountDeletionConfig,
+    enqueue_account_deletion,
+    process_account_deletions,
+)
+from backend.db.database import Base
+from backend.models import (
+    AccountDeletionJob,
+    Event,
+    EventSignup,
+    Friendship,
+    Group,
+    GroupMembership,
+    Message,
+    User,
+    UserNotification,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        self.now += 1.0
+        return self.now
+
+
+class _DeletionFixture(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+
+        @event.listens_for(self.engine, "connect")
+        def _foreign_keys(dbapi_connection, connection_record):
+            dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        self.db = self.Session()
+        self.addCleanup(self.engine.dispose)
+        self.addCleanup(self.db.close)
+
+        self.user = User(email="leaving@example.com", password_hash="x", role="user", status="active")
+        self.friend = User(email="friend@example.com", password_hash="x", role="user", status="active")
+        self.other = User(email="other@example.com", password_hash="x", role="user", status="active")
+        self.db.add_all([self.user, self.friend, self.other])
+        self.db.flush()
+        uid, fid, oid = self.user.id, self.friend.id, self.other.id
+
+        self.shared = Group(title="Wspólna", interest_tag="kino", members_count=3, creator_id=oid)
+        self.owned = Group(title="Własna", interest_tag="kawa", members_count=2, creator_id=uid)
+        self.db.add_all([self.shared, self.owned])
+        self.db.flush()
+        for group, member_ids in ((self.shared, (uid, fid, oid)), (self.owned, (uid, fid))):
+            for member_id in member_ids:
+                self.db.add(GroupMembership(user_id=member_id, group_id=group.id, role="member"))
+
+        for index in range(25):
+            self.db.add(Message(sender_user_id=uid, recipient_user_id=fid, content=f"m{index}"))
+            self.db.add(Message(sender_user_id=fid, recipient_user_id=uid, content=f"r{index}"))
+        for index in range(4):
+            self.db.add(Message(sender_user_id=fid, group_id=self.owned.id, content=f"g{index}"))
+        self.db.add(Message(sender_user_id=fid, recipient_user_id=oid, content="zostaje"))
+        self.db.add(Friendship(requester_user_id=uid, addressee_user_id=fid, status="accepted"))
+        self.db.add(UserNotification(user_id=uid, type="friend_request"))
+
+        now = datetime.utcnow()
+        self.event = Event(
+            partner_user_id=oid,
+            title="Koncert",
+            description="",
+            city="Gdańsk",
+            where="Centrum",
+            interest_tag="muzyka",
+            start_at=now + timedelta(days=1),
+            end_at=now + timedelta(days=1, hours=2),
+            status="published",
+        )
+        self.db.add(self.event)
+        self.db.flush()
+        self.db.add(EventSignup(event_id=self.event.id, user_id=uid))
+        self.db.commit()
+        self.uid, self.fid = uid, fid
+        self.shared_id, self.owned_id = self.shared.id, self.owned.id
+
+
+class AccountDeletionTests(_DeletionFixture):
+    def _job(self) -> AccountDeletionJob:
+        job = enqueue_account_deletion(self.db, self.uid)
+        self.db.commit()
+        return job
+
+    def test_job_deletes_everything_and_recounts_groups(self) -> None:
+        job = self._job()
+        self.assertEqual(json.loads(job.affected_group_ids_json), [self.shared_id])
+
+        process_account_deletions(self.db, AccountDeletionConfig(batch_size=10, max_seconds=1000))
+
+        self.db.expire_all()
+        job = self.db.get(AccountDeletionJob, job.id)
+        self.assertEqual(job.status, "done")
+        progress = json.loads(job.progress_json)
+        self.assertEqual(progress["messages_sent"], 25)
+        self.assertEqual(progress["messages_received"], 25)
+        self.assertEqual(progress["owned_group_messages"], 4)
+        self.assertEqual(set(progress), {step.name for step in DELETION_STEPS})
+
+        self.assertEqual(self.db.query(Message).count(), 1)
+        self.assertIsNone(self.db.get(Group, self.owned_id))
+        self.assertEqual(self.db.get(Group, self.shared_id).members_count, 2)
+        self.assertEqual(self.db.query(Friendship).count(), 0)
+        self.assertEqual(self.db.query(EventSignup).count(), 0)
+        self.assertEqual(self.db.query(UserNotification).count(), 0)
+
+    def test_resumes_from_current_step_after_time_budget(self) -> None:
+        job = self._job()
+        clock = _Clock()
+        statements = []
+
+        @event.listens_for(self.engine, "before_cursor_execute")
+        def _count(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("DELETE"):
+                statements.append(statement)
+
+        # Budżet na kilka partii: zadanie zatrzymuje się w trakcie kroków.
+        process_account_deletions(self.db, AccountDeletionConfig(batch_size=5, max_seconds=6), clock=clock)
+        self.db.expire_all()
+        job = self.db.get(AccountDeletionJob, job.id)
+        self.assertEqual(job.status, "running")
+        self.assertIsNotNone(job.current_step)
+        self.assertGreater(self.db.query(Message).count(), 1)
+
+        for _ in range(50):
+            process_account_deletions(self.db, AccountDeletionConfig(batch_size=5, max_seconds=6), clock=clock)
+        self.db.expire_all()
+        self.assertEqual(self.db.get(AccountDeletionJob, job.id).status, "done")
+        self.assertEqual(self.db.query(Message).count(), 1)
+        self.assertTrue(all("LIMIT" in statement for statement in statements))
+
+    def test_failure_is_recorded_and_retried(self) -> None:
+        job = self._job()
+        with patch("backend.account_deletion.run_step_batch", side_effect=RuntimeError("boom")):
+            process_account_deletions(self.db, AccountDeletionConfig())
+
+        self.db.expire_all()
+        job = self.db.get(AccountDeletionJob, job.id)
+        self.assertEqual(job.status, "pending")
+        self.assertEqual(job.attempts, 1)
+        self.assertIn("boom", job.last_error)
+
+
+class DeleteAccountEndpointTests(_DeletionFixture):
+    def setUp(self) -> None:
+        super().setUp()
+        patcher = patch.object(main, "SessionLocal", self.Session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_admin_delete_marks_account_and_enqueues_job(self) -> None:
+        admin = SimpleNamespace(
+            id=self.other.id,
+            role="admin",
+            admin_level="owner",
+            admin_display_name=None,
+            email="other@example.com",
+        )
+        with patch.object(main, "_best_effort_revoke_apple_credentials_for_admin_delete", return_value={}):
+            body = main.admin_delete_user_account(self.uid, current_user=admin)["data"]
+
+        self.db.expire_all()
+        self.assertEqual(self.db.get(User, self.uid).status, "deleted")
+        # Dane zostają do uruchomienia zadania — żądanie niczego nie kasuje.
+        self.assertEqual(self.db.query(Message).count(), 55)
+
+        status = main.admin_account_deletion(body["deletion_job_id"], current_user=admin)["data"]
+        self.assertEqual(status["status"], "pending")
+        self.assertEqual(status["requested_by_user_id"], self.other.id)
+        self.assertEqual(status["steps_done"], 0)
+
+        with self.assertRaises(HTTPException) as ctx:
+            main.admin_retry_account_deletion(body["deletion_job_id"], current_user=admin)
+        self.assertEqual(ctx.exception.detail, "ACCOUNT_DELETION_JOB_NOT_FAILED")
+
+        main.process_account_deletions(self.db, AccountDeletionConfig(batch_size=7))
+        items = main.admin_account_deletions(status="done", limit=10, current_user=admin)["data"]["items"]
+        self.assertEqual([item["id"] for item in items], [body["deletion_job_id"]])
+        self.assertEqual(items[0]["steps_done"], items[0]["steps_total"])
+
+
+if __name__ == "__main__":
+    unittest.main()
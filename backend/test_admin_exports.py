@@ -0,0 +1,248 @@
+"""Testy eksportów hurtowych panelu admina."""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import gzip
+import io
+import json
+import unittest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import backend.main as main
+from backend.admin_exports import (
+    ADMIN_EXPORTS,
+    AdminExportFilters,
+    event_lifecycle_status,
+    iter_admin_export,
+)
+from backend.audit_log import archive_audit_logs
+from backend.db.database import Base
+from backend.exports import iter_gzip
+from backend.models import AuditLog, Event, EventSave, EventSignup, PartnerProfile, User, UserProfile
+from backend.query_tracking import query_budget
+
+
+def _collect(response) -> bytes:
+    async def collect() -> bytes:
+        parts = []
+        async for chunk in response.body_iterator:
+            parts.append(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+        return b"".join(parts)
+
+    return asyncio.run(collect())
+
+
+class _AdminExportFixture(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        self.addCleanup(self.engine.dispose)
+
+        self.base = datetime(2026, 3, 1, 12, 0)
+        db = self.Session()
+        try:
+            self.admin = User(email="admin@example.com", password_hash="x", role="admin", status="active")
+            db.add(self.admin)
+            for index in range(6):
+                user = User(
+                    email=f"user{index}@example.com",
+                    password_hash="x",
+                    role="user",
+                    status="blocked" if index == 5 else "active",
+                    created_at=self.base + timedelta(days=index),
+                )
+                db.add(user)
+                db.flush()
+                if index % 2 == 0:
+                    db.add(UserProfile(user_id=user.id, nick=f"nick{index}", miasto="Kraków", plan="premium"))
+
+            self.partner = User(
+                email="partner@example.com",
+                password_hash="x",
+                role="partner",
+                status="active",
+                created_at=self.base,
+            )
+            db.add(self.partner)
+            db.flush()
+            db.add(PartnerProfile(user_id=self.partner.id, nazwa="Klub", miasto="Gdańsk", plan="pro"))
+
+            user_ids = [user_id for (user_id,) in db.query(User.id).filter(User.role == "user").order_by(User.id)]
+            for index in range(5):
+                event = Event(
+                    partner_user_id=self.partner.id,
+                    title=f"Event {index}",
+                    description="",
+                    city="Gdańsk",
+                    where="Centrum",
+                    interest_tag="muzyka",
+                    start_at=self.base + timedelta(days=index),
+                    end_at=self.base + timedelta(days=index, hours=2),
+                    status="draft" if index == 4 else "published",
+                )
+                db.add(event)
+                db.flush()
+                for user_id in user_ids[:index]:
+                    db.add(EventSignup(event_id=event.id, user_id=user_id))
+                if index:
+                    db.add(EventSave(event_id=event.id, user_id=user_ids[-1]))
+
+            for index in range(4):
+                db.add(
+                    AuditLog(
+                        user_id=self.admin.id if index % 2 else None,
+                        action="LOGIN_SUCCESS" if index < 3 else "ADMIN_EXPORT",
+                        created_at=self.base + timedelta(hours=index),
+                        details="password=hunter2" if index == 0 else None,
+                    )
+                )
+            db.commit()
+            self.admin_id = self.admin.id
+        finally:
+            db.close()
+
+    def _export(self, name: str, export_format: str = "csv", **filters) -> str:
+        return "".join(
+            iter_admin_export(self.Session, ADMIN_EXPORTS[name], AdminExportFilters(**filters), export_format)
+        )
+
+    def _csv(self, name: str, **filters) -> list[dict]:
+        return list(csv.DictReader(io.StringIO(self._export(name, "csv", **filters))))
+
+
+class AdminExportTests(_AdminExportFixture):
+    def test_users_export_joins_profiles_and_skips_admins(self) -> None:
+        rows = {row["email"]: row for row in self._csv("users")}
+
+        self.assertNotIn("admin@example.com", rows)
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(rows["user0@example.com"]["display_name"], "nick0")
+        self.assertEqual(rows["user0@example.com"]["plan"], "premium")
+        self.assertEqual(rows["user1@example.com"]["display_name"], "user1@example.com")
+        self.assertEqual(rows["user1@example.com"]["plan"], "free")
+        self.assertEqual(rows["partner@example.com"]["display_name"], "Klub")
+        self.assertEqual(rows["partner@example.com"]["city"], "Gdańsk")
+
+    def test_users_filters(self) -> None:
+        rows = self._csv(
+            "users",
+            role="user",
+            status="active",
+            created_from=self.base + timedelta(days=1),
+            created_to=(self.base + timedelta(days=4)).replace(tzinfo=timezone.utc),
+        )
+        self.assertEqual([row["email"] for row in rows], ["user1@example.com", "user2@example.com", "user3@example.com"])
+
+    def test_events_counts_are_loaded_per_batch(self) -> None:
+        with patch("backend.admin_exports.EXPORT_BATCH_SIZE", 2):
+            with query_budget(1 + 2 * 3, engine=self.engine):
+                text = self._export("events", "ndjson")
+
+        rows = [json.loads(line) for line in text.splitlines()]
+        self.assertEqual([row["signups_count"] for row in rows], [0, 1, 2, 3, 4])
+        self.assertEqual([row["saves_count"] for row in rows], [0, 1, 1, 1, 1])
+        self.assertEqual(rows[0]["organizer_name"], "Klub")
+        self.assertEqual(rows[4]["lifecycle_status"], "draft")
+        self.assertEqual(rows[0]["lifecycle_status"], "ended")
+
+    def test_audit_log_export_is_not_capped_and_filters_by_action(self) -> None:
+        rows = self._csv("audit-log", action="LOGIN_SUCCESS")
+
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1]["user_email"], "admin@example.com")
+        self.assertEqual(rows[0]["details"], "password=hunter2")
+
+    def test_audit_log_export_includes_archived_rows(self) -> None:
+        db = self.Session()
+        try:
+            archive_audit_logs(db, retention_days=1, now=self.base + timedelta(days=1, hours=1, minutes=30), batch_size=1)
+            self.assertEqual(db.query(AuditLog).count(), 2)
+        finally:
+            db.close()
+
+        rows = self._csv("audit-log")
+        self.assertEqual(len(rows), 4)
+        self.assertEqual([row["id"] for row in rows], sorted((row["id"] for row in rows), key=int))
+        self.assertEqual(rows[1]["user_email"], "admin@example.com")
+
+        rows = self._csv(
+            "audit-log",
+            action="LOGIN_SUCCESS",
+            created_from=self.base + timedelta(minutes=30),
+            created_to=self.base + timedelta(hours=2, minutes=30),
+        )
+        self.assertEqual([row["created_at"] for row in rows], [(self.base + timedelta(hours=h)).isoformat() for h in (1, 2)])
+
+    def test_gzip_stream_round_trips(self) -> None:
+        chunks = iter_admin_export(self.Session, ADMIN_EXPORTS["users"], AdminExportFilters(), "csv")
+        data = gzip.decompress(b"".join(iter_gzip(chunks)))
+        self.assertEqual(data.decode("utf-8"), self._export("users"))
+
+    def test_event_lifecycle_status(self) -> None:
+        now = datetime(2026, 5, 1, tzinfo=timezone.utc)
+        self.assertEqual(event_lifecycle_status("published", datetime(2026, 4, 30), now), "ended")
+        self.assertEqual(event_lifecycle_status("published", datetime(2026, 5, 2), now), "published")
+        self.assertEqual(event_lifecycle_status("archived", datetime(2026, 4, 30), now), "archived")
+        self.assertEqual(event_lifecycle_status(None, None, now), "published")
+
+
+class AdminExportEndpointTests(_AdminExportFixture):
+    def setUp(self) -> None:
+        super().setUp()
+        patcher = patch.object(main, "SessionLocal", self.Session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        audit = patch.object(main, "record_audit_event")
+        self.record_audit_event = audit.start()
+        self.addCleanup(audit.stop)
+        self.request = SimpleNamespace(headers={}, client=SimpleNamespace(host="127.0.0.1"))
+
+    def _call(self, name: str, export_format: str, admin_level: str = "owner", **params):
+        current_user = SimpleNamespace(id=self.admin_id, role="admin", admin_level=admin_level)
+        defaults = dict(created_from=None, created_to=None, role=None, status_filter=None, action=None, gzip=False)
+        defaults.update(params)
+        return main.admin_export(name, export_format, self.request, current_user=current_user, **defaults)
+
+    def test_streams_gzip_csv_and_records_audit(self) -> None:
+        response = self._call("users", "csv", role="Partner", gzip=True)
+
+        self.assertEqual(response.media_type, "application/gzip")
+        self.assertRegex(response.headers["content-disposition"], r'filename="users-\d{8}-\d{6}\.csv\.gz"')
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(_collect(response)).decode("utf-8"))))
+        self.assertEqual([row["email"] for row in rows], ["partner@example.com"])
+
+        details = self.record_audit_event.call_args.kwargs["details"]
+        self.assertEqual(details, "export=users.csv; role=partner")
+
+    def test_permissions_and_unknown_exports(self) -> None:
+        with self.assertRaises(HTTPException) as ctx:
+            self._call("audit-log", "csv", admin_level="operations")
+        self.assertEqual(ctx.exception.detail, "ADMIN_PERMISSION_DENIED")
+
+        for name, export_format in (("payments", "csv"), ("users", "xlsx")):
+            with self.assertRaises(HTTPException) as ctx:
+                self._call(name, export_format)
+            self.assertEqual(ctx.exception.status_code, 404)
+
+    def test_rejects_empty_date_range(self) -> None:
+        with self.assertRaises(HTTPException) as ctx:
+            self._call("events", "ndjson", created_from=self.base, created_to=self.base)
+        self.assertEqual(ctx.exception.detail, "INVALID_DATE_RANGE")
+
+
+if __name__ == "__main__":
+    unittest.main()
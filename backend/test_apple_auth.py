@@ -7,12 +7,14 @@ from cryptography.hazmat.primitives.asymmetric import rsa
 from jose import jwt
 from jose.utils import base64url_encode
 
+from backend import apple_auth
 from backend.apple_auth import (
     APPLE_ISSUER,
     AppleAuthKeyError,
     AppleAuthTokenError,
     verify_apple_identity_token,
 )
+from backend.identity_keys import IdentityKeyProvider
 
 
 IOS_AUDIENCE = "com.usly.app"
@@ -51,6 +53,17 @@ class AppleIdentityTokenVerificationTests(unittest.TestCase):
         )
         cls.public_jwk = _rsa_public_jwk(cls.private_key)
 
+    def setUp(self):
+        # Fresh cache per test; unknown kids may refetch immediately.
+        provider = IdentityKeyProvider(
+            "Apple",
+            lambda: apple_auth._fetch_apple_jwks(),
+            min_forced_refresh_interval_seconds=0,
+        )
+        patcher = patch.object(apple_auth, "apple_signing_keys", provider)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def make_token(
         self,
         *,
@@ -96,7 +109,7 @@ class AppleIdentityTokenVerificationTests(unittest.TestCase):
     ):
         with patch(
             "backend.apple_auth._fetch_apple_jwks",
-            return_value=[self.public_jwk],
+            return_value=([self.public_jwk], None),
         ):
             return verify_apple_identity_token(
                 token,
@@ -169,7 +182,7 @@ class AppleIdentityTokenVerificationTests(unittest.TestCase):
 
         with patch(
             "backend.apple_auth._fetch_apple_jwks",
-            return_value=[self.public_jwk],
+            return_value=([self.public_jwk], None),
         ) as mocked_fetch:
             with self.assertRaises(AppleAuthKeyError):
                 verify_apple_identity_token(
@@ -0,0 +1,196 @@
+"""Testy buforowanego zapisu AuditLog i retencji."""
+
+from __future__ import annotations
+
+import time
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.audit_log import (
+    AuditSink,
+    AuditSinkConfig,
+    _parse_sample_rates,
+    archive_audit_logs,
+    read_audit_log_archive,
+)
+from backend.db.database import Base
+from backend.models import AuditLog, AuditLogArchive
+
+
+class AuditLogTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.db = self.Session()
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.engine.dispose()
+
+
+class AuditSinkTests(AuditLogTestCase):
+    def make_sink(self, **config) -> AuditSink:
+        sink = AuditSink(
+            self.Session,
+            AuditSinkConfig(
+                batch_size=config.pop("batch_size", 1000),
+                flush_interval_seconds=config.pop("flush_interval_seconds", 60),
+                max_buffer_size=config.pop("max_buffer_size", 1000),
+                sample_rates=config.pop("sample_rates", {}),
+            ),
+            **config,
+        )
+        self.addCleanup(sink.close)
+        return sink
+
+    def test_record_does_not_write_until_flush(self) -> None:
+        sink = self.make_sink()
+
+        sink.record(action="LOGIN_SUCCESS", user_id=None, details="email=a@b.pl")
+
+        self.assertEqual(self.db.query(AuditLog).count(), 0)
+        self.assertEqual(sink.pending(), 1)
+
+        self.assertEqual(sink.flush(), 1)
+        row = self.db.query(AuditLog).one()
+        self.assertEqual(row.action, "LOGIN_SUCCESS")
+        self.assertEqual(row.details, "email=a@b.pl")
+        self.assertIsNotNone(row.created_at)
+
+    def test_batch_threshold_wakes_background_flush(self) -> None:
+        sink = self.make_sink(batch_size=3)
+
+        for _ in range(3):
+            sink.record(action="EVENT_JOIN", user_id=None)
+
+        deadline = time.monotonic() + 5
+        while sink.written < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(sink.written, 3)
+        self.assertEqual(self.db.query(AuditLog).count(), 3)
+
+    def test_close_drains_buffer(self) -> None:
+        sink = self.make_sink()
+        sink.record(action="LOGOUT", user_id=None)
+        sink.record(action="LOGOUT", user_id=None)
+
+        self.assertEqual(sink.close(), 2)
+        self.assertEqual(self.db.query(AuditLog).count(), 2)
+
+    def test_sampled_action_is_dropped_or_kept(self) -> None:
+        values = iter([0.5, 0.01])
+        sink = self.make_sink(
+            sample_rates={"TOKEN_EXPIRED": 0.05},
+            random_fn=lambda: next(values),
+        )
+
+        self.assertFalse(sink.record(action="TOKEN_EXPIRED", user_id=None))
+        self.assertTrue(sink.record(action="TOKEN_EXPIRED", user_id=None))
+        self.assertEqual(sink.sampled_out, 1)
+        self.assertEqual(sink.pending(), 1)
+
+    def test_zero_rate_drops_action(self) -> None:
+        sink = self.make_sink(sample_rates={"TOKEN_EXPIRED": 0.0})
+
+        self.assertFalse(sink.record(action="TOKEN_EXPIRED", user_id=None))
+        self.assertEqual(sink.pending(), 0)
+
+    def test_full_buffer_drops_new_records(self) -> None:
+        sink = self.make_sink(batch_size=10, max_buffer_size=2)
+
+        sink.record(action="A", user_id=None)
+        sink.record(action="B", user_id=None)
+        self.assertFalse(sink.record(action="C", user_id=None))
+        self.assertEqual(sink.dropped, 1)
+
+    def test_failed_flush_requeues_rows(self) -> None:
+        def broken_session():
+            raise_on_execute = self.Session()
+
+            def execute(*args, **kwargs):
+                raise RuntimeError("db down")
+
+            raise_on_execute.execute = execute
+            return raise_on_execute
+
+        sink = AuditSink(broken_session, AuditSinkConfig(sample_rates={}))
+        sink.record(action="LOGIN_FAIL", user_id=None)
+
+        self.assertEqual(sink.flush(), 0)
+        self.assertEqual(sink.pending(), 1)
+        sink._stopping.set()
+
+    def test_parse_sample_rates(self) -> None:
+        self.assertEqual(
+            _parse_sample_rates("token_expired=0.1, LOGOUT=0"),
+            {"TOKEN_EXPIRED": 0.1, "LOGOUT": 0.0},
+        )
+
+        with self.assertRaises(ValueError):
+            _parse_sample_rates("TOKEN_EXPIRED")
+
+        with self.assertRaises(ValueError):
+            _parse_sample_rates("TOKEN_EXPIRED=2")
+
+
+class AuditLogRetentionTests(AuditLogTestCase):
+    def test_moves_old_rows_to_compressed_archive(self) -> None:
+        now = datetime(2026, 10, 1, 12, 0)
+
+        for days_ago in (400, 300, 200, 10):
+            self.db.add(
+                AuditLog(
+                    action="LOGIN_SUCCESS",
+                    user_id=None,
+                    details=f"days_ago={days_ago}",
+                    created_at=now - timedelta(days=days_ago),
+                )
+            )
+        self.db.commit()
+
+        result = archive_audit_logs(
+            self.db,
+            retention_days=180,
+            now=now,
+            batch_size=2,
+        )
+
+        self.assertEqual(result, {"archived_rows": 3, "archive_batches": 2})
+        remaining = self.db.query(AuditLog).all()
+        self.assertEqual([row.details for row in remaining], ["days_ago=10"])
+
+        archives = self.db.query(AuditLogArchive).order_by(AuditLogArchive.id).all()
+        self.assertEqual([a.row_count for a in archives], [2, 1])
+
+        restored = [
+            item["details"]
+            for archive in archives
+            for item in read_audit_log_archive(archive)
+        ]
+        self.assertEqual(
+            restored,
+            ["days_ago=400", "days_ago=300", "days_ago=200"],
+        )
+
+    def test_noop_when_nothing_is_old(self) -> None:
+        self.db.add(AuditLog(action="LOGOUT", user_id=None))
+        self.db.commit()
+
+        result = archive_audit_logs(self.db, retention_days=30)
+
+        self.assertEqual(result, {"archived_rows": 0, "archive_batches": 0})
+        self.assertEqual(self.db.query(AuditLog).count(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
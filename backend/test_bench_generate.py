@@ -0,0 +1,122 @@
+"""Testy generatora danych benchmarkowych."""
+
+from __future__ import annotations
+
+import unittest
+from datetime import date
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.bench.endpoints import load_actors
+from backend.bench.generate import DatasetGenerator, load_cities
+from backend.db.database import Base
+from backend.models import Event, EventSignup, Friendship, GroupMembership, Message, User, UserProfile
+
+
+def _session_factory():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    return engine, sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+
+def _generate(session_factory, **overrides) -> dict:
+    options = {
+        "users": 120,
+        "events": 30,
+        "messages": 500,
+        "seed": 3,
+        "anchor": date(2026, 5, 1),
+        "password_hash": "bench-hash",
+    }
+    options.update(overrides)
+    return DatasetGenerator(session_factory, **options).run()
+
+
+class DatasetGeneratorTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine, self.Session = _session_factory()
+
+    def tearDown(self) -> None:
+        self.engine.dispose()
+
+    def test_generates_requested_volume_with_consistent_references(self) -> None:
+        counts = _generate(self.Session)
+
+        self.assertEqual(counts["users"], 120 + counts["partner_profiles"])
+        self.assertEqual(counts["user_profiles"], 120)
+        self.assertEqual(counts["events"], 30)
+        self.assertEqual(counts["messages"], 500)
+        self.assertGreater(counts["friendships"], 0)
+        self.assertGreater(counts["event_signups"], 0)
+        self.assertGreater(counts["group_memberships"], 0)
+        self.assertGreater(counts["user_notifications"], 0)
+
+        with self.Session() as db:
+            partner_ids = set(db.execute(select(User.id).where(User.role == "partner")).scalars())
+            self.assertTrue(set(db.execute(select(Event.partner_user_id)).scalars()) <= partner_ids)
+            self.assertEqual(
+                db.execute(
+                    select(func.count())
+                    .select_from(EventSignup)
+                    .join(Event, Event.id == EventSignup.event_id)
+                    .where(Event.status != "published")
+                ).scalar_one(),
+                0,
+            )
+            friendships = db.execute(select(Friendship.requester_user_id, Friendship.addressee_user_id)).all()
+            self.assertEqual(len({frozenset(pair) for pair in friendships}), len(friendships))
+
+            cities = {name for name, *_ in load_cities()}
+            self.assertTrue(set(db.execute(select(UserProfile.miasto)).scalars()) <= cities)
+
+            # Wiadomości grupowe wysyłają tylko członkowie grupy.
+            members = set(db.execute(select(GroupMembership.group_id, GroupMembership.user_id)).all())
+            group_messages = db.execute(
+                select(Message.group_id, Message.sender_user_id).where(Message.group_id.is_not(None))
+            ).all()
+            self.assertTrue(set(group_messages) <= members)
+
+    def test_same_seed_gives_same_dataset(self) -> None:
+        _generate(self.Session)
+        other_engine, OtherSession = _session_factory()
+        try:
+            _generate(OtherSession)
+
+            query = select(
+                Message.sender_user_id,
+                Message.recipient_user_id,
+                Message.content,
+                Message.created_at,
+            ).order_by(Message.id)
+            with self.Session() as db, OtherSession() as other_db:
+                self.assertEqual(db.execute(query).all(), other_db.execute(query).all())
+        finally:
+            other_engine.dispose()
+
+    def test_refuses_non_empty_database(self) -> None:
+        _generate(self.Session, users=10, events=2, messages=10)
+
+        with self.assertRaises(ValueError):
+            _generate(self.Session, users=10, events=2, messages=10)
+
+    def test_benchmark_actors_have_data_for_scenarios(self) -> None:
+        _generate(self.Session)
+
+        with self.Session() as db:
+            actors = load_actors(db, 20, seed=1)
+
+        self.assertEqual(len(actors), 20)
+        self.assertTrue(all(actor.city for actor in actors))
+        self.assertTrue(any(actor.friend_id for actor in actors))
+        self.assertTrue(any(actor.group_id for actor in actors))
+        self.assertTrue(any(actor.event_id for actor in actors))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+"""Testy warunkowego GET (ETag / If-None-Match)."""
+
+from __future__ import annotations
+
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event as sa_event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import backend.main as main
+from backend.api_response import ok
+from backend.compression import CompressionConfig, CompressionMiddleware
+from backend.conditional import compute_etag, conditional_file_response, not_modified
+from backend.db.database import Base
+from backend.json_response import FastJSONResponse, PlainJSONRoute
+from backend.models import Event, EventSignup, Group, PartnerProfile, User
+from backend.security import get_current_user
+
+
+class ConditionalHelperTests(unittest.TestCase):
+    def setUp(self) -> None:
+        app = FastAPI(default_response_class=FastJSONResponse)
+        app.router.route_class = PlainJSONRoute
+        app.add_middleware(CompressionMiddleware, config=CompressionConfig(min_bytes=100))
+        self.version = 1
+        self.built = 0
+
+        @app.get("/doc")
+        def doc(request: Request, response: Response):
+            cached = not_modified(request, response, compute_etag("doc", self.version))
+            if cached is not None:
+                return cached
+            self.built += 1
+            return ok({"text": "Regulamin " * 50, "version": self.version})
+
+        @app.get("/file")
+        def file(request: Request):
+            return conditional_file_response(request, self.path)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "terms.md"
+        self.path.write_text("# Regulamin\n", encoding="utf-8")
+        self.client = TestClient(app)
+
+    def test_compute_etag_is_stable_and_quoted(self) -> None:
+        at = datetime(2026, 10, 19, 12, 0)
+        self.assertEqual(compute_etag("event", 1, at), compute_etag("event", 1, at))
+        self.assertNotEqual(compute_etag("event", 1, at), compute_etag("event", 1, at + timedelta(microseconds=1)))
+        self.assertRegex(compute_etag("x"), r'^"[0-9a-f]{32}"$')
+
+    def test_revalidation_skips_handler_body(self) -> None:
+        first = self.client.get("/doc", headers={"Accept-Encoding": "identity"})
+        etag = first.headers["etag"]
+        self.assertEqual(first.headers["cache-control"], "private, no-cache")
+
+        second = self.client.get("/doc", headers={"If-None-Match": etag})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b"")
+        self.assertEqual(second.headers["etag"], etag)
+        self.assertEqual(self.built, 1)
+
+        self.version = 2
+        third = self.client.get("/doc", headers={"If-None-Match": etag, "Accept-Encoding": "identity"})
+        self.assertEqual(third.status_code, 200)
+        self.assertNotEqual(third.headers["etag"], etag)
+
+    def test_compression_weakens_etag_and_still_revalidates(self) -> None:
+        response = self.client.get("/doc", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertTrue(response.headers["etag"].startswith('W/"'))
+
+        again = self.client.get("/doc", headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]})
+        self.assertEqual(again.status_code, 304)
+
+    def test_file_etag_follows_content(self) -> None:
+        first = self.client.get("/file")
+        self.assertEqual(first.text, "# Regulamin\n")
+        self.assertEqual(self.client.get("/file", headers={"If-None-Match": first.headers["etag"]}).status_code, 304)
+
+        self.path.write_text("# Regulamin v2\n", encoding="utf-8")
+        changed = self.client.get("/file", headers={"If-None-Match": first.headers["etag"]})
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.text, "# Regulamin v2\n")
+
+
+class ConditionalRoutesTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        self.db = self.Session()
+        self.addCleanup(self.engine.dispose)
+        self.addCleanup(self.db.close)
+
+        partner = User(email="partner@example.com", password_hash="x", role="partner", status="active")
+        viewer = User(email="viewer@example.com", password_hash="x", role="user", status="active")
+        self.db.add_all([partner, viewer])
+        self.db.flush()
+        self.db.add(PartnerProfile(user_id=partner.id, nazwa="Klub"))
+        group = Group(title="Planszówki", interest_tag="gry", members_count=3)
+        now = datetime.utcnow()
+        event = Event(
+            partner_user_id=partner.id,
+            title="Koncert",
+            description="",
+            city="Warszawa",
+            where="Centrum",
+            interest_tag="muzyka",
+            start_at=now + timedelta(days=1),
+            end_at=now + timedelta(days=1, hours=2),
+            status="published",
+        )
+        self.db.add_all([group, event])
+        self.db.commit()
+        self.group_id, self.event_id, self.viewer_id = group.id, event.id, viewer.id
+
+        session_patch = patch.object(main, "SessionLocal", self.Session)
+        session_patch.start()
+        self.addCleanup(session_patch.stop)
+        main.app.dependency_overrides[get_current_user] = lambda: self.db.get(User, self.viewer_id)
+        self.addCleanup(main.app.dependency_overrides.clear)
+        self.client = TestClient(main.app)
+
+    def _revalidate(self, path: str, etag: str) -> int:
+        return self.client.get(path, headers={"If-None-Match": etag}).status_code
+
+    def test_groups_change_etag_when_members_change(self) -> None:
+        for path in ("/groups?limit=5", f"/groups/{self.group_id}"):
+            first = self.client.get(path)
+            self.assertEqual(first.status_code, 200)
+            self.assertEqual(first.headers["cache-control"], "public, no-cache")
+            self.assertEqual(self._revalidate(path, first.headers["etag"]), 304)
+
+            group = self.db.get(Group, self.group_id)
+            group.members_count += 1
+            self.db.commit()
+            self.assertEqual(self._revalidate(path, first.headers["etag"]), 200)
+
+    def test_event_details_change_etag_on_signup(self) -> None:
+        path = f"/events/{self.event_id}"
+        first = self.client.get(path)
+        self.assertEqual(first.json()["data"]["signups_count"], 0)
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        sa_event.listen(self.engine, "before_cursor_execute", listener)
+        try:
+            self.assertEqual(self._revalidate(path, first.headers["etag"]), 304)
+        finally:
+            sa_event.remove(self.engine, "before_cursor_execute", listener)
+        # Pomijamy odczyt widza z nadpisanego get_current_user — handler robi jedno zapytanie.
+        self.assertEqual(len([sql for sql in statements if not sql.startswith("SELECT users.")]), 1)
+
+        self.db.add(EventSignup(event_id=self.event_id, user_id=self.viewer_id))
+        self.db.commit()
+        second = self.client.get(path, headers={"If-None-Match": first.headers["etag"]})
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json()["data"]["signups_count"], 1)
+
+    def test_legal_terms_file(self) -> None:
+        # Ścieżka pliku jest względna wobec katalogu roboczego (jak na produkcji).
+        if not Path("legal/terms_pl.md").exists():
+            self.skipTest("brak legal/terms_pl.md w katalogu roboczym")
+        path = "/api/legal/terms_pl"
+        first = self.client.get(path)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(self._revalidate(path, first.headers["etag"]), 304)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,217 @@
+"""Testy list i eksportów uczestników / obserwujących wydarzenia partnera."""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import json
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import backend.main as main
+from backend.db.database import Base
+from backend.event_exports import ROSTER_KINDS, iter_roster_csv, iter_roster_ndjson, roster_page, roster_total
+from backend.models import Event, EventSave, EventSignup, User, UserBlock, UserProfile
+from backend.pagination import InvalidCursor, decode_cursor, encode_cursor
+from backend.query_tracking import query_budget
+
+
+PARTICIPANTS = ROSTER_KINDS["participants"]
+OBSERVERS = ROSTER_KINDS["observers"]
+
+
+class CursorTests(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        created_at = datetime(2026, 5, 1, 12, 30, 15, 123456)
+        self.assertEqual(decode_cursor(encode_cursor(created_at, 42)), (created_at, 42))
+
+    def test_garbage_is_rejected(self) -> None:
+        for raw in ("", "abc", "W10", encode_cursor(datetime(2026, 1, 1), 1)[:-3]):
+            with self.subTest(raw=raw), self.assertRaises(InvalidCursor):
+                decode_cursor(raw)
+
+
+class _RosterFixture(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        self.db = self.Session()
+        self.addCleanup(self.engine.dispose)
+        self.addCleanup(self.db.close)
+
+        self.partner = User(email="partner@example.com", password_hash="x", role="partner", status="active")
+        self.other_partner = User(email="other@example.com", password_hash="x", role="partner", status="active")
+        self.db.add_all([self.partner, self.other_partner])
+        self.db.flush()
+
+        now = datetime.utcnow()
+        self.event = Event(
+            partner_user_id=self.partner.id,
+            title="Koncert",
+            description="",
+            city="Warszawa",
+            where="Centrum",
+            interest_tag="muzyka",
+            start_at=now + timedelta(days=1),
+            end_at=now + timedelta(days=1, hours=2),
+            status="published",
+        )
+        self.db.add(self.event)
+        self.db.flush()
+
+        self.users = []
+        for index in range(25):
+            user = User(email=f"user{index}@example.com", password_hash="x", role="user", status="active")
+            self.db.add(user)
+            self.db.flush()
+            if index % 5:
+                self.db.add(UserProfile(user_id=user.id, nick="=HYPERLINK()" if index == 1 else f"nick{index}"))
+            # Część zapisów z tą samą chwilą — kursor musi rozstrzygać po id.
+            self.db.add(EventSignup(event_id=self.event.id, user_id=user.id, created_at=now - timedelta(minutes=index // 3)))
+            if index < 4:
+                self.db.add(EventSave(event_id=self.event.id, user_id=user.id, created_at=now - timedelta(minutes=index)))
+            self.users.append(user)
+
+        self.db.add(UserBlock(blocker_user_id=self.partner.id, blocked_user_id=self.users[3].id))
+        self.db.add(UserBlock(blocker_user_id=self.users[7].id, blocked_user_id=self.partner.id))
+        self.db.commit()
+        self.visible_ids = {user.id for user in self.users} - {self.users[3].id, self.users[7].id}
+
+
+class EventRosterTests(_RosterFixture):
+    def _walk(self, kind, limit: int) -> list[int]:
+        seen, cursor = [], None
+        while True:
+            items, next_cursor = roster_page(
+                self.db, kind, self.event.id, self.partner.id, limit=limit, cursor=cursor
+            )
+            seen.extend(item["user"]["id"] for item in items)
+            if next_cursor is None:
+                return seen
+            cursor = decode_cursor(next_cursor)
+
+    def test_cursor_walk_returns_every_visible_participant_once(self) -> None:
+        seen = self._walk(PARTICIPANTS, limit=4)
+
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(set(seen), self.visible_ids)
+        self.assertEqual(roster_total(self.db, PARTICIPANTS, self.event.id, self.partner.id), len(self.visible_ids))
+
+    def test_page_is_a_single_query_with_profiles(self) -> None:
+        event_id, partner_id = self.event.id, self.partner.id
+        with query_budget(1, engine=self.engine):
+            items, _ = roster_page(self.db, PARTICIPANTS, event_id, partner_id, limit=100)
+
+        nicks = {item["user"]["id"]: item["user"]["nick"] for item in items}
+        self.assertEqual(nicks[self.users[2].id], "nick2")
+        self.assertIsNone(nicks[self.users[5].id])
+
+    def test_observers_keep_blocked_users(self) -> None:
+        self.assertEqual(
+            set(self._walk(OBSERVERS, limit=3)),
+            {user.id for user in self.users[:4]},
+        )
+
+    def test_csv_export(self) -> None:
+        text = "".join(iter_roster_csv(self.db, PARTICIPANTS, self.event.id, self.partner.id))
+        rows = list(csv.DictReader(io.StringIO(text)))
+
+        self.assertEqual({int(row["user_id"]) for row in rows}, self.visible_ids)
+        self.assertEqual(list(rows[0]), ["user_id", "email", "nick", "signed_up_at"])
+        by_id = {int(row["user_id"]): row for row in rows}
+        self.assertEqual(by_id[self.users[1].id]["nick"], "'=HYPERLINK()")
+
+    def test_ndjson_export_is_streamed_in_batches(self) -> None:
+        with patch("backend.event_exports.EXPORT_BATCH_SIZE", 10):
+            chunks = list(iter_roster_ndjson(self.db, PARTICIPANTS, self.event.id, self.partner.id))
+
+        self.assertEqual(len(chunks), 3)
+        rows = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+        self.assertEqual({row["user_id"] for row in rows}, self.visible_ids)
+        self.assertIn("signed_up_at", rows[0])
+
+    def test_empty_csv_export_has_header(self) -> None:
+        self.assertEqual(
+            "".join(iter_roster_csv(self.db, OBSERVERS, self.event.id + 1, self.partner.id)),
+            "user_id,email,nick,saved_at\r\n",
+        )
+
+
+class PartnerRosterEndpointTests(_RosterFixture):
+    def setUp(self) -> None:
+        super().setUp()
+        patcher = patch.object(main, "SessionLocal", self.Session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _partner(self, user: User):
+        return SimpleNamespace(id=user.id, role="partner")
+
+    def test_paged_endpoint_returns_next_cursor(self) -> None:
+        first = main.partner_event_participants(
+            self.event.id, limit=10, offset=0, cursor=None, current_user=self._partner(self.partner)
+        )
+        body = first["data"]
+        self.assertEqual(body["pagination"]["total"], len(self.visible_ids))
+        self.assertEqual(len(body["items"]), 10)
+
+        second = main.partner_event_participants(
+            self.event.id,
+            limit=10,
+            offset=0,
+            cursor=body["pagination"]["next_cursor"],
+            current_user=self._partner(self.partner),
+        )
+        second_body = second["data"]
+        self.assertIsNone(second_body["pagination"]["total"])
+        self.assertFalse(
+            {item["user"]["id"] for item in body["items"]} & {item["user"]["id"] for item in second_body["items"]}
+        )
+
+    def test_invalid_cursor_is_422(self) -> None:
+        with self.assertRaises(HTTPException) as ctx:
+            main.partner_event_observers(
+                self.event.id, limit=10, offset=0, cursor="nope", current_user=self._partner(self.partner)
+            )
+        self.assertEqual(ctx.exception.detail, "INVALID_CURSOR")
+
+    def test_export_streams_csv_for_owner_only(self) -> None:
+        with self.assertRaises(HTTPException) as ctx:
+            main.partner_event_participants_export(
+                self.event.id, "csv", current_user=self._partner(self.other_partner)
+            )
+        self.assertEqual(ctx.exception.detail, "FORBIDDEN_NOT_OWNER")
+
+        response = main.partner_event_participants_export(
+            self.event.id, "csv", current_user=self._partner(self.partner)
+        )
+        self.assertEqual(response.media_type, "text/csv; charset=utf-8")
+        self.assertIn(f"event-{self.event.id}-participants.csv", response.headers["content-disposition"])
+
+        async def collect() -> str:
+            return "".join([chunk async for chunk in response.body_iterator])
+
+        rows = list(csv.DictReader(io.StringIO(asyncio.run(collect()))))
+        self.assertEqual(len(rows), len(self.visible_ids))
+
+    def test_unknown_export_format_is_404(self) -> None:
+        with self.assertRaises(HTTPException) as ctx:
+            main.partner_event_observers_export(self.event.id, "xlsx", current_user=self._partner(self.partner))
+        self.assertEqual(ctx.exception.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,215 @@
+"""Testy pełnotekstowego wyszukiwania wydarzeń (SQLite FTS5)."""
+
+from __future__ import annotations
+
+import time
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import backend.main as main
+from backend.db.database import Base
+from backend.event_search import (
+    create_event_search_index,
+    fold_search_text,
+    install_event_search,
+    rebuild_event_search,
+    search_terms,
+)
+from backend.models import Event, EventSignup, PartnerProfile, User, UserBlock
+
+
+class FoldingTests(unittest.TestCase):
+    def test_polish_text_is_folded(self) -> None:
+        self.assertEqual(fold_search_text("Łódź — Żółć, GĘŚLĄ jaźń!"), "lodz zolc gesla jazn")
+        self.assertEqual(fold_search_text(None), "")
+
+    def test_terms_drop_short_and_duplicate_words(self) -> None:
+        self.assertEqual(search_terms("a Koncert koncert w Łodzi"), ["koncert", "lodzi"])
+        self.assertEqual(search_terms("\"* OR -"), ["or"])
+        self.assertEqual(len(search_terms(" ".join(f"slowo{i}" for i in range(20)))), 8)
+
+
+class _SearchFixture(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(self.engine)
+        with self.engine.begin() as connection:
+            create_event_search_index(connection)
+        self.Session = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        install_event_search(self.Session)
+        self.addCleanup(self.engine.dispose)
+
+        patcher = patch.object(main, "SessionLocal", self.Session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        db = self.Session()
+        try:
+            self.viewer = User(email="viewer@example.com", password_hash="x", role="user", status="active")
+            self.partner = User(email="partner@example.com", password_hash="x", role="partner", status="active")
+            self.blocked_partner = User(email="blocked@example.com", password_hash="x", role="partner", status="active")
+            db.add_all([self.viewer, self.partner, self.blocked_partner])
+            db.flush()
+            db.add(PartnerProfile(user_id=self.partner.id, nazwa="Klub Żak", miasto="Gdańsk"))
+            db.add(UserBlock(blocker_user_id=self.blocked_partner.id, blocked_user_id=self.viewer.id))
+            db.commit()
+            self.viewer_id = self.viewer.id
+            self.partner_id = self.partner.id
+            self.blocked_partner_id = self.blocked_partner.id
+        finally:
+            db.close()
+
+    def _event(self, db, title: str, **fields) -> Event:
+        start_at = datetime.utcnow() + timedelta(days=fields.pop("days", 1))
+        values = dict(
+            partner_user_id=self.partner_id,
+            title=title,
+            description="",
+            city="Gdańsk",
+            where="Centrum",
+            interest_tag="muzyka",
+            start_at=start_at,
+            end_at=start_at + timedelta(hours=2),
+            status="published",
+        )
+        values.update(fields)
+        event = Event(**values)
+        db.add(event)
+        db.flush()
+        return event
+
+    def _search(self, q: str, **params):
+        defaults = dict(city=None, date=None, limit=10, offset=0, lat=None, lng=None, radius_km=None)
+        defaults.update(params)
+        current_user = SimpleNamespace(id=self.viewer_id, role="user")
+        return main.search_events(q, current_user=current_user, **defaults)["data"]
+
+    def _titles(self, q: str, **params) -> list[str]:
+        return [item["title"] for item in self._search(q, **params)["items"]]
+
+
+class EventSearchTests(_SearchFixture):
+    def test_matches_prefix_without_diacritics_and_ranks_title_first(self) -> None:
+        db = self.Session()
+        try:
+            self._event(db, "Wieczór jazzowy", description="Koncert w ogrodzie", days=1)
+            self._event(db, "Koncert chóru w Łodzi", days=2)
+            self._event(db, "Warsztaty ceramiki", where="Pracownia koncertowa", days=3)
+            db.commit()
+        finally:
+            db.close()
+
+        titles = self._titles("KONCER")
+        self.assertEqual(titles[0], "Koncert chóru w Łodzi")
+        self.assertEqual(set(titles[1:]), {"Wieczór jazzowy", "Warsztaty ceramiki"})
+        self.assertEqual(self._titles("chor lodz"), ["Koncert chóru w Łodzi"])
+        self.assertEqual(self._titles("wieczor jazz"), ["Wieczór jazzowy"])
+
+    def test_index_follows_updates_and_deletes(self) -> None:
+        db = self.Session()
+        try:
+            event = self._event(db, "Joga o poranku")
+            db.commit()
+            event.title = "Pilates o poranku"
+            db.commit()
+            self.assertEqual(self._titles("pilates"), ["Pilates o poranku"])
+            self.assertEqual(self._titles("joga"), [])
+
+            # Zmiana statusu nie przebudowuje dokumentu, ale filtr ją uwzględnia.
+            event.status = "archived"
+            db.commit()
+            self.assertEqual(self._titles("pilates"), [])
+
+            db.delete(event)
+            db.commit()
+        finally:
+            db.close()
+
+        with self.engine.connect() as connection:
+            self.assertEqual(connection.exec_driver_sql("SELECT count(*) FROM event_search").scalar(), 0)
+
+    def test_filters_and_item_counts(self) -> None:
+        db = self.Session()
+        try:
+            near = self._event(db, "Bieg nocny", location_lat=54.35, location_lng=18.65, capacity=10)
+            self._event(db, "Bieg charytatywny", location_lat=52.23, location_lng=21.01, city="Warszawa")
+            self._event(db, "Bieg przełajowy", partner_user_id=self.blocked_partner_id)
+            self._event(db, "Bieg zakończony", days=-2)
+            self._event(db, "Bieg w szkicu", status="draft")
+            db.add(EventSignup(event_id=near.id, user_id=self.viewer_id))
+            db.commit()
+        finally:
+            db.close()
+
+        body = self._search("bieg")
+        self.assertEqual(body["pagination"]["total"], 2)
+        self.assertEqual(self._titles("bieg", city="Warszawa"), ["Bieg charytatywny"])
+
+        near_body = self._search("bieg", lat=54.36, lng=18.64, radius_km=10)
+        self.assertEqual(near_body["pagination"]["total"], 1)
+        item = near_body["items"][0]
+        self.assertEqual(item["signups_count"], 1)
+        self.assertEqual(item["spots_left"], 9)
+        self.assertEqual(item["partner_name"], "Klub Żak")
+        self.assertGreater(item["_score"], 0)
+
+    def test_rejects_queries_without_terms(self) -> None:
+        with self.assertRaises(HTTPException) as ctx:
+            self._search("a ?")
+        self.assertEqual(ctx.exception.detail, "SEARCH_QUERY_TOO_SHORT")
+
+    def test_rebuild_backfills_existing_events(self) -> None:
+        db = self.Session()
+        try:
+            self._event(db, "Targi książki")
+            db.commit()
+        finally:
+            db.close()
+
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql("DELETE FROM event_search")
+            self.assertEqual(rebuild_event_search(connection, batch_size=1), 1)
+        self.assertEqual(self._titles("ksiazk"), ["Targi książki"])
+
+    def test_search_is_fast_on_many_events(self) -> None:
+        with self.engine.begin() as connection:
+            connection.execute(
+                Event.__table__.insert(),
+                [
+                    {
+                        "partner_user_id": self.partner_id,
+                        "title": f"Wydarzenie {index} {'koncert' if index % 500 == 0 else 'spotkanie'}",
+                        "description": "Opis wydarzenia w centrum miasta",
+                        "city": "Gdańsk",
+                        "where": "Centrum",
+                        "interest_tag": "muzyka",
+                        "start_at": datetime.utcnow() + timedelta(days=1),
+                        "end_at": datetime.utcnow() + timedelta(days=1, hours=2),
+                        "status": "published",
+                    }
+                    for index in range(20000)
+                ],
+            )
+            rebuild_event_search(connection)
+
+        started = time.perf_counter()
+        body = self._search("koncert")
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(body["pagination"]["total"], 40)
+        self.assertLess(elapsed, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""Testy polecanych grup i wyszukiwarki grup."""
+
+from __future__ import annotations
+
+import json
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import backend.main as main
+from backend.db.database import Base
+from backend.group_recommendations import groups_by_prefix, suggested_groups
+from backend.models import Group, GroupMembership, User, UserProfile
+from backend.query_tracking import query_budget
+
+
+class GroupRecommendationTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        self.db = self.Session()
+        self.addCleanup(self.engine.dispose)
+        self.addCleanup(self.db.close)
+
+        self.user = User(email="user@example.com", password_hash="x", role="user", status="active")
+        self.db.add(self.user)
+        self.db.flush()
+        self.db.add(
+            UserProfile(user_id=self.user.id, zainteresowania_json=json.dumps(["#Kino", "koncert"]))
+        )
+
+        specs = [
+            ("Kino nocne", "kino", 5),
+            ("Kino klasyczne", "kino", 50),
+            ("Koncerty w plenerze", "koncerty", 8),
+            ("Biegacze", "bieganie", 500),
+            ("Kawosze", "kawa", 300),
+            ("Planszówki", "planszówki", 100),
+            ("Kino dla członków", "kino", 900),
+        ]
+        self.groups = {}
+        for title, tag, members in specs:
+            group = Group(title=title, interest_tag=tag, members_count=members)
+            self.db.add(group)
+            self.groups[title] = group
+        self.db.flush()
+        self.db.add(GroupMembership(user_id=self.user.id, group_id=self.groups["Kino dla członków"].id, role="member"))
+        self.db.commit()
+        self.user_id = self.user.id
+
+    def _reference(self, interests: set[str], limit: int) -> list[str]:
+        # Dotychczasowe zachowanie: pełne sortowanie w Pythonie.
+        joined = {self.groups["Kino dla członków"].id}
+        rows = [
+            (1 if group.interest_tag in interests else 0, group.members_count, group.id, title)
+            for title, group in self.groups.items()
+            if group.id not in joined
+        ]
+        rows.sort(key=lambda row: (-row[0], -row[1], row[2]))
+        return [row[3] for row in rows[:limit]]
+
+    def test_matches_full_sort_for_every_limit(self) -> None:
+        interests = {"kino", "koncerty"}
+        for limit in range(1, 8):
+            with self.subTest(limit=limit):
+                titles = [g.title for g in suggested_groups(self.db, self.user_id, interests, limit)]
+                self.assertEqual(titles, self._reference(interests, limit))
+
+    def test_without_interests_returns_largest_groups(self) -> None:
+        titles = [g.title for g in suggested_groups(self.db, self.user_id, set(), 3)]
+        self.assertEqual(titles, ["Biegacze", "Kawosze", "Planszówki"])
+
+    def test_is_a_single_query(self) -> None:
+        user_id = self.user_id
+        with query_budget(1, engine=self.engine):
+            suggested_groups(self.db, user_id, {"kino", "koncerty", "kawa"}, 20)
+
+    def test_prefix_search_on_tag_and_title(self) -> None:
+        groups, total = groups_by_prefix(self.db, "#KIN", limit=2)
+        self.assertEqual(total, 3)
+        self.assertEqual([g.title for g in groups], ["Kino dla członków", "Kino klasyczne"])
+
+        groups, total = groups_by_prefix(self.db, "kaw", limit=10)
+        self.assertEqual([g.title for g in groups], ["Kawosze"])
+
+        # Alias zainteresowania sprowadzany do tagu kanonicznego.
+        groups, _ = groups_by_prefix(self.db, "koncert", limit=10)
+        self.assertEqual([g.title for g in groups], ["Koncerty w plenerze"])
+
+    def test_endpoints(self) -> None:
+        current_user = SimpleNamespace(id=self.user_id, role="user")
+        with patch.object(main, "SessionLocal", self.Session):
+            body = main.list_suggested_groups(current_user=current_user, limit=2)["data"]
+            self.assertEqual([item["title"] for item in body["items"]], ["Kino klasyczne", "Koncerty w plenerze"])
+
+            body = main.search_groups("bieg", limit=20, offset=0, current_user=current_user)["data"]
+            self.assertEqual(body["pagination"]["total"], 1)
+            self.assertEqual(body["items"][0]["members_count"], 500)
+
+            with self.assertRaises(HTTPException) as ctx:
+                main.search_groups(" # ", limit=20, offset=0, current_user=current_user)
+            self.assertEqual(ctx.exception.detail, "SEARCH_QUERY_TOO_SHORT")
+
+
+if __name__ == "__main__":
+    unittest.main()
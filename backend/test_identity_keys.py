@@ -0,0 +1,207 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwt
+
+from backend import google_auth
+from backend.google_auth import (
+    GoogleAuthKeyError,
+    GoogleAuthTokenError,
+    verify_google_id_token,
+)
+from backend.identity_keys import (
+    IdentityKeyError,
+    IdentityKeyProvider,
+    parse_max_age,
+)
+from backend.test_apple_auth import _rsa_public_jwk
+
+
+GOOGLE_AUDIENCE = "usly-web.apps.googleusercontent.com"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingFetch:
+    def __init__(self, keys, max_age=None):
+        self.keys = keys
+        self.max_age = max_age
+        self.calls = 0
+        self.error = None
+        self.delay = 0.0
+
+    def __call__(self):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return list(self.keys), self.max_age
+
+
+class IdentityKeyProviderTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        cls.jwk = _rsa_public_jwk(cls.private_key, kid="k1")
+
+    def make_provider(self, fetch, **kwargs):
+        self.clock = FakeClock()
+        return IdentityKeyProvider("Test", fetch, clock=self.clock, **kwargs)
+
+    def test_parse_max_age(self):
+        self.assertEqual(parse_max_age("public, max-age=19845, must-revalidate"), 19845)
+        self.assertEqual(parse_max_age("max-age=60"), 60)
+        self.assertIsNone(parse_max_age("no-cache"))
+        self.assertIsNone(parse_max_age(None))
+
+    def test_keys_are_cached_until_refresh_window(self):
+        fetch = CountingFetch([self.jwk], max_age=1000)
+        provider = self.make_provider(fetch)
+
+        first = provider.get_key("k1")
+        self.clock.now += 700
+        second = provider.get_key("k1")
+
+        self.assertIs(first, second)
+        self.assertEqual(fetch.calls, 1)
+
+    def test_refresh_ahead_runs_in_background(self):
+        fetch = CountingFetch([self.jwk], max_age=1000)
+        provider = self.make_provider(fetch)
+        provider.warm()
+
+        self.clock.now += 850
+        provider.get_key("k1")
+        provider._background_refresh.join(timeout=5)
+
+        self.assertEqual(fetch.calls, 2)
+        self.assertEqual(provider.keyset().fetched_at, self.clock.now)
+
+    def test_expired_cache_blocks_once_for_concurrent_callers(self):
+        fetch = CountingFetch([self.jwk], max_age=1000)
+        fetch.delay = 0.1
+        provider = self.make_provider(fetch)
+
+        threads = [threading.Thread(target=provider.get_key, args=("k1",)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(fetch.calls, 1)
+
+    def test_failed_refresh_keeps_stale_keys(self):
+        fetch = CountingFetch([self.jwk], max_age=100)
+        provider = self.make_provider(fetch)
+        provider.warm()
+
+        fetch.error = IdentityKeyError("down")
+        self.clock.now += 500
+
+        self.assertIsNotNone(provider.get_key("k1"))
+        self.assertEqual(fetch.calls, 2)
+
+    def test_cold_cache_failure_raises(self):
+        fetch = CountingFetch([self.jwk])
+        fetch.error = IdentityKeyError("down")
+        provider = self.make_provider(fetch)
+
+        with self.assertRaises(IdentityKeyError):
+            provider.get_key("k1")
+
+    def test_unknown_kid_refetch_is_rate_limited(self):
+        fetch = CountingFetch([self.jwk], max_age=3600)
+        provider = self.make_provider(fetch, min_forced_refresh_interval_seconds=30)
+        provider.warm()
+
+        with self.assertRaises(IdentityKeyError):
+            provider.get_key("rotated")
+        self.assertEqual(fetch.calls, 1)
+
+        self.clock.now += 31
+        fetch.keys = [self.jwk, _rsa_public_jwk(self.private_key, kid="rotated")]
+        self.assertIsNotNone(provider.get_key("rotated"))
+        self.assertEqual(fetch.calls, 2)
+
+    def test_ttl_is_clamped(self):
+        fetch = CountingFetch([self.jwk], max_age=0)
+        provider = self.make_provider(fetch)
+
+        keyset = provider.keyset()
+
+        self.assertEqual(keyset.expires_at - keyset.fetched_at, 60)
+
+
+class GoogleIdTokenVerificationTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        cls.private_key_pem = cls.private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        )
+        cls.public_jwk = _rsa_public_jwk(cls.private_key, kid="google-test")
+
+    def setUp(self):
+        self.fetch = CountingFetch([self.public_jwk], max_age=3600)
+        provider = IdentityKeyProvider("Google", self.fetch, min_forced_refresh_interval_seconds=0)
+        patcher = patch.object(google_auth, "google_signing_keys", provider)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_token(self, *, audience=GOOGLE_AUDIENCE, issuer="https://accounts.google.com", kid="google-test", expires_in=300):
+        now = int(time.time())
+        claims = {
+            "iss": issuer,
+            "aud": audience,
+            "sub": "google-user-1",
+            "email": "google-test@example.com",
+            "email_verified": True,
+            "at_hash": "ignored",
+            "iat": now,
+            "exp": now + expires_in,
+        }
+        return jwt.encode(claims, self.private_key_pem, algorithm="RS256", headers={"kid": kid})
+
+    def test_accepts_valid_token_and_reuses_keys(self):
+        for issuer in ("accounts.google.com", "https://accounts.google.com"):
+            claims = verify_google_id_token(self.make_token(issuer=issuer), audience=GOOGLE_AUDIENCE)
+            self.assertEqual(claims["sub"], "google-user-1")
+
+        self.assertEqual(self.fetch.calls, 1)
+
+    def test_rejects_wrong_audience(self):
+        with self.assertRaises(GoogleAuthTokenError):
+            verify_google_id_token(self.make_token(audience="other"), audience=GOOGLE_AUDIENCE)
+
+    def test_rejects_wrong_issuer(self):
+        with self.assertRaises(GoogleAuthTokenError):
+            verify_google_id_token(self.make_token(issuer="https://evil.example"), audience=GOOGLE_AUDIENCE)
+
+    def test_rejects_expired_token(self):
+        with self.assertRaises(GoogleAuthTokenError):
+            verify_google_id_token(self.make_token(expires_in=-60), audience=GOOGLE_AUDIENCE)
+
+    def test_rejects_unknown_kid(self):
+        with self.assertRaises(GoogleAuthKeyError):
+            verify_google_id_token(self.make_token(kid="missing"), audience=GOOGLE_AUDIENCE)
+
+    def test_rejects_garbage(self):
+        with self.assertRaises(GoogleAuthTokenError):
+            verify_google_id_token("not-a-jwt", audience=GOOGLE_AUDIENCE)
+
+
+if __name__ == "__main__":
+    unittest.main()
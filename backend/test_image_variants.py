@@ -0,0 +1,91 @@
+"""Testy przetwarzania uploadów obrazów na warianty."""
+
+from __future__ import annotations
+
+import io
+import unittest
+
+from PIL import Image
+
+from backend.image_variants import (
+    IMAGE_VARIANT_SIZES,
+    InvalidImageError,
+    image_variant_urls,
+    process_image,
+)
+
+
+def make_image(size=(2000, 1000), mode="RGB", fmt="JPEG", **save_kwargs) -> bytes:
+    color = (200, 30, 30, 128) if mode == "RGBA" else (200, 30, 30)
+    buffer = io.BytesIO()
+    Image.new(mode, size, color).save(buffer, fmt, **save_kwargs)
+    return buffer.getvalue()
+
+
+class ProcessImageTests(unittest.TestCase):
+    def test_generates_webp_and_jpeg_for_each_size(self) -> None:
+        processed = process_image(make_image())
+
+        self.assertEqual((processed.width, processed.height), (2000, 1000))
+        self.assertEqual(len(processed.variants), len(IMAGE_VARIANT_SIZES) * 2)
+
+        for variant in processed.variants:
+            with Image.open(io.BytesIO(variant.content)) as decoded:
+                self.assertEqual(max(decoded.size), variant.size)
+                self.assertEqual(decoded.format, {"jpg": "JPEG", "webp": "WEBP"}[variant.ext])
+
+    def test_does_not_upscale_small_images(self) -> None:
+        processed = process_image(make_image(size=(100, 80), fmt="PNG"))
+
+        largest = [v for v in processed.variants if v.size == 1024]
+        with Image.open(io.BytesIO(largest[0].content)) as decoded:
+            self.assertEqual(decoded.size, (100, 80))
+
+    def test_strips_exif_metadata(self) -> None:
+        exif = Image.Exif()
+        exif[0x010F] = "Camera maker"
+        processed = process_image(make_image(exif=exif.tobytes()))
+
+        for variant in processed.variants:
+            with Image.open(io.BytesIO(variant.content)) as decoded:
+                self.assertEqual(len(decoded.getexif()), 0)
+
+    def test_transparent_png_is_flattened_for_jpeg(self) -> None:
+        processed = process_image(make_image(size=(300, 300), mode="RGBA", fmt="PNG"))
+
+        jpeg = next(v for v in processed.variants if v.ext == "jpg")
+        with Image.open(io.BytesIO(jpeg.content)) as decoded:
+            self.assertEqual(decoded.mode, "RGB")
+
+    def test_rejects_non_image_content(self) -> None:
+        with self.assertRaises(InvalidImageError):
+            process_image(b"\x89PNG\r\n\x1a\nnot really a png")
+
+    def test_image_id_is_deterministic(self) -> None:
+        content = make_image(size=(50, 50))
+
+        self.assertEqual(process_image(content).image_id, process_image(content).image_id)
+
+
+class ImageVariantUrlsTests(unittest.TestCase):
+    def test_derives_all_variants_from_primary_url(self) -> None:
+        image_id = "a" * 32
+        urls = image_variant_urls(f"https://cdn.example.com/avatars/{image_id}/1024.jpg")
+
+        self.assertEqual(
+            urls["64"],
+            {
+                "webp": f"https://cdn.example.com/avatars/{image_id}/64.webp",
+                "jpg": f"https://cdn.example.com/avatars/{image_id}/64.jpg",
+            },
+        )
+        self.assertEqual(set(urls), {str(size) for size in IMAGE_VARIANT_SIZES})
+
+    def test_legacy_urls_have_no_variants(self) -> None:
+        self.assertIsNone(image_variant_urls("/uploads/static/avatars/abc.png"))
+        self.assertIsNone(image_variant_urls(""))
+        self.assertIsNone(image_variant_urls(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
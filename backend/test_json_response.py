@@ -0,0 +1,117 @@
+"""Testy szybkiej serializacji JSON i kompresji odpowiedzi."""
+
+from __future__ import annotations
+
+import json
+import unittest
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import brotli
+from fastapi import BackgroundTasks, FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from backend.api_response import ok
+from backend.compression import CompressionConfig, CompressionMiddleware
+from backend.json_response import FastJSONResponse, PlainJSONRoute, dumps
+
+
+class _Item(BaseModel):
+    id: int
+    at: datetime
+
+
+PAYLOAD = {
+    "naive": datetime(2026, 10, 19, 12, 30, 5, 123456),
+    "aware": datetime(2026, 10, 19, 12, 30, tzinfo=timezone.utc),
+    "day": date(2026, 10, 19),
+    "model": _Item(id=1, at=datetime(2026, 1, 1)),
+    "price": Decimal("9.90"),
+    "by_id": {3: "trzy"},
+    "text": "zażółć gęślą jaźń",
+}
+
+
+class FastJSONTests(unittest.TestCase):
+    def test_matches_jsonable_encoder_output(self) -> None:
+        expected = json.dumps(jsonable_encoder(ok(PAYLOAD)))
+        self.assertEqual(json.loads(dumps(ok(PAYLOAD))), json.loads(expected))
+
+    def test_route_skips_jsonable_encoder_for_plain_dicts(self) -> None:
+        app = FastAPI(default_response_class=FastJSONResponse)
+        app.router.route_class = PlainJSONRoute
+        ran = []
+
+        @app.get("/sync")
+        def sync_endpoint(limit: int = 1):
+            return ok({"limit": limit, "at": PAYLOAD["naive"]})
+
+        @app.get("/async")
+        async def async_endpoint(background_tasks: BackgroundTasks):
+            background_tasks.add_task(ran.append, "done")
+            return ok([PAYLOAD["day"]])
+
+        @app.get("/model", response_model=_Item)
+        def model_endpoint():
+            return {"id": "7", "at": PAYLOAD["naive"]}
+
+        client = TestClient(app)
+        self.assertEqual(client.get("/sync?limit=5").json()["data"], {"limit": 5, "at": "2026-10-19T12:30:05.123456"})
+        self.assertEqual(client.get("/sync?limit=x").status_code, 422)
+        self.assertEqual(client.get("/async").json()["data"], ["2026-10-19"])
+        self.assertEqual(ran, ["done"])
+        # Trasa z response_model idzie zwykłą ścieżką FastAPI (walidacja modelu).
+        self.assertEqual(client.get("/model").json()["id"], 7)
+        # Dekorator zwraca oryginalną funkcję — testy wywołują handlery wprost.
+        self.assertEqual(sync_endpoint(limit=2)["data"]["limit"], 2)
+
+
+class CompressionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        app = FastAPI(default_response_class=FastJSONResponse)
+        app.router.route_class = PlainJSONRoute
+        app.add_middleware(CompressionMiddleware, config=CompressionConfig(min_bytes=100))
+        self.body = {"items": [{"id": index, "title": "Koncert w parku"} for index in range(50)]}
+
+        @app.get("/big")
+        def big():
+            return ok(self.body)
+
+        @app.get("/small")
+        def small():
+            return ok({"id": 1})
+
+        @app.get("/stream")
+        def stream():
+            return StreamingResponse(iter([b"a" * 500, b"b" * 500]), media_type="text/csv")
+
+        self.client = TestClient(app)
+
+    def test_negotiates_brotli_and_gzip(self) -> None:
+        response = self.client.get("/big", headers={"Accept-Encoding": "gzip, br"})
+        self.assertEqual(response.headers["content-encoding"], "br")
+        self.assertIn("Accept-Encoding", response.headers["vary"])
+        self.assertEqual(response.json()["data"], self.body)
+
+        response = self.client.get("/big", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertLess(int(response.headers["content-length"]), len(dumps(ok(self.body))))
+        self.assertEqual(response.json()["data"], self.body)
+
+    def test_raw_body_is_smaller(self) -> None:
+        with self.client.stream("GET", "/big", headers={"Accept-Encoding": "br"}) as response:
+            raw = b"".join(response.iter_raw())
+        self.assertLess(len(raw), len(dumps(ok(self.body))))
+        self.assertEqual(json.loads(brotli.decompress(raw))["data"], self.body)
+
+    def test_skips_small_streaming_and_unaccepted(self) -> None:
+        self.assertNotIn("content-encoding", self.client.get("/small", headers={"Accept-Encoding": "gzip"}).headers)
+        self.assertNotIn("content-encoding", self.client.get("/stream", headers={"Accept-Encoding": "gzip"}).headers)
+        self.assertNotIn("content-encoding", self.client.get("/big", headers={"Accept-Encoding": "identity"}).headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
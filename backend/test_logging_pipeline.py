@@ -0,0 +1,212 @@
+"""Testy kolejkowanego, strukturalnego logowania."""
+
+from __future__ import annotations
+
+import io
+import json
+import logging
+import os
+import queue
+import random
+import unittest
+from unittest import mock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.logger import (
+    LoggingConfig,
+    NonBlockingQueueHandler,
+    RateLimitFilter,
+    TextFormatter,
+    bind_request_id,
+    build_log_pipeline,
+    load_logging_config,
+    mask_sensitive,
+    reset_request_id,
+)
+from backend.metrics import MetricsMiddleware, MetricsRegistry
+
+
+def _record(name: str = "backend.test", level: int = logging.INFO, msg: str = "hello", args=()) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+class _PipelineCase(unittest.TestCase):
+    def _logger(self, config: LoggingConfig) -> tuple[logging.Logger, io.StringIO]:
+        stream = io.StringIO()
+        handler, listener = build_log_pipeline(config, stream=stream)
+        listener.start()
+        self.addCleanup(listener.stop)
+
+        logger = logging.getLogger(f"backend.test_pipeline.{self.id()}")
+        logger.handlers = [handler]
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        self.addCleanup(setattr, logger, "handlers", [])
+        return logger, stream
+
+    def _flush(self, stream: io.StringIO, logger: logging.Logger) -> list[str]:
+        # Listener woła task_done() dopiero po zapisaniu rekordu.
+        logger.handlers[0].queue.join()
+        return stream.getvalue().splitlines()
+
+
+class MaskingTests(unittest.TestCase):
+    def test_masks_key_value_and_json_forms(self) -> None:
+        self.assertEqual(
+            mask_sensitive("login=aga password=SuperTajne123 token: abcdef"),
+            "login=aga password=******** token: ********",
+        )
+        self.assertEqual(
+            mask_sensitive('{"authorization":"Bearer XYZ","api_key": "k123"}'),
+            '{"authorization":"********","api_key": "********"}',
+        )
+
+    def test_masks_bearer_header_and_prefixed_keys(self) -> None:
+        self.assertEqual(mask_sensitive("Authorization: Bearer abc.def"), "Authorization: ********")
+        self.assertEqual(mask_sensitive("refresh ACCESS_TOKEN=xyz;"), "refresh ACCESS_TOKEN=********;")
+
+    def test_leaves_plain_text_alone(self) -> None:
+        text = "user_id=7 sent 3 messages, token count unknown"
+        self.assertEqual(mask_sensitive(text), text)
+
+
+class PipelineTests(_PipelineCase):
+    def test_json_records_carry_request_id_extras_and_masked_fields(self) -> None:
+        logger, stream = self._logger(LoggingConfig(json_format=True, sample_rates={}, rate_limits={}))
+
+        token = bind_request_id("req-123")
+        try:
+            logger.info("login password=%s", "hunter2", extra={"user_id": 7, "token_id": 5, "api_key": "k1"})
+        finally:
+            reset_request_id(token)
+        logger.warning("outside request")
+
+        first, second = (json.loads(line) for line in self._flush(stream, logger))
+        self.assertEqual(first["message"], "login password=********")
+        self.assertEqual(first["request_id"], "req-123")
+        self.assertEqual(first["user_id"], 7)
+        self.assertEqual(first["token_id"], 5)
+        self.assertEqual(first["api_key"], "********")
+        self.assertEqual(first["level"], "INFO")
+        self.assertNotIn("request_id", second)
+
+    def test_exception_traceback_is_formatted_on_listener(self) -> None:
+        logger, stream = self._logger(LoggingConfig(json_format=True, sample_rates={}, rate_limits={}))
+
+        try:
+            raise RuntimeError("secret=abc")
+        except RuntimeError:
+            logger.exception("failed")
+
+        entry = json.loads(self._flush(stream, logger)[0])
+        self.assertIn("RuntimeError: secret=********", entry["exc"])
+
+    def test_text_format_appends_extras(self) -> None:
+        logger, stream = self._logger(LoggingConfig(json_format=False, sample_rates={}, rate_limits={}))
+
+        logger.info("Push sent", extra={"user_id": 3, "token": "abc"})
+
+        line = self._flush(stream, logger)[0]
+        self.assertIn("| INFO |", line)
+        self.assertIn("| - | Push sent | user_id=3 token=********", line)
+
+    def test_arguments_are_rendered_before_enqueueing(self) -> None:
+        handler = NonBlockingQueueHandler(queue.Queue())
+        payload = {"count": 1}
+        record = _record(msg="payload %s", args=(payload,))
+
+        handler.handle(record)
+        payload["count"] = 2
+
+        self.assertEqual(handler.queue.get_nowait().getMessage(), "payload {'count': 1}")
+
+    def test_full_queue_drops_instead_of_blocking(self) -> None:
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+
+        handler.handle(_record())
+        handler.handle(_record())
+
+        self.assertEqual(handler.queue.qsize(), 1)
+        self.assertEqual(handler.dropped, 1)
+
+
+class RateLimitFilterTests(unittest.TestCase):
+    def test_sampling_applies_below_warning_only(self) -> None:
+        rate_filter = RateLimitFilter({"backend.push": 0.0}, rng=random.Random(1))
+
+        self.assertFalse(rate_filter.filter(_record("backend.push.fcm")))
+        self.assertTrue(rate_filter.filter(_record("backend.push", logging.WARNING)))
+        self.assertTrue(rate_filter.filter(_record("backend.main")))
+
+    def test_rate_limit_reports_suppressed_records(self) -> None:
+        now = [0.0]
+        rate_filter = RateLimitFilter(rate_limits={"backend.push": 2}, clock=lambda: now[0])
+
+        results = [rate_filter.filter(_record("backend.push")) for _ in range(5)]
+        self.assertEqual(results, [True, True, False, False, False])
+
+        now[0] = 1.0
+        record = _record("backend.push")
+        self.assertTrue(rate_filter.filter(record))
+        self.assertEqual(record.suppressed, 3)
+
+
+class ConfigTests(unittest.TestCase):
+    def test_env_overrides_defaults(self) -> None:
+        env = {
+            "ENV": "prod",
+            "LOG_LEVEL": "warning",
+            "LOG_SAMPLE_RATES": "backend.main=0.5",
+            "LOG_RATE_LIMITS": "backend.push=0",
+        }
+        with mock.patch.dict(os.environ, env, clear=False):
+            config = load_logging_config()
+
+        self.assertTrue(config.json_format)
+        self.assertEqual(config.level, logging.WARNING)
+        self.assertEqual(config.sample_rates["backend.main"], 0.5)
+        self.assertNotIn("backend.push", config.rate_limits)
+
+    def test_invalid_values_are_rejected(self) -> None:
+        for env in ({"LOG_FORMAT": "xml"}, {"LOG_SAMPLE_RATES": "backend.push=2"}, {"LOG_RATE_LIMITS": "push"}):
+            with self.subTest(env=env), mock.patch.dict(os.environ, env, clear=False):
+                with self.assertRaises(ValueError):
+                    load_logging_config()
+
+
+class RequestIdMiddlewareTests(_PipelineCase):
+    def test_records_from_handler_get_the_response_request_id(self) -> None:
+        logger, stream = self._logger(LoggingConfig(json_format=True, sample_rates={}, rate_limits={}))
+
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware, registry=MetricsRegistry())
+
+        @app.get("/sync")
+        def sync_endpoint():
+            logger.info("in threadpool")
+            return {}
+
+        @app.get("/async")
+        async def async_endpoint():
+            logger.info("in event loop")
+            return {}
+
+        with TestClient(app) as client:
+            sync_id = client.get("/sync").headers["x-request-id"]
+            async_id = client.get("/async", headers={"X-Request-ID": "given-id"}).headers["x-request-id"]
+
+        entries = [json.loads(line) for line in self._flush(stream, logger)]
+        self.assertEqual([entry["request_id"] for entry in entries], [sync_id, async_id])
+        self.assertEqual(async_id, "given-id")
+
+
+class TextFormatterTests(unittest.TestCase):
+    def test_missing_request_id_defaults_to_dash(self) -> None:
+        line = TextFormatter("%(request_id)s %(message)s").format(_record(msg="x"))
+        self.assertEqual(line, "- x")
+
+
+if __name__ == "__main__":
+    unittest.main()
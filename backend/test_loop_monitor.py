@@ -0,0 +1,46 @@
+"""Testy monitora opóźnienia pętli zdarzeń."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import unittest
+
+from backend.loop_monitor import EventLoopLagConfig, EventLoopLagMonitor
+
+
+class EventLoopLagMonitorTests(unittest.IsolatedAsyncioTestCase):
+    async def test_detects_blocked_loop(self) -> None:
+        monitor = EventLoopLagMonitor(
+            EventLoopLagConfig(interval_seconds=0.01, threshold_seconds=0.05)
+        )
+        monitor.start()
+        await asyncio.sleep(0.03)
+
+        time.sleep(0.2)
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+
+        self.assertGreaterEqual(monitor.stalls_total, 1)
+        self.assertGreaterEqual(monitor.max_lag_seconds, 0.1)
+
+    async def test_idle_loop_has_no_stalls(self) -> None:
+        monitor = EventLoopLagMonitor(
+            EventLoopLagConfig(interval_seconds=0.01, threshold_seconds=0.5)
+        )
+        monitor.start()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+
+        self.assertEqual(monitor.stalls_total, 0)
+        self.assertEqual(monitor.snapshot()["stalls_total"], 0)
+
+    def test_observe_ignores_negative_lag(self) -> None:
+        monitor = EventLoopLagMonitor()
+        monitor.observe(-0.001)
+
+        self.assertEqual(monitor.last_lag_seconds, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,240 @@
+"""Testy archiwum starych wiadomości i odczytu historii z archiwum."""
+
+from __future__ import annotations
+
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import backend.main as main
+from backend.db.database import Base
+from backend.message_archive import (
+    MessageArchiveConfig,
+    archive_messages,
+    archived_page,
+    group_conversation_key,
+    private_conversation_key,
+    purge_user_from_archives,
+    read_message_archive,
+)
+from backend.models import Group, GroupMembership, Message, MessageArchive, User, UserBlock
+
+
+class MessageArchiveTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        self.db = self.Session()
+        self.addCleanup(self.engine.dispose)
+        self.addCleanup(self.db.close)
+
+        self.alice = User(email="alice@example.com", password_hash="x", role="user", status="active")
+        self.bob = User(email="bob@example.com", password_hash="x", role="user", status="active")
+        self.carol = User(email="carol@example.com", password_hash="x", role="user", status="active")
+        self.db.add_all([self.alice, self.bob, self.carol])
+        self.db.flush()
+        self.group = Group(title="Kino", interest_tag="kino", members_count=3)
+        self.db.add(self.group)
+        self.db.flush()
+        for user in (self.alice, self.bob, self.carol):
+            self.db.add(GroupMembership(user_id=user.id, group_id=self.group.id, role="member"))
+
+        self.now = datetime(2026, 10, 1)
+        start = self.now - timedelta(days=400)
+        # 30 wiadomości prywatnych co 10 dni: 22 starsze niż 180 dni, reszta świeża.
+        for index in range(30):
+            sender, recipient = (self.alice, self.bob) if index % 2 == 0 else (self.bob, self.alice)
+            self.db.add(
+                Message(
+                    sender_user_id=sender.id,
+                    recipient_user_id=recipient.id,
+                    content=f"p{index}",
+                    created_at=start + timedelta(days=10 * index),
+                    is_read=True,
+                )
+            )
+        for index in range(12):
+            sender = (self.alice, self.bob, self.carol)[index % 3]
+            self.db.add(
+                Message(
+                    sender_user_id=sender.id,
+                    group_id=self.group.id,
+                    content=f"g{index}",
+                    created_at=start + timedelta(days=40 * index),
+                )
+            )
+        # Stara, ale nieprzeczytana: zostaje w messages.
+        self.db.add(
+            Message(
+                sender_user_id=self.carol.id,
+                recipient_user_id=self.alice.id,
+                content="nieprzeczytana",
+                created_at=start,
+                is_read=False,
+            )
+        )
+        self.db.commit()
+        self.ids = {"alice": self.alice.id, "bob": self.bob.id, "carol": self.carol.id}
+        self.group_id = self.group.id
+
+    def _archive(self, batch_size: int = 7) -> dict:
+        return archive_messages(self.db, MessageArchiveConfig(after_days=180, batch_size=batch_size), now=self.now)
+
+    def _history(self, fetch, target_id: int, user_id: int, page: int) -> list[str]:
+        current_user = SimpleNamespace(id=user_id, role="user")
+        contents, offset = [], 0
+        with patch.object(main, "SessionLocal", self.Session):
+            while True:
+                body = fetch(target_id, limit=page, offset=offset, current_user=current_user)["data"]
+                contents.extend(item["content"] for item in body["items"])
+                offset += page
+                if offset >= body["pagination"]["total"]:
+                    return contents
+
+    def test_moves_old_read_messages_into_compressed_segments(self) -> None:
+        result = self._archive()
+
+        self.assertEqual(result["archived_rows"], 22 + 6)
+        self.assertEqual(self.db.query(Message).filter(Message.content == "nieprzeczytana").count(), 1)
+        self.assertEqual(self.db.query(Message).count(), 8 + 6 + 1)
+
+        segments = self.db.query(MessageArchive).all()
+        self.assertEqual(sum(segment.row_count for segment in segments), 28)
+        for segment in segments:
+            rows = read_message_archive(segment)
+            self.assertEqual(len(rows), segment.row_count)
+            self.assertEqual({row["created_at"].month for row in rows}, {segment.month.month})
+            self.assertEqual([row["id"] for row in rows], sorted(row["id"] for row in rows))
+
+        # Druga runda nie ma już nic do przeniesienia.
+        self.assertEqual(self._archive()["archived_rows"], 0)
+
+    def test_history_pages_span_archive_and_hot_rows(self) -> None:
+        expected = self._history(main.list_private_messages, self.ids["bob"], self.ids["alice"], 100)
+        self._archive()
+
+        for page in (1, 4, 7, 100):
+            with self.subTest(page=page):
+                got = self._history(main.list_private_messages, self.ids["bob"], self.ids["alice"], page)
+                self.assertEqual(got, expected)
+
+    def test_page_only_decompresses_covered_segments(self) -> None:
+        self._archive()
+        key = private_conversation_key(self.ids["bob"], self.ids["alice"])
+        with patch("backend.message_archive.read_message_archive", wraps=read_message_archive) as reader:
+            items, total = archived_page(self.db, key, offset=1, limit=2)
+        self.assertEqual(total, 22)
+        self.assertEqual([item["content"] for item in items], ["p1", "p2"])
+        self.assertEqual(reader.call_count, 1)
+
+    def test_group_history_hides_blocked_senders(self) -> None:
+        self.db.add(UserBlock(blocker_user_id=self.ids["alice"], blocked_user_id=self.ids["carol"]))
+        self.db.commit()
+        expected = self._history(main.list_group_messages, self.group_id, self.ids["alice"], 100)
+        self.assertNotIn("g2", expected)
+
+        self._archive()
+        for page in (3, 100):
+            with self.subTest(page=page):
+                got = self._history(main.list_group_messages, self.group_id, self.ids["alice"], page)
+                self.assertEqual(got, expected)
+
+    def test_conversation_list_includes_fully_archived_conversations(self) -> None:
+        self.db.add(
+            Message(
+                sender_user_id=self.ids["carol"],
+                recipient_user_id=self.ids["bob"],
+                content="stara rozmowa",
+                created_at=self.now - timedelta(days=300),
+                is_read=True,
+            )
+        )
+        self.db.commit()
+        self._archive()
+        self.assertEqual(
+            self.db.query(Message).filter(Message.sender_user_id == self.ids["carol"], Message.recipient_user_id == self.ids["bob"]).count(),
+            0,
+        )
+
+        with patch.object(main, "SessionLocal", self.Session):
+            body = main.list_private_conversations(limit=10, current_user=SimpleNamespace(id=self.ids["bob"], role="user"))["data"]
+        by_user = {item["other_user_id"]: item for item in body["items"]}
+        self.assertEqual(by_user[self.ids["carol"]]["last_message"], "stara rozmowa")
+        self.assertEqual(by_user[self.ids["alice"]]["last_message"], "p29")
+
+    def test_unread_message_keeps_newer_part_of_conversation_hot(self) -> None:
+        # Po starej nieprzeczytanej (carol -> alice) przychodzą nowsze, już przeczytane.
+        # Historię czyta carol — odczyt przez alice oznaczyłby wiadomość jako przeczytaną.
+        for index in range(3):
+            self.db.add(
+                Message(
+                    sender_user_id=self.ids["carol"],
+                    recipient_user_id=self.ids["bob"],
+                    content=f"obok{index}",
+                    created_at=self.now - timedelta(days=300 - index),
+                    is_read=True,
+                )
+            )
+            self.db.add(
+                Message(
+                    sender_user_id=self.ids["alice"],
+                    recipient_user_id=self.ids["carol"],
+                    content=f"po{index}",
+                    created_at=self.now - timedelta(days=300 - index),
+                    is_read=True,
+                )
+            )
+        self.db.commit()
+        expected = self._history(main.list_private_messages, self.ids["alice"], self.ids["carol"], 100)
+        self.assertEqual(expected, ["nieprzeczytana", "po0", "po1", "po2"])
+
+        self._archive()
+        key = private_conversation_key(self.ids["alice"], self.ids["carol"])
+        self.assertEqual(self.db.query(MessageArchive).filter(MessageArchive.conversation_key == key).count(), 0)
+        # Inne rozmowy tych samych osób archiwizują się normalnie.
+        self.assertEqual(self.db.query(Message).filter(Message.content.like("obok%")).count(), 0)
+        for page in (1, 3):
+            with self.subTest(page=page):
+                got = self._history(main.list_private_messages, self.ids["alice"], self.ids["carol"], page)
+                self.assertEqual(got, expected)
+
+    def test_conversation_list_reads_preview_without_decompressing(self) -> None:
+        self._archive()
+        self.db.query(Message).filter(Message.group_id.is_(None)).delete()
+        self.db.commit()
+
+        with patch.object(main, "SessionLocal", self.Session), patch(
+            "backend.message_archive.read_message_archive", wraps=read_message_archive
+        ) as reader:
+            body = main.list_private_conversations(limit=10, current_user=SimpleNamespace(id=self.ids["bob"], role="user"))["data"]
+        self.assertEqual(reader.call_count, 0)
+        [item] = body["items"]
+        self.assertEqual(item["other_user_id"], self.ids["alice"])
+        self.assertEqual(item["last_message"], "p21")
+        self.assertEqual(item["last_message_at"], self.now - timedelta(days=400 - 210))
+
+    def test_purge_removes_user_messages_from_archive(self) -> None:
+        self._archive()
+        while purge_user_from_archives(self.db, self.ids["carol"], batch_size=2):
+            self.db.commit()
+
+        remaining = [row for segment in self.db.query(MessageArchive) for row in read_message_archive(segment)]
+        self.assertTrue(remaining)
+        self.assertNotIn(self.ids["carol"], {row["sender_user_id"] for row in remaining})
+        key = group_conversation_key(self.group_id)
+        _, total = archived_page(self.db, key, offset=0, limit=1)
+        self.assertEqual(total, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
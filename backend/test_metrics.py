@@ -0,0 +1,147 @@
+"""Testy middleware metryk i eksportu w formacie Prometheusa."""
+
+from __future__ import annotations
+
+import os
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from backend.metrics import Gauge, Histogram, MetricsMiddleware, MetricsRegistry, instrument_engine
+
+
+class HistogramTests(unittest.TestCase):
+    def test_buckets_are_cumulative_and_inclusive(self) -> None:
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.cumulative(), [("0.1", 2), ("1.0", 3), ("+Inf", 4)])
+        self.assertAlmostEqual(histogram.sum, 3.65)
+
+
+class MetricsMiddlewareTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        self.registry = MetricsRegistry()
+        instrument_engine(self.engine, self.registry)
+
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware, registry=self.registry)
+
+        @app.get("/items/{item_id}")
+        def get_item(item_id: int):
+            with self.engine.connect() as conn:
+                for _ in range(3):
+                    conn.execute(text("SELECT 1"))
+            return {"id": item_id}
+
+        @app.get("/async/{item_id}")
+        async def get_async(item_id: int):
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return {"id": item_id}
+
+        @app.get("/missing")
+        def missing():
+            raise HTTPException(status_code=404, detail="nope")
+
+        self.client = TestClient(app)
+
+    def tearDown(self) -> None:
+        self.engine.dispose()
+
+    def test_request_id_is_generated_or_propagated(self) -> None:
+        generated = self.client.get("/items/1")
+        propagated = self.client.get("/items/1", headers={"X-Request-ID": "abc-123"})
+
+        self.assertTrue(generated.headers["x-request-id"])
+        self.assertEqual(propagated.headers["x-request-id"], "abc-123")
+        self.assertEqual(propagated.headers.get_list("x-request-id"), ["abc-123"])
+
+    def test_records_latency_by_route_template(self) -> None:
+        self.client.get("/items/1")
+        self.client.get("/items/2")
+        self.client.get("/missing")
+        self.client.get("/does-not-exist")
+
+        self.assertEqual(self.registry.requests_total[("GET", "/items/{item_id}", "200")], 2)
+        self.assertEqual(self.registry.requests_total[("GET", "/missing", "404")], 1)
+        self.assertEqual(self.registry.requests_total[("GET", "unmatched", "404")], 1)
+        self.assertEqual(self.registry.request_seconds[("GET", "/items/{item_id}")].count, 2)
+        self.assertEqual(self.registry.in_flight, 0)
+
+    def test_counts_sql_statements_per_request(self) -> None:
+        self.client.get("/items/1")
+        self.client.get("/async/1")
+
+        sync_queries = self.registry.request_db_queries[("GET", "/items/{item_id}")]
+        async_queries = self.registry.request_db_queries[("GET", "/async/{item_id}")]
+
+        self.assertEqual(sync_queries.sum, 3)
+        self.assertEqual(async_queries.sum, 1)
+        self.assertEqual(self.registry.db_statements_total, 4)
+
+    def test_statements_outside_requests_are_counted_globally(self) -> None:
+        with self.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        self.assertEqual(self.registry.db_statements_total, 1)
+        self.assertEqual(self.registry.request_db_queries, {})
+
+    def test_render_prometheus_text(self) -> None:
+        self.registry.register_collector(lambda: [Gauge("usly_test_value", "Test gauge.", 2.5)])
+        self.client.get("/items/1")
+
+        body = self.registry.render()
+
+        self.assertIn('http_requests_total{method="GET",route="/items/{item_id}",status="200"} 1', body)
+        self.assertIn('http_request_duration_seconds_bucket{method="GET",route="/items/{item_id}",le="+Inf"} 1', body)
+        self.assertIn('http_request_db_queries_sum{method="GET",route="/items/{item_id}"} 3.0', body)
+        self.assertIn("# TYPE http_request_duration_seconds histogram", body)
+        self.assertIn("db_statement_duration_seconds_count 3", body)
+        self.assertIn("usly_test_value 2.5", body)
+
+    def test_failing_collector_does_not_break_export(self) -> None:
+        def broken():
+            raise RuntimeError("boom")
+
+        self.registry.register_collector(broken)
+
+        self.assertIn("http_requests_in_flight 0", self.registry.render())
+
+
+class MetricsEndpointTests(unittest.TestCase):
+    def call(self, authorization: str | None):
+        from backend.main import metrics
+
+        headers = {"authorization": authorization} if authorization else {}
+        return metrics(SimpleNamespace(headers=headers))
+
+    def test_disabled_without_token(self) -> None:
+        with patch.dict(os.environ, {"METRICS_TOKEN": ""}):
+            with self.assertRaises(HTTPException) as ctx:
+                self.call("Bearer anything")
+        self.assertEqual(ctx.exception.status_code, 404)
+
+    def test_requires_bearer_token(self) -> None:
+        with patch.dict(os.environ, {"METRICS_TOKEN": "scrape-secret"}):
+            with self.assertRaises(HTTPException) as ctx:
+                self.call("Bearer wrong")
+            response = self.call("Bearer scrape-secret")
+
+        self.assertEqual(ctx.exception.status_code, 401)
+        self.assertIn("usly_event_loop_lag_seconds", response.body.decode("utf-8"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+"""Testy feedu powiadomień, licznika nieprzeczytanych i oznaczania zbiorczego."""
+
+from __future__ import annotations
+
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import backend.main as main
+from backend.db.database import Base
+from backend.account_deletion import DELETION_STEPS, run_step_batch
+from backend.models import Event, User, UserNotification
+from backend.notifications import (
+    install_notification_counters,
+    mark_notifications_read,
+    recount_unread_notifications,
+    unread_notifications_count,
+)
+
+
+class NotificationFeedTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        install_notification_counters(self.Session)
+        self.db = self.Session()
+        self.addCleanup(self.engine.dispose)
+        self.addCleanup(self.db.close)
+
+        user = User(email="user@example.com", password_hash="x", role="user", status="active")
+        other = User(email="other@example.com", password_hash="x", role="user", status="active")
+        self.db.add_all([user, other])
+        self.db.flush()
+        self.user_id, self.other_id = user.id, other.id
+
+        base = datetime(2026, 10, 1)
+        # Te same created_at parami — kolejność rozstrzyga id.
+        for index in range(9):
+            self.db.add(
+                UserNotification(
+                    user_id=self.user_id,
+                    type="friend_request",
+                    created_at=base + timedelta(minutes=index // 2),
+                    read_at=base if index < 2 else None,
+                )
+            )
+        self.db.add(UserNotification(user_id=self.other_id, type="friend_request"))
+        self.db.commit()
+        self.current_user = SimpleNamespace(id=self.user_id, role="user")
+
+    def test_counter_follows_orm_changes(self) -> None:
+        self.assertEqual(unread_notifications_count(self.db, self.user_id), 7)
+        self.assertEqual(unread_notifications_count(self.db, self.other_id), 1)
+
+        notifications = (
+            self.db.query(UserNotification)
+            .filter(UserNotification.user_id == self.user_id, UserNotification.read_at.is_(None))
+            .order_by(UserNotification.id)
+            .all()
+        )
+        notifications[0].read_at = datetime.utcnow()
+        self.db.delete(notifications[1])
+        self.db.commit()
+        self.assertEqual(unread_notifications_count(self.db, self.user_id), 5)
+
+    def test_mark_read_up_to_id_and_all(self) -> None:
+        ids = [n.id for n in self.db.query(UserNotification).filter(UserNotification.user_id == self.user_id).order_by(UserNotification.id)]
+
+        self.assertEqual(mark_notifications_read(self.db, self.user_id, up_to_id=ids[4]), 3)
+        self.db.commit()
+        self.assertEqual(unread_notifications_count(self.db, self.user_id), 4)
+
+        self.assertEqual(mark_notifications_read(self.db, self.user_id), 4)
+        self.db.commit()
+        self.assertEqual(unread_notifications_count(self.db, self.user_id), 0)
+        self.assertEqual(unread_notifications_count(self.db, self.other_id), 1)
+        self.assertEqual(
+            self.db.query(UserNotification).filter(UserNotification.read_at.is_(None)).count(),
+            1,
+        )
+
+    def test_recount_repairs_counter(self) -> None:
+        self.db.query(User).update({User.unread_notifications_count: 42})
+        recount_unread_notifications(self.db)
+        self.db.commit()
+        self.assertEqual(unread_notifications_count(self.db, self.user_id), 7)
+
+    def test_feed_keyset_pages_match_full_order(self) -> None:
+        with patch.object(main, "SessionLocal", self.Session):
+            full = main.my_notifications(limit=100, offset=0, cursor=None, current_user=self.current_user)["data"]
+            self.assertEqual(full["total"], 9)
+            self.assertEqual(full["unread_count"], 7)
+            self.assertIsNone(full["next_cursor"])
+            expected = [item["notification"]["id"] for item in full["items"]]
+
+            seen, cursor = [], None
+            while True:
+                body = main.my_notifications(limit=2, offset=0, cursor=cursor, current_user=self.current_user)["data"]
+                seen.extend(item["notification"]["id"] for item in body["items"])
+                cursor = body["next_cursor"]
+                if cursor is None:
+                    break
+                self.assertIsNone(main.my_notifications(limit=2, offset=0, cursor=cursor, current_user=self.current_user)["data"]["total"])
+            self.assertEqual(seen, expected)
+
+            with self.assertRaises(HTTPException) as ctx:
+                main.my_notifications(limit=2, offset=0, cursor="???", current_user=self.current_user)
+            self.assertEqual(ctx.exception.detail, "INVALID_CURSOR")
+
+    def test_endpoints(self) -> None:
+        with patch.object(main, "SessionLocal", self.Session):
+            body = main.my_notifications_unread_count(current_user=self.current_user)["data"]
+            self.assertEqual(body, {"unread_count": 7})
+
+            newest_id = main.my_notifications(limit=1, offset=0, cursor=None, current_user=self.current_user)["data"]["items"][0]["notification"]["id"]
+            body = main.mark_my_notifications_read(
+                main.NotificationsMarkReadRequest(up_to_id=newest_id - 1),
+                current_user=self.current_user,
+            )["data"]
+            self.assertEqual(body, {"marked": 6, "unread_count": 1})
+
+            body = main.mark_all_my_notifications_read(current_user=self.current_user)["data"]
+            self.assertEqual(body, {"marked": 1, "unread_count": 0})
+
+    def test_deletes_outside_orm_keep_counter(self) -> None:
+        partner = User(email="partner@example.com", password_hash="x", role="partner", status="active")
+        self.db.add(partner)
+        self.db.flush()
+        now = datetime.utcnow()
+        event = Event(
+            partner_user_id=partner.id,
+            title="Koncert",
+            description="",
+            city="Warszawa",
+            where="Centrum",
+            interest_tag="muzyka",
+            start_at=now + timedelta(days=1),
+            end_at=now + timedelta(days=1, hours=2),
+            status="published",
+        )
+        self.db.add(event)
+        self.db.flush()
+        self.db.add_all(
+            [
+                UserNotification(user_id=self.user_id, type="event_reminder", event_id=event.id),
+                UserNotification(user_id=self.user_id, type="friend_request", partner_user_id=partner.id),
+                UserNotification(user_id=self.other_id, type="friend_request", partner_user_id=partner.id, read_at=now),
+            ]
+        )
+        self.db.commit()
+        event_id, partner_id = event.id, partner.id
+        self.assertEqual(unread_notifications_count(self.db, self.user_id), 9)
+
+        with patch.object(main, "SessionLocal", self.Session):
+            main.partner_delete_event(event_id, current_user=SimpleNamespace(id=partner_id, role="partner"))
+        self.assertEqual(unread_notifications_count(self.db, self.user_id), 8)
+
+        step = next(step for step in DELETION_STEPS if step.name == "notifications")
+        self.assertEqual(run_step_batch(self.db, step, partner_id, batch_size=1), 1)
+        self.assertEqual(run_step_batch(self.db, step, partner_id, batch_size=1), 1)
+        self.assertEqual(run_step_batch(self.db, step, partner_id, batch_size=1), 0)
+        self.db.commit()
+
+        self.assertEqual(unread_notifications_count(self.db, self.user_id), 7)
+        self.assertEqual(unread_notifications_count(self.db, self.other_id), 1)
+        self.assertEqual(
+            self.db.query(UserNotification).filter(UserNotification.user_id == self.user_id, UserNotification.read_at.is_(None)).count(),
+            7,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
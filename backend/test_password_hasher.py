@@ -0,0 +1,97 @@
+"""Testy puli procesów haszowania haseł bcrypt."""
+
+from __future__ import annotations
+
+import unittest
+from unittest.mock import patch
+
+from backend.password_hasher import (
+    PasswordHasher,
+    PasswordHasherBusyError,
+    PasswordHasherConfig,
+    load_password_hasher_config,
+)
+
+
+class PasswordHasherInlineTests(unittest.TestCase):
+    def make_hasher(self, rounds: int = 4) -> PasswordHasher:
+        return PasswordHasher(
+            PasswordHasherConfig(workers=0, max_pending=2, bcrypt_rounds=rounds)
+        )
+
+    def test_hash_and_verify(self) -> None:
+        hasher = self.make_hasher()
+        hashed = hasher.hash("tajne-haslo")
+
+        self.assertTrue(hashed.startswith("$2"))
+        self.assertEqual(hasher.verify_and_update("tajne-haslo", hashed), (True, None))
+        self.assertEqual(hasher.verify_and_update("inne", hashed), (False, None))
+
+    def test_unknown_hash_is_rejected(self) -> None:
+        hasher = self.make_hasher()
+
+        self.assertEqual(hasher.verify_and_update("x", "TEST_HASH"), (False, None))
+
+    def test_rehashes_when_rounds_change(self) -> None:
+        old_hash = self.make_hasher(rounds=4).hash("tajne-haslo")
+        hasher = self.make_hasher(rounds=5)
+
+        verified, new_hash = hasher.verify_and_update("tajne-haslo", old_hash)
+
+        self.assertTrue(verified)
+        self.assertIsNotNone(new_hash)
+        self.assertIn("$05$", new_hash)
+        self.assertEqual(hasher.verify_and_update("tajne-haslo", new_hash), (True, None))
+
+    def test_wrong_password_does_not_rehash(self) -> None:
+        old_hash = self.make_hasher(rounds=4).hash("tajne-haslo")
+
+        self.assertEqual(
+            self.make_hasher(rounds=5).verify_and_update("inne", old_hash),
+            (False, None),
+        )
+
+    def test_raises_busy_when_queue_is_full(self) -> None:
+        hasher = PasswordHasher(
+            PasswordHasherConfig(workers=0, max_pending=1, bcrypt_rounds=4)
+        )
+        hasher._slots.acquire()
+
+        try:
+            with self.assertRaises(PasswordHasherBusyError):
+                hasher.hash("tajne-haslo")
+        finally:
+            hasher._slots.release()
+
+        self.assertTrue(hasher.hash("tajne-haslo").startswith("$2"))
+
+
+class PasswordHasherProcessPoolTests(unittest.TestCase):
+    def test_hashes_in_worker_process(self) -> None:
+        hasher = PasswordHasher(
+            PasswordHasherConfig(workers=1, max_pending=2, bcrypt_rounds=4)
+        )
+        self.addCleanup(hasher.shutdown)
+
+        hashed = hasher.hash("tajne-haslo")
+
+        self.assertEqual(hasher.verify_and_update("tajne-haslo", hashed), (True, None))
+        self.assertIsNotNone(hasher._executor)
+
+
+class PasswordHasherConfigTests(unittest.TestCase):
+    def test_defaults_scale_queue_with_workers(self) -> None:
+        with patch.dict("os.environ", {"PASSWORD_HASH_WORKERS": "3"}, clear=False):
+            config = load_password_hasher_config()
+
+        self.assertEqual(config.workers, 3)
+        self.assertEqual(config.max_pending, 12)
+
+    def test_rejects_invalid_rounds(self) -> None:
+        with patch.dict("os.environ", {"PASSWORD_BCRYPT_ROUNDS": "2"}, clear=False):
+            with self.assertRaises(ValueError):
+                load_password_hasher_config()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,225 @@
+"""Testy cache'ującego proxy Google Places na lokalnym fałszywym serwerze."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.db.database import Base
+from backend.models import PlacesSearchCache
+from backend.places_search import (
+    PlacesSearchConfig,
+    PlacesSearchError,
+    PlacesSearchNotConfiguredError,
+    PlacesSearchService,
+    places_query_key,
+    purge_expired_places_cache,
+)
+
+
+class FakePlacesServer:
+    def __init__(self, *, delay: float = 0.0, status: int = 200) -> None:
+        self.delay = delay
+        self.status = status
+        self.requests: list[dict] = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", "0"))
+                fake.requests.append({
+                    "path": self.path,
+                    "api_key": self.headers.get("X-Goog-Api-Key"),
+                    "body": json.loads(self.rfile.read(length)),
+                })
+                time.sleep(fake.delay)
+
+                payload = json.dumps({
+                    "places": [
+                        {
+                            "displayName": {"text": "Kawiarnia Testowa"},
+                            "formattedAddress": "ul. Próżna 1, Warszawa",
+                            "location": {"latitude": 52.23, "longitude": 21.0},
+                        }
+                    ]
+                }).encode("utf-8")
+                self.send_response(fake.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class PlacesSearchTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.now = 1_800_000_000.0
+
+    def tearDown(self) -> None:
+        self.engine.dispose()
+
+    def make_service(self, server: FakePlacesServer, **config) -> PlacesSearchService:
+        return PlacesSearchService(
+            PlacesSearchConfig(api_key="test-key", base_url=server.base_url, **config),
+            self.Session,
+            clock=lambda: self.now,
+        )
+
+    def start_server(self, **kwargs) -> FakePlacesServer:
+        server = FakePlacesServer(**kwargs)
+        self.addCleanup(server.close)
+        return server
+
+
+class PlacesSearchServiceTests(PlacesSearchTestCase):
+    def test_normalized_queries_share_cache_entry(self) -> None:
+        server = self.start_server()
+        service = self.make_service(server)
+
+        first = service.search("Kawiarnia  Testowa", "Warszawa")
+        second = service.search("kawiarnia testowa ", "WARSZAWA")
+
+        self.assertEqual(first, second)
+        self.assertEqual(first[0]["name"], "Kawiarnia Testowa")
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(server.requests[0]["path"], "/v1/places:searchText")
+        self.assertEqual(server.requests[0]["api_key"], "test-key")
+        self.assertEqual(server.requests[0]["body"]["textQuery"], "Kawiarnia  Testowa, Warszawa, Polska")
+        self.assertEqual(service.metrics.snapshot()["memory_hits"], 1)
+
+    def test_persistent_cache_survives_new_service(self) -> None:
+        server = self.start_server()
+        self.make_service(server).search("Kawiarnia", "Kraków")
+
+        fresh = self.make_service(server)
+        fresh.search("Kawiarnia", "Kraków")
+        fresh.search("Kawiarnia", "Kraków")
+
+        self.assertEqual(len(server.requests), 1)
+        snapshot = fresh.metrics.snapshot()
+        self.assertEqual((snapshot["db_hits"], snapshot["memory_hits"]), (1, 1))
+
+    def test_expired_entries_are_refetched(self) -> None:
+        server = self.start_server()
+        service = self.make_service(server, cache_ttl_seconds=60)
+
+        service.search("Kawiarnia", None)
+        self.now += 61
+        service.search("Kawiarnia", None)
+
+        self.assertEqual(len(server.requests), 2)
+        db = self.Session()
+        self.assertEqual(db.query(PlacesSearchCache).count(), 1)
+        db.close()
+
+    def test_concurrent_identical_queries_are_coalesced(self) -> None:
+        server = self.start_server(delay=0.3)
+        service = self.make_service(server)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: service.search("Kawiarnia", "Gdańsk"), range(8)))
+
+        self.assertEqual(len(server.requests), 1)
+        self.assertTrue(all(result == results[0] for result in results))
+        snapshot = service.metrics.snapshot()
+        self.assertEqual(snapshot["upstream_calls"], 1)
+        self.assertEqual(snapshot["misses"] + snapshot["coalesced"] + snapshot["memory_hits"], 8)
+
+    def test_upstream_error_is_not_cached(self) -> None:
+        server = self.start_server(status=500)
+        service = self.make_service(server)
+
+        with self.assertRaises(PlacesSearchError):
+            service.search("Kawiarnia", None)
+
+        server.status = 200
+        service.search("Kawiarnia", None)
+
+        self.assertEqual(len(server.requests), 2)
+        self.assertEqual(service.metrics.snapshot()["upstream_errors"], 1)
+
+    def test_missing_api_key(self) -> None:
+        service = PlacesSearchService(PlacesSearchConfig(api_key=""), self.Session)
+
+        with self.assertRaises(PlacesSearchNotConfiguredError):
+            service.search("Kawiarnia", None)
+
+    def test_database_errors_fall_back_to_upstream(self) -> None:
+        server = self.start_server(delay=0.2)
+
+        def broken_session():
+            raise OperationalError("SELECT 1", {}, Exception("database is locked"))
+
+        service = PlacesSearchService(
+            PlacesSearchConfig(api_key="test-key", base_url=server.base_url),
+            broken_session,
+            clock=lambda: self.now,
+        )
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: service.search("Kawiarnia", "Poznań"), range(4)))
+
+        self.assertTrue(all(result and result == results[0] for result in results))
+        self.assertEqual(len(server.requests), 1)
+        snapshot = service.metrics.snapshot()
+        # Każdy odczyt z bazy (wywołania bez trafienia w pamięci) i jeden zapis.
+        self.assertEqual(snapshot["db_errors"], 4 - snapshot["memory_hits"] + 1)
+        self.assertEqual(snapshot["upstream_errors"], 0)
+
+    def test_memory_lru_evicts_oldest(self) -> None:
+        server = self.start_server()
+        service = self.make_service(server, memory_cache_size=1)
+
+        service.search("Pierwsza", None)
+        service.search("Druga", None)
+
+        self.assertEqual(list(service._memory), [places_query_key("Druga", None)])
+
+
+class PurgeExpiredPlacesCacheTests(PlacesSearchTestCase):
+    def test_removes_only_expired_rows(self) -> None:
+        now = datetime(2026, 10, 1, 12, 0)
+        db = self.Session()
+        for key, expires_at in (("a", now - timedelta(seconds=1)), ("b", now + timedelta(hours=1))):
+            db.add(PlacesSearchCache(query_key=key, query=key, items_json="[]", expires_at=expires_at))
+        db.commit()
+
+        self.assertEqual(purge_expired_places_cache(db, now=now), 1)
+        self.assertEqual([row.query_key for row in db.query(PlacesSearchCache)], ["b"])
+        db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+"""Testy wykrywania N+1 i budżetów zapytań."""
+
+from __future__ import annotations
+
+import unittest
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.db.database import Base
+from backend.models import Event, EventSave, EventSignup, User, UserNotification, UserProfile
+from backend.query_tracking import (
+    QueryBudgetExceeded,
+    QueryTracker,
+    QueryTrackingMiddleware,
+    install_query_tracking,
+    normalize_sql,
+    query_budget,
+    track_queries,
+)
+
+
+def _memory_engine():
+    return create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+
+class NormalizeSqlTests(unittest.TestCase):
+    def test_parameters_and_literals_collapse_to_one_shape(self) -> None:
+        self.assertEqual(
+            normalize_sql("SELECT users.id FROM users\n WHERE users.id = ? AND users.email = 'a@b.pl'"),
+            normalize_sql("SELECT users.id FROM users WHERE users.id = %(id_1)s AND users.email = :email"),
+        )
+        self.assertEqual(
+            normalize_sql("SELECT * FROM events WHERE events.id IN (?, ?, ?) LIMIT 20"),
+            "SELECT * FROM events WHERE events.id IN (?) LIMIT ?",
+        )
+
+    def test_identifiers_with_digits_are_kept(self) -> None:
+        self.assertIn("param_1", normalize_sql("SELECT anon_1.param_1 FROM anon_1"))
+
+
+class QueryTrackerTests(unittest.TestCase):
+    def test_flags_repeated_shapes_with_site(self) -> None:
+        tracker = QueryTracker(threshold=3)
+        for user_id in range(4):
+            tracker.record(f"SELECT * FROM users WHERE id = {user_id}")
+        tracker.record("SELECT * FROM events")
+
+        repeated = tracker.repeated()
+
+        self.assertEqual(len(repeated), 1)
+        self.assertEqual(repeated[0].count, 4)
+        self.assertIn("backend/test_query_tracking.py", repeated[0].site)
+        self.assertEqual(tracker.total, 5)
+
+    def test_query_budget_raises_with_report(self) -> None:
+        engine = _memory_engine()
+        with self.assertRaises(QueryBudgetExceeded) as ctx:
+            with query_budget(2, engine=engine):
+                with engine.connect() as conn:
+                    for value in range(3):
+                        conn.execute(text("SELECT :value"), {"value": value})
+
+        self.assertIn("3 > 2", str(ctx.exception))
+        self.assertIn("3x SELECT ?", str(ctx.exception))
+
+    def test_query_budget_passes_within_limit(self) -> None:
+        engine = _memory_engine()
+        with query_budget(1, engine=engine) as tracker:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+        self.assertEqual(tracker.total, 1)
+
+
+class TrackQueriesTests(unittest.TestCase):
+    def test_counts_only_statements_from_current_context(self) -> None:
+        engine = _memory_engine()
+        install_query_tracking(engine)
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            with track_queries() as tracker:
+                conn.execute(text("SELECT 2"))
+                conn.execute(text("SELECT 3"))
+            conn.execute(text("SELECT 4"))
+
+        self.assertEqual(tracker.total, 2)
+
+
+class QueryTrackingMiddlewareTests(unittest.TestCase):
+    def test_logs_n_plus_one_with_route(self) -> None:
+        engine = _memory_engine()
+        install_query_tracking(engine)
+
+        app = FastAPI()
+        app.add_middleware(QueryTrackingMiddleware, threshold=3)
+
+        @app.get("/users/{user_id}/friends")
+        def friends(user_id: int):
+            with engine.connect() as conn:
+                for friend_id in range(5):
+                    conn.execute(text("SELECT :id"), {"id": friend_id})
+            return {}
+
+        with self.assertLogs("backend.query_tracking", level="WARNING") as logs:
+            TestClient(app).get("/users/1/friends")
+
+        self.assertIn("GET /users/{user_id}/friends: 5x SELECT ?", logs.output[0])
+        self.assertIn("in friends", logs.output[0])
+
+
+class BackgroundJobQueryBudgetTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = _memory_engine()
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(bind=self.engine, autocommit=False, autoflush=False)()
+        self.now = datetime(2026, 3, 1, 12, 0, 0)
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.engine.dispose()
+
+    def add_users(self, count: int, role: str = "user") -> list[User]:
+        users = [
+            User(email=f"{role}{index}@example.com", password_hash="x", role=role, status="active")
+            for index in range(count)
+        ]
+        self.db.add_all(users)
+        self.db.flush()
+        return users
+
+    def test_event_reminders_do_not_query_per_event_or_user(self) -> None:
+        from backend.main import ensure_event_reminder_notifications
+
+        partner = self.add_users(1, role="partner")[0]
+        users = self.add_users(10)
+        for index in range(8):
+            event = Event(
+                partner_user_id=partner.id,
+                title=f"Event {index}",
+                description="",
+                city="Warszawa",
+                where="Centrum",
+                interest_tag="kino",
+                start_at=self.now + timedelta(hours=30 + index),
+                end_at=self.now + timedelta(hours=32 + index),
+                status="published",
+            )
+            self.db.add(event)
+            self.db.flush()
+            for user in users[:5]:
+                self.db.add(EventSignup(event_id=event.id, user_id=user.id))
+            for user in users[5:]:
+                self.db.add(EventSave(event_id=event.id, user_id=user.id))
+        self.db.commit()
+
+        # 4 odczyty niezależnie od liczby wydarzeń i uczestników + INSERT na powiadomienie.
+        with query_budget(4 + 80, engine=self.engine) as tracker:
+            created = ensure_event_reminder_notifications(self.db, self.now)
+            self.db.commit()
+
+        self.assertEqual(created, 80)
+        self.assertEqual(
+            [shape.sql for shape in tracker.repeated() if shape.sql.startswith("SELECT")],
+            [],
+        )
+        self.assertEqual(self.db.query(UserNotification).count(), 80)
+        self.assertEqual(ensure_event_reminder_notifications(self.db, self.now), 0)
+
+    def test_expire_due_plans_skips_profiles_not_due(self) -> None:
+        from backend.main import _expire_due_plans
+
+        users = self.add_users(20)
+        for index, user in enumerate(users):
+            self.db.add(
+                UserProfile(
+                    user_id=user.id,
+                    plan="plus",
+                    plan_status="active",
+                    plan_expires_at=self.now + timedelta(days=1 + index),
+                )
+            )
+        self.db.commit()
+
+        with query_budget(2, engine=self.engine):
+            result = _expire_due_plans(self.db, self.now)
+
+        self.assertEqual(result, {"user": 0, "partner": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
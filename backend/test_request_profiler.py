@@ -0,0 +1,168 @@
+"""Testy profilera żądań."""
+
+from __future__ import annotations
+
+import json
+import time
+import unittest
+from datetime import datetime, timedelta
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.db.database import Base
+from backend.metrics import MetricsMiddleware, MetricsRegistry
+from backend.models import RequestProfile
+from backend.request_profiler import (
+    ProfilerConfig,
+    RequestProfilerMiddleware,
+    install_profiler,
+    purge_request_profiles,
+    route_root_codes,
+)
+
+
+def _busy(seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+def current_account() -> int:
+    return 1
+
+
+class RequestProfilerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(self.engine)
+        install_profiler(self.engine)
+        self.Session = sessionmaker(bind=self.engine, autocommit=False, autoflush=False)
+        self.authorized: list[str] = []
+
+    def tearDown(self) -> None:
+        self.engine.dispose()
+
+    def authorize(self, authorization: str) -> int | None:
+        self.authorized.append(authorization)
+        return 7 if authorization == "Bearer admin" else None
+
+    def make_client(self, config: ProfilerConfig | None = None, rng=lambda: 1.0) -> TestClient:
+        app = FastAPI()
+        engine = self.engine
+
+        @app.get("/slow/{item_id}")
+        def slow(item_id: int, account: int = Depends(current_account)):
+            with engine.connect() as conn:
+                for value in range(3):
+                    conn.execute(text("SELECT :value"), {"value": value})
+            _busy(0.08)
+            return {"item_id": item_id}
+
+        app.add_middleware(
+            RequestProfilerMiddleware,
+            session_factory=self.Session,
+            authorize=self.authorize,
+            config=config or ProfilerConfig(interval_seconds=0.002),
+            rng=rng,
+        )
+        app.add_middleware(MetricsMiddleware, registry=MetricsRegistry())
+        return TestClient(app)
+
+    def profiles(self) -> list[RequestProfile]:
+        with self.Session() as db:
+            return db.query(RequestProfile).all()
+
+    def test_admin_header_profiles_request_under_request_id(self) -> None:
+        response = self.make_client().get(
+            "/slow/5",
+            headers={"X-Usly-Profile": "1", "Authorization": "Bearer admin"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        [profile] = self.profiles()
+        self.assertEqual(profile.request_id, response.headers["X-Request-ID"])
+        self.assertEqual((profile.trigger, profile.user_id), ("header", 7))
+        self.assertEqual((profile.method, profile.route, profile.path), ("GET", "/slow/{item_id}", "/slow/5"))
+        self.assertEqual(profile.status_code, 200)
+        self.assertGreaterEqual(profile.duration_ms, 80)
+        self.assertEqual(profile.sql_count, 3)
+        self.assertEqual([statement["sql"] for statement in json.loads(profile.statements_json)], ["SELECT ?"] * 3)
+
+        self.assertGreater(profile.sample_count, 5)
+        lines = profile.folded.strip().splitlines()
+        root = "GET /slow/{item_id};slow (backend/test_request_profiler.py:"
+        self.assertTrue(all(line.startswith(root) for line in lines))
+        self.assertTrue(any(";_busy (backend/test_request_profiler.py:" in line for line in lines))
+        self.assertEqual(sum(int(line.rsplit(" ", 1)[1]) for line in lines), profile.sample_count)
+
+    def test_requests_without_header_are_not_profiled(self) -> None:
+        response = self.make_client().get("/slow/1", headers={"Authorization": "Bearer admin"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.profiles(), [])
+        self.assertEqual(self.authorized, [])
+
+    def test_header_from_non_admin_is_ignored(self) -> None:
+        response = self.make_client().get(
+            "/slow/1",
+            headers={"X-Usly-Profile": "1", "Authorization": "Bearer user"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.profiles(), [])
+        self.assertEqual(self.authorized, ["Bearer user"])
+
+    def test_sample_rate_profiles_anonymous_requests(self) -> None:
+        client = self.make_client(ProfilerConfig(sample_rate=0.5, interval_seconds=0.002), rng=lambda: 0.2)
+
+        client.get("/slow/1")
+
+        [profile] = self.profiles()
+        self.assertEqual((profile.trigger, profile.user_id), ("sample", None))
+
+    def test_route_roots_include_dependencies(self) -> None:
+        app = FastAPI()
+
+        @app.get("/items")
+        def items(account: int = Depends(current_account)):
+            return []
+
+        route = next(route for route in app.routes if getattr(route, "path", None) == "/items")
+        self.assertEqual(route_root_codes(route), {items.__code__, current_account.__code__})
+
+    def test_purge_removes_profiles_older_than_retention(self) -> None:
+        now = datetime(2026, 5, 10)
+        with self.Session() as db:
+            for request_id, age_days in (("old", 8), ("fresh", 2)):
+                db.add(
+                    RequestProfile(
+                        request_id=request_id,
+                        created_at=now - timedelta(days=age_days),
+                        trigger="header",
+                        method="GET",
+                        route="/x",
+                        path="/x",
+                        status_code=200,
+                        duration_ms=1.0,
+                        statements_json="[]",
+                        folded="",
+                    )
+                )
+            db.commit()
+
+            self.assertEqual(purge_request_profiles(db, retention_days=7, now=now), 1)
+            self.assertEqual([row.request_id for row in db.query(RequestProfile).all()], ["fresh"])
+
+
+if __name__ == "__main__":
+    unittest.main()
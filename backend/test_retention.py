@@ -0,0 +1,155 @@
+"""Testy retencji tabel tymczasowych (purge_expired_rows)."""
+
+from __future__ import annotations
+
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import backend.main as main
+from backend.db.database import Base
+from backend.models import (
+    AiUsageLog,
+    AppleAuthNonce,
+    DevicePushToken,
+    PasswordResetToken,
+    RevenueCatWebhookEvent,
+    User,
+    UserNotification,
+)
+from backend.retention import RETENTION_RULES, RetentionConfig, purge_expired_rows
+
+
+class RetentionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        self.db = self.Session()
+        self.addCleanup(self.engine.dispose)
+        self.addCleanup(self.db.close)
+
+        self.now = datetime(2026, 10, 1)
+        user = User(email="user@example.com", password_hash="x", role="user", status="active")
+        self.db.add(user)
+        self.db.flush()
+        uid = user.id
+        day = timedelta(days=1)
+
+        for index in range(12):
+            # Co drugi nonce zużyty dawno, reszta jeszcze ważna.
+            self.db.add(
+                AppleAuthNonce(
+                    nonce_hash=f"n{index}",
+                    expires_at=self.now + day,
+                    used_at=self.now - 3 * day if index % 2 == 0 else None,
+                    created_at=self.now - 3 * day,
+                )
+            )
+        self.db.add_all([
+            PasswordResetToken(user_id=uid, token="expired", expires_at=self.now - 10 * day),
+            PasswordResetToken(user_id=uid, token="valid", expires_at=self.now + day),
+        ])
+        for index, (status, age) in enumerate([("processed", 100), ("processed", 10), ("failed", 100)]):
+            self.db.add(
+                RevenueCatWebhookEvent(
+                    event_id=f"e{index}",
+                    event_type="RENEWAL",
+                    payload_json="{}",
+                    status=status,
+                    processed_at=self.now - age * day,
+                )
+            )
+        for index, (active, age) in enumerate([(False, 40), (False, 5), (True, 40), (True, 300)]):
+            self.db.add(
+                DevicePushToken(
+                    user_id=uid,
+                    token=f"token-{index}",
+                    platform="ios",
+                    language="pl",
+                    is_active=active,
+                    last_seen_at=self.now - age * day,
+                )
+            )
+        self.db.add_all([
+            AiUsageLog(user_id=uid, feature="avatar", plan="free", created_at=self.now - 500 * day),
+            AiUsageLog(user_id=uid, feature="avatar", plan="free", created_at=self.now - 20 * day),
+            UserNotification(user_id=uid, type="friend_request", read_at=self.now - 200 * day),
+            UserNotification(user_id=uid, type="friend_request", read_at=None, created_at=self.now - 900 * day),
+        ])
+        self.db.commit()
+
+    def _counts(self) -> dict[str, int]:
+        return {
+            model.__tablename__: self.db.query(model).count()
+            for model in (AppleAuthNonce, PasswordResetToken, RevenueCatWebhookEvent, DevicePushToken, AiUsageLog, UserNotification)
+        }
+
+    def test_purges_expired_rows_per_rule(self) -> None:
+        result = purge_expired_rows(self.db, RetentionConfig(batch_size=4), now=self.now)
+
+        self.assertEqual(result, {
+            "apple_auth_nonces": 6,
+            "password_reset_tokens": 1,
+            "email_verification_tokens": 0,
+            "revenuecat_webhook_events": 1,
+            "inactive_push_tokens": 1,
+            "stale_push_tokens": 1,
+            "ai_usage_logs": 1,
+            "read_notifications": 1,
+        })
+        self.assertEqual(self._counts(), {
+            "apple_auth_nonces": 6,
+            "password_reset_tokens": 1,
+            "revenuecat_webhook_events": 2,
+            "device_push_tokens": 2,
+            "ai_usage_logs": 1,
+            "user_notifications": 1,
+        })
+        self.assertEqual(self.db.query(PasswordResetToken).one().token, "valid")
+
+    def test_dry_run_only_counts(self) -> None:
+        before = self._counts()
+        result = purge_expired_rows(self.db, RetentionConfig(dry_run=True), now=self.now)
+        self.assertEqual(result["apple_auth_nonces"], 6)
+        self.assertEqual(self._counts(), before)
+
+    def test_batches_are_bounded_and_rules_can_be_disabled(self) -> None:
+        days = {rule.name: rule.days for rule in RETENTION_RULES}
+        days["read_notifications"] = 0
+        statements = []
+
+        @event.listens_for(self.engine, "before_cursor_execute")
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("DELETE"):
+                statements.append(statement)
+
+        result = purge_expired_rows(self.db, RetentionConfig(batch_size=2, max_batches=2, days=days), now=self.now)
+
+        self.assertEqual(result["apple_auth_nonces"], 4)
+        self.assertNotIn("read_notifications", result)
+        self.assertTrue(all("LIMIT" in statement for statement in statements))
+        self.assertEqual(self.db.query(AppleAuthNonce).count(), 8)
+
+    def test_admin_preview(self) -> None:
+        admin = SimpleNamespace(id=1, role="admin", admin_level="owner")
+        with patch.object(main, "SessionLocal", self.Session), patch.object(main, "retention_config", RetentionConfig()):
+            body = main.admin_retention(current_user=admin)["data"]
+        rules = {rule["name"]: rule for rule in body["rules"]}
+        self.assertEqual(rules["revenuecat_webhook_events"]["days"], 90)
+        self.assertEqual(rules["stale_push_tokens"]["table"], "device_push_tokens")
+        self.assertGreaterEqual(rules["apple_auth_nonces"]["pending_rows"], 6)
+        self.assertEqual(self.db.query(AppleAuthNonce).count(), 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
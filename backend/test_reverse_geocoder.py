@@ -0,0 +1,116 @@
+"""Testy offline'owego reverse geocodingu."""
+
+from __future__ import annotations
+
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.db.database import Base
+from backend.models import ReverseGeocodeCache, User, UserProfile
+from backend.reverse_geocoder import (
+    CityIndex,
+    Place,
+    ReverseGeocodeConfig,
+    _store,
+    fill_cache_from_remote,
+    get_city_index,
+    lookup_city,
+)
+
+
+class CityIndexTests(unittest.TestCase):
+    def test_bundled_dataset_resolves_major_cities(self) -> None:
+        index = get_city_index()
+
+        self.assertGreater(index.size, 1000)
+        self.assertEqual(index.nearest(52.23, 21.01, 25)[0].name, "Warszawa")
+        self.assertEqual(index.nearest(52.19, 21.03, 25)[0].name, "Warszawa")
+        self.assertEqual(index.nearest(50.06, 19.94, 25)[0].name, "Kraków")
+        self.assertEqual(index.nearest(54.35, 18.65, 25)[0].name, "Gdańsk")
+
+    def test_returns_none_outside_max_distance(self) -> None:
+        self.assertIsNone(get_city_index().nearest(56.5, 18.0, 25))
+
+    def test_finds_nearest_across_cells(self) -> None:
+        index = CityIndex(
+            [
+                Place("Bliżej", 50.26, 20.0, 1000),
+                Place("Dalej", 50.0, 20.4, 1000),
+            ],
+            cell_degrees=0.25,
+        )
+
+        place, distance = index.nearest(50.24, 20.0, 50)
+
+        self.assertEqual(place.name, "Bliżej")
+        self.assertLess(distance, 3)
+
+
+class LookupCityTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.db = self.Session()
+        self.index = CityIndex([Place("Testowo", 51.0, 19.0, 5000)])
+
+    def tearDown(self) -> None:
+        self.db.close()
+        self.engine.dispose()
+
+    def test_local_result_is_cached(self) -> None:
+        self.assertEqual(lookup_city(self.db, 51.01, 19.02, index=self.index), ("Testowo", False))
+        self.db.commit()
+
+        row = self.db.query(ReverseGeocodeCache).one()
+        self.assertEqual((row.lat_key, row.lng_key, row.source), (5101, 1902, "local"))
+
+        empty_index = CityIndex([])
+        self.assertEqual(lookup_city(self.db, 51.01, 19.02, index=empty_index), ("Testowo", False))
+
+    def test_duplicate_key_is_ignored(self) -> None:
+        _store(self.db, 5101, 1902, "Testowo", "local")
+        self.db.commit()
+        _store(self.db, 5101, 1902, "Inne", "nominatim")
+        self.db.commit()
+
+        self.assertEqual(self.db.query(ReverseGeocodeCache).one().city, "Testowo")
+
+    def test_miss_requests_remote_lookup(self) -> None:
+        config = ReverseGeocodeConfig(max_distance_km=5)
+
+        self.assertEqual(lookup_city(self.db, 54.9, 15.0, index=self.index, config=config), (None, True))
+        self.assertEqual(self.db.query(ReverseGeocodeCache).count(), 0)
+
+    def test_remote_fallback_fills_cache_and_profile(self) -> None:
+        user = User(email="geo@example.com", password_hash="x", role="user", status="active")
+        self.db.add(user)
+        self.db.flush()
+        self.db.add(UserProfile(user_id=user.id, location_lat=54.9, location_lng=15.0))
+        self.db.commit()
+
+        with patch("backend.reverse_geocoder.fetch_nominatim_city", return_value="Morze"):
+            city = fill_cache_from_remote(self.Session, user.id, 54.9, 15.0)
+
+        self.assertEqual(city, "Morze")
+        self.db.expire_all()
+        self.assertEqual(self.db.query(UserProfile).one().miasto, "Morze")
+        self.assertEqual(self.db.query(ReverseGeocodeCache).one().source, "nominatim")
+
+    def test_remote_failure_is_not_cached(self) -> None:
+        with patch("backend.reverse_geocoder.fetch_nominatim_city", return_value=None):
+            self.assertIsNone(fill_cache_from_remote(self.Session, 1, 54.9, 15.0))
+
+        self.assertEqual(self.db.query(ReverseGeocodeCache).count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+"""Testy schedulera zadań okresowych z lease w bazie."""
+
+from __future__ import annotations
+
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.db.database import Base
+from backend.models import ScheduledJob
+from backend.scheduler import JobScheduler, PeriodicJob, SchedulerConfig, scheduled_jobs_status
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = datetime(2026, 1, 1, 12, 0, 0)
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+class JobSchedulerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine, autocommit=False, autoflush=False)
+        self.clock = FakeClock()
+        self.calls: list[str] = []
+
+    def tearDown(self) -> None:
+        self.engine.dispose()
+
+    def make_scheduler(self, jobs, worker_id: str, lease_seconds: int = 600) -> JobScheduler:
+        scheduler = JobScheduler(
+            self.Session,
+            jobs,
+            config=SchedulerConfig(lease_seconds=lease_seconds),
+            worker_id=worker_id,
+            clock=self.clock,
+        )
+        scheduler.register_jobs()
+        return scheduler
+
+    def job_row(self, name: str) -> ScheduledJob:
+        db = self.Session()
+        try:
+            return db.query(ScheduledJob).filter(ScheduledJob.name == name).one()
+        finally:
+            db.close()
+
+    def test_job_runs_once_per_interval_across_workers(self) -> None:
+        job = PeriodicJob("sweep", 3600, lambda db: self.calls.append("sweep") or 3)
+        first = self.make_scheduler([job], "worker-a")
+        second = self.make_scheduler([job], "worker-b")
+
+        self.assertEqual(first.run_pending(), ["sweep"])
+        self.assertEqual(second.run_pending(), [])
+
+        self.clock.now += timedelta(minutes=59)
+        self.assertEqual(second.run_pending(), [])
+
+        self.clock.now += timedelta(minutes=1)
+        self.assertEqual(second.run_pending(), ["sweep"])
+        self.assertEqual(first.run_pending(), [])
+
+        self.assertEqual(self.calls, ["sweep", "sweep"])
+        row = self.job_row("sweep")
+        self.assertEqual(row.run_count, 2)
+        self.assertEqual(row.last_rows, 3)
+        self.assertEqual(row.last_status, "ok")
+        self.assertEqual(row.last_worker, "worker-b")
+        self.assertIsNone(row.lease_owner)
+
+    def test_running_job_holds_lease(self) -> None:
+        results = []
+
+        def sweep(db):
+            results.append(other.run_job(job))
+            return 0
+
+        job = PeriodicJob("sweep", 60, sweep)
+        owner = self.make_scheduler([job], "worker-a")
+        other = self.make_scheduler([job], "worker-b")
+
+        self.assertTrue(owner.run_job(job))
+        self.assertEqual(results, [False])
+
+    def test_expired_lease_can_be_taken_over(self) -> None:
+        job = PeriodicJob("sweep", 60, lambda db: 1)
+        crashed = self.make_scheduler([job], "worker-a", lease_seconds=300)
+        self.assertTrue(crashed._claim(job, self.clock.now))
+
+        survivor = self.make_scheduler([job], "worker-b", lease_seconds=300)
+        self.assertEqual(survivor.run_pending(), [])
+
+        self.clock.now += timedelta(seconds=301)
+        self.assertEqual(survivor.run_pending(), ["sweep"])
+        self.assertEqual(self.job_row("sweep").last_worker, "worker-b")
+
+    def test_failure_is_recorded_and_retried_next_interval(self) -> None:
+        def broken(db):
+            raise RuntimeError("smtp down")
+
+        job = PeriodicJob("notices", 600, broken)
+        scheduler = self.make_scheduler([job], "worker-a")
+
+        self.assertEqual(scheduler.run_pending(), ["notices"])
+
+        row = self.job_row("notices")
+        self.assertEqual(row.last_status, "error")
+        self.assertIn("smtp down", row.last_error)
+        self.assertEqual(row.failure_count, 1)
+        self.assertIsNone(row.lease_owner)
+        self.assertEqual(row.next_run_at, self.clock.now + timedelta(seconds=600))
+
+    def test_status_lists_jobs(self) -> None:
+        jobs = [
+            PeriodicJob("b_job", 60, lambda db: None),
+            PeriodicJob("a_job", 60, lambda db: 5),
+        ]
+        scheduler = self.make_scheduler(jobs, "worker-a")
+        scheduler.run_pending()
+
+        db = self.Session()
+        try:
+            status = scheduled_jobs_status(db)
+        finally:
+            db.close()
+
+        self.assertEqual([item["name"] for item in status], ["a_job", "b_job"])
+        self.assertEqual(status[0]["last_rows"], 5)
+        self.assertIsNone(status[1]["last_rows"])
+        self.assertFalse(status[0]["running"])
+
+    def test_duplicate_job_names_are_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            JobScheduler(self.Session, [PeriodicJob("x", 1, len), PeriodicJob("x", 1, len)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+"""Budżet czasu importu backend.main (zimny start po deployu).
+
+Import jest mierzony w osobnym procesie przez `python -X importtime`.
+Budżet można nadpisać zmienną STARTUP_IMPORT_BUDGET_MS (np. na wolnym CI).
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_STARTUP_IMPORT_BUDGET_MS = 3000
+
+# SDK ładowane leniwie (backend.integrations) — nie mogą wrócić do importu modułu.
+LAZY_MODULES = (
+    "boto3",
+    "botocore",
+    "firebase_admin",
+    "googleapiclient",
+    "google.auth",
+    "openai",
+    "qrcode",
+    "pyotp",
+    "sentry_sdk",
+)
+
+
+def _import_profile(module: str) -> tuple[dict[str, int], str]:
+    env = dict(os.environ)
+    env.setdefault("JWT_SECRET_KEY", "startup-import-test")
+    env["SENTRY_DSN"] = ""
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    if result.returncode != 0:
+        raise AssertionError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    cumulative_us: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        try:
+            cumulative_us[name.strip()] = int(cumulative)
+        except ValueError:
+            continue  # nagłówek tabeli
+    return cumulative_us, result.stderr
+
+
+class StartupImportTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.profile, _ = _import_profile("backend.main")
+
+    def test_heavy_sdks_are_not_imported(self) -> None:
+        loaded = sorted(
+            name
+            for name in self.profile
+            if any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES)
+        )
+        self.assertEqual(loaded, [])
+
+    def test_import_within_budget(self) -> None:
+        budget_ms = int(os.getenv("STARTUP_IMPORT_BUDGET_MS", str(DEFAULT_STARTUP_IMPORT_BUDGET_MS)))
+        elapsed_ms = self.profile["backend.main"] / 1000
+
+        self.assertLess(
+            elapsed_ms,
+            budget_ms,
+            f"import backend.main took {elapsed_ms:.0f} ms (budget {budget_ms} ms)",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
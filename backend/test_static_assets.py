@@ -0,0 +1,124 @@
+"""Testy budowania i serwowania hashowanych zasobów statycznych."""
+
+from __future__ import annotations
+
+import gzip
+import tempfile
+import unittest
+from pathlib import Path
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from backend.static_assets import (
+    IMMUTABLE_CACHE_CONTROL,
+    build_static_bundle,
+    load_static_bundle,
+    negotiate_encoding,
+    static_response,
+    write_static_bundle,
+)
+
+
+APP_JS = "console.log('usly');\n" * 100
+INDEX_HTML = (
+    '<link rel="stylesheet" href="./style.css?v=20260314-2136">\n'
+    '<script src="app.js?v=20260720-push3"></script>\n'
+    '<img src="./USLY logo.png">\n'
+)
+
+
+class StaticAssetsTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.source = Path(self.tmp.name) / "frontend"
+        self.source.mkdir()
+        (self.source / "app.js").write_text(APP_JS, encoding="utf-8")
+        (self.source / "style.css").write_text("body { margin: 0; }\n", encoding="utf-8")
+        (self.source / "index.html").write_text(INDEX_HTML, encoding="utf-8")
+
+
+class BuildStaticBundleTests(StaticAssetsTestCase):
+    def test_hashes_assets_and_rewrites_html(self) -> None:
+        bundle = build_static_bundle(self.source)
+
+        app_js = bundle.assets["app.js"]
+        self.assertRegex(app_js.hashed_name, r"^app\.[0-9a-f]{12}\.js$")
+
+        html = bundle.pages["index.html"].bodies["identity"].decode("utf-8")
+        self.assertIn(f'src="/static/{app_js.hashed_name}"', html)
+        self.assertIn(f'href="/static/{bundle.assets["style.css"].hashed_name}"', html)
+        self.assertIn('src="./USLY logo.png"', html)
+
+    def test_small_files_are_not_compressed(self) -> None:
+        bundle = build_static_bundle(self.source)
+
+        self.assertEqual(set(bundle.assets["style.css"].bodies), {"identity"})
+        self.assertEqual(
+            gzip.decompress(bundle.assets["app.js"].bodies["gzip"]).decode("utf-8"),
+            APP_JS,
+        )
+
+    def test_written_bundle_round_trips(self) -> None:
+        bundle = build_static_bundle(self.source)
+        dist = Path(self.tmp.name) / "dist"
+
+        write_static_bundle(bundle, dist)
+        loaded = load_static_bundle(dist)
+
+        self.assertTrue((dist / bundle.assets["app.js"].hashed_name).is_file())
+        self.assertEqual(loaded.assets["app.js"], bundle.assets["app.js"])
+        self.assertEqual(loaded.pages["index.html"], bundle.pages["index.html"])
+
+
+class NegotiateEncodingTests(unittest.TestCase):
+    def test_prefers_brotli_then_gzip(self) -> None:
+        available = {"identity", "gzip", "br"}
+
+        self.assertEqual(negotiate_encoding("gzip, deflate, br", available), "br")
+        self.assertEqual(negotiate_encoding("gzip", available), "gzip")
+        self.assertEqual(negotiate_encoding("br;q=0, gzip", available), "gzip")
+        self.assertEqual(negotiate_encoding("*", {"identity", "gzip"}), "gzip")
+        self.assertEqual(negotiate_encoding(None, available), "identity")
+        self.assertEqual(negotiate_encoding("deflate", available), "identity")
+
+
+class StaticResponseTests(StaticAssetsTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        bundle = build_static_bundle(self.source)
+        self.asset = bundle.assets["app.js"]
+
+        app = FastAPI()
+
+        @app.get("/asset")
+        def asset(request: Request):
+            return static_response(request, self.asset, immutable=True)
+
+        self.client = TestClient(app)
+
+    def test_serves_precompressed_body(self) -> None:
+        response = self.client.get("/asset", headers={"Accept-Encoding": "gzip"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertEqual(response.headers["cache-control"], IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(response.headers["vary"], "Accept-Encoding")
+        self.assertEqual(response.text, APP_JS)
+
+    def test_conditional_request_returns_304(self) -> None:
+        first = self.client.get("/asset", headers={"Accept-Encoding": "identity"})
+        second = self.client.get(
+            "/asset",
+            headers={"Accept-Encoding": "identity", "If-None-Match": first.headers["etag"]},
+        )
+
+        self.assertNotIn("content-encoding", first.headers)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b"")
+        self.assertEqual(second.headers["etag"], first.headers["etag"])
+
+
+if __name__ == "__main__":
+    unittest.main()